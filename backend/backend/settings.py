@@ -174,6 +174,30 @@ USE_TZ = True
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Background report generation: 'thread' runs jobs in a local worker pool,
+# 'celery' hands them to the Celery broker configured above.
+EXPORT_JOB_BACKEND = os.environ.get("EXPORT_JOB_BACKEND", "thread")
+EXPORT_JOB_WORKERS = int(os.environ.get("EXPORT_JOB_WORKERS", 2))
+EXPORT_CACHE_DIR = os.environ.get("EXPORT_CACHE_DIR", os.path.join(MEDIA_ROOT, 'exports'))
+# Seconds after which a queued or running export job is taken to be lost and queued again
+EXPORT_JOB_TIMEOUT = int(os.environ.get("EXPORT_JOB_TIMEOUT", 1800))
+
+# Seconds the shared employee/shift data behind the manual punch and attendance
+# edit views is kept before a full reload (edits in this process apply at once)
+PROCESSOR_REGISTRY_MAX_AGE = int(os.environ.get("PROCESSOR_REGISTRY_MAX_AGE", 300))
+
+# Log processing commits and advances LastLogId after this many logs or this
+# many seconds, whichever comes first, so a failure loses at most one chunk
+LOG_PROCESSING_CHUNK_SIZE = int(os.environ.get("LOG_PROCESSING_CHUNK_SIZE", 1000))
+LOG_PROCESSING_CHUNK_SECONDS = float(os.environ.get("LOG_PROCESSING_CHUNK_SECONDS", 10))
+
+# Run the scheduled `task` command on attendance7's set-based batch mode instead
+# of the attendance4 per-log processor
+LOG_PROCESSING_BATCH = os.environ.get("LOG_PROCESSING_BATCH", "False") == "True"
+
+# Largest body accepted by /logs/bulk/, in bytes; the default holds about 130,000 punches
+LOGS_BULK_MAX_BODY_SIZE = int(os.environ.get("LOGS_BULK_MAX_BODY_SIZE", 20 * 1024 * 1024))
+
 # FILTERS_DISABLE_HELP_TEXT = True
 
 REST_FRAMEWORK = {
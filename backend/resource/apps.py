@@ -13,6 +13,13 @@ class ResourceConfig(AppConfig):
 
 
     def ready(self):
+        # Connect the Attendance signal handlers that keep the monthly summaries current
+        from . import monthly_summary  # noqa: F401
+        # Connect the Employee/Shift/AutoShift handlers that keep the shared processor data current
+        from . import processor_registry  # noqa: F401
+        # Connect the Attendance handlers that keep the attendance processor's open sessions current
+        from . import open_sessions  # noqa: F401
+
         # Prevent the scheduler from starting during migrations
         if 'runserver' in sys.argv or 'uwsgi' in sys.argv:
             from . import scheduler
@@ -20,7 +27,7 @@ class ResourceConfig(AppConfig):
             try:
                 if ENVIRONMENT != 'local':
                     call_command('migrate', interactive=False)  # Ensure all migrations are applied
-                    call_command('absentees', days=400)
+                    # Absentee rows are opened by the scheduled absentees run from its watermark
                     call_command('reset_sequences')
                     scheduler.start()
                     print("Scheduler started.")
@@ -1,4 +1,4 @@
-from datetime import datetime, timedelta, date, time
+from datetime import date
 from django.db.models import Q
 from django.db import transaction
 from typing import List, Dict, Tuple
@@ -6,6 +6,7 @@ import logging
 from tqdm import tqdm
 
 from resource.models import Logs, Employee, ManDaysAttendance, LastLogIdMandays
+from resource.punch_pairs import DAY, out_offset, summarize, to_offset
 
 logger = logging.getLogger(__name__)
 
@@ -37,121 +38,59 @@ class ManDaysAttendanceProcessor:
                 .distinct(*distinct_fields)
                 .values('id', 'employeeid', 'log_datetime', 'direction'))
 
-    def _get_last_record_info(self, prev_day_record: ManDaysAttendance) -> Tuple[int, str, time, bool]:
-        """Get info about the last record from previous day."""
-        last_index = 0
-        last_direction = None
-        last_time = None
-        has_out = False
-
-        for i in range(1, 11):
-            in_time = getattr(prev_day_record, f'duty_in_{i}', None)
-            out_time = getattr(prev_day_record, f'duty_out_{i}', None)
-            
-            if in_time is not None:
-                last_index = i
-                last_direction = 'In Device'
-                last_time = in_time
-                
-            if out_time is not None:
-                last_index = i
-                last_direction = 'Out Device'
-                last_time = out_time
-                has_out = True
-                
-            if in_time is None and out_time is None:
+    def _close_prev_day(self, prev_day_record: ManDaysAttendance, current_date: date, sorted_logs: List) -> bool:
+        """
+        Pair the first Out punch of the day with the previous day's last In
+        that has no Out. Returns True if prev_day_record was changed.
+        """
+        # Find the last pair with an In on the previous day
+        for pair in reversed(prev_day_record.punches):
+            if pair[0] is not None:
                 break
+        else:
+            return False
+
+        if pair[1] is not None:
+            return False
 
-        return last_index, last_direction, last_time, has_out
+        # The Out belongs to the next day, so it is stored past midnight
+        pair[1] = DAY + to_offset(sorted_logs[0]['log_datetime'].time())
+        for field, value in summarize(prev_day_record.punches).items():
+            setattr(prev_day_record, field, value)
+        return True
 
-    def _process_day_logs(self, emp_id: str, current_date: date, logs: List, prev_day_record: ManDaysAttendance = None) -> List[Dict]:
-        """Process logs for a single day, handling night shift scenarios."""
+    def _process_day_logs(self, emp_id: str, current_date: date, logs: List, prev_day_record: ManDaysAttendance = None) -> List[List]:
+        """
+        Pair a single day's logs into [in, out] offsets, handling night shift
+        scenarios. Every punch is kept, however many pairs the day has.
+        """
         processed_logs = []
-        slot_index = 1
 
         # Sort logs chronologically
         sorted_logs = sorted(logs, key=lambda x: x['log_datetime'])
         
         # Only proceed with night shift handling if there are logs and first punch is Out Device
         if sorted_logs and sorted_logs[0]['direction'] == 'Out Device' and prev_day_record:
-            last_idx = 0
-            last_in_time = None
-            
-            # Find the last duty_in without duty_out from previous day
-            for i in range(10, 0, -1):
-                in_time = getattr(prev_day_record, f'duty_in_{i}', None)
-                out_time = getattr(prev_day_record, f'duty_out_{i}', None)
-                
-                if in_time is not None:
-                    if out_time is None:
-                        last_idx = i
-                        last_in_time = in_time
-                    break
-            
-            # If we found a duty_in without duty_out, copy the first out punch
-            if last_idx > 0 and last_in_time:
-                first_out_time = sorted_logs[0]['log_datetime'].time()
-                setattr(prev_day_record, f'duty_out_{last_idx}', first_out_time)
-                
-                # Calculate total time for previous day
-                in_dt = datetime.combine(current_date - timedelta(days=1), last_in_time)
-                out_dt = datetime.combine(current_date, first_out_time)
-                if out_dt > in_dt:
-                    total_time = out_dt - in_dt
-                    setattr(prev_day_record, f'total_time_{last_idx}', total_time)
-                
-                # Recalculate total_hours_worked for previous day
-                total_hours = timedelta()
-                for i in range(1, 11):
-                    slot_total = getattr(prev_day_record, f'total_time_{i}', None)
-                    if slot_total:
-                        total_hours += slot_total
-                
-                prev_day_record.total_hours_worked = total_hours
-                
+            if self._close_prev_day(prev_day_record, current_date, sorted_logs):
                 prev_day_record.save()
         
         # Process current day's logs
-        current_in_time = None
+        current_in = None
         
         for log in sorted_logs:
-            if slot_index > 10:
-                break
-
-            log_time = log['log_datetime'].time()
+            offset = to_offset(log['log_datetime'].time())
             
             if log['direction'] == 'In Device':
-                current_in_time = log_time
-                processed_logs.append({
-                    'slot': slot_index,
-                    'duty_in': log_time,
-                    'duty_out': None,
-                    'total_time': None
-                })
-                slot_index += 1
+                current_in = offset
+                processed_logs.append([offset, None])
             else:  # Out Device
-                # Try to pair with previous in time
-                if current_in_time and processed_logs and processed_logs[-1]['duty_out'] is None:
-                    processed_logs[-1]['duty_out'] = log_time
-                    
-                    # Calculate total time
-                    in_dt = datetime.combine(current_date, current_in_time)
-                    out_dt = datetime.combine(current_date, log_time)
-                    if out_dt < in_dt:  # Handle midnight crossing
-                        out_dt += timedelta(days=1)
-                    if out_dt > in_dt:
-                        processed_logs[-1]['total_time'] = out_dt - in_dt
-                    
-                    current_in_time = None
+                # Try to pair with previous in time, crossing midnight if it is earlier
+                if current_in is not None and processed_logs and processed_logs[-1][1] is None:
+                    processed_logs[-1][1] = out_offset(current_in, offset)
+                    current_in = None
                 else:
-                    # Create new record if can't pair
-                    processed_logs.append({
-                        'slot': slot_index,
-                        'duty_in': None,
-                        'duty_out': log_time,
-                        'total_time': None
-                    })
-                    slot_index += 1
+                    # Start a new pair if can't pair
+                    processed_logs.append([None, offset])
 
         return processed_logs
 
@@ -176,6 +115,18 @@ class ManDaysAttendanceProcessor:
     
         return grouped_logs
 
+    def _attendance_data(self, empid_id: int, log_date: date, processed_logs: List[List]) -> Dict:
+        """Field values of the ManDays row for one employee-day."""
+        attendance_data = {
+            'employeeid_id': empid_id,
+            'logdate': log_date,
+            'shift': '',
+            'shift_status': '',
+            'punches': processed_logs,
+        }
+        attendance_data.update(summarize(processed_logs))
+        return attendance_data
+
     def _create_attendance_record(self, emp_id: str, log_date: date, processed_logs: List[Dict]) -> None:
         try:
             if not self._is_valid_employee(emp_id):
@@ -183,29 +134,7 @@ class ManDaysAttendanceProcessor:
                 return
                 
             empid_id = self.employee_details[emp_id]['id']
-            attendance_data = {
-                'employeeid_id': empid_id,
-                'logdate': log_date,
-                'shift': '',
-                'shift_status': ''
-            }
-            
-            total_hours = timedelta()
-            
-            for log in processed_logs:
-                slot = log['slot']
-                if slot > 10:
-                    break
-                    
-                if log['duty_in']:
-                    attendance_data[f'duty_in_{slot}'] = log['duty_in']
-                if log['duty_out']:
-                    attendance_data[f'duty_out_{slot}'] = log['duty_out']
-                if log['total_time']:
-                    attendance_data[f'total_time_{slot}'] = log['total_time']
-                    total_hours += log['total_time']
-            
-            attendance_data['total_hours_worked'] = total_hours
+            attendance_data = self._attendance_data(empid_id, log_date, processed_logs)
             
             ManDaysAttendance.objects.update_or_create(
                 employeeid_id=empid_id,
@@ -269,6 +198,98 @@ class ManDaysAttendanceProcessor:
             logger.error(f"Error processing logs: {str(e)}")
             raise
 
+    def _prefetch_records(self, grouped_logs: Dict) -> Dict[Tuple[int, date], ManDaysAttendance]:
+        """Load every existing ManDays row the grouped logs can touch in one query."""
+        employee_pks = [self.employee_details[emp_id]['id'] for emp_id in grouped_logs]
+        log_dates = [log_date for date_logs in grouped_logs.values() for log_date in date_logs]
+        if not log_dates:
+            return {}
+
+        queryset = ManDaysAttendance.objects.filter(
+            employeeid_id__in=employee_pks,
+            logdate__range=(min(log_dates), max(log_dates))
+        )
+        return {(row.employeeid_id, row.logdate): row for row in queryset.iterator(chunk_size=10000)}
+
+    def _write_records(self, records: Dict, dirty: set, batch_size: int) -> int:
+        """Upsert the changed rows on (employeeid, logdate), batch_size rows per statement."""
+        update_fields = [
+            field.name for field in ManDaysAttendance._meta.concrete_fields
+            if field.name not in ('id', 'employeeid', 'logdate')
+        ]
+        changed = []
+        for key in dirty:
+            row = records[key]
+            # Existing rows keep their id through the ON CONFLICT update
+            row.pk = None
+            changed.append(row)
+
+        if changed:
+            ManDaysAttendance.objects.bulk_create(
+                changed,
+                batch_size=batch_size,
+                update_conflicts=True,
+                unique_fields=['employeeid', 'logdate'],
+                update_fields=update_fields,
+            )
+        return len(changed)
+
+    @transaction.atomic
+    def process_logs_batch(self, batch_size: int = 5000) -> None:
+        """
+        Set-based variant of process_logs.
+
+        Prefetches every existing ManDays row the new logs can touch in one
+        query, pairs the punches against the in-memory rows (including the
+        night-shift fix-up of the previous day) and writes every changed row
+        with one bulk upsert per batch_size rows.
+        """
+        try:
+            new_logs = list(self._get_new_logs())
+            if not new_logs:
+                print("No new logs to process")
+                return
+
+            grouped_logs = self._group_logs_by_employee_and_date(new_logs)
+            records = self._prefetch_records(grouped_logs)
+            dirty = set()
+
+            total_iterations = sum(len(date_logs) for date_logs in grouped_logs.values())
+            with tqdm(total=total_iterations, desc="Processing attendance logs (batch)") as pbar:
+                for emp_id, date_logs in grouped_logs.items():
+                    empid_id = self.employee_details[emp_id]['id']
+                    sorted_dates = sorted(date_logs.keys())
+
+                    for i, log_date in enumerate(sorted_dates):
+                        logs = sorted(date_logs[log_date], key=lambda x: x['log_datetime'])
+
+                        # Previous day's row as process_logs would read it back, if any
+                        if i > 0 and logs[0]['direction'] == 'Out Device':
+                            prev_key = (empid_id, sorted_dates[i - 1])
+                            prev_day_record = records.get(prev_key)
+                            if prev_day_record and self._close_prev_day(prev_day_record, log_date, logs):
+                                dirty.add(prev_key)
+
+                        processed_logs = self._process_day_logs(emp_id, log_date, logs)
+                        if processed_logs:
+                            key = (empid_id, log_date)
+                            record = records.get(key)
+                            if record is None:
+                                record = records[key] = ManDaysAttendance()
+                            for field, value in self._attendance_data(empid_id, log_date, processed_logs).items():
+                                setattr(record, field, value)
+                            dirty.add(key)
+                        pbar.update(1)
+
+            written = self._write_records(records, dirty, batch_size)
+            logger.info(f"Batch processed {len(new_logs)} logs into {written} mandays rows")
+
+            self._update_last_processed_id(max(log['id'] for log in new_logs))
+
+        except Exception as e:
+            logger.error(f"Error processing logs: {str(e)}")
+            raise
+
     def _update_last_processed_id(self, log_id: int) -> None:
         LastLogIdMandays.objects.update_or_create(
             defaults={'last_log_id': log_id}
@@ -12,6 +12,7 @@ from django.utils.timezone import make_aware, timezone, now
 
 from config.models import AutoShift, Shift
 from resource.models import Employee, Logs, Attendance, LastLogId
+from resource.employee_roster import build_roster, week_off_days
 from value_config import WEEK_OFF_CONFIG
 
 import logging
@@ -32,13 +33,23 @@ class ShiftWindow:
     half_day_threshold: timedelta
 
 class AttendanceProcessor:
-    def __init__(self):
+    def __init__(self, reference_data=None):
+        """
+        reference_data: optional warm lookups from resource.processor_registry,
+        used instead of loading every employee, shift and auto shift again.
+        """
         self.logger = logging.getLogger(__name__)
 
-        self.auto_shifts = list(AutoShift.objects.all())
-        self.auto_shift_dict = {shift.name: shift for shift in self.auto_shifts}
-        self.shifts = {shift.id: shift for shift in Shift.objects.all()}
-        self.employees = {emp.employee_id: emp for emp in Employee.objects.all()}
+        if reference_data is not None:
+            self.auto_shifts = reference_data.auto_shifts
+            self.auto_shift_dict = reference_data.auto_shift_dict
+            self.shifts = reference_data.shifts
+            self.employees = reference_data.employees
+        else:
+            self.auto_shifts = list(AutoShift.objects.all())
+            self.auto_shift_dict = {shift.name: shift for shift in self.auto_shifts}
+            self.shifts = {shift.id: shift for shift in Shift.objects.all()}
+            self.employees = build_roster(self.shifts)
 
     @transaction.atomic
     def process_new_logs(self) -> bool:
@@ -153,7 +164,7 @@ class AttendanceProcessor:
                     if shift_window.start_window <= log_datetime <= shift_window.end_window:
                         with transaction.atomic():  # Use a nested atomic block
                             existing_attendance = Attendance.objects.select_for_update().filter(
-                                employeeid=employee,
+                                employeeid_id=employee.pk,
                                 logdate=shift_window.start_time.date()
                             ).first()
 
@@ -168,7 +179,7 @@ class AttendanceProcessor:
                                     return True
                             else:
                                 attendance = Attendance(
-                                    employeeid=employee,
+                                    employeeid_id=employee.pk,
                                     logdate=log_date,
                                     first_logtime=log_time,
                                     shift=auto_shift.name,
@@ -210,7 +221,7 @@ class AttendanceProcessor:
 
             # First check if there are any earlier logs for this day
             attendance = Attendance.objects.filter(
-                employeeid=employee,
+                employeeid_id=employee.pk,
                 logdate=log_date,
                 first_logtime__isnull=False
             ).first()
@@ -218,7 +229,7 @@ class AttendanceProcessor:
             if not attendance:
                 prev_date = log_date - timedelta(days=1)
                 attendance = Attendance.objects.filter(
-                    employeeid=employee,
+                    employeeid_id=employee.pk,
                     logdate=prev_date,
                     first_logtime__isnull=False,
                     # last_logtime__isnull=True  # Must not have an OUT punch already
@@ -227,7 +238,7 @@ class AttendanceProcessor:
                 if not attendance:
                     # Create or update an OUT log with shift_status as 'MP' if no valid IN found
                     attendance = Attendance.objects.update_or_create(
-                        employeeid=employee,
+                        employeeid_id=employee.pk,
                         logdate=log_date,
                         defaults={
                             'last_logtime': log_time,
@@ -274,13 +285,7 @@ class AttendanceProcessor:
                     auto_shift.end_time
                 )
             
-            first_weekoff = employee.first_weekly_off
-            if isinstance(first_weekoff, str):
-                try:
-                    first_weekoff = int(first_weekoff)
-                except ValueError:
-                    raise ValueError
-            is_weekoff = first_weekoff
+            weekoff_days = week_off_days(employee)
             absent_threshold = auto_shift.absent_threshold
             half_day_threshold = auto_shift.half_day_threshold
             full_day_threshold = auto_shift.full_day_threshold
@@ -336,7 +341,6 @@ class AttendanceProcessor:
 
                     
                     # Update status based on thresholds
-                    weekoff_days = [is_weekoff] if is_weekoff is not None else WEEK_OFF_CONFIG.get('DEFAULT_WEEK_OFF', [])
 
                     if attendance.logdate.weekday() in weekoff_days:
                         attendance.overtime = total_time
@@ -425,7 +429,6 @@ class AttendanceProcessor:
                     overtime_after = max(timedelta(), out_datetime - shift_end) if out_datetime > overtime_threshold_after else timedelta()
                     
                     # Update status based on thresholds
-                    weekoff_days = [is_weekoff] if is_weekoff is not None else WEEK_OFF_CONFIG.get('DEFAULT_WEEK_OFF', [])
 
                     if attendance.logdate.weekday() in weekoff_days:
                         attendance.overtime = total_time
@@ -563,7 +566,7 @@ class AttendanceProcessor:
             try:
                 with transaction.atomic():
                     existing_attendance = Attendance.objects.select_for_update().filter(
-                        employeeid=employee,
+                        employeeid_id=employee.pk,
                         logdate=shift_date
                     ).first()
 
@@ -578,7 +581,7 @@ class AttendanceProcessor:
                             return True
                     else:
                         attendance = Attendance(
-                            employeeid=employee,
+                            employeeid_id=employee.pk,
                             logdate=shift_date,
                             first_logtime=log_time,
                             shift=shift.name,
@@ -635,7 +638,7 @@ class AttendanceProcessor:
 
             # Check for existing attendance records
             existing_attendance = Attendance.objects.filter(
-                employeeid=employee,
+                employeeid_id=employee.pk,
                 logdate=log_date
             ).first()
 
@@ -684,8 +687,7 @@ class AttendanceProcessor:
                         overtime_after = max(timedelta(), out_datetime - shift_end) if out_datetime > overtime_threshold_after else timedelta()
 
                         # Shift status determination
-                        first_weekoff = employee.first_weekly_off
-                        weekoff_days = [first_weekoff] if first_weekoff is not None else WEEK_OFF_CONFIG.get('DEFAULT_WEEK_OFF', [])
+                        weekoff_days = week_off_days(employee)
 
                         if existing_attendance.logdate.weekday() in weekoff_days:
                             existing_attendance.overtime = total_time
@@ -714,7 +716,7 @@ class AttendanceProcessor:
             else:
                 # Create a new attendance record with OUT time
                 Attendance.objects.create(
-                    employeeid=employee,
+                    employeeid_id=employee.pk,
                     logdate=log_date,
                     last_logtime=log_time,
                     direction='Manual' if is_manual else 'Machine',
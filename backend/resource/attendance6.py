@@ -1,5 +1,5 @@
 # attendance_business_logic.py (New file name for better organization)
-from datetime import datetime, timedelta, time
+from datetime import date, datetime, timedelta, time
 from dataclasses import dataclass
 from typing import Optional, Tuple
 from functools import reduce
@@ -12,6 +12,8 @@ from django.utils import timezone
 from django.utils.timezone import make_aware, timezone, now
 
 from config.models import AutoShift, Shift
+from resource.autoshift_index import AutoShiftIndex
+from resource.log_checkpoint import pending_logs, process_in_chunks
 from resource.models import Employee, Logs, Attendance, LastLogId
 from value_config import WEEK_OFF_CONFIG
 
@@ -60,6 +62,7 @@ class ShiftCalculator:
             auto_shifts (list[AutoShift]): List of AutoShift configurations.
         """
         self.auto_shifts = auto_shifts
+        self.index = AutoShiftIndex(auto_shifts)
         self.logger = logging.getLogger(__name__)
 
     def calculate_autoshift_window(self, auto_shift: AutoShift, log_datetime: datetime) -> ShiftWindow:
@@ -93,8 +96,6 @@ class ShiftCalculator:
             base_date = log_datetime.date()
             log_time = log_datetime.time()
 
-            name = auto_shift.name
-
             # Special handling for midnight shift (00:00 start time)
             if auto_shift.start_time == time(0, 0):
                 # If log time is between 23:00 and midnight
@@ -106,37 +107,62 @@ class ShiftCalculator:
                 if time(0, 0) <= log_time <= time(1, 0):
                     base_date = base_date - timedelta(days=1)
 
-            # Calculate start and end times
-            start_time = datetime.combine(base_date, auto_shift.start_time)
-            end_time = datetime.combine(
-                base_date + timedelta(days=1) if auto_shift.is_night_shift() and auto_shift.end_time < auto_shift.start_time else base_date,
-                auto_shift.end_time
-            )
-
-            # Calculate window times
-            if auto_shift.start_time == time(0, 0):
-                start_window = start_time - timedelta(hours=1)  # One hour before midnight
-            else:
-                start_window = start_time - auto_shift.tolerance_start_time
-
-            end_window = start_time + auto_shift.tolerance_end_time
-
-            return ShiftWindow(
-                name=name,
-                start_time=start_time,
-                end_time=end_time,
-                start_window=start_window,
-                end_window=end_window,
-                start_time_with_grace=start_time + auto_shift.grace_period_at_start_time,
-                end_time_with_grace=end_time - auto_shift.grace_period_at_end_time,
-                overtime_before_start=auto_shift.overtime_threshold_before_start,
-                overtime_after_end=auto_shift.overtime_threshold_after_end,
-                half_day_threshold=auto_shift.half_day_threshold
-            )
+            return self.autoshift_window_on(auto_shift, base_date)
         except Exception as e:
             self.logger.error(f"Error in calculate_autoshift_window: {str(e)}")
             raise
 
+    def autoshift_window_on(self, auto_shift: AutoShift, base_date: date) -> ShiftWindow:
+        """
+        Builds the shift window of an AutoShift starting on a given date.
+
+        Args:
+            auto_shift (AutoShift): The AutoShift configuration to build the window for.
+            base_date (date): The date the shift starts on.
+
+        Returns:
+            ShiftWindow: A ShiftWindow object representing the shift window.
+        """
+        # Calculate start and end times
+        start_time = datetime.combine(base_date, auto_shift.start_time)
+        end_time = datetime.combine(
+            base_date + timedelta(days=1) if auto_shift.is_night_shift() and auto_shift.end_time < auto_shift.start_time else base_date,
+            auto_shift.end_time
+        )
+
+        # Calculate window times
+        if auto_shift.start_time == time(0, 0):
+            start_window = start_time - timedelta(hours=1)  # One hour before midnight
+        else:
+            start_window = start_time - auto_shift.tolerance_start_time
+
+        end_window = start_time + auto_shift.tolerance_end_time
+
+        return ShiftWindow(
+            name=auto_shift.name,
+            start_time=start_time,
+            end_time=end_time,
+            start_window=start_window,
+            end_window=end_window,
+            start_time_with_grace=start_time + auto_shift.grace_period_at_start_time,
+            end_time_with_grace=end_time - auto_shift.grace_period_at_end_time,
+            overtime_before_start=auto_shift.overtime_threshold_before_start,
+            overtime_after_end=auto_shift.overtime_threshold_after_end,
+            half_day_threshold=auto_shift.half_day_threshold
+        )
+
+    def matching_autoshifts(self, log_datetime: datetime):
+        """
+        Finds the AutoShifts whose IN window contains a log datetime, using the interval index.
+
+        Args:
+            log_datetime (datetime): The naive datetime of the 'IN' log.
+
+        Returns:
+            list[tuple[AutoShift, date]]: Candidate AutoShifts with the date each would start on, in configuration order.
+        """
+        return self.index.match(log_datetime)
+
 
 class AttendanceCalculator:
     """
@@ -411,9 +437,9 @@ class LogProcessor:
             log_date = log_datetime.date()
 
             # Find the matching shift for this IN punch
-            for auto_shift in self.auto_shifts.values(): # Iterate through auto_shifts dictionary
+            for auto_shift, shift_date in self.shift_calculator.matching_autoshifts(log_datetime):
                 try:
-                    shift_window = self.shift_calculator.calculate_autoshift_window(auto_shift, log_datetime)
+                    shift_window = self.shift_calculator.autoshift_window_on(auto_shift, shift_date)
 
                     if shift_window.start_window <= log_datetime <= shift_window.end_window:
                         with transaction.atomic():  # Use a nested atomic block
@@ -844,55 +870,41 @@ class AttendanceProcessor:
         self.attendance_recalculator = AttendanceRecalculator(self.shifts_dict, self.auto_shift_dict, self.employees_dict, self.attendance_calculator)
 
 
-    @transaction.atomic
-    def process_new_logs(self) -> bool:
+    def process_new_logs(self, chunk_size: Optional[int] = None, chunk_seconds: Optional[float] = None) -> bool:
         """
         Processes new attendance logs from the Logs table.
 
         This is the main entry point for attendance processing. It fetches new logs since the last processed log ID,
-        processes them in batches using the LogProcessor, updates the last processed log ID, and then triggers
-        attendance recalculation to handle any late 'IN' logs.
+        processes them in chunks using the LogProcessor, and then triggers attendance recalculation to handle any
+        late 'IN' logs.
+
+        Args:
+            chunk_size (int, optional): Logs per transaction. Defaults to the LOG_PROCESSING_CHUNK_SIZE setting.
+            chunk_seconds (float, optional): Longest time one transaction may run. Defaults to LOG_PROCESSING_CHUNK_SECONDS.
 
         Returns:
             bool: True if log processing was successful, False otherwise.
 
         Edge Cases Handled:
             - Handles cases with no new logs gracefully.
-            - Processes logs in batches to manage memory and transaction size.
-            - Uses tqdm for progress indication during log processing.
+            - Commits each chunk with its LastLogId checkpoint, so a failure loses at most one chunk
+              and the LastLogId row lock is only held for one chunk at a time.
+            - Stops if another run advances the checkpoint in the meantime.
             - Calls AttendanceRecalculator to address late 'IN' log scenario.
         """
         try:
-            last_log_id_record = LastLogId.objects.select_for_update().first()
-            if not last_log_id_record:
-                last_log_id_record = LastLogId.objects.create(last_log_id=0)
-
-            last_processed_id = last_log_id_record.last_log_id
-            new_logs = Logs.objects.filter(id__gt=last_processed_id).order_by('log_datetime')
-            print(f"Processing new logs {new_logs}")
+            new_logs, last_processed_id = pending_logs()
 
             if not new_logs:
                 return True
 
-            # Process logs in batches
-            batch_size = 10000
-            processed_logs = []
-
-            # Calculate total number of logs
-            total_logs = new_logs.count()
-
-            # Use tqdm to show progress
-            with tqdm(total=total_logs, desc="Processing logs", unit="log") as pbar:
-                for i in range(0, total_logs, batch_size):
-                    batch = new_logs[i:i + batch_size]
-                    for log in batch:
-                        if self.log_processor.process_single_log(log): # Use LogProcessor to process single log
-                            processed_logs.append(log.id)
-                        pbar.update(1)  # Update progress bar for each log
-
-            if processed_logs:
-                last_log_id_record.last_log_id = max(processed_logs)
-                last_log_id_record.save()
+            process_in_chunks(
+                self.log_processor.process_single_log, # Use LogProcessor to process single log
+                new_logs,
+                since=last_processed_id,
+                chunk_size=chunk_size,
+                chunk_seconds=chunk_seconds,
+            )
 
             self.attendance_recalculator.recalculate_attendance_on_late_in_log() # Recalculate after processing logs
 
@@ -1,17 +1,24 @@
-from datetime import datetime, timedelta, time
+from datetime import date, datetime, timedelta, time
 from dataclasses import dataclass
 from typing import Optional, Tuple
+from contextlib import nullcontext
+import copy
 from functools import reduce
 import operator
 from django.db.models import Q, F, Max
 from tqdm import tqdm
 import gc
-from django.db import models, transaction
+from django.db import models, transaction, IntegrityError
 from django.utils import timezone
-from django.utils.timezone import make_aware, timezone, now
+from django.utils.timezone import make_aware, now
 
 from config.models import AutoShift, Shift
 from resource.models import Employee, Logs, Attendance, LastLogId
+from resource.autoshift_index import AutoShiftIndex
+from resource.employee_roster import build_roster, week_off_days
+from resource.log_checkpoint import pending_logs, process_in_chunks
+from resource.monthly_summary import queue_summary_refresh
+from resource.open_sessions import OpenSessionStore
 from value_config import WEEK_OFF_CONFIG
 
 import logging
@@ -31,57 +38,255 @@ class ShiftWindow:
     overtime_after_end: timedelta
     half_day_threshold: timedelta
 
+class AttendanceStore:
+    """
+    Reads and writes Attendance rows straight through the ORM.
+    Used by the per-log path, every lookup and save is its own query. An OUT
+    punch that pairs with an IN the open-session store already holds takes
+    that row from memory instead of searching for it.
+    """
+
+    def __init__(self, sessions: Optional[OpenSessionStore] = None):
+        self.sessions = sessions if sessions is not None else OpenSessionStore()
+
+    def atomic(self):
+        return transaction.atomic()
+
+    def get(self, employee: Employee, logdate, with_in: bool = False, for_update: bool = False) -> Optional[Attendance]:
+        queryset = Attendance.objects.select_for_update() if for_update else Attendance.objects
+        filters = {'employeeid_id': employee.pk, 'logdate': logdate}
+        if with_in:
+            filters['first_logtime__isnull'] = False
+        return queryset.filter(**filters).first()
+
+    def get_open(self, employee: Employee, *logdates) -> Optional[Attendance]:
+        """The employee's open row with an IN on one of logdates, without a query; None if it isn't known."""
+        return self.sessions.find(employee.pk, logdates)
+
+    def save(self, attendance: Attendance) -> None:
+        attendance.save()
+
+    def create(self, **fields) -> Attendance:
+        return Attendance.objects.create(**fields)
+
+    def update_or_create(self, employee: Employee, logdate, defaults: dict) -> Attendance:
+        return Attendance.objects.update_or_create(employeeid_id=employee.pk, logdate=logdate, defaults=defaults)[0]
+
+class BatchAttendanceStore(AttendanceStore):
+    """
+    Keeps every Attendance row a batch of logs can touch in memory, keyed by
+    (employee pk, logdate), and writes the changed rows back with one bulk upsert.
+
+    Lookups hand out copies so a handler that fails half way leaves the stored
+    row untouched, exactly like an unsaved instance in the per-log path.
+    """
+
+    UPDATE_FIELDS = [
+        'first_logtime', 'last_logtime', 'direction', 'shortname', 'total_time',
+        'late_entry', 'early_exit', 'overtime', 'shift', 'shift_status',
+    ]
+
+    def __init__(self, sessions: Optional[OpenSessionStore] = None):
+        super().__init__(sessions)
+        self.rows = {}
+        self.dirty = set()
+
+    def preload(self, employee_ids, start_date, end_date) -> None:
+        """Load the existing rows for the given employees and date range in one query."""
+        queryset = Attendance.objects.filter(employeeid__in=employee_ids, logdate__range=(start_date, end_date))
+        for row in queryset.iterator(chunk_size=10000):
+            self.rows[(row.employeeid_id, row.logdate)] = row
+
+    def atomic(self):
+        return nullcontext()
+
+    def get(self, employee: Employee, logdate, with_in: bool = False, for_update: bool = False) -> Optional[Attendance]:
+        row = self.rows.get((employee.pk, logdate))
+        if row is None or (with_in and row.first_logtime is None):
+            return None
+        return copy.copy(row)
+
+    def get_open(self, employee: Employee, *logdates) -> Optional[Attendance]:
+        for logdate in logdates:
+            row = self.get(employee, logdate, with_in=True)
+            if row is not None:
+                return row
+        return None
+
+    def save(self, attendance: Attendance) -> None:
+        key = (attendance.employeeid_id, attendance.logdate)
+        if attendance._state.adding:
+            if key in self.rows:
+                # Same failure the unique (employeeid, logdate) constraint raises on the per-log path
+                raise IntegrityError(f"Attendance already exists for {key}")
+            attendance._state.adding = False
+        self.rows[key] = attendance
+        self.dirty.add(key)
+
+    def create(self, **fields) -> Attendance:
+        attendance = Attendance(**fields)
+        self.save(attendance)
+        return attendance
+
+    def update_or_create(self, employee: Employee, logdate, defaults: dict) -> Attendance:
+        attendance = self.get(employee, logdate)
+        if attendance is None:
+            attendance = Attendance(employeeid_id=employee.pk, logdate=logdate)
+        for field, value in defaults.items():
+            setattr(attendance, field, value)
+        self.save(attendance)
+        return attendance
+
+    def flush(self, batch_size: int = 5000) -> int:
+        """Upsert every changed row on (employeeid, logdate) and return how many were written."""
+        changed = []
+        for key in self.dirty:
+            row = copy.copy(self.rows[key])
+            # Existing rows keep their id through the ON CONFLICT update
+            row.pk = None
+            changed.append(row)
+
+        if changed:
+            Attendance.objects.bulk_create(
+                changed,
+                batch_size=batch_size,
+                update_conflicts=True,
+                unique_fields=['employeeid', 'logdate'],
+                update_fields=self.UPDATE_FIELDS,
+            )
+            # bulk_create doesn't send post_save, so queue the summary refresh here
+            for employee_id, logdate in self.dirty:
+                queue_summary_refresh(employee_id, logdate)
+            # The upsert sets the primary key of every row, new or existing
+            for row in changed:
+                self.sessions.record(row)
+            self.sessions.flush()
+        self.dirty.clear()
+        return len(changed)
+
 class AttendanceProcessor:
-    def __init__(self):
+    def __init__(self, reference_data=None):
+        """
+        reference_data: optional warm lookups from resource.processor_registry,
+        used instead of loading every employee, shift and auto shift again.
+        """
         self.logger = logging.getLogger(__name__)
 
-        self.auto_shifts = list(AutoShift.objects.all())
-        self.auto_shift_dict = {shift.name: shift for shift in self.auto_shifts}
-        self.shifts = {shift.id: shift for shift in Shift.objects.all()}
-        self.employees = {emp.employee_id: emp for emp in Employee.objects.all()}
-
-    @transaction.atomic
-    def process_new_logs(self) -> bool:
+        if reference_data is not None:
+            self.auto_shifts = reference_data.auto_shifts
+            self.auto_shift_dict = reference_data.auto_shift_dict
+            self.auto_shift_index = reference_data.auto_shift_index
+            self.shifts = reference_data.shifts
+            self.employees = reference_data.employees
+        else:
+            self.auto_shifts = list(AutoShift.objects.all())
+            self.auto_shift_dict = {shift.name: shift for shift in self.auto_shifts}
+            self.auto_shift_index = AutoShiftIndex(self.auto_shifts)
+            self.shifts = {shift.id: shift for shift in Shift.objects.all()}
+            self.employees = build_roster(self.shifts)
+        self.sessions = OpenSessionStore()
+        self.store = AttendanceStore(self.sessions)
+
+    def process_new_logs(self, chunk_size: Optional[int] = None, chunk_seconds: Optional[float] = None) -> bool:
+        """
+        Process every log after the LastLogId checkpoint. Logs are committed in
+        chunks of chunk_size logs or chunk_seconds seconds, each advancing the
+        checkpoint (defaults from LOG_PROCESSING_CHUNK_SIZE/_SECONDS).
+        """
         try:
-            last_log_id_record = LastLogId.objects.select_for_update().first()
-            if not last_log_id_record:
-                last_log_id_record = LastLogId.objects.create(last_log_id=0)
+            new_logs, last_processed_id = pending_logs()
+            if not new_logs:
+                return True
 
-            last_processed_id = last_log_id_record.last_log_id
-            new_logs = Logs.objects.filter(id__gt=last_processed_id).order_by('log_datetime')
-            print(f"Processing new logs {new_logs}")
+            self.sessions.load(self._employee_pks(new_logs))
+            with self.sessions.writing():
+                process_in_chunks(
+                    self.process_single_log,
+                    new_logs,
+                    since=last_processed_id,
+                    chunk_size=chunk_size,
+                    chunk_seconds=chunk_seconds,
+                    end_chunk=self.sessions.flush,
+                )
+            return True
+        except Exception as e:
+            # Sessions recorded by the failed chunk were rolled back with it
+            self.sessions.clear()
+            self.logger.error(f"Error in process_new_logs: {str(e)}")
+            return False
 
+    def process_new_logs_batch(self, batch_size: int = 5000, chunk_size: Optional[int] = None, chunk_seconds: Optional[float] = None) -> bool:
+        """
+        Set-based variant of process_new_logs.
+
+        Loads all pending logs once, preloads every Attendance row they can touch
+        (log dates -1/+1 day for night shift and midnight crossovers), runs the same
+        per-log rules against the in-memory rows grouped by (employee, logdate) and
+        writes the changed rows with one bulk upsert per batch_size rows. Like
+        process_new_logs it commits in checkpointed chunks; each chunk's rows are
+        written at the end of its transaction.
+        """
+        try:
+            new_logs, last_processed_id = pending_logs()
             if not new_logs:
                 return True
 
-            # Process logs in batches
-            batch_size = 10000
-            processed_logs = []
+            employee_ids = set()
+            log_dates = []
+            for log in new_logs:
+                employee = self.employees.get(log.employeeid)
+                if employee is None or log.log_datetime is None:
+                    continue
+                employee_ids.add(employee.pk)
+                log_datetime = timezone.make_naive(log.log_datetime) if timezone.is_aware(log.log_datetime) else log.log_datetime
+                log_dates.append(log_datetime.date())
+
+            self.sessions.load(employee_ids)
+            store = BatchAttendanceStore(self.sessions)
+            if log_dates:
+                store.preload(employee_ids, min(log_dates) - timedelta(days=1), max(log_dates) + timedelta(days=1))
 
-            # Calculate total number of logs
-            total_logs = new_logs.count()
+            written = 0
 
-            # Use tqdm to show progress
-            with tqdm(total=total_logs, desc="Processing logs", unit="log") as pbar:
-                for i in range(0, total_logs, batch_size):
-                    batch = new_logs[i:i + batch_size]
-                    for log in batch:
-                        if self.process_single_log(log):
-                            processed_logs.append(log.id)
-                        pbar.update(1)  # Update progress bar for each log
+            def flush():
+                nonlocal written
+                written += store.flush(batch_size)
 
-            if processed_logs:
-                last_log_id_record.last_log_id = max(processed_logs)
-                last_log_id_record.save()
+            self.store = store
+            try:
+                with self.sessions.writing():
+                    handled = process_in_chunks(
+                        self.process_single_log,
+                        new_logs,
+                        since=last_processed_id,
+                        chunk_size=chunk_size,
+                        chunk_seconds=chunk_seconds,
+                        desc="Processing logs (batch)",
+                        end_chunk=flush,
+                    )
+            finally:
+                self.store = AttendanceStore(self.sessions)
 
+            self.logger.info(f"Batch processed {handled} of {len(new_logs)} logs into {written} attendance rows")
             return True
         except Exception as e:
-            self.logger.error(f"Error in process_new_logs: {str(e)}")
+            # Sessions recorded by the failed chunk were rolled back with it
+            self.sessions.clear()
+            self.logger.error(f"Error in process_new_logs_batch: {str(e)}")
             return False
 
+    def _employee_pks(self, logs) -> set:
+        """Primary keys of the known employees the logs belong to."""
+        employee_pks = set()
+        for log in logs:
+            employee = self.employees.get(log.employeeid)
+            if employee is not None:
+                employee_pks.add(employee.pk)
+        return employee_pks
+
     def process_single_log(self, log: Logs, is_manual=False) -> bool:
         """Process a single attendance log."""
-        print(f"Processing log for employee: {log} {log.employeeid}, Time: {log.log_datetime}, Direction: {log.direction}, Manual: {is_manual}")
+        self.logger.debug(f"Processing log for employee: {log} {log.employeeid}, Time: {log.log_datetime}, Direction: {log.direction}, Manual: {is_manual}")
 
         if not log.employeeid:
             # self.logger.error("Empty employee ID in log")
@@ -139,22 +344,23 @@ class AttendanceProcessor:
             log_time = log_datetime.time()
             log_date = log_datetime.date()
 
-            print(f"dfgfdgdfg employee {employee.employee_id} on {log_date} at {log_time}")
+            self.logger.debug(f"IN punch for employee {employee.employee_id} on {log_date} at {log_time}")
 
             # Find the matching shift for this IN punch
-            for auto_shift in self.auto_shifts:
+            for auto_shift, shift_date in self.auto_shift_index.match(log_datetime):
                 try:
-                    shift_window = self._calculate_autoshift_window(auto_shift, log_datetime)
+                    shift_window = self._autoshift_window_on(auto_shift, shift_date)
 
                     if shift_window.start_window <= log_datetime <= shift_window.end_window:
-                        with transaction.atomic():  # Use a nested atomic block
-                            existing_attendance = Attendance.objects.select_for_update().filter(
-                                employeeid=employee,
-                                logdate=shift_window.start_time.date()
-                            ).first()
+                        with self.store.atomic():  # Use a nested atomic block
+                            existing_attendance = self.store.get(
+                                employee,
+                                shift_window.start_time.date(),
+                                for_update=True
+                            )
 
                             if existing_attendance:
-                                print(f"Existing attendance record found for employee {employee.employee_id}: first_logtime={existing_attendance.first_logtime}, last_logtime={existing_attendance.last_logtime}")
+                                self.logger.debug(f"Existing attendance record found for employee {employee.employee_id}: first_logtime={existing_attendance.first_logtime}, last_logtime={existing_attendance.last_logtime}")
                                 if existing_attendance.first_logtime is None and existing_attendance.last_logtime is None:
                                     attendance = existing_attendance
                                     attendance.first_logtime = log_time
@@ -167,10 +373,12 @@ class AttendanceProcessor:
                                 else:
                                     return True # Already has first logtime, nothing to update for IN log
                             else:
-                                print(f"No existing attendance record found for employee {employee.employee_id} on {log_date}. Creating new record.")
+                                self.logger.debug(f"No existing attendance record found for employee {employee.employee_id} on {log_date}. Creating new record.")
+                                # Dated by the shift, not the punch: an IN just after
+                                # midnight belongs to the night shift of the evening before
                                 attendance = Attendance(
-                                    employeeid=employee,
-                                    logdate=log_date,
+                                    employeeid_id=employee.pk,
+                                    logdate=shift_window.start_time.date(),
                                     first_logtime=log_time,
                                     shift=auto_shift.name,
                                     direction='Manual' if is_manual else 'Machine',
@@ -180,7 +388,7 @@ class AttendanceProcessor:
                             if log_datetime > shift_window.start_time_with_grace:
                                 attendance.late_entry = log_datetime - shift_window.start_time
 
-                            attendance.save()
+                            self.store.save(attendance)
                             return True
 
                 except Exception as e:
@@ -198,7 +406,7 @@ class AttendanceProcessor:
         Handles the case where an 'IN' log arrives for an attendance record that already has a 'last_logtime' but no 'first_logtime'.
         This typically happens when the 'OUT' log was processed before the 'IN' log.
         """
-        print(f"Handling late IN log for employee {employee.employee_id} with existing attendance record: {existing_attendance}")
+        self.logger.debug(f"Handling late IN log for employee {employee.employee_id} with existing attendance record: {existing_attendance}")
         try:
             if timezone.is_aware(log.log_datetime):
                 log_datetime = timezone.make_naive(log.log_datetime)
@@ -263,17 +471,10 @@ class AttendanceProcessor:
             overtime_after = max(timedelta(), out_datetime - shift_end) if out_datetime > overtime_threshold_after else timedelta()
 
             # Shift status determination - reuse logic from _handle_out_log_autoshift for status update
-            first_weekoff = employee.first_weekly_off
-            if isinstance(first_weekoff, str):
-                try:
-                    first_weekoff = int(first_weekoff)
-                except ValueError:
-                    raise ValueError
-            is_weekoff = first_weekoff
+            weekoff_days = week_off_days(employee)
             absent_threshold = auto_shift.absent_threshold
             half_day_threshold = auto_shift.half_day_threshold
             full_day_threshold = auto_shift.full_day_threshold
-            weekoff_days = [is_weekoff] if is_weekoff is not None else WEEK_OFF_CONFIG.get('DEFAULT_WEEK_OFF', [])
 
             if existing_attendance.logdate.weekday() in weekoff_days:
                 existing_attendance.overtime = total_time
@@ -295,7 +496,7 @@ class AttendanceProcessor:
             else:
                 existing_attendance.shift_status = 'P' if total_time >= full_day_threshold else ''
 
-            existing_attendance.save()
+            self.store.save(existing_attendance)
             return True
 
         except Exception as e:
@@ -318,35 +519,31 @@ class AttendanceProcessor:
             log_time = log_datetime.time()
             log_date = log_datetime.date()
 
+            prev_date = log_date - timedelta(days=1)
+
+            # Pair with the open IN for today or, for a night shift, yesterday
+            attendance = self.store.get_open(employee, log_date, prev_date)
+
             # First check if there are any earlier logs for this day
-            attendance = Attendance.objects.filter(
-                employeeid=employee,
-                logdate=log_date,
-                first_logtime__isnull=False
-            ).first()
+            if not attendance:
+                attendance = self.store.get(employee, log_date, with_in=True)
 
             if not attendance:
-                prev_date = log_date - timedelta(days=1)
-                attendance = Attendance.objects.filter(
-                    employeeid=employee,
-                    logdate=prev_date,
-                    first_logtime__isnull=False,
-                    # last_logtime__isnull=True  # Must not have an OUT punch already
-                ).first()
+                # Must have an IN punch; an existing OUT punch is allowed
+                attendance = self.store.get(employee, prev_date, with_in=True)
 
                 if not attendance:
                     # Create or update an OUT log with shift_status as 'MP' if no valid IN found
-                    attendance = Attendance.objects.update_or_create(
-                        employeeid=employee,
-                        logdate=log_date,
+                    attendance = self.store.update_or_create(
+                        employee,
+                        log_date,
                         defaults={
                             'last_logtime': log_time,
                             'shift': '',  # Or set it as needed
                             'direction': 'Manual' if is_manual else 'Machine',
                             'shift_status': 'MP'
                         }
-                    )[0]
-                    attendance.save()
+                    )
 
             if not attendance:
                 # self.logger.warning(f"No valid IN log found for employee {employee.employee_id} before OUT")
@@ -361,7 +558,7 @@ class AttendanceProcessor:
                 return False
 
             # Check if this is a valid OUT punch for the attendance
-            in_datetime = datetime.combine(attendance.logdate, attendance.first_logtime)
+            in_datetime = self._autoshift_in_datetime(attendance, auto_shift)
             out_datetime = log_datetime
             # Calculate shift end time based on shift type
             if auto_shift.is_night_shift():
@@ -384,13 +581,7 @@ class AttendanceProcessor:
                     auto_shift.end_time
                 )
             
-            first_weekoff = employee.first_weekly_off
-            if isinstance(first_weekoff, str):
-                try:
-                    first_weekoff = int(first_weekoff)
-                except ValueError:
-                    raise ValueError
-            is_weekoff = first_weekoff
+            weekoff_days = week_off_days(employee)
             absent_threshold = auto_shift.absent_threshold
             half_day_threshold = auto_shift.half_day_threshold
             full_day_threshold = auto_shift.full_day_threshold
@@ -420,15 +611,12 @@ class AttendanceProcessor:
                         else:
                             attendance.total_time = total_time 
 
-                    shift_start = datetime.combine(in_datetime.date(), auto_shift.start_time)
+                    # The row is dated by the shift, so the shift runs from its logdate
+                    shift_start = datetime.combine(attendance.logdate, auto_shift.start_time)
                     if not auto_shift.is_night_shift():
-                        if auto_shift.start_time == time(0, 0):
-                            if in_datetime.time() > auto_shift.end_time:
-                                shift_end = datetime.combine(in_datetime.date() + timedelta(days=1), auto_shift.end_time)
-                        else:
-                            shift_end = datetime.combine(in_datetime.date(), auto_shift.end_time)
+                        shift_end = datetime.combine(attendance.logdate, auto_shift.end_time)
                     else:
-                        shift_end = datetime.combine(in_datetime.date() + timedelta(days=1), auto_shift.end_time)
+                        shift_end = datetime.combine(attendance.logdate + timedelta(days=1), auto_shift.end_time)
                     # shift_end = datetime.combine(in_datetime.date(), auto_shift.end_time) if auto_shift.night_shift
 
                     # Calculate early exit
@@ -446,7 +634,6 @@ class AttendanceProcessor:
 
                     
                     # Update status based on thresholds
-                    weekoff_days = [is_weekoff] if is_weekoff is not None else WEEK_OFF_CONFIG.get('DEFAULT_WEEK_OFF', [])
 
                     if attendance.logdate.weekday() in weekoff_days:
                         attendance.overtime = total_time
@@ -475,7 +662,7 @@ class AttendanceProcessor:
                     # else:
                     #     attendance.shift_status = 'P' if total_time > auto_shift.half_day_threshold else 'HD'
 
-                    attendance.save()
+                    self.store.save(attendance)
                     # self.logger.info(
                     #     f"Updated attendance for employee {employee.employee_id}: "
                     #     f"Date: {attendance.logdate}, "
@@ -535,7 +722,6 @@ class AttendanceProcessor:
                     overtime_after = max(timedelta(), out_datetime - shift_end) if out_datetime > overtime_threshold_after else timedelta()
                     
                     # Update status based on thresholds
-                    weekoff_days = [is_weekoff] if is_weekoff is not None else WEEK_OFF_CONFIG.get('DEFAULT_WEEK_OFF', [])
 
                     if attendance.logdate.weekday() in weekoff_days:
                         attendance.overtime = total_time
@@ -559,7 +745,7 @@ class AttendanceProcessor:
                     # else:
                     #     attendance.shift_status = 'P' if total_time > auto_shift.half_day_threshold else 'HD'
 
-                    attendance.save()
+                    self.store.save(attendance)
 
             return True
 
@@ -578,8 +764,6 @@ class AttendanceProcessor:
             base_date = log_datetime.date()
             log_time = log_datetime.time()
 
-            name = auto_shift.name
-
             # Special handling for midnight shift (00:00 start time)
             if auto_shift.start_time == time(0, 0):
                 # If log time is between 23:00 and midnight
@@ -604,37 +788,57 @@ class AttendanceProcessor:
             #         if not (auto_shift.start_time <= log_time <= auto_shift.end_time):
             #             base_date = base_date + timedelta(days=1)
 
-            # Calculate start and end times
-            start_time = datetime.combine(base_date, auto_shift.start_time)
-            end_time = datetime.combine(
-                base_date + timedelta(days=1) if auto_shift.is_night_shift() and auto_shift.end_time < auto_shift.start_time else base_date,
-                auto_shift.end_time
-            )
-
-            # Calculate window times
-            if auto_shift.start_time == time(0, 0):
-                start_window = start_time - timedelta(hours=1)  # One hour before midnight
-            else:
-                start_window = start_time - auto_shift.tolerance_start_time
-            
-            end_window = start_time + auto_shift.tolerance_end_time
-
-            return ShiftWindow(
-                name=name,
-                start_time=start_time,
-                end_time=end_time,
-                start_window=start_window,
-                end_window=end_window,
-                start_time_with_grace=start_time + auto_shift.grace_period_at_start_time,
-                end_time_with_grace=end_time - auto_shift.grace_period_at_end_time,
-                overtime_before_start=auto_shift.overtime_threshold_before_start,
-                overtime_after_end=auto_shift.overtime_threshold_after_end,
-                half_day_threshold=auto_shift.half_day_threshold
-            )
+            return self._autoshift_window_on(auto_shift, base_date)
         except Exception as e:
-            print(f"Error in _calculate_autoshift_window: {str(e)}")
+            self.logger.error(f"Error in _calculate_autoshift_window: {str(e)}")
             raise
 
+    def _autoshift_in_datetime(self, attendance: Attendance, auto_shift: AutoShift) -> datetime:
+        """
+        When the IN punch of an auto shift attendance happened. The row is dated
+        by the shift, so the punch is on its logdate unless the shift's IN window
+        puts it on the day before or after (an IN after midnight for a night
+        shift, or before midnight for a shift starting at 00:00).
+        """
+        in_datetime = datetime.combine(attendance.logdate, attendance.first_logtime)
+        if auto_shift.tolerance_start_time is None or auto_shift.tolerance_end_time is None:
+            return in_datetime
+        window = self._autoshift_window_on(auto_shift, attendance.logdate)
+        for candidate in (in_datetime, in_datetime + timedelta(days=1), in_datetime - timedelta(days=1)):
+            if window.start_window <= candidate <= window.end_window:
+                return candidate
+        return in_datetime
+
+    def _autoshift_window_on(self, auto_shift: AutoShift, base_date: date) -> ShiftWindow:
+        """Shift window of an auto shift starting on base_date."""
+        # Calculate start and end times
+        start_time = datetime.combine(base_date, auto_shift.start_time)
+        end_time = datetime.combine(
+            base_date + timedelta(days=1) if auto_shift.is_night_shift() and auto_shift.end_time < auto_shift.start_time else base_date,
+            auto_shift.end_time
+        )
+
+        # Calculate window times
+        if auto_shift.start_time == time(0, 0):
+            start_window = start_time - timedelta(hours=1)  # One hour before midnight
+        else:
+            start_window = start_time - auto_shift.tolerance_start_time
+
+        end_window = start_time + auto_shift.tolerance_end_time
+
+        return ShiftWindow(
+            name=auto_shift.name,
+            start_time=start_time,
+            end_time=end_time,
+            start_window=start_window,
+            end_window=end_window,
+            start_time_with_grace=start_time + auto_shift.grace_period_at_start_time,
+            end_time_with_grace=end_time - auto_shift.grace_period_at_end_time,
+            overtime_before_start=auto_shift.overtime_threshold_before_start,
+            overtime_after_end=auto_shift.overtime_threshold_after_end,
+            half_day_threshold=auto_shift.half_day_threshold
+        )
+
     def _handle_in_log_fixedshift(self, employee: Employee, log: Logs, is_manual: bool = False) -> bool:
         """Handle incoming attendance log for fixed shift employees."""
         try:
@@ -671,11 +875,8 @@ class AttendanceProcessor:
 
 
             try:
-                with transaction.atomic():
-                    existing_attendance = Attendance.objects.select_for_update().filter(
-                        employeeid=employee,
-                        logdate=shift_date
-                    ).first()
+                with self.store.atomic():
+                    existing_attendance = self.store.get(employee, shift_date, for_update=True)
 
                     if existing_attendance:
                         if existing_attendance.first_logtime is None:
@@ -688,7 +889,7 @@ class AttendanceProcessor:
                             return True
                     else:
                         attendance = Attendance(
-                            employeeid=employee,
+                            employeeid_id=employee.pk,
                             logdate=shift_date,
                             first_logtime=log_time,
                             shift=shift.name,
@@ -704,7 +905,7 @@ class AttendanceProcessor:
                     if log_datetime > shift_start_with_grace:
                         attendance.late_entry = log_datetime - shift_start
 
-                    attendance.save()
+                    self.store.save(attendance)
                     return True
 
             except Exception as e:
@@ -743,11 +944,8 @@ class AttendanceProcessor:
                     # If log time is before shift start, it belongs to previous day
                     log_date = log_date - timedelta(days=1)
 
-            # Check for existing attendance records
-            existing_attendance = Attendance.objects.filter(
-                employeeid=employee,
-                logdate=log_date
-            ).first()
+            # Check for existing attendance records, starting with the open IN
+            existing_attendance = self.store.get_open(employee, log_date) or self.store.get(employee, log_date)
 
             # Handle different scenarios
             if existing_attendance:
@@ -794,8 +992,7 @@ class AttendanceProcessor:
                         overtime_after = max(timedelta(), out_datetime - shift_end) if out_datetime > overtime_threshold_after else timedelta()
 
                         # Shift status determination
-                        first_weekoff = employee.first_weekly_off
-                        weekoff_days = [first_weekoff] if first_weekoff is not None else WEEK_OFF_CONFIG.get('DEFAULT_WEEK_OFF', [])
+                        weekoff_days = week_off_days(employee)
 
                         if existing_attendance.logdate.weekday() in weekoff_days:
                             existing_attendance.overtime = total_time
@@ -813,18 +1010,18 @@ class AttendanceProcessor:
                         else:
                             existing_attendance.shift_status = 'P'
 
-                        existing_attendance.save()
+                        self.store.save(existing_attendance)
                 else:
                     # If no IN time, just update the OUT time
                     existing_attendance.last_logtime = log_time
                     existing_attendance.shift = shift.name
                     existing_attendance.direction = 'Manual' if is_manual else 'Machine'
                     existing_attendance.shift_status = 'MP'
-                    existing_attendance.save()
+                    self.store.save(existing_attendance)
             else:
                 # Create a new attendance record with OUT time
-                Attendance.objects.create(
-                    employeeid=employee,
+                self.store.create(
+                    employeeid_id=employee.pk,
                     logdate=log_date,
                     last_logtime=log_time,
                     direction='Manual' if is_manual else 'Machine',
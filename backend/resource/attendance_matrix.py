@@ -0,0 +1,73 @@
+from calendar import monthrange
+from collections import defaultdict
+from operator import attrgetter, itemgetter
+
+DURATION_FIELDS = ('total_time', 'late_entry', 'early_exit', 'overtime')
+
+
+def _seconds(value):
+    return int(value.total_seconds()) if value else 0
+
+
+def _getter(row):
+    """Attendance rows arrive either as model instances or as .values() dicts."""
+    return itemgetter if isinstance(row, dict) else attrgetter
+
+
+class AttendanceMonth:
+    """
+    One employee's month of attendance laid out by day.
+
+    records[i] is the row for day i + 1 (or None), statuses and shifts hold the
+    per-day codes ('' when there is no row), and seconds() gives a per-day
+    duration column in whole seconds. Every lookup is by index, so building the
+    month is a single pass over the employee's rows.
+    """
+
+    __slots__ = ('num_days', 'records', 'statuses', 'shifts', '_get', '_seconds')
+
+    def __init__(self, rows, num_days):
+        self.num_days = num_days
+        self.records = [None] * num_days
+        self.statuses = [''] * num_days
+        self.shifts = [''] * num_days
+        self._seconds = {}
+        self._get = None
+
+        for row in rows:
+            if self._get is None:
+                self._get = _getter(row)
+            get = self._get
+            index = get('logdate')(row).day - 1
+            self.records[index] = row
+            self.statuses[index] = get('shift_status')(row) or ''
+            self.shifts[index] = get('shift')(row) or ''
+
+    def seconds(self, field):
+        """Per-day values of a DurationField in whole seconds, 0 for missing days."""
+        if field not in self._seconds:
+            get = self._get(field) if self._get else None
+            self._seconds[field] = [_seconds(get(row)) if row is not None else 0 for row in self.records]
+        return self._seconds[field]
+
+    def total_seconds(self, field):
+        return sum(self.seconds(field))
+
+    def count(self, *codes):
+        """Number of days whose status is one of codes."""
+        return sum(1 for status in self.statuses if status in codes)
+
+
+def build_attendance_matrix(rows, year, month):
+    """
+    Group one month of attendance rows into an AttendanceMonth per employee pk.
+    rows can be Attendance instances or .values() dicts that include employeeid_id.
+    """
+    num_days = monthrange(year, month)[1]
+    by_employee = defaultdict(list)
+    get_employee = None
+    for row in rows:
+        if get_employee is None:
+            get_employee = _getter(row)('employeeid_id')
+        by_employee[get_employee(row)].append(row)
+    return {employee_id: AttendanceMonth(employee_rows, num_days) for employee_id, employee_rows in by_employee.items()}
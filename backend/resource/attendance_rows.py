@@ -0,0 +1,102 @@
+from django.core.files.storage import default_storage
+from django.utils.duration import duration_string
+
+# Output key -> values() path, in the key order AttendanceSerializer uses
+ATTENDANCE_ROW_FIELDS = {
+    'id': 'id',
+    'employee_id_id': 'employeeid__employee_id',
+    'profile_pic': 'employeeid__profile_pic',
+    'employee_name': 'employeeid__employee_name',
+    'device_enroll_id': 'employeeid__device_enroll_id',
+    'company_name': 'employeeid__company__name',
+    'location_name': 'employeeid__location__name',
+    'job_type': 'employeeid__job_type',
+    'department_name': 'employeeid__department__name',
+    'category': 'employeeid__category',
+    'designation_name': 'employeeid__designation__name',
+    'shift_name': 'employeeid__shift__name',
+    'logdate': 'logdate',
+    'first_logtime': 'first_logtime',
+    'last_logtime': 'last_logtime',
+    'direction': 'direction',
+    'shortname': 'shortname',
+    'total_time': 'total_time',
+    'late_entry': 'late_entry',
+    'early_exit': 'early_exit',
+    'overtime': 'overtime',
+    'shift': 'shift',
+    'shift_status': 'shift_status',
+    'employeeid': 'employeeid',
+}
+
+ISO_FIELDS = {'logdate', 'first_logtime', 'last_logtime'}
+DURATION_FIELDS = {'total_time', 'late_entry', 'early_exit', 'overtime'}
+
+
+def parse_fields(fields_param):
+    """
+    Output keys for a ?fields= value (comma separated), in serializer order.
+    All keys when the parameter is empty; ValueError names any unknown key.
+    """
+    if not fields_param:
+        return list(ATTENDANCE_ROW_FIELDS)
+    requested = {name.strip() for name in fields_param.split(',') if name.strip()}
+    unknown = requested - ATTENDANCE_ROW_FIELDS.keys()
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return [key for key in ATTENDANCE_ROW_FIELDS if key in requested]
+
+
+def select_rows(queryset, keys):
+    """
+    The queryset as values() rows holding just the columns behind keys, joined in
+    one query. id and logdate are always selected for the keyset paginator.
+    """
+    paths = dict.fromkeys([*(ATTENDANCE_ROW_FIELDS[key] for key in keys), 'id', 'logdate'])
+    return queryset.values(*paths)
+
+
+def format_rows(rows, keys, request=None):
+    """
+    Map values() rows to the dicts AttendanceSerializer would return for the
+    same keys, formatting dates, times and durations the way DRF does.
+    Relations that are not set come back as None rather than being left out.
+    """
+    formatters = []
+    for key in keys:
+        path = ATTENDANCE_ROW_FIELDS[key]
+        if key in ISO_FIELDS:
+            formatter = _isoformat
+        elif key in DURATION_FIELDS:
+            formatter = _duration
+        elif key == 'profile_pic':
+            formatter = _media_url(request)
+        else:
+            formatter = None
+        formatters.append((key, path, formatter))
+
+    data = []
+    for row in rows:
+        item = {}
+        for key, path, formatter in formatters:
+            value = row[path]
+            item[key] = formatter(value) if formatter is not None and value is not None else value
+        data.append(item)
+    return data
+
+
+def _isoformat(value):
+    return value.isoformat()
+
+
+def _duration(value):
+    return duration_string(value)
+
+
+def _media_url(request):
+    def formatter(name):
+        if not name:
+            return None
+        url = default_storage.url(name)
+        return request.build_absolute_uri(url) if request is not None else url
+    return formatter
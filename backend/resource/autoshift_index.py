@@ -0,0 +1,81 @@
+from bisect import bisect_right
+from datetime import time, timedelta
+
+# Times of day are compared as integer microseconds since midnight
+DAY = 24 * 60 * 60 * 1_000_000
+
+# A shift starting at midnight opens its window one hour before, whatever its tolerance
+MIDNIGHT_START_TOLERANCE = timedelta(hours=1)
+
+
+def microseconds(value):
+    """Microseconds since midnight of a time, or the length of a timedelta."""
+    if isinstance(value, timedelta):
+        return (value.days * 86400 + value.seconds) * 1_000_000 + value.microseconds
+    return ((value.hour * 60 + value.minute) * 60 + value.second) * 1_000_000 + value.microsecond
+
+
+def tolerance_segments(auto_shift):
+    """
+    The parts of one day covered by an auto shift's IN window, as
+    (start, end, day_offset) with end exclusive. day_offset is the day the
+    shift starts on relative to the punch date, so a window that wraps midnight
+    gives one segment for each side of it.
+    """
+    start = microseconds(auto_shift.start_time)
+    if auto_shift.start_time == time(0, 0):
+        before = MIDNIGHT_START_TOLERANCE
+    else:
+        before = auto_shift.tolerance_start_time
+    # Both ends of the window are inclusive
+    low = start - microseconds(before)
+    high = start + microseconds(auto_shift.tolerance_end_time) + 1
+
+    segments = []
+    for day_offset in (-1, 0, 1):
+        segment_start = max(low + day_offset * DAY, 0)
+        segment_end = min(high + day_offset * DAY, DAY)
+        if segment_start < segment_end:
+            segments.append((segment_start, segment_end, day_offset))
+    return segments
+
+
+class AutoShiftIndex:
+    """
+    Sorted interval index over the IN windows of a list of auto shifts.
+
+    The day is cut at every window boundary into disjoint segments, each
+    holding the (auto_shift, day_offset) candidates that cover it in
+    auto_shifts order, so a punch time resolves to its candidates with one
+    bisect. Build a new index whenever the auto shifts change.
+    """
+
+    def __init__(self, auto_shifts):
+        intervals = []
+        for auto_shift in auto_shifts:
+            if auto_shift.tolerance_start_time is None or auto_shift.tolerance_end_time is None:
+                continue
+            for start, end, day_offset in tolerance_segments(auto_shift):
+                intervals.append((start, end, auto_shift, day_offset))
+
+        boundaries = sorted({0}.union(*({start, end} for start, end, _, _ in intervals)) - {DAY})
+        self._starts = boundaries
+        self._candidates = []
+        for start in boundaries:
+            self._candidates.append(tuple(
+                (auto_shift, day_offset)
+                for interval_start, interval_end, auto_shift, day_offset in intervals
+                if interval_start <= start < interval_end
+            ))
+
+    def candidates(self, log_time):
+        """(auto_shift, day_offset) pairs whose IN window contains log_time, in auto_shifts order."""
+        return self._candidates[bisect_right(self._starts, microseconds(log_time)) - 1]
+
+    def match(self, log_datetime):
+        """(auto_shift, shift_date) pairs for a naive punch datetime."""
+        log_date = log_datetime.date()
+        return [
+            (auto_shift, log_date + timedelta(days=day_offset))
+            for auto_shift, day_offset in self.candidates(log_datetime.time())
+        ]
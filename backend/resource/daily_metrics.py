@@ -0,0 +1,59 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import Count, F, Max, Q, Subquery
+from django.utils.timezone import now
+
+from resource.models import Attendance
+
+# Dashboard counts are cached this many seconds per logdate
+CACHE_TIMEOUT = 30
+LATEST_KEY = 'attendance-metrics:latest'
+
+
+def metrics_key(logdate):
+    return f'attendance-metrics:{logdate}'
+
+
+def latest_day_queryset():
+    """Attendance rows of the latest logdate, with the date looked up in the same query."""
+    latest = Attendance.objects.order_by('-logdate').values('logdate')[:1]
+    return Attendance.objects.filter(logdate=Subquery(latest))
+
+
+def count_latest_day():
+    """Every dashboard count for the latest logdate, in one aggregate query."""
+    return latest_day_queryset().aggregate(
+        logdate=Max('logdate'),
+        present_count=Count('id', filter=Q(shift_status='P')),
+        absent_count=Count('id', filter=Q(shift_status='A')),
+        late_entry_count=Count('id', filter=Q(late_entry__isnull=False)),
+        early_exit_count=Count('id', filter=Q(early_exit__isnull=False)),
+        overtime_count=Count('id', filter=Q(overtime__isnull=False)),
+        # first_logtime is a time of day, compared with the time an hour ago like before
+        present_count_last_hour=Count('id', filter=Q(shift_status='P', first_logtime__gte=(now() - timedelta(hours=1)).time())),
+        single_punch_count=Count('id', filter=Q(first_logtime=F('last_logtime'))),
+        total_checkin=Count('id', filter=Q(first_logtime__isnull=False)),
+        total_checkout=Count('id', filter=Q(last_logtime__isnull=False) & ~Q(last_logtime=F('first_logtime'))),
+    )
+
+
+def latest_day_counts():
+    """
+    count_latest_day(), served from the cache while the latest date and its
+    counts are there, so a dashboard poll costs one query or none.
+    """
+    logdate = cache.get(LATEST_KEY)
+    if logdate is not None:
+        counts = cache.get(metrics_key(logdate))
+        if counts is not None:
+            return counts
+
+    counts = count_latest_day()
+    cache.set_many({LATEST_KEY: counts['logdate'], metrics_key(counts['logdate']): counts}, CACHE_TIMEOUT)
+    return counts
+
+
+def invalidate(logdates):
+    """Drop the cached counts for logdates; any write may also change which date is latest."""
+    cache.delete_many([LATEST_KEY, *(metrics_key(logdate) for logdate in set(logdates))])
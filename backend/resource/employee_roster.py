@@ -0,0 +1,58 @@
+from resource.models import Employee
+from value_config import WEEK_OFF_CONFIG
+
+# The only Employee columns the attendance processors read
+ROSTER_FIELDS = (
+    'id', 'employee_id', 'shift_id', 'auto_shift', 'first_weekly_off', 'second_weekly_off',
+    'flexi_time', 'consider_late_entry', 'consider_early_exit', 'consider_extra_hours_worked',
+    'date_of_joining', 'date_of_leaving',
+)
+
+
+def resolve_week_off_days(first_weekly_off):
+    """Weekdays (0 = Monday) treated as week off for an employee's first_weekly_off setting."""
+    if isinstance(first_weekly_off, str):
+        first_weekly_off = int(first_weekly_off)
+    if first_weekly_off is not None:
+        return (first_weekly_off,)
+    return tuple(WEEK_OFF_CONFIG.get('DEFAULT_WEEK_OFF', []))
+
+
+class RosterEmployee:
+    """
+    The attendance-relevant part of one Employee row.
+
+    Built from .values() rather than a model instance, with the fixed shift
+    resolved to its Shift and the week-off days worked out once, so the
+    per-log path does no coercion or related-object lookups. Attribute names
+    match Employee, so the processors can take either.
+    """
+
+    __slots__ = ROSTER_FIELDS + ('pk', 'shift', 'week_off_days')
+
+    def __init__(self, values, shifts):
+        for field in ROSTER_FIELDS:
+            setattr(self, field, values[field])
+        self.pk = self.id
+        self.shift = shifts.get(self.shift_id) if self.shift_id is not None else None
+        self.week_off_days = resolve_week_off_days(self.first_weekly_off)
+
+    def __repr__(self):
+        return f"<RosterEmployee {self.employee_id}>"
+
+
+def week_off_days(employee):
+    """Week-off days of a RosterEmployee or a plain Employee instance."""
+    if isinstance(employee, RosterEmployee):
+        return employee.week_off_days
+    return resolve_week_off_days(employee.first_weekly_off)
+
+
+def roster_entries(shifts, **filters):
+    """RosterEmployee records for the employees matching filters, read in one query."""
+    return [RosterEmployee(values, shifts) for values in Employee.objects.filter(**filters).values(*ROSTER_FIELDS)]
+
+
+def build_roster(shifts):
+    """employee_id -> RosterEmployee for every employee."""
+    return {entry.employee_id: entry for entry in roster_entries(shifts)}
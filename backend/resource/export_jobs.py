@@ -0,0 +1,207 @@
+import hashlib
+import json
+import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Count, Max, Q
+from django.http import HttpRequest, QueryDict
+from django.utils.timezone import now
+
+from config.models import Company, Department, Designation, Location
+from resource.models import Employee, ExportJob, HolidayList, ManualLogs, MonthlyAttendanceSummary, OvertimeRoundoffRules
+from resource.monthly_summary import ensure_month
+
+logger = logging.getLogger(__name__)
+
+# Report types accepted by the job endpoints, mapped to the view that renders them.
+# The names match the /attendance/export/<report_type>/ urls.
+REPORT_VIEWS = {
+    'monthly_muster_role': 'ExportMonthlyMusterRoleExcel2',
+    'monthly_payroll': 'ExportMonthlyPayrollExcel2',
+    'monthly_shift_roaster': 'ExportMonthlyShiftRoasterExcel2',
+    'monthly_overtime': 'ExportMonthlyOvertimeExcel2',
+    'monthly_roundoff_overtime': 'ExportMonthlyOvertimeRoundoffExcel2',
+    'monthly_late_entry': 'ExportMonthlyLateEntryExcel2',
+    'monthly_early_exit': 'ExportMonthlyEarlyExitExcel2',
+    'monthly_absent': 'ExportMonthlyAbsentExcel2',
+    'monthly_present': 'ExportMonthlyPresentExcel2',
+}
+
+# Filters the report views understand. They only read month and year so far,
+# so any filter is refused rather than silently ignored.
+REPORT_FILTERS = frozenset()
+
+_executor = None
+
+
+def data_version(month, year):
+    """
+    Stamp describing the data a monthly report is built from. It changes whenever
+    attendance for the month is written, manual punches are added, or employees,
+    the companies, locations, departments and designations the report names,
+    holidays or round-off rules are edited.
+
+    Attendance rows carry no modification time, so the month's summaries stand in
+    for them: every write to an employee-month, including in-place edits,
+    re-saves its MonthlyAttendanceSummary and moves updated_at. A month written
+    before the summaries existed is built first, as the report itself would.
+    """
+    ensure_month(year, month)
+    summaries = MonthlyAttendanceSummary.objects.filter(year=year, month=month).aggregate(
+        rows=Count('id'), updated=Max('updated_at')
+    )
+    employees = Employee.objects.aggregate(rows=Count('id'), updated=Max('updated_at'))
+    organisation = [
+        model.objects.aggregate(rows=Count('id'), updated=Max('updated_at'))
+        for model in (Company, Location, Department, Designation)
+    ]
+    holidays = HolidayList.objects.aggregate(rows=Count('id'), updated=Max('updated_at'))
+    manual = ManualLogs.objects.aggregate(max_id=Max('id'))
+    rules = OvertimeRoundoffRules.objects.filter(pk=1).values_list('round_off_interval', 'round_off_direction').first()
+
+    stamp = [summaries, employees, organisation, holidays, manual, rules]
+    return hashlib.sha256(json.dumps(stamp, default=str, sort_keys=True).encode()).hexdigest()
+
+
+def build_cache_key(report_type, month, year, filters, version):
+    """Key a generated file by its parameters plus the data version it was built from."""
+    payload = json.dumps([report_type, month, year, filters or {}, version], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def cache_path(cache_key):
+    return os.path.join(settings.EXPORT_CACHE_DIR, f"{cache_key}.xlsx")
+
+
+def enqueue_export(report_type, month, year, filters=None):
+    """
+    Return an ExportJob for the requested report. A finished job for the same
+    parameters and data version is reused as is, an identical job that is still
+    queued or running is shared, and otherwise a new job is queued.
+
+    A job that has been queued or running for longer than EXPORT_JOB_TIMEOUT is
+    taken to be lost (its worker was restarted) and marked failed, so the report
+    is queued again instead of waiting on it forever.
+    """
+    if report_type not in REPORT_VIEWS:
+        raise ValueError(f"Unknown report type: {report_type}")
+
+    filters = filters or {}
+    unknown = set(filters) - REPORT_FILTERS
+    if unknown:
+        raise ValueError(f"Unsupported filters: {', '.join(sorted(unknown))}")
+
+    version = data_version(month, year)
+    key = build_cache_key(report_type, month, year, filters, version)
+
+    done = ExportJob.objects.filter(cache_key=key, status='done').order_by('-finished_at').first()
+    if done and done.file_path and os.path.exists(done.file_path):
+        return done
+
+    in_flight = ExportJob.objects.filter(cache_key=key, status__in=('pending', 'running'))
+    cutoff = now() - timedelta(seconds=getattr(settings, 'EXPORT_JOB_TIMEOUT', 1800))
+    lost = in_flight.filter(Q(started_at__lt=cutoff) | Q(started_at__isnull=True, created_at__lt=cutoff))
+    if lost.update(status='failed', error='Job did not finish in time', finished_at=now()):
+        logger.warning("Export job for %s %s/%s timed out, queueing the report again", report_type, month, year)
+
+    in_flight = in_flight.order_by('-created_at').first()
+    if in_flight:
+        return in_flight
+
+    job = ExportJob.objects.create(
+        report_type=report_type,
+        month=month,
+        year=year,
+        filters=filters,
+        cache_key=key,
+        data_version=version,
+    )
+    transaction.on_commit(lambda: dispatch(job.id))
+    return job
+
+
+def dispatch(job_id):
+    """Hand a job to the configured backend."""
+    backend = getattr(settings, 'EXPORT_JOB_BACKEND', 'thread')
+    if backend == 'celery':
+        from resource.tasks import generate_export
+        generate_export.delay(job_id)
+    elif backend == 'inline':
+        run_export_job(job_id)
+    else:
+        _get_executor().submit(_run_in_thread, job_id)
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'EXPORT_JOB_WORKERS', 2),
+            thread_name_prefix='export-job',
+        )
+    return _executor
+
+
+def _run_in_thread(job_id):
+    try:
+        run_export_job(job_id)
+    finally:
+        connections.close_all()
+
+
+def run_export_job(job_id):
+    """Render the report for a job and store it under its cache key."""
+    from resource import views
+
+    job = ExportJob.objects.get(pk=job_id)
+    if job.status == 'done':
+        return job
+
+    job.status = 'running'
+    job.started_at = now()
+    job.save(update_fields=['status', 'started_at'])
+
+    try:
+        request = HttpRequest()
+        request.method = 'GET'
+        request.GET = QueryDict(mutable=True)
+        request.GET.update({'month': str(job.month), 'year': str(job.year)})
+        request.GET.update({k: str(v) for k, v in job.filters.items()})
+
+        view = getattr(views, REPORT_VIEWS[job.report_type]).as_view()
+        response = view(request)
+        if response.status_code != 200:
+            raise RuntimeError(f"Report view returned status {response.status_code}")
+
+        os.makedirs(settings.EXPORT_CACHE_DIR, exist_ok=True)
+        path = cache_path(job.cache_key)
+        tmp_path = f"{path}.{job.id}.part"
+        try:
+            with open(tmp_path, 'wb') as fh:
+                if response.streaming:
+                    for chunk in response.streaming_content:
+                        fh.write(chunk)
+                else:
+                    fh.write(response.content)
+        finally:
+            # Releases the view's temporary workbook, as the server would after a request
+            response.close()
+        os.replace(tmp_path, path)
+
+        match = re.search(r'filename=([^;]+)', response.get('Content-Disposition', ''))
+        job.file_path = path
+        job.file_name = match.group(1).strip('"') if match else os.path.basename(path)
+        job.status = 'done'
+    except Exception as e:
+        logger.exception("Export job %s failed", job_id)
+        job.status = 'failed'
+        job.error = str(e)
+
+    job.finished_at = now()
+    job.save(update_fields=['status', 'file_path', 'file_name', 'error', 'finished_at'])
+    return job
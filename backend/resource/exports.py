@@ -0,0 +1,117 @@
+import tempfile
+
+import xlsxwriter
+from django.http import FileResponse
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Cell formats shared by the monthly register exports (xlsxwriter format properties)
+TITLE_FORMAT = {'bold': True}
+INFO_FORMAT = {'bold': True, 'bg_color': '#E3F2FD', 'border': 1}
+DAYS_HEADER_FORMAT = {'bold': True, 'bg_color': '#F5F5F5', 'border': 1}
+BORDER_FORMAT = {'border': 1}
+BOLD_FORMAT = {'bold': True, 'border': 1}
+TOTAL_FORMAT = {'bold': True, 'bg_color': '#FFD700', 'border': 1}
+PRESENT_TOTAL_FORMAT = {'bold': True, 'bg_color': '#C8E6C9', 'border': 1}
+ABSENT_TOTAL_FORMAT = {'bold': True, 'bg_color': '#FFCDD2', 'border': 1}
+
+# Predefined formats for shift statuses
+STATUS_FORMATS = {
+    'P': {'bg_color': '#C8E6C9', 'font_color': '#256029', 'bold': True, 'border': 1, 'align': 'center'},
+    'WW': {'bg_color': '#C8E6C9', 'font_color': '#256029', 'bold': True, 'border': 1, 'align': 'center'},
+    'A': {'bg_color': '#FFCDD2', 'font_color': '#C63737', 'bold': True, 'border': 1, 'align': 'center'},
+    'HD': {'bg_color': '#FFD54F', 'font_color': '#8A5340', 'bold': True, 'border': 1, 'align': 'center'},
+    'WO': {'bg_color': '#FFD54F', 'font_color': '#8A5340', 'bold': True, 'border': 1, 'align': 'center'},
+    'PH': {'bg_color': '#FFD54F', 'font_color': '#8A5340', 'bold': True, 'border': 1, 'align': 'center'},
+    'FH': {'bg_color': '#FFD54F', 'font_color': '#8A5340', 'bold': True, 'border': 1, 'align': 'center'},
+    'MP': {'bg_color': '#FFF4E6', 'font_color': '#D84315', 'bold': True, 'border': 1, 'align': 'center'},
+    'IH': {'bg_color': '#FFF3CD', 'font_color': '#856404', 'bold': True, 'border': 1, 'align': 'center'},
+}
+
+
+class StreamingExcelWriter:
+    """
+    Constant-memory XLSX writer for the monthly register exports.
+
+    Rows are written with xlsxwriter in constant_memory mode, so each row is
+    flushed to a temporary file as soon as the next one starts. Column widths
+    are tracked from the values as they are written instead of rescanning the
+    sheet, and the finished workbook is streamed back from disk in chunks.
+
+    The workbook is written to an anonymous TemporaryFile, which the operating
+    system removes once it is closed: by the response when streaming ends or the
+    client goes away, or when the writer is dropped because the view failed.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, sheet_title, min_width=10, max_width=30):
+        self.file = tempfile.TemporaryFile(suffix='.xlsx')
+
+        self.workbook = xlsxwriter.Workbook(self.file, {'constant_memory': True})
+        self.worksheet = self.workbook.add_worksheet(sheet_title[:31])
+        self.min_width = min_width
+        self.max_width = max_width
+        self.widths = {}
+        self.row = 0
+        self._formats = {}
+
+    def get_format(self, properties):
+        """Return a cached workbook format for a dict of format properties."""
+        if not properties:
+            return None
+        key = tuple(sorted(properties.items()))
+        if key not in self._formats:
+            self._formats[key] = self.workbook.add_format(properties)
+        return self._formats[key]
+
+    def _track_width(self, col, value):
+        length = min(len(str(value)) if value is not None else 0, self.max_width)
+        if length > self.widths.get(col, -1):
+            self.widths[col] = length
+
+    def merge_title(self, text, last_column, properties=TITLE_FORMAT):
+        """Write a title merged across columns 1..last_column of the next row."""
+        self.worksheet.merge_range(self.row, 0, self.row, last_column - 1, text, self.get_format(properties))
+        self.row += 1
+
+    def write_row(self, values, formats=None):
+        """
+        Write one row. formats is a list of format property dicts aligned with
+        the columns and may be longer than values, the extra cells are written
+        blank with their format.
+        """
+        formats = formats or []
+        for col in range(max(len(values), len(formats))):
+            value = values[col] if col < len(values) else None
+            cell_format = self.get_format(formats[col]) if col < len(formats) else None
+            if value is None or value == "":
+                if cell_format is not None:
+                    self.worksheet.write_blank(self.row, col, None, cell_format)
+            else:
+                self.worksheet.write(self.row, col, value, cell_format)
+            self._track_width(col, value)
+        self.row += 1
+
+    def close(self):
+        for col, width in self.widths.items():
+            self.worksheet.set_column(col, col, max(self.min_width, width + 2))
+        self.workbook.close()
+
+    def response(self, filename):
+        """Close the workbook and stream it back as an attachment; closing the response deletes the file."""
+        try:
+            self.close()
+            self.file.seek(0)
+        except Exception:
+            self.file.close()
+            raise
+        response = FileResponse(self.file, content_type=XLSX_CONTENT_TYPE)
+        response.block_size = self.CHUNK_SIZE
+        response['Content-Disposition'] = f'attachment; filename={filename}'
+        return response
+
+
+def header_formats(num_columns, info_columns=8):
+    """Formats for the column header row: employee info columns, then day and total columns."""
+    return [INFO_FORMAT] * info_columns + [DAYS_HEADER_FORMAT] * (num_columns - info_columns)
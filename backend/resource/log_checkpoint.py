@@ -0,0 +1,110 @@
+import logging
+import time
+
+from django.conf import settings
+from django.db import transaction
+from tqdm import tqdm
+
+from resource.models import LastLogId, Logs
+
+logger = logging.getLogger(__name__)
+
+
+class CheckpointMoved(Exception):
+    """Another run advanced LastLogId while this one was between chunks."""
+
+
+def chunk_limits(chunk_size=None, chunk_seconds=None):
+    """Logs and seconds per transaction, from the arguments or the LOG_PROCESSING_CHUNK_* settings."""
+    if chunk_size is None:
+        chunk_size = getattr(settings, 'LOG_PROCESSING_CHUNK_SIZE', 1000)
+    if chunk_seconds is None:
+        chunk_seconds = getattr(settings, 'LOG_PROCESSING_CHUNK_SECONDS', 10)
+    return max(int(chunk_size), 1), float(chunk_seconds)
+
+
+def lock_checkpoint():
+    """Lock the LastLogId row for the current transaction, creating it on first use."""
+    record = LastLogId.objects.select_for_update().first()
+    if record is None:
+        record = LastLogId.objects.create(last_log_id=0)
+    return record
+
+
+def pending_logs():
+    """
+    The logs after the current checkpoint in processing order, and the checkpoint
+    they were read at. Creates the LastLogId row on first use.
+    """
+    record = LastLogId.objects.first()
+    if record is None:
+        record = LastLogId.objects.create(last_log_id=0)
+    logs = list(Logs.objects.filter(id__gt=record.last_log_id).order_by('log_datetime'))
+    return logs, record.last_log_id
+
+
+def process_in_chunks(handle_log, logs=None, since=None, chunk_size=None, chunk_seconds=None, desc="Processing logs", end_chunk=None):
+    """
+    Run handle_log(log) over the pending logs, committing every chunk_size
+    logs or chunk_seconds seconds, whichever comes first.
+
+    Each chunk is one transaction: it locks the LastLogId row, handles its
+    logs and advances the checkpoint to the highest id handle_log returned
+    True for, but never to or past the id of a log that is still waiting:
+    logs run in log_datetime order, and a late synced old punch can carry a
+    higher id than punches after it. A failure rolls back only the chunk in
+    flight, and the row lock is released at every chunk boundary. If another run moves the checkpoint
+    in between, CheckpointMoved is raised instead of handling its logs again.
+
+    logs defaults to everything after the checkpoint; pass since with an
+    explicit list to detect a concurrent run from the first chunk. end_chunk(),
+    if given, runs at the end of every chunk inside its transaction, before the
+    checkpoint moves, e.g. to write rows a handler only staged in memory.
+    Returns the number of logs handled successfully.
+    """
+    chunk_size, chunk_seconds = chunk_limits(chunk_size, chunk_seconds)
+    if logs is None:
+        logs, since = pending_logs()
+
+    # lowest_waiting[i] is the smallest id among logs[i:], the bound for a checkpoint taken before logs[i]
+    lowest_waiting = [float('inf')] * (len(logs) + 1)
+    for index in range(len(logs) - 1, -1, -1):
+        lowest_waiting[index] = min(logs[index].id, lowest_waiting[index + 1])
+
+    expected = since
+    position = 0
+    handled = 0
+    chunks = 0
+    highest_handled = 0
+
+    with tqdm(total=len(logs), desc=desc, unit="log") as pbar:
+        while position < len(logs):
+            with transaction.atomic():
+                record = lock_checkpoint()
+                if expected is not None and record.last_log_id != expected:
+                    raise CheckpointMoved(f"LastLogId moved from {expected} to {record.last_log_id}")
+
+                started = time.monotonic()
+                end = min(position + chunk_size, len(logs))
+                while position < end:
+                    log = logs[position]
+                    position += 1
+                    if handle_log(log):
+                        handled += 1
+                        highest_handled = max(highest_handled, log.id)
+                    pbar.update(1)
+                    if time.monotonic() - started >= chunk_seconds:
+                        break
+
+                if end_chunk is not None:
+                    end_chunk()
+                checkpoint = max(record.last_log_id, min(highest_handled, lowest_waiting[position] - 1))
+                if checkpoint != record.last_log_id:
+                    record.last_log_id = checkpoint
+                    record.save(update_fields=['last_log_id'])
+                expected = checkpoint
+                chunks += 1
+
+    if logs:
+        logger.info(f"Processed {handled} of {len(logs)} logs in {chunks} chunks, checkpoint at {expected}")
+    return handled
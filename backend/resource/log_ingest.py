@@ -0,0 +1,166 @@
+import json
+
+from django.conf import settings
+from django.db import connections, router
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from resource.models import Logs
+
+# Text columns accepted for each punch, all CharField(max_length=50) on Logs
+TEXT_FIELDS = ('employeeid', 'direction', 'shortname', 'serialno')
+MAX_LENGTH = 50
+
+# Rows per INSERT
+BATCH_SIZE = 1000
+
+# Columns written for each punch; the id is the source device table's id
+INSERT_FIELDS = ('id',) + TEXT_FIELDS + ('log_datetime',)
+
+# Only the first rejected rows are described in the response
+MAX_REPORTED_ERRORS = 100
+
+NDJSON_CONTENT_TYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonlines')
+
+
+def parse_punches(body, content_type):
+    """
+    Decode a request body into a list of punch dicts. The body is either a JSON
+    array (or an object with a "logs" array) or NDJSON, one object per line.
+    Raises ValueError when the body cannot be decoded.
+    """
+    text = body.decode('utf-8') if isinstance(body, bytes) else body
+
+    if (content_type or '').split(';')[0].strip() in NDJSON_CONTENT_TYPES:
+        rows = []
+        for number, line in enumerate(text.splitlines(), start=1):
+            if line.strip():
+                try:
+                    rows.append(json.loads(line))
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"Invalid JSON on line {number}: {e}")
+        return rows
+
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON: {e}")
+    if isinstance(data, dict):
+        data = data.get('logs')
+    if not isinstance(data, list):
+        raise ValueError("Expected a JSON array of logs")
+    return data
+
+
+def clean_punch(row):
+    """
+    Validate one punch. Returns (Logs instance, None) or (None, errors).
+    """
+    if not isinstance(row, dict):
+        return None, {'non_field_errors': ['Expected an object.']}
+
+    errors = {}
+    values = {}
+
+    log_id = row.get('id')
+    if log_id is None:
+        errors['id'] = ['This field is required.']
+    elif isinstance(log_id, bool) or not isinstance(log_id, (int, str)) or not str(log_id).isdigit() or int(log_id) <= 0:
+        errors['id'] = ['A positive integer is required.']
+    else:
+        values['id'] = int(log_id)
+
+    for field in TEXT_FIELDS:
+        value = row.get(field)
+        if value is None or value == '':
+            values[field] = None
+            continue
+        if isinstance(value, bool) or not isinstance(value, (str, int)):
+            errors[field] = ['Not a valid string.']
+            continue
+        value = str(value)
+        if len(value) > MAX_LENGTH:
+            errors[field] = [f'Ensure this field has no more than {MAX_LENGTH} characters.']
+        values[field] = value
+
+    if not values.get('employeeid') and 'employeeid' not in errors:
+        errors['employeeid'] = ['This field is required.']
+
+    log_datetime = row.get('log_datetime')
+    parsed = parse_datetime(log_datetime) if isinstance(log_datetime, str) else None
+    if parsed is None:
+        errors['log_datetime'] = ['A valid datetime is required.']
+    else:
+        if settings.USE_TZ and timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        values['log_datetime'] = parsed
+
+    if errors:
+        return None, errors
+    return Logs(**values), None
+
+
+def insert_new(logs):
+    """
+    Insert punches whose id is not stored yet with INSERT ... ON CONFLICT (id)
+    DO NOTHING RETURNING id, and return how many rows were actually written.
+    Ids inserted concurrently by another request are skipped, not counted.
+    """
+    connection = connections[router.db_for_write(Logs)]
+    quote = connection.ops.quote_name
+    fields = [Logs._meta.get_field(name) for name in INSERT_FIELDS]
+    columns = ', '.join(quote(field.column) for field in fields)
+    row_placeholder = '(' + ', '.join(['%s'] * len(fields)) + ')'
+    pk = quote(Logs._meta.pk.column)
+
+    inserted = 0
+    with connection.cursor() as cursor:
+        for start in range(0, len(logs), BATCH_SIZE):
+            batch = logs[start:start + BATCH_SIZE]
+            params = [field.get_db_prep_save(getattr(log, field.attname), connection) for log in batch for field in fields]
+            cursor.execute(
+                f"INSERT INTO {quote(Logs._meta.db_table)} ({columns}) VALUES {', '.join([row_placeholder] * len(batch))} "
+                f"ON CONFLICT ({pk}) DO NOTHING RETURNING {pk}",
+                params,
+            )
+            inserted += len(cursor.fetchall())
+    return inserted
+
+
+def ingest_punches(rows):
+    """
+    Validate every punch in one pass and insert the valid ones. Every punch
+    must carry its source id, which is what makes a retried batch safe: a
+    punch whose id already exists, in the table or earlier in the same
+    payload, is counted as a duplicate, and accepted is the number of rows
+    the database actually inserted.
+    """
+    logs = []
+    errors = []
+    rejected = 0
+    seen_ids = set()
+    duplicates = 0
+
+    for index, row in enumerate(rows):
+        log, row_errors = clean_punch(row)
+        if row_errors:
+            rejected += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({'row': index, 'errors': row_errors})
+            continue
+        if log.id in seen_ids:
+            duplicates += 1
+            continue
+        seen_ids.add(log.id)
+        logs.append(log)
+
+    accepted = insert_new(logs)
+    duplicates += len(logs) - accepted
+
+    return {
+        'received': len(rows),
+        'accepted': accepted,
+        'duplicates': duplicates,
+        'rejected': rejected,
+        'errors': errors,
+    }
@@ -1,133 +1,168 @@
 import datetime
-from django.core.management.base import BaseCommand
-from django.db.models import F, Min, Q
-from resource.models import Attendance, Employee
+from collections import deque
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Min
+from resource import daily_metrics
+from resource.models import AbsenceCorrectionWatermark, Attendance
+from resource.monthly_summary import refresh_monthly_summaries
 from tqdm import tqdm  # Import TQDM for progress bar
 from django.db import transaction
+from django.utils import timezone
+from value_config import ABSENCE_CORRECTION_CONFIG
+
+UPDATE_BATCH_SIZE = 1000
+
+
+def parse_patterns(patterns):
+    """
+    Turn 'A-WO-A' style strings into status tuples. A pattern needs at least
+    three days and must start and end with 'A'.
+    """
+    parsed = []
+    for pattern in patterns:
+        statuses = tuple(status.strip() for status in pattern.split('-'))
+        if len(statuses) < 3 or statuses[0] != 'A' or statuses[-1] != 'A' or not all(statuses):
+            raise CommandError(f"Invalid absence pattern '{pattern}', expected e.g. 'A-WO-A'")
+        parsed.append(statuses)
+    return parsed
+
+
+def find_sandwiched(rows, patterns):
+    """
+    Slide a window over (id, employee_id, logdate, shift_status) rows ordered by
+    employee and date, and yield (id, employee_id, logdate) for every day found
+    between the outer 'A's of a pattern.
+
+    A window only spans consecutive days of one employee. Patterns are matched
+    against the statuses as read, so a day corrected to 'A' never creates a new
+    match; this is the same result as checking every window before updating.
+    """
+    size = max(len(pattern) for pattern in patterns)
+    window = deque(maxlen=size)
+    for row in rows:
+        _, employee_id, logdate, _ = row
+        if window:
+            _, last_employee_id, last_logdate, _ = window[-1]
+            if employee_id != last_employee_id or logdate != last_logdate + datetime.timedelta(days=1):
+                window.clear()
+        window.append(row)
+
+        for pattern in patterns:
+            if len(window) < len(pattern):
+                continue
+            days = list(window)[-len(pattern):]
+            if all(day[3] == status for day, status in zip(days, pattern)):
+                for day in days[1:-1]:
+                    if day[3] != 'A':
+                        yield day[0], day[1], day[2]
+
 
 class Command(BaseCommand):
     """
-    Django management command to identify and update attendance records exhibiting the 'A-WO-A' pattern
-    across three consecutive days.
+    Django management command to identify and update attendance records exhibiting sandwich
+    patterns such as 'A-WO-A' across consecutive days.
 
-    This command searches for the pattern:
+    The default pattern is:
     Day 1: 'A' (Absent)
     Day 2: 'WO' (Week Off)
     Day 3: 'A' (Absent)
 
-    For records up to yesterday from the earliest attendance record date in the database.
-    When the pattern is found, the 'shift_status' for Day 2 (Week Off) is updated to 'A' (Absent).
+    Patterns come from ABSENCE_CORRECTION_CONFIG['PATTERNS'] (or --patterns), e.g. 'A-PH-A'.
+    When a pattern is found, the days between the outer absences are updated to 'A' (Absent).
 
-    Performance is optimized using:
-        - Database indexes on 'logdate' and 'employeeid, logdate'.
-        - Batch updates for efficient database modifications.
-        - Efficient data structures (dictionaries) for record lookup.
-        - TQDM progress bar for monitoring execution progress.
-        - Reduced database hits by fetching attendance records in batches per date range.
+    Every employee's statuses are read once, ordered by (employee, logdate), and matched with a
+    sliding window. The last date checked is kept in AbsenceCorrectionWatermark, so a run only
+    reads the days since the previous one (plus the window overlap) up to yesterday.
     """
-    help = 'Identifies and updates attendance records with A-WO-A pattern from earliest date'
+    help = 'Identifies and updates attendance records with A-WO-A style patterns since the last run'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Check from the earliest attendance date instead of the last processed date'
+        )
+        parser.add_argument(
+            '--patterns',
+            type=str,
+            default=None,
+            help="Comma separated patterns to use instead of the configured ones, e.g. 'A-WO-A,A-PH-A'"
+        )
+
+    def lock_watermark(self):
+        """Lock the watermark row for the current transaction, creating it on first use."""
+        watermark = AbsenceCorrectionWatermark.objects.select_for_update().first()
+        if watermark is None:
+            watermark = AbsenceCorrectionWatermark.objects.create()
+        return watermark
+
+    def get_start_date(self, watermark, window_size, full=False):
+        """
+        First logdate to read. Windows ending after the watermark can begin up to
+        window_size - 1 days before it, so those days are read again.
+        """
+        if full or watermark.processed_through is None:
+            return Attendance.objects.aggregate(Min('logdate'))['logdate__min']
+        return watermark.processed_through - datetime.timedelta(days=window_size - 1)
 
+    @transaction.atomic
     def handle(self, *args, **options):
         """
         The main entry point for the management command.
 
-        Retrieves attendance records from the earliest date to yesterday, identifies 'A-WO-A' patterns,
-        and updates the middle day's status to 'A' when the pattern is found.
-
-        Uses TQDM to display a progress bar during date iteration and optimizes database access.
+        Streams the attendance statuses from the start date to yesterday, collects the days
+        sandwiched by a pattern, updates them to 'A' in batches and advances the watermark.
         """
-        today = datetime.date.today()
+        if options['patterns']:
+            patterns = parse_patterns(options['patterns'].split(','))
+        else:
+            patterns = parse_patterns(ABSENCE_CORRECTION_CONFIG['PATTERNS'])
+        window_size = max(len(pattern) for pattern in patterns)
+
+        today = timezone.now().date()
         yesterday = today - datetime.timedelta(days=1)
 
-        # Find the earliest logdate in the database to start processing from
-        earliest_attendance = Attendance.objects.aggregate(Min('logdate'))
-        earliest_logdate = earliest_attendance['logdate__min']
+        watermark = self.lock_watermark()
+        start_date = self.get_start_date(watermark, window_size, options['full'])
 
-        if earliest_logdate is None:
+        if start_date is None:
             self.stdout.write(self.style.WARNING("No attendance records found in the database."))
             return
 
-        current_date = earliest_logdate
-        updated_count = 0
-        total_employees_processed = 0
-        records_to_bulk_update = []  # List to store records for bulk update
-
         self.stdout.write(self.style.SUCCESS(
-            f"Starting A-WO-A pattern check from earliest date: {earliest_logdate} to {yesterday}"
+            f"Starting {', '.join('-'.join(pattern) for pattern in patterns)} pattern check from {start_date} to {yesterday}"
         ))
 
-        # Calculate total number of days to process for TQDM progress bar
-        total_days = (yesterday - earliest_logdate).days + 1
-
-        # Iterate through dates from the earliest log date to yesterday, using tqdm for progress bar
-        with tqdm(total=total_days, desc="Processing Dates", unit="day", ncols=80) as pbar:
-            date_iterator = self.date_range_generator(earliest_logdate, yesterday)
-            for day1, day2, day3 in date_iterator:
-                date_range = [day1, day2, day3]
-                # self.stdout.write(self.style.SUCCESS(f"Checking A-WO-A pattern for dates: {date_range}"))
-
-                # Fetch all attendance records for the current 3-day date range in a single query
-                all_date_range_attendance = Attendance.objects.filter(logdate__in=date_range).order_by('employeeid', 'logdate')
-
-                # Group attendance records by employee ID for efficient processing
-                employee_attendance_map = {}
-                for record in all_date_range_attendance:
-                    if record.employeeid_id not in employee_attendance_map:
-                        employee_attendance_map[record.employeeid_id] = {}
-                    employee_attendance_map[record.employeeid_id][record.logdate] = record
-
-                # Process each employee's attendance records for the current date range
-                for employee_id in employee_attendance_map:
-                    total_employees_processed += 1
-                    employee_dates_attendance = employee_attendance_map[employee_id]
-
-                    # Check if attendance records exist for all three days in the pattern for this employee
-                    if day1 in employee_dates_attendance and day2 in employee_dates_attendance and day3 in employee_dates_attendance:
-                        day1_record = employee_dates_attendance[day1]
-                        day2_record = employee_dates_attendance[day2]
-                        day3_record = employee_dates_attendance[day3]
-
-                        # Identify A-WO-A pattern
-                        if (day1_record.shift_status == 'A' and
-                                day2_record.shift_status == 'WO' and
-                                day3_record.shift_status == 'A'):
-                            day2_record.shift_status = 'A'
-                            records_to_bulk_update.append(day2_record)  # Add record to bulk update list
-                            updated_count += 1
-                            # self.stdout.write(self.style.WARNING(f"Pattern found: Updated shift_status for employee {employee_id} on {day2} from WO to A."))
-                pbar.update(1) # Update progress bar after processing each date range
-
-        # Perform bulk update for all identified records
-        if records_to_bulk_update:
-            Attendance.objects.bulk_update(records_to_bulk_update, ['shift_status'])
-            self.stdout.write(self.style.SUCCESS(f"Bulk updated {len(records_to_bulk_update)} attendance records."))
-
-        self.stdout.write(self.style.SUCCESS(f"Successfully processed employees from earliest date to yesterday."))
-        self.stdout.write(self.style.SUCCESS(f"Total employees processed: {total_employees_processed}."))
-        self.stdout.write(self.style.SUCCESS(f"Updated {updated_count} attendance records with WO to A based on A-WO-A pattern."))
-        self.stdout.write(self.style.SUCCESS("Completed A-WO-A pattern check."))
-
-    def date_range_generator(self, start_date, end_date):
-        """
-        Generates a sequence of 3-day date ranges from start_date to end_date.
-
-        For each date, it yields the date itself and the following two consecutive dates,
-        representing a 3-day window.
-
-        Args:
-            start_date (datetime.date): The starting date for range generation.
-            end_date (datetime.date): The ending date for range generation.
-
-        Yields:
-            tuple: A tuple containing three datetime.date objects representing a 3-day date range (day1, day2, day3).
-                   The iteration stops when day3 exceeds the end_date.
-        """
-        current_date = start_date
-        while current_date <= end_date:
-            day1 = current_date
-            day2 = current_date + datetime.timedelta(days=1)
-            day3 = current_date + datetime.timedelta(days=2)
-            if day3 > end_date:  # Stop if day3 is in the future (after end_date)
-                break
-            yield day1, day2, day3
-            current_date += datetime.timedelta(days=1)  # Move to the next day as starting point for 3-day window
\ No newline at end of file
+        rows = (
+            Attendance.objects
+            .filter(logdate__range=(start_date, yesterday), employeeid__isnull=False)
+            .order_by('employeeid', 'logdate')
+            .values_list('id', 'employeeid_id', 'logdate', 'shift_status')
+        )
+
+        matched = {}
+        logdates = set()
+        with tqdm(desc="Checking attendance", unit="record", ncols=80) as pbar:
+            def counted(iterable):
+                for row in iterable:
+                    pbar.update(1)
+                    yield row
+
+            for record_id, employee_id, logdate in find_sandwiched(counted(rows.iterator(chunk_size=10000)), patterns):
+                matched[record_id] = (employee_id, logdate.year, logdate.month)
+                logdates.add(logdate)
+
+        # Perform batched updates for all identified records
+        record_ids = list(matched)
+        for i in range(0, len(record_ids), UPDATE_BATCH_SIZE):
+            Attendance.objects.filter(id__in=record_ids[i:i + UPDATE_BATCH_SIZE]).update(shift_status='A')
+        if matched:
+            refresh_monthly_summaries(set(matched.values()))
+            transaction.on_commit(lambda: daily_metrics.invalidate(logdates))
+
+        if watermark.processed_through is None or watermark.processed_through < yesterday:
+            watermark.processed_through = yesterday
+            watermark.save(update_fields=['processed_through'])
+
+        self.stdout.write(self.style.SUCCESS(f"Updated {len(matched)} attendance records to A based on the patterns."))
+        self.stdout.write(self.style.SUCCESS(f"Processed through {yesterday}."))
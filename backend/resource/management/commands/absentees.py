@@ -1,122 +1,105 @@
 from django.core.management.base import BaseCommand
-from django.db import transaction
-from django.db.models import Q
+from django.db import connection, transaction
 from django.utils import timezone
-from resource.models import Attendance, Employee, HolidayList
-from tqdm import tqdm
-from typing import List, Dict, Set
+from resource.models import AbsenteeWatermark, Attendance, Employee, HolidayList
 from datetime import date, timedelta
-from collections import defaultdict
+from resource.monthly_summary import queue_summary_refresh
 from value_config import WEEK_OFF_CONFIG
 
+# Every employee x day in the range who was employed that day and has no row yet,
+# marked with the day's holiday type, WO on their weekly off, or A.
+# first_weekly_off follows Python's weekday() (0 is Monday), and like before an
+# unset or Monday weekly off falls back to WEEK_OFF_CONFIG['DEFAULT_WEEK_OFF'].
+OPEN_DAYS_SQL = """
+    INSERT INTO {attendance} (employeeid_id, logdate, shift_status)
+    SELECT e.id, d.day::date,
+           COALESCE(
+               h.holiday_type,
+               CASE WHEN CASE WHEN COALESCE(e.first_weekly_off, 0) <> 0
+                              THEN EXTRACT(ISODOW FROM d.day)::int - 1 = e.first_weekly_off
+                              ELSE EXTRACT(ISODOW FROM d.day)::int - 1 = ANY(%(default_week_off)s::int[])
+                         END
+                    THEN 'WO' ELSE 'A' END
+           )
+    FROM {employee} e
+    CROSS JOIN generate_series(%(start)s::date, %(end)s::date, interval '1 day') AS d(day)
+    LEFT JOIN (
+        SELECT DISTINCT ON (holiday_date) holiday_date, holiday_type
+        FROM {holiday}
+        WHERE holiday_date BETWEEN %(start)s AND %(end)s
+        ORDER BY holiday_date, id DESC
+    ) h ON h.holiday_date = d.day::date
+    WHERE (e.date_of_joining IS NULL OR e.date_of_joining <= d.day::date)
+      AND (e.date_of_leaving IS NULL OR e.date_of_leaving >= d.day::date)
+    ON CONFLICT (employeeid_id, logdate) DO NOTHING
+    RETURNING employeeid_id, logdate
+"""
+
+
 class Command(BaseCommand):
-    help = "Creates new fields in Attendance model and marks absent employees for a given number of days starting from today"
-    BATCH_SIZE = 1000  # Number of records to create at once
+    help = (
+        "Opens Attendance rows (A, WO or holiday) for every employee on the days after the "
+        "last day already opened, up to today. --days reopens a fixed window instead."
+    )
 
     def add_arguments(self, parser):
         """Define command arguments."""
         parser.add_argument(
             '--days',
             type=int,
-            default=1,
-            help='Number of days to process starting from today'
+            default=None,
+            help='Open the last N days ending today, whatever has been opened already'
         )
 
-    def get_dates_to_process(self, num_days: int) -> List[date]:
-        """Generate list of dates to process."""
-        today = timezone.now().date()
-        return [today - timedelta(days=i) for i in range(num_days)]
-
-    def fetch_existing_attendance(self, dates: List[date]) -> Dict[int, Set[date]]:
-        """Fetch existing attendance records grouped by employee ID."""
-        existing_records = defaultdict(set)
-        queryset = Attendance.objects.filter(logdate__in=dates).values_list('employeeid_id', 'logdate')
-        for employee_id, logdate in queryset:
-            existing_records[employee_id].add(logdate)
-        return existing_records
-
-    def create_attendance_objects(self, employees: List[Employee], dates: List[date], existing_records: Dict[int, Set[date]]):
-        """Generate attendance objects for batch insertion."""
-        attendance_objects = []
-
-        # Fetch all holidays for the given date range
-        holidays = HolidayList.objects.filter(holiday_date__in=dates)
-        holiday_dict = {holiday.holiday_date: holiday.holiday_type for holiday in holidays}
-
-        for employee in employees:
-            join_date = employee.date_of_joining or dates[-1]
-            leave_date = employee.date_of_leaving or dates[0]
-            # Convert first_weekoff to an integer if it's a string
-            first_weekoff = employee.first_weekly_off
-            if isinstance(first_weekoff, str):
-                try:
-                    first_weekoff = int(first_weekoff)
-                except ValueError:
-                    raise ValueError
-
-            for process_date in dates:
-                if process_date < join_date or process_date > leave_date:
-                    continue
-
-                # is_week_off = process_date.weekday() in WEEK_OFF_CONFIG['DEFAULT_WEEK_OFF']
-                if first_weekoff:
-                    is_week_off = process_date.weekday() == first_weekoff
-                else:
-                    is_week_off = process_date.weekday() in WEEK_OFF_CONFIG['DEFAULT_WEEK_OFF']
-
-                if process_date in existing_records.get(employee.id, set()):
-                    continue
-
-                shift_status = 'WO' if is_week_off else 'A'
-                
-                # Check if the current date is a holiday
-                if process_date in holiday_dict:
-                    shift_status = holiday_dict[process_date]
-                
-
-                attendance_objects.append(
-                    Attendance(
-                        employeeid=employee,
-                        logdate=process_date,
-                        shift_status=shift_status
-                    )
-                )
-
-                if len(attendance_objects) >= self.BATCH_SIZE:
-                    yield attendance_objects
-                    attendance_objects = []
-
-        if attendance_objects:
-            yield attendance_objects
+    def lock_watermark(self) -> AbsenteeWatermark:
+        """Lock the watermark row for the current transaction, creating it on first use."""
+        watermark = AbsenteeWatermark.objects.select_for_update().first()
+        if watermark is None:
+            watermark = AbsenteeWatermark.objects.create()
+        return watermark
+
+    def get_start_date(self, watermark: AbsenteeWatermark, today: date, num_days: int = None) -> date:
+        """First day to open. Today is always included so employees added today get their row."""
+        if num_days is not None:
+            return today - timedelta(days=max(num_days, 1) - 1)
+        if watermark.opened_through is None:
+            return today
+        return min(watermark.opened_through + timedelta(days=1), today)
+
+    def open_days(self, start: date, end: date) -> int:
+        """Insert the missing rows for start..end in one statement and return how many were created."""
+        sql = OPEN_DAYS_SQL.format(
+            attendance=Attendance._meta.db_table,
+            employee=Employee._meta.db_table,
+            holiday=HolidayList._meta.db_table,
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, {
+                'start': start,
+                'end': end,
+                'default_week_off': list(WEEK_OFF_CONFIG['DEFAULT_WEEK_OFF']),
+            })
+            created = cursor.fetchall()
+
+        for employee_id, logdate in created:
+            queue_summary_refresh(employee_id, logdate)
+        return len(created)
 
     @transaction.atomic
     def handle(self, *args, **options):
         """Main command logic."""
-        num_days = options['days']
-        dates = self.get_dates_to_process(num_days)
-
-        employees = Employee.objects.only('id', 'date_of_joining', 'date_of_leaving', 'first_weekly_off')  # Fetch only required fields
-        if not employees.exists():
-            self.stdout.write(self.style.WARNING("No employees found"))
-            return
-
-        existing_records = self.fetch_existing_attendance(dates)
+        today = timezone.now().date()
+        watermark = self.lock_watermark()
+        start = self.get_start_date(watermark, today, options['days'])
 
-        records_to_create = 0
-        for employee in employees:
-            join_date = employee.date_of_joining or dates[-1]
-            leave_date = employee.date_of_leaving or dates[0]
-            valid_dates = [date for date in dates if join_date <= date <= leave_date]
-            existing_dates_for_employee = existing_records.get(employee.id, set())
-            records_to_create += len(valid_dates) - len(existing_dates_for_employee)
+        created = self.open_days(start, today)
 
-        with tqdm(total=records_to_create, desc="Creating attendance records", unit="records") as pbar:
-            for batch in self.create_attendance_objects(employees, dates, existing_records):
-                Attendance.objects.bulk_create(batch)
-                pbar.update(len(batch))
+        if watermark.opened_through is None or watermark.opened_through < today:
+            watermark.opened_through = today
+            watermark.save(update_fields=['opened_through'])
 
         self.stdout.write(
             self.style.SUCCESS(
-                f"Successfully processed attendance for {num_days} days with {employees.count()} employees"
+                f"Opened {created} attendance records from {start} to {today}"
             )
-        )
\ No newline at end of file
+        )
@@ -15,8 +15,18 @@ from resource.attendance3 import ManDaysAttendanceProcessor
 class Command(BaseCommand):
     help = 'Processes new logs from the database.'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch',
+            action='store_true',
+            help='Prefetch the affected rows and write them with bulk upserts (for large backlogs and resets).',
+        )
+
     def handle(self, *args, **options):
         # process_attendance()
         processor = ManDaysAttendanceProcessor()
-        processor.process_logs()
+        if options['batch']:
+            processor.process_logs_batch()
+        else:
+            processor.process_logs()
         self.stdout.write(self.style.SUCCESS('Successfully processed logs.'))
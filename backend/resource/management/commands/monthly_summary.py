@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from resource.monthly_summary import rebuild_month
+
+class Command(BaseCommand):
+    help = "Rebuilds the monthly attendance summaries from the Attendance table"
+
+    def add_arguments(self, parser):
+        """Define command arguments."""
+        today = timezone.now().date()
+        parser.add_argument('--year', type=int, default=today.year, help='Year to rebuild')
+        parser.add_argument('--month', type=int, default=today.month, help='Month to rebuild')
+
+    def handle(self, *args, **options):
+        year, month = options['year'], options['month']
+        count = rebuild_month(year, month)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt monthly summaries for {count} employees for {month:02d}/{year}"))
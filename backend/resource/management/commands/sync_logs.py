@@ -3,10 +3,69 @@ from django.core.management.base import BaseCommand
 import psycopg2
 import pyodbc
 from datetime import datetime
+from io import StringIO
 import sys
 import os
+import queue
+import threading
+import time
 from typing import List, Tuple, Optional
 
+# Columns copied from the MSSQL logs table, in the order they are fetched
+LOG_COLUMNS = ('id', 'employeeid', 'direction', 'shortname', 'serialno', 'log_datetime')
+
+# Backslash escapes for the COPY text format
+COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+
+def copy_value(value) -> str:
+    """
+    Render one value as a field of COPY ... FROM STDIN text format.
+    """
+    if value is None:
+        return '\\N'
+    return str(value).translate(COPY_ESCAPES)
+
+
+def copy_rows(records: List[Tuple]) -> StringIO:
+    """
+    Render a batch of records as a tab separated COPY text buffer.
+    """
+    buffer = StringIO()
+    buffer.writelines('\t'.join(map(copy_value, record)) + '\n' for record in records)
+    buffer.seek(0)
+    return buffer
+
+
+class StageStats:
+    """
+    Rows and busy time of one pipeline stage.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.batches = 0
+        self.rows = 0
+        self.seconds = 0.0
+        self.wait_seconds = 0.0
+
+    def add(self, rows: int, seconds: float):
+        self.batches += 1
+        self.rows += rows
+        self.seconds += seconds
+
+    @property
+    def rate(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return (
+            f"{self.name}: {self.rows} rows in {self.batches} batches, "
+            f"busy {self.seconds:.2f}s, waiting {self.wait_seconds:.2f}s, "
+            f"{self.rate:.2f} rows/second"
+        )
+
+
 class Command(BaseCommand):
     help = 'Sync logs from MSSQL to PostgreSQL with batch processing'
 
@@ -32,6 +91,35 @@ class Command(BaseCommand):
     # Batch size for processing records
     BATCH_SIZE = 100000
 
+    # Session-local table each batch is copied into before it is merged into public.logs
+    STAGING_TABLE = 'logs_staging'
+
+    # Last MSSQL id committed to public.logs, written in the same transaction as each batch
+    CHECKPOINT_TABLE = 'public.sync_logs_checkpoint'
+
+    # Batches fetched ahead of the writer in --pipeline mode
+    QUEUE_SIZE = 4
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--mode',
+            choices=['copy', 'insert'],
+            default='copy',
+            help='copy streams each batch through COPY into a staging table and merges it with one upsert, '
+                 'insert uses the row by row INSERT ... ON CONFLICT path',
+        )
+        parser.add_argument(
+            '--pipeline',
+            action='store_true',
+            help='Fetch from MSSQL in a background thread while the previous batch is written to PostgreSQL',
+        )
+        parser.add_argument(
+            '--queue-size',
+            type=int,
+            default=self.QUEUE_SIZE,
+            help='Maximum number of fetched batches waiting to be written in --pipeline mode',
+        )
+
     def get_mssql_connection(self) -> pyodbc.Connection:
         """
         Establish connection to MSSQL database with detailed error handling
@@ -140,7 +228,224 @@ class Command(BaseCommand):
             self.stderr.write(self.style.ERROR(f"Error inserting into PostgreSQL: {str(e)}"))
             raise
 
+    def create_staging_table(self, pg_cursor):
+        """
+        Create the temporary staging table for COPY batches. Its rows are
+        dropped at every commit, so each batch starts from an empty table.
+        """
+        try:
+            pg_cursor.execute(f"""
+                CREATE TEMPORARY TABLE IF NOT EXISTS {self.STAGING_TABLE}
+                    (LIKE public.logs INCLUDING DEFAULTS)
+                ON COMMIT DELETE ROWS
+            """)
+        except psycopg2.Error as e:
+            self.stderr.write(self.style.ERROR(f"Error creating staging table: {str(e)}"))
+            raise
+
+    def copy_postgresql_batch(self, pg_cursor, records: List[Tuple]) -> int:
+        """
+        Stream a batch into the staging table with COPY FROM STDIN, then merge
+        it into public.logs with a single set-based upsert. Must run inside a
+        transaction so the staging rows are cleared on commit.
+        """
+        columns = ', '.join(LOG_COLUMNS)
+        merge_query = f"""
+            INSERT INTO public.logs ({columns})
+            SELECT DISTINCT ON (id) {columns}
+            FROM {self.STAGING_TABLE}
+            ORDER BY id, log_datetime DESC
+            ON CONFLICT (id) DO UPDATE
+            SET
+                employeeid = EXCLUDED.employeeid,
+                direction = EXCLUDED.direction,
+                shortname = EXCLUDED.shortname,
+                serialno = EXCLUDED.serialno,
+                log_datetime = EXCLUDED.log_datetime
+            WHERE
+                logs.log_datetime < EXCLUDED.log_datetime
+        """
+        try:
+            pg_cursor.copy_expert(f"COPY {self.STAGING_TABLE} ({columns}) FROM STDIN", copy_rows(records))
+            pg_cursor.execute(merge_query)
+            return len(records)
+        except psycopg2.Error as e:
+            self.stderr.write(self.style.ERROR(f"Error copying into PostgreSQL: {str(e)}"))
+            raise
+
+    def create_checkpoint_table(self, pg_cursor):
+        """
+        Create the checkpoint table that records the last synced MSSQL id.
+        """
+        try:
+            pg_cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS {self.CHECKPOINT_TABLE} (
+                    source VARCHAR(255) PRIMARY KEY,
+                    last_id BIGINT NOT NULL,
+                    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+                )
+            """)
+        except psycopg2.Error as e:
+            self.stderr.write(self.style.ERROR(f"Error creating checkpoint table: {str(e)}"))
+            raise
+
+    def get_checkpoint(self, pg_cursor) -> Optional[int]:
+        """
+        Return the last committed MSSQL id, or None before the first checkpoint.
+        """
+        pg_cursor.execute(
+            f"SELECT last_id FROM {self.CHECKPOINT_TABLE} WHERE source = %s",
+            (self.checkpoint_source(),),
+        )
+        row = pg_cursor.fetchone()
+        return row[0] if row else None
+
+    def save_checkpoint(self, pg_cursor, last_id: int):
+        pg_cursor.execute(f"""
+            INSERT INTO {self.CHECKPOINT_TABLE} (source, last_id, updated_at)
+            VALUES (%s, %s, NOW())
+            ON CONFLICT (source) DO UPDATE
+            SET last_id = EXCLUDED.last_id, updated_at = EXCLUDED.updated_at
+        """, (self.checkpoint_source(), last_id))
+
+    def checkpoint_source(self) -> str:
+        return f"{self.MSSQL_CONFIG['server']}/{self.MSSQL_CONFIG['database']}"
+
+    def commit_batch(self, pg_conn, pg_cursor, write_batch, records: List[Tuple]) -> Tuple[int, float]:
+        """
+        Write one batch and advance the checkpoint in a single transaction.
+        Returns the number of records written and the seconds it took.
+        """
+        try:
+            # Start transaction for batch processing
+            pg_conn.autocommit = False
+            batch_start = time.perf_counter()
+
+            # Write batch to PostgreSQL
+            inserted_count = write_batch(pg_cursor, records)
+            self.save_checkpoint(pg_cursor, records[-1][0])
+
+            # Commit the transaction
+            pg_conn.commit()
+            batch_seconds = time.perf_counter() - batch_start
+
+            # Reset autocommit to True after transaction
+            pg_conn.autocommit = True
+            return inserted_count, batch_seconds
+
+        except Exception as e:
+            if not pg_conn.autocommit:
+                pg_conn.rollback()
+                pg_conn.autocommit = True
+            self.stderr.write(self.style.ERROR(f"Error processing batch: {str(e)}"))
+            raise
+
+    def report_batch(self, inserted_count: int, total_records: int, last_id: int, batch_seconds: float):
+        self.stdout.write(
+            f"Processed batch: Records={inserted_count}, "
+            f"Total processed={total_records}, "
+            f"Last ID={last_id}, "
+            f"Rate={inserted_count / batch_seconds if batch_seconds else 0:.2f} rows/second"
+        )
+
+    def run_sequential(self, ms_conn, pg_conn, write_batch, last_id: int) -> int:
+        """
+        Fetch a batch, write it, then fetch the next one.
+        """
+        ms_cursor = ms_conn.cursor()
+        pg_cursor = pg_conn.cursor()
+        total_records = 0
+
+        while True:
+            # Fetch batch from MSSQL
+            records = self.fetch_mssql_batch(ms_cursor, last_id)
+
+            if not records:
+                self.stdout.write("No more records to process")
+                break
+
+            inserted_count, batch_seconds = self.commit_batch(pg_conn, pg_cursor, write_batch, records)
+
+            # Update last processed ID and counts
+            last_id = records[-1][0]
+            total_records += inserted_count
+            self.report_batch(inserted_count, total_records, last_id, batch_seconds)
+
+        return total_records
+
+    def run_pipelined(self, ms_conn, pg_conn, write_batch, last_id: int, queue_size: int) -> int:
+        """
+        Page through MSSQL by id in a producer thread while this thread writes
+        the previous batches to PostgreSQL. The bounded queue keeps the reader
+        at most queue_size batches ahead of the writer.
+        """
+        batches = queue.Queue(maxsize=max(queue_size, 1))
+        stop = threading.Event()
+        errors = []
+        fetch_stats = StageStats('MSSQL fetch')
+        write_stats = StageStats('PostgreSQL write')
+
+        def put(item):
+            # Block while the queue is full, but give up once the writer has stopped
+            wait_start = time.perf_counter()
+            while not stop.is_set():
+                try:
+                    batches.put(item, timeout=1)
+                    break
+                except queue.Full:
+                    continue
+            fetch_stats.wait_seconds += time.perf_counter() - wait_start
+
+        def produce():
+            ms_cursor = ms_conn.cursor()
+            next_id = last_id
+            try:
+                while not stop.is_set():
+                    fetch_start = time.perf_counter()
+                    records = self.fetch_mssql_batch(ms_cursor, next_id)
+                    fetch_stats.add(len(records), time.perf_counter() - fetch_start)
+                    if not records:
+                        break
+                    next_id = records[-1][0]
+                    put(records)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                put(None)
+
+        producer = threading.Thread(target=produce, name='sync-logs-fetch', daemon=True)
+        producer.start()
+
+        pg_cursor = pg_conn.cursor()
+        total_records = 0
+        try:
+            while True:
+                wait_start = time.perf_counter()
+                records = batches.get()
+                write_stats.wait_seconds += time.perf_counter() - wait_start
+                if records is None:
+                    break
+
+                inserted_count, batch_seconds = self.commit_batch(pg_conn, pg_cursor, write_batch, records)
+                write_stats.add(inserted_count, batch_seconds)
+
+                last_id = records[-1][0]
+                total_records += inserted_count
+                self.report_batch(inserted_count, total_records, last_id, batch_seconds)
+        finally:
+            stop.set()
+            producer.join()
+
+        if errors:
+            raise errors[0]
+
+        self.stdout.write("No more records to process")
+        self.stdout.write(str(fetch_stats))
+        self.stdout.write(str(write_stats))
+        return total_records
+
     def handle(self, *args, **options):
+        mode = options.get('mode') or 'copy'
         start_time = datetime.now()
         total_records = 0
         ms_conn = None
@@ -151,51 +456,29 @@ class Command(BaseCommand):
             ms_conn = self.get_mssql_connection()
             pg_conn = self.get_postgresql_connection()
             
-            ms_cursor = ms_conn.cursor()
             pg_cursor = pg_conn.cursor()
+            self.create_checkpoint_table(pg_cursor)
+
+            if mode == 'copy':
+                self.create_staging_table(pg_cursor)
+                write_batch = self.copy_postgresql_batch
+            else:
+                write_batch = self.insert_postgresql_batch
 
             # Get current state of PostgreSQL table
             last_id, existing_count = self.get_table_info(pg_cursor)
-            self.stdout.write(f"Starting sync from ID: {last_id}")
-            self.stdout.write(f"Existing records in PostgreSQL: {existing_count}")
 
-            while True:
-                try:
-                    # Fetch batch from MSSQL
-                    records = self.fetch_mssql_batch(ms_cursor, last_id)
-                    
-                    if not records:
-                        self.stdout.write("No more records to process")
-                        break
+            # Resume from the last committed batch once a checkpoint exists
+            checkpoint = self.get_checkpoint(pg_cursor)
+            if checkpoint is not None:
+                last_id = checkpoint
+            self.stdout.write(f"Starting sync from ID: {last_id} ({mode} mode)")
+            self.stdout.write(f"Existing records in PostgreSQL: {existing_count}")
 
-                    # Start transaction for batch processing
-                    pg_conn.autocommit = False
-                    
-                    # Insert batch in PostgreSQL
-                    inserted_count = self.insert_postgresql_batch(pg_cursor, records)
-                    
-                    # Commit the transaction
-                    pg_conn.commit()
-                    
-                    # Reset autocommit to True after transaction
-                    pg_conn.autocommit = True
-                    
-                    # Update last processed ID and counts
-                    last_id = records[-1][0]
-                    total_records += inserted_count
-                    
-                    self.stdout.write(
-                        f"Processed batch: Records={inserted_count}, "
-                        f"Total processed={total_records}, "
-                        f"Last ID={last_id}"
-                    )
-
-                except Exception as e:
-                    if not pg_conn.autocommit:
-                        pg_conn.rollback()
-                        pg_conn.autocommit = True
-                    self.stderr.write(self.style.ERROR(f"Error processing batch: {str(e)}"))
-                    raise
+            if options.get('pipeline'):
+                total_records = self.run_pipelined(ms_conn, pg_conn, write_batch, last_id, options.get('queue_size') or self.QUEUE_SIZE)
+            else:
+                total_records = self.run_sequential(ms_conn, pg_conn, write_batch, last_id)
 
             # Log summary
             duration = datetime.now() - start_time
@@ -203,7 +486,7 @@ class Command(BaseCommand):
                 f"\nSync completed successfully!"
                 f"\nTotal records processed: {total_records}"
                 f"\nTime taken: {duration}"
-                f"\nAverage rate: {total_records / duration.total_seconds():.2f} records/second"
+                f"\nAverage rate: {total_records / duration.total_seconds() if duration.total_seconds() else 0:.2f} records/second"
             ))
 
         except Exception as e:
@@ -1,4 +1,5 @@
 import logging
+from django.conf import settings
 from django.db import transaction
 from celery import shared_task
 
@@ -13,14 +14,32 @@ from resource.models import Logs, LastLogId  # Import your models
 # from resource.tasks import scan_for_data   # Import the function to execute
 
 from resource.attendance4 import AttendanceProcessor
+from resource import attendance7
+from resource.processor_registry import get_processor
 
 class Command(BaseCommand):
     help = 'Processes new logs from the database.'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch',
+            action='store_true',
+            default=None,
+            help="Use attendance7's set-based batch mode (default: the LOG_PROCESSING_BATCH setting)"
+        )
+
     def handle(self, *args, **options):
         # scan_for_data()
-        processor = AttendanceProcessor()
-        processor.process_new_logs()
-        
-        self.stdout.write(self.style.SUCCESS('Successfully processed logs.'))
+        batch = options['batch']
+        if batch is None:
+            batch = getattr(settings, 'LOG_PROCESSING_BATCH', False)
 
+        if batch:
+            processor = get_processor(attendance7.AttendanceProcessor)
+            if not processor.process_new_logs_batch():
+                raise CommandError('Batch log processing failed, see the log for details.')
+        else:
+            processor = AttendanceProcessor()
+            processor.process_new_logs()
+
+        self.stdout.write(self.style.SUCCESS('Successfully processed logs.'))
@@ -0,0 +1,46 @@
+# Generated by Django 5.0.7 on 2026-10-18 17:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resource', '0010_exportjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyAttendanceSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.IntegerField()),
+                ('month', models.IntegerField()),
+                ('present_count', models.IntegerField(default=0)),
+                ('absent_count', models.IntegerField(default=0)),
+                ('half_day_count', models.IntegerField(default=0)),
+                ('week_off_count', models.IntegerField(default=0)),
+                ('week_off_worked_count', models.IntegerField(default=0)),
+                ('missed_punch_count', models.IntegerField(default=0)),
+                ('holiday_count', models.IntegerField(default=0)),
+                ('in_house_count', models.IntegerField(default=0)),
+                ('total_time_seconds', models.IntegerField(default=0)),
+                ('late_entry_seconds', models.IntegerField(default=0)),
+                ('early_exit_seconds', models.IntegerField(default=0)),
+                ('overtime_seconds', models.IntegerField(default=0)),
+                ('day_statuses', models.TextField(blank=True, default='')),
+                ('day_shifts', models.TextField(blank=True, default='')),
+                ('day_late_entry', models.JSONField(blank=True, default=list)),
+                ('day_early_exit', models.JSONField(blank=True, default=list)),
+                ('day_overtime', models.JSONField(blank=True, default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('employeeid', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='resource.employee')),
+            ],
+            options={
+                'db_table': 'monthly_attendance_summary',
+                'indexes': [models.Index(fields=['year', 'month'], name='idx_summary_year_month')],
+                'unique_together': {('employeeid', 'year', 'month')},
+            },
+        ),
+    ]
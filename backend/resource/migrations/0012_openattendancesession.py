@@ -0,0 +1,28 @@
+# Generated by Django 5.0.7 on 2026-10-18 17:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resource', '0011_monthlyattendancesummary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OpenAttendanceSession',
+            fields=[
+                ('employeeid', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to='resource.employee')),
+                ('logdate', models.DateField()),
+                ('first_logtime', models.TimeField()),
+                ('last_logtime', models.TimeField(blank=True, null=True)),
+                ('shift', models.CharField(blank=True, max_length=50, null=True)),
+                ('attendance', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='resource.attendance')),
+            ],
+            options={
+                'db_table': 'open_attendance_session',
+            },
+        ),
+    ]
@@ -0,0 +1,271 @@
+# Generated by Django 5.0.7 on 2026-10-18 17:44
+
+from django.db import migrations, models
+
+from resource.punch_pairs import from_slots, summarize, to_slots
+
+
+def slots_to_punches(apps, schema_editor):
+    for model_name in ('ManDaysAttendance', 'ManDaysMissedPunchAttendance'):
+        model = apps.get_model('resource', model_name)
+        changed = []
+        for row in model.objects.iterator(chunk_size=5000):
+            row.punches = from_slots(row)
+            derived = summarize(row.punches)
+            row.first_in, row.last_out = derived['first_in'], derived['last_out']
+            changed.append(row)
+            if len(changed) >= 5000:
+                model.objects.bulk_update(changed, ['punches', 'first_in', 'last_out'])
+                changed = []
+        if changed:
+            model.objects.bulk_update(changed, ['punches', 'first_in', 'last_out'])
+
+
+def punches_to_slots(apps, schema_editor):
+    # Only the first ten pairs fit the old columns
+    for model_name, totals in (('ManDaysAttendance', True), ('ManDaysMissedPunchAttendance', False)):
+        model = apps.get_model('resource', model_name)
+        for row in model.objects.iterator(chunk_size=5000):
+            values = to_slots(row.punches, totals=totals)
+            model.objects.filter(pk=row.pk).update(**values)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resource', '0012_openattendancesession'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mandaysattendance',
+            name='first_in',
+            field=models.TimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='mandaysattendance',
+            name='last_out',
+            field=models.TimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='mandaysattendance',
+            name='punches',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='mandaysmissedpunchattendance',
+            name='first_in',
+            field=models.TimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='mandaysmissedpunchattendance',
+            name='last_out',
+            field=models.TimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='mandaysmissedpunchattendance',
+            name='punches',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.RunPython(slots_to_punches, punches_to_slots),
+        migrations.RemoveField(
+            model_name='mandaysattendance',
+            name='duty_in_1',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysattendance',
+            name='duty_in_10',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysattendance',
+            name='duty_in_2',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysattendance',
+            name='duty_in_3',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysattendance',
+            name='duty_in_4',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysattendance',
+            name='duty_in_5',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysattendance',
+            name='duty_in_6',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysattendance',
+            name='duty_in_7',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysattendance',
+            name='duty_in_8',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysattendance',
+            name='duty_in_9',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysattendance',
+            name='duty_out_1',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysattendance',
+            name='duty_out_10',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysattendance',
+            name='duty_out_2',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysattendance',
+            name='duty_out_3',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysattendance',
+            name='duty_out_4',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysattendance',
+            name='duty_out_5',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysattendance',
+            name='duty_out_6',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysattendance',
+            name='duty_out_7',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysattendance',
+            name='duty_out_8',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysattendance',
+            name='duty_out_9',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysattendance',
+            name='total_time_1',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysattendance',
+            name='total_time_10',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysattendance',
+            name='total_time_2',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysattendance',
+            name='total_time_3',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysattendance',
+            name='total_time_4',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysattendance',
+            name='total_time_5',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysattendance',
+            name='total_time_6',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysattendance',
+            name='total_time_7',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysattendance',
+            name='total_time_8',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysattendance',
+            name='total_time_9',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysmissedpunchattendance',
+            name='duty_in_1',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysmissedpunchattendance',
+            name='duty_in_10',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysmissedpunchattendance',
+            name='duty_in_2',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysmissedpunchattendance',
+            name='duty_in_3',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysmissedpunchattendance',
+            name='duty_in_4',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysmissedpunchattendance',
+            name='duty_in_5',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysmissedpunchattendance',
+            name='duty_in_6',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysmissedpunchattendance',
+            name='duty_in_7',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysmissedpunchattendance',
+            name='duty_in_8',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysmissedpunchattendance',
+            name='duty_in_9',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysmissedpunchattendance',
+            name='duty_out_1',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysmissedpunchattendance',
+            name='duty_out_10',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysmissedpunchattendance',
+            name='duty_out_2',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysmissedpunchattendance',
+            name='duty_out_3',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysmissedpunchattendance',
+            name='duty_out_4',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysmissedpunchattendance',
+            name='duty_out_5',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysmissedpunchattendance',
+            name='duty_out_6',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysmissedpunchattendance',
+            name='duty_out_7',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysmissedpunchattendance',
+            name='duty_out_8',
+        ),
+        migrations.RemoveField(
+            model_name='mandaysmissedpunchattendance',
+            name='duty_out_9',
+        ),
+    ]
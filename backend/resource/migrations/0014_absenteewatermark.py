@@ -0,0 +1,23 @@
+# Generated by Django 5.0.7 on 2026-10-18 17:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resource', '0013_mandays_punch_pairs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AbsenteeWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('opened_through', models.DateField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'absentee_watermark',
+            },
+        ),
+    ]
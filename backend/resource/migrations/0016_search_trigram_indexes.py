@@ -0,0 +1,33 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+# Trigram indexes on the expression Django's icontains compiles to on PostgreSQL,
+# UPPER(column::text), so the search boxes use an index scan instead of a
+# sequential one. They are kept out of Employee.Meta because they are
+# PostgreSQL-only; see resource.search.
+SEARCH_COLUMNS = ('employee_id', 'employee_name', 'device_enroll_id', 'email')
+
+
+def create_index(column):
+    return (
+        f'CREATE INDEX IF NOT EXISTS idx_employee_{column}_trgm '
+        f'ON employee USING gin (UPPER({column}::text) gin_trgm_ops);'
+    )
+
+
+def drop_index(column):
+    return f'DROP INDEX IF EXISTS idx_employee_{column}_trgm;'
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resource', '0015_absencecorrectionwatermark'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+    ] + [
+        migrations.RunSQL(create_index(column), drop_index(column))
+        for column in SEARCH_COLUMNS
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.0.7 on 2026-10-18 17:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resource', '0016_search_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['logdate', 'id'], name='idx_logdate_id'),
+        ),
+        migrations.AddIndex(
+            model_name='logs',
+            index=models.Index(fields=['log_datetime', 'id'], name='logs_logdt_id'),
+        ),
+    ]
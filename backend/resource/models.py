@@ -242,6 +242,7 @@ class Logs(models.Model):
         indexes = [
             models.Index(fields=['employeeid', 'log_datetime'], name='logs_emp_logdt'), # Composite index
             models.Index(fields=['log_datetime'], name='logs_logdt'),
+            models.Index(fields=['log_datetime', 'id'], name='logs_logdt_id'),  # Keyset pagination
             models.Index(fields=['direction'], name='logs_dir'),  
         ]        
          
@@ -257,6 +258,20 @@ class LastLogIdMandays(models.Model):
     class Meta:
         db_table = 'last_log_id_mandays'
 
+class AbsenteeWatermark(models.Model):
+    # Last date the absentees command has opened Attendance rows for
+    opened_through = models.DateField(blank=True, null=True)
+
+    class Meta:
+        db_table = 'absentee_watermark'
+
+class AbsenceCorrectionWatermark(models.Model):
+    # Last date the absence_correction command has checked sandwich patterns up to
+    processed_through = models.DateField(blank=True, null=True)
+
+    class Meta:
+        db_table = 'absence_correction_watermark'
+
 class Attendance(models.Model):
     employeeid = models.ForeignKey(Employee, on_delete=models.SET_NULL, blank=True, null=True)
     logdate = models.DateField()
@@ -277,6 +292,7 @@ class Attendance(models.Model):
         indexes = [
             models.Index(fields=['logdate'], name='idx_logdate'),  # Single index on logdate
             models.Index(fields=['employeeid', 'logdate'], name='idx_employeeid_logdate'),  # Composite index
+            models.Index(fields=['logdate', 'id'], name='idx_logdate_id'),  # Keyset pagination
         ]
     
     # def save(self, *args, **kwargs):
@@ -321,36 +337,10 @@ class ManDaysAttendance(models.Model):
     shift = models.CharField(max_length=50, blank=True, null=True)
     shift_status = models.CharField(max_length=50, blank=True, null=True)
     logdate = models.DateField()
-    duty_in_1 = models.TimeField(blank=True, null=True)
-    duty_out_1 = models.TimeField(blank=True, null=True)
-    total_time_1 = models.DurationField(blank=True, null=True)
-    duty_in_2 = models.TimeField(blank=True, null=True)
-    duty_out_2 = models.TimeField(blank=True, null=True)
-    total_time_2 = models.DurationField(blank=True, null=True)
-    duty_in_3 = models.TimeField(blank=True, null=True)
-    duty_out_3 = models.TimeField(blank=True, null=True)
-    total_time_3 = models.DurationField(blank=True, null=True)
-    duty_in_4 = models.TimeField(blank=True, null=True)
-    duty_out_4 = models.TimeField(blank=True, null=True)
-    total_time_4 = models.DurationField(blank=True, null=True)
-    duty_in_5 = models.TimeField(blank=True, null=True)
-    duty_out_5 = models.TimeField(blank=True, null=True)
-    total_time_5 = models.DurationField(blank=True, null=True)
-    duty_in_6 = models.TimeField(blank=True, null=True)
-    duty_out_6 = models.TimeField(blank=True, null=True)
-    total_time_6 = models.DurationField(blank=True, null=True)
-    duty_in_7 = models.TimeField(blank=True, null=True)
-    duty_out_7 = models.TimeField(blank=True, null=True)
-    total_time_7 = models.DurationField(blank=True, null=True)
-    duty_in_8 = models.TimeField(blank=True, null=True)
-    duty_out_8 = models.TimeField(blank=True, null=True)
-    total_time_8 = models.DurationField(blank=True, null=True)
-    duty_in_9 = models.TimeField(blank=True, null=True)
-    duty_out_9 = models.TimeField(blank=True, null=True)
-    total_time_9 = models.DurationField(blank=True, null=True)
-    duty_in_10 = models.TimeField(blank=True, null=True)
-    duty_out_10 = models.TimeField(blank=True, null=True)
-    total_time_10 = models.DurationField(blank=True, null=True)
+    # [in, out] pairs as seconds since midnight of logdate, see resource.punch_pairs
+    punches = models.JSONField(default=list, blank=True)
+    first_in = models.TimeField(blank=True, null=True)
+    last_out = models.TimeField(blank=True, null=True)
     total_hours_worked = models.DurationField(blank=True, null=True)
 
     class Meta:
@@ -362,26 +352,10 @@ class ManDaysMissedPunchAttendance(models.Model):
     shift = models.CharField(max_length=50, blank=True, null=True)
     shift_status = models.CharField(max_length=50, blank=True, null=True)
     logdate = models.DateField()
-    duty_in_1 = models.TimeField(blank=True, null=True)
-    duty_out_1 = models.TimeField(blank=True, null=True)
-    duty_in_2 = models.TimeField(blank=True, null=True)
-    duty_out_2 = models.TimeField(blank=True, null=True)
-    duty_in_3 = models.TimeField(blank=True, null=True)
-    duty_out_3 = models.TimeField(blank=True, null=True)
-    duty_in_4 = models.TimeField(blank=True, null=True)
-    duty_out_4 = models.TimeField(blank=True, null=True)
-    duty_in_5 = models.TimeField(blank=True, null=True)
-    duty_out_5 = models.TimeField(blank=True, null=True)
-    duty_in_6 = models.TimeField(blank=True, null=True)
-    duty_out_6 = models.TimeField(blank=True, null=True)
-    duty_in_7 = models.TimeField(blank=True, null=True)
-    duty_out_7 = models.TimeField(blank=True, null=True)
-    duty_in_8 = models.TimeField(blank=True, null=True)
-    duty_out_8 = models.TimeField(blank=True, null=True)
-    duty_in_9 = models.TimeField(blank=True, null=True)
-    duty_out_9 = models.TimeField(blank=True, null=True)
-    duty_in_10 = models.TimeField(blank=True, null=True)
-    duty_out_10 = models.TimeField(blank=True, null=True)
+    # [in, out] pairs as seconds since midnight of logdate, see resource.punch_pairs
+    punches = models.JSONField(default=list, blank=True)
+    first_in = models.TimeField(blank=True, null=True)
+    last_out = models.TimeField(blank=True, null=True)
 
     class Meta:
         db_table = 'mandays_missed_punch_attendance'
@@ -414,4 +388,95 @@ class HolidayList(models.Model):
             models.Index(fields=['holiday_name'], name='idx_holiday_name'),  # Single index on holiday_name
             models.Index(fields=['holiday_type'], name='idx_holiday_type'),  # Single index on holiday_type
             models.Index(fields=['holiday_date', 'holiday_name'], name='idx_holiday_date_name'),  # Composite index
-        ]
\ No newline at end of file
+        ]
+class ExportJob(models.Model):
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    )
+
+    report_type = models.CharField(max_length=50)
+    month = models.IntegerField()
+    year = models.IntegerField()
+    filters = models.JSONField(default=dict, blank=True)
+    cache_key = models.CharField(max_length=64)
+    data_version = models.CharField(max_length=64)
+    status = models.CharField(choices=STATUS_CHOICES, default='pending', max_length=10)
+    file_path = models.CharField(max_length=255, blank=True, null=True)
+    file_name = models.CharField(max_length=255, blank=True, null=True)
+    error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        db_table = 'export_job'
+        indexes = [
+            models.Index(fields=['cache_key', 'status'], name='idx_export_job_key_status'),
+        ]
+
+class MonthlyAttendanceSummary(models.Model):
+    """
+    One row per employee per month, kept in step with Attendance by
+    resource.monthly_summary so the monthly reports don't have to re-read and
+    re-total every day of the month.
+    """
+    employeeid = models.ForeignKey(Employee, on_delete=models.CASCADE)
+    year = models.IntegerField()
+    month = models.IntegerField()
+
+    present_count = models.IntegerField(default=0)
+    absent_count = models.IntegerField(default=0)
+    half_day_count = models.IntegerField(default=0)
+    week_off_count = models.IntegerField(default=0)
+    week_off_worked_count = models.IntegerField(default=0)
+    missed_punch_count = models.IntegerField(default=0)
+    holiday_count = models.IntegerField(default=0)
+    in_house_count = models.IntegerField(default=0)
+
+    total_time_seconds = models.IntegerField(default=0)
+    late_entry_seconds = models.IntegerField(default=0)
+    early_exit_seconds = models.IntegerField(default=0)
+    overtime_seconds = models.IntegerField(default=0)
+
+    # Per-day values, one entry per day of the month
+    day_statuses = models.TextField(default='', blank=True)  # comma separated shift_status codes
+    day_shifts = models.TextField(default='', blank=True)  # comma separated shift codes
+    day_late_entry = models.JSONField(default=list, blank=True)  # seconds
+    day_early_exit = models.JSONField(default=list, blank=True)  # seconds
+    day_overtime = models.JSONField(default=list, blank=True)  # seconds
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['employeeid', 'year', 'month']
+        db_table = 'monthly_attendance_summary'
+        indexes = [
+            models.Index(fields=['year', 'month'], name='idx_summary_year_month'),
+        ]
+
+    @property
+    def statuses(self):
+        return self.day_statuses.split(',') if self.day_statuses else []
+
+    @property
+    def shifts(self):
+        return self.day_shifts.split(',') if self.day_shifts else []
+
+class OpenAttendanceSession(models.Model):
+    """
+    The latest Attendance row with an IN punch for each employee, kept by
+    resource.open_sessions so the attendance processor can pair OUT punches,
+    including night shifts that end the next day, without looking the row up.
+    """
+    employeeid = models.OneToOneField(Employee, on_delete=models.CASCADE, primary_key=True)
+    attendance = models.ForeignKey(Attendance, on_delete=models.CASCADE)
+    logdate = models.DateField()
+    first_logtime = models.TimeField()
+    last_logtime = models.TimeField(blank=True, null=True)
+    shift = models.CharField(max_length=50, blank=True, null=True)
+
+    class Meta:
+        db_table = 'open_attendance_session'
@@ -0,0 +1,157 @@
+import logging
+import threading
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from resource import daily_metrics
+from resource.attendance_matrix import build_attendance_matrix
+from resource.models import Attendance, MonthlyAttendanceSummary
+
+logger = logging.getLogger(__name__)
+
+# shift_status code -> counter column on MonthlyAttendanceSummary
+STATUS_COUNTERS = {
+    'P': 'present_count',
+    'A': 'absent_count',
+    'HD': 'half_day_count',
+    'WO': 'week_off_count',
+    'WW': 'week_off_worked_count',
+    'MP': 'missed_punch_count',
+    'PH': 'holiday_count',
+    'FH': 'holiday_count',
+    'IH': 'in_house_count',
+}
+
+DURATION_SUMS = {
+    'total_time': 'total_time_seconds',
+    'late_entry': 'late_entry_seconds',
+    'early_exit': 'early_exit_seconds',
+    'overtime': 'overtime_seconds',
+}
+
+UPDATE_FIELDS = sorted(set(STATUS_COUNTERS.values())) + list(DURATION_SUMS.values()) + [
+    'day_statuses', 'day_shifts', 'day_late_entry', 'day_early_exit', 'day_overtime', 'updated_at',
+]
+
+BATCH_SIZE = 1000
+
+# Employee/month keys touched in this thread that still need their summary refreshed,
+# and the logdates whose dashboard counts are stale
+_pending = threading.local()
+
+
+def build_summary(employee_id, year, month, attendance_month):
+    """Build an unsaved summary from one employee's AttendanceMonth."""
+    summary = MonthlyAttendanceSummary(employeeid_id=employee_id, year=year, month=month)
+
+    for status in attendance_month.statuses:
+        if status in STATUS_COUNTERS:
+            counter = STATUS_COUNTERS[status]
+            setattr(summary, counter, getattr(summary, counter) + 1)
+    for field, column in DURATION_SUMS.items():
+        setattr(summary, column, attendance_month.total_seconds(field))
+
+    summary.day_statuses = ','.join(attendance_month.statuses)
+    summary.day_shifts = ','.join(attendance_month.shifts)
+    summary.day_late_entry = attendance_month.seconds('late_entry')
+    summary.day_early_exit = attendance_month.seconds('early_exit')
+    summary.day_overtime = attendance_month.seconds('overtime')
+    return summary
+
+
+def refresh_monthly_summaries(keys):
+    """
+    Recompute the summaries for the given (employee pk, year, month) keys from
+    Attendance. Only the touched employee-months are read and written; a key
+    whose month no longer has attendance rows has its summary removed.
+    """
+    by_month = defaultdict(set)
+    for employee_id, year, month in keys:
+        if employee_id is not None:
+            by_month[(year, month)].add(employee_id)
+
+    for (year, month), employee_ids in by_month.items():
+        employee_ids = sorted(employee_ids)
+        for start in range(0, len(employee_ids), BATCH_SIZE):
+            _refresh_month(year, month, employee_ids[start:start + BATCH_SIZE])
+
+
+def _refresh_month(year, month, employee_ids):
+    rows = Attendance.objects.filter(
+        employeeid_id__in=employee_ids, logdate__year=year, logdate__month=month
+    ).values('employeeid_id', 'logdate', 'shift', 'shift_status', *DURATION_SUMS)
+    matrix = build_attendance_matrix(rows, year, month)
+
+    summaries = [build_summary(employee_id, year, month, attendance_month) for employee_id, attendance_month in matrix.items()]
+    if summaries:
+        MonthlyAttendanceSummary.objects.bulk_create(
+            summaries,
+            update_conflicts=True,
+            unique_fields=['employeeid', 'year', 'month'],
+            update_fields=UPDATE_FIELDS,
+        )
+
+    empty = [employee_id for employee_id in employee_ids if employee_id not in matrix]
+    if empty:
+        MonthlyAttendanceSummary.objects.filter(employeeid_id__in=empty, year=year, month=month).delete()
+
+
+def rebuild_month(year, month):
+    """Rebuild every summary for a month from scratch."""
+    employee_ids = list(
+        Attendance.objects.filter(logdate__year=year, logdate__month=month, employeeid__isnull=False)
+        .values_list('employeeid_id', flat=True).distinct()
+    )
+    with transaction.atomic():
+        MonthlyAttendanceSummary.objects.filter(year=year, month=month).exclude(employeeid_id__in=employee_ids).delete()
+        refresh_monthly_summaries((employee_id, year, month) for employee_id in employee_ids)
+    return len(employee_ids)
+
+
+def ensure_month(year, month):
+    """Build a month's summaries on first use, e.g. for months written before the table existed."""
+    if MonthlyAttendanceSummary.objects.filter(year=year, month=month).exists():
+        return
+    if Attendance.objects.filter(logdate__year=year, logdate__month=month).exists():
+        rebuild_month(year, month)
+
+
+def queue_summary_refresh(employee_id, logdate):
+    """
+    Mark an employee-day as changed. The refresh runs when the surrounding
+    transaction commits, so a processor run that touches the same month many
+    times recomputes each employee-month once. The cached dashboard counts for
+    the day are dropped at the same time.
+    """
+    if employee_id is None or logdate is None:
+        return
+    keys = getattr(_pending, 'keys', None)
+    if keys is None:
+        keys = _pending.keys = set()
+        _pending.logdates = set()
+    keys.add((employee_id, logdate.year, logdate.month))
+    _pending.logdates.add(logdate)
+    transaction.on_commit(flush_pending)
+
+
+def flush_pending():
+    keys = getattr(_pending, 'keys', None)
+    if not keys:
+        return
+    logdates = _pending.logdates
+    _pending.keys = set()
+    _pending.logdates = set()
+    daily_metrics.invalidate(logdates)
+    try:
+        refresh_monthly_summaries(keys)
+    except Exception as e:
+        logger.error(f"Error refreshing monthly attendance summaries: {e}")
+
+
+@receiver(post_save, sender=Attendance)
+@receiver(post_delete, sender=Attendance)
+def attendance_changed(sender, instance, **kwargs):
+    queue_summary_refresh(instance.employeeid_id, instance.logdate)
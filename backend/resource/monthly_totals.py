@@ -0,0 +1,124 @@
+from calendar import monthrange
+
+import numpy as np
+
+from resource.models import MonthlyAttendanceSummary
+
+COUNTER_FIELDS = (
+    'present_count', 'absent_count', 'half_day_count', 'week_off_count',
+    'week_off_worked_count', 'missed_punch_count', 'holiday_count', 'in_house_count',
+)
+SECONDS_FIELDS = ('total_time_seconds', 'late_entry_seconds', 'early_exit_seconds', 'overtime_seconds')
+DAY_FIELDS = ('day_late_entry', 'day_early_exit', 'day_overtime')
+
+
+def format_seconds(seconds):
+    """Format whole seconds as H:MM:SS with hours running past 24, or None for zero."""
+    seconds = int(seconds)
+    if not seconds:
+        return None
+    return f"{seconds // 3600}:{(seconds % 3600) // 60:02d}:{seconds % 60:02d}"
+
+
+def format_day_seconds(seconds):
+    """Format a single day's duration, blank when there is none."""
+    return format_seconds(seconds) or ""
+
+
+def round_seconds(seconds, interval, direction):
+    """
+    Round an array of durations in seconds to the overtime round-off interval.
+    direction is 'nearest', 'up' or anything else for down, as in OvertimeRoundoffRules.
+    """
+    seconds = np.asarray(seconds, dtype=np.int64)
+    if interval <= 0:
+        return seconds
+    remainder = seconds % interval
+    direction = direction.lower()
+    if direction == 'nearest':
+        return np.where(remainder >= interval / 2, seconds + (interval - remainder), seconds - remainder)
+    if direction == 'up':
+        return np.where(remainder > 0, seconds + (interval - remainder), seconds)
+    return seconds - remainder
+
+
+class MonthlyTotals:
+    """
+    Columnar view of one month of MonthlyAttendanceSummary rows.
+
+    Every counter and duration column is loaded with a single values_list()
+    into an integer NumPy array, one entry per employee, and the derived
+    report columns (present/absent/paid/working days) and grand totals are
+    computed on whole arrays. Durations stay as integer seconds; callers format
+    them with format_seconds() only when a cell is written.
+    """
+
+    def __init__(self, year, month):
+        self.year = year
+        self.month = month
+        self.num_days = monthrange(year, month)[1]
+
+        rows = list(
+            MonthlyAttendanceSummary.objects.filter(year=year, month=month)
+            .values_list('employeeid_id', 'day_statuses', 'day_shifts', *COUNTER_FIELDS, *SECONDS_FIELDS)
+        )
+        self.employee_ids = [row[0] for row in rows]
+        self.index = {employee_id: i for i, employee_id in enumerate(self.employee_ids)}
+        self._day_statuses = [row[1] for row in rows]
+        self._day_shifts = [row[2] for row in rows]
+
+        fields = COUNTER_FIELDS + SECONDS_FIELDS
+        matrix = np.array([row[3:] for row in rows], dtype=np.int64).reshape(len(rows), len(fields))
+        self.columns = {field: matrix[:, i] for i, field in enumerate(fields)}
+        self._day_columns = {}
+        self._add_derived_columns()
+
+    def _add_derived_columns(self):
+        c = self.columns
+        half_days = c['half_day_count'] * 0.5
+
+        c['present_days'] = c['present_count'] + half_days + c['in_house_count']
+        c['present_days_with_ww'] = c['present_days'] + c['week_off_worked_count']
+        c['absent_days'] = c['absent_count'] + half_days
+        c['absent_days_with_mp'] = c['absent_days'] + c['missed_punch_count']
+        c['week_offs'] = c['week_off_count'] + c['week_off_worked_count']
+        c['working_days'] = self.num_days - c['week_offs']
+        c['paid_days'] = c['present_days'] + c['week_offs']
+
+    def __len__(self):
+        return len(self.employee_ids)
+
+    def __contains__(self, employee_id):
+        return employee_id in self.index
+
+    def value(self, column, employee_id):
+        """One employee's value of a column as a plain Python number."""
+        return self.columns[column][self.index[employee_id]].item()
+
+    def grand(self, column):
+        """Sum of a column over every employee in the month."""
+        return self.columns[column].sum().item()
+
+    def statuses(self, employee_id):
+        packed = self._day_statuses[self.index[employee_id]]
+        return packed.split(',') if packed else [''] * self.num_days
+
+    def shifts(self, employee_id):
+        packed = self._day_shifts[self.index[employee_id]]
+        return packed.split(',') if packed else [''] * self.num_days
+
+    def day_seconds(self, field):
+        """
+        Per-day durations (day_overtime, day_late_entry or day_early_exit) as an
+        employees x days integer matrix, loaded on first use.
+        """
+        if field not in self._day_columns:
+            values = dict(
+                MonthlyAttendanceSummary.objects.filter(year=self.year, month=self.month).values_list('employeeid_id', field)
+            )
+            matrix = np.zeros((len(self.employee_ids), self.num_days), dtype=np.int64)
+            for i, employee_id in enumerate(self.employee_ids):
+                days = values.get(employee_id) or []
+                matrix[i, :len(days)] = days
+            self._day_columns[field] = matrix
+        return self._day_columns[field]
@@ -0,0 +1,221 @@
+import copy
+import threading
+import weakref
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.db.models import Exists, OuterRef
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from resource.models import Attendance, OpenAttendanceSession
+
+# Attendance columns an OUT punch needs to pair with its IN
+SESSION_FIELDS = ('logdate', 'first_logtime', 'last_logtime', 'shift')
+
+# How far back a cold start looks for open INs
+COLD_START_WINDOW = timedelta(hours=48)
+
+# Every store alive in this process, kept in step by the Attendance signal receivers
+_stores = weakref.WeakSet()
+
+# The store whose processor run is writing Attendance in this thread
+_local = threading.local()
+
+
+class OpenSessionStore:
+    """
+    employee pk -> the employee's latest Attendance row with an IN punch.
+
+    The attendance processor records every row it saves with an IN, so an OUT
+    punch for the same day or the day after pairs with its row from memory,
+    without a query. Changes are written to the compact open_attendance_session
+    table. load() reads the sessions of a run's employees back in one query,
+    joined to their Attendance rows, so each run starts from the rows as they
+    are; when the table is empty it is rebuilt from the last 48 hours of
+    Attendance. An employee outside the loaded set is read on first use.
+
+    The table is checked when it is loaded rather than kept clean on every
+    write: a session whose row lost its IN, or that a later row with an IN has
+    superseded, is ignored and the processor falls back to its lookups.
+    During a run, Attendance saves and deletes are followed through signals:
+    writes made inside writing() update the session, and any other write in
+    this process (an edit in the UI, another processor) drops the employee's
+    session. Writes from other processes are seen from the next run on.
+    """
+
+    def __init__(self):
+        self.sessions = {}
+        self.known = set()
+        self.dirty = set()
+        self.loaded = False
+        _stores.add(self)
+
+    def load(self, employee_pks=None):
+        """
+        Read the stored sessions with their rows in one query, for employee_pks
+        or for every employee. Employees without a usable session are known to
+        have none, so they cost no further queries either.
+        """
+        self.clear()
+        self.loaded = employee_pks is None
+        self._read(employee_pks)
+        if not self.sessions and not OpenAttendanceSession.objects.exists():
+            self.rebuild()
+        if employee_pks is not None:
+            self.known.update(employee_pks)
+
+    def clear(self):
+        """Forget everything in memory, e.g. after a rolled back chunk; sessions are read again on use."""
+        self.sessions = {}
+        self.known = set()
+        self.dirty = set()
+        self.loaded = False
+
+    @contextmanager
+    def writing(self):
+        """Attendance written in this thread inside the block is recorded as this store's own."""
+        previous = getattr(_local, 'writer', None)
+        _local.writer = self
+        try:
+            yield self
+        finally:
+            _local.writer = previous
+
+    def rebuild(self):
+        """Open a session for the latest IN of every employee punched in the last 48 hours."""
+        since = (timezone.localtime() - COLD_START_WINDOW).date()
+        rows = Attendance.objects.filter(
+            logdate__gte=since, first_logtime__isnull=False, employeeid__isnull=False
+        ).order_by('logdate')
+        for row in rows.iterator(chunk_size=10000):
+            self.record(row)
+        self.flush()
+
+    def _read(self, employee_pks):
+        superseded = Attendance.objects.filter(
+            employeeid_id=OuterRef('employeeid_id'), logdate__gt=OuterRef('attendance__logdate'), first_logtime__isnull=False
+        )
+        sessions = OpenAttendanceSession.objects.select_related('attendance').annotate(superseded=Exists(superseded))
+        if employee_pks is not None:
+            sessions = sessions.filter(employeeid_id__in=list(employee_pks))
+        for session in sessions:
+            attendance = session.attendance
+            self.known.add(session.employeeid_id)
+            if session.superseded or attendance.first_logtime is None:
+                continue
+            # The row is the truth: follow it if it was edited since the session was stored
+            self.sessions[session.employeeid_id] = session
+            values = {field: getattr(attendance, field) for field in SESSION_FIELDS}
+            if any(getattr(session, field) != value for field, value in values.items()):
+                for field, value in values.items():
+                    setattr(session, field, value)
+                self.dirty.add(session.employeeid_id)
+
+    def get(self, employee_pk):
+        session = self.sessions.get(employee_pk)
+        if session is not None or self.loaded or employee_pk in self.known:
+            return session
+        self._read([employee_pk])
+        self.known.add(employee_pk)
+        return self.sessions.get(employee_pk)
+
+    def find(self, employee_pk, logdates):
+        """
+        A copy of the open row for one of logdates, from memory, so a handler
+        that fails half way leaves the session as it was. None when the
+        employee has no open row on those days; the caller then looks it up.
+        """
+        session = self.get(employee_pk)
+        if session is None or session.logdate not in logdates:
+            return None
+        return copy.copy(session.attendance)
+
+    def forget(self, employee_pk):
+        """Drop an employee's session from memory; until the next one is recorded, find() returns None."""
+        self.sessions.pop(employee_pk, None)
+        self.dirty.discard(employee_pk)
+        self.known.add(employee_pk)
+
+    def record(self, attendance):
+        """Keep the session in step with a saved Attendance row."""
+        employee_pk = attendance.employeeid_id
+        if employee_pk is None or attendance.pk is None:
+            return
+        if attendance.first_logtime is None:
+            session = self.sessions.get(employee_pk)
+            if session is not None and session.attendance_id == attendance.pk:
+                self.forget(employee_pk)
+            return
+        session = self.sessions.get(employee_pk)
+        if session is not None and session.logdate > attendance.logdate:
+            return
+        if session is None:
+            session = self.sessions[employee_pk] = OpenAttendanceSession(employeeid_id=employee_pk)
+            self.known.add(employee_pk)
+
+        values = {'attendance_id': attendance.pk}
+        values.update((field, getattr(attendance, field)) for field in SESSION_FIELDS)
+        if any(getattr(session, field) != value for field, value in values.items()):
+            for field, value in values.items():
+                setattr(session, field, value)
+            self.dirty.add(employee_pk)
+        session.attendance = copy.copy(attendance)
+
+    def flush(self):
+        """
+        Upsert the changed sessions and return how many were written. Sessions
+        whose row is gone, e.g. rolled back with a failed log, are dropped instead.
+        """
+        if not self.dirty:
+            return 0
+        changed = [self.sessions[employee_pk] for employee_pk in self.dirty]
+        existing = set(
+            Attendance.objects.filter(pk__in=[session.attendance_id for session in changed], first_logtime__isnull=False)
+            .values_list('pk', flat=True)
+        )
+        for session in changed:
+            if session.attendance_id not in existing:
+                self.forget(session.employeeid_id)
+        changed = [session for session in changed if session.attendance_id in existing]
+        self.dirty.clear()
+        if not changed:
+            return 0
+        OpenAttendanceSession.objects.bulk_create(
+            changed,
+            batch_size=5000,
+            update_conflicts=True,
+            unique_fields=['employeeid'],
+            update_fields=['attendance', *SESSION_FIELDS],
+        )
+        return len(changed)
+
+
+def attendance_written(instance, deleted=False):
+    """
+    Follow an Attendance save or delete. The store running in this thread records
+    its own writes and every other store drops the employee's session. The stored
+    table is left alone: load() checks it against the rows.
+    """
+    employee_pk = instance.employeeid_id
+    if employee_pk is None:
+        return
+    writer = getattr(_local, 'writer', None)
+    for store in list(_stores):
+        if store is not writer:
+            store.forget(employee_pk)
+        elif not deleted:
+            store.record(instance)
+        elif employee_pk in store.sessions and store.sessions[employee_pk].attendance_id == instance.pk:
+            store.forget(employee_pk)
+
+
+@receiver(post_save, sender=Attendance)
+def attendance_saved(sender, instance, **kwargs):
+    attendance_written(instance)
+
+
+@receiver(post_delete, sender=Attendance)
+def attendance_deleted(sender, instance, **kwargs):
+    attendance_written(instance, deleted=True)
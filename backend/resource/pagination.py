@@ -0,0 +1,307 @@
+import base64
+import binascii
+import hashlib
+import json
+from functools import partial
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import connections
+from django.db.models import F, Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset pagination on (field, id) with opaque cursors.
+
+    Pages are read with WHERE (field, id) beyond the cursor ... LIMIT n, so a
+    deep page costs the same as the first one and no COUNT(*) is run. The
+    direction follows the queryset's ordering on field (descending unless it
+    is ordered ascending); rows with a NULL field sort first when descending
+    and last when ascending, as PostgreSQL does.
+
+    Opt in with ?pagination=cursor (or any ?cursor=); the response has next and
+    previous links instead of a count.
+    """
+    cursor_query_param = 'cursor'
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self, field):
+        self.field = field
+
+    @classmethod
+    def requested(cls, request):
+        return request.query_params.get('pagination') == 'cursor' or cls.cursor_query_param in request.query_params
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.pk_name = queryset.model._meta.pk.attname
+        self.model_field = queryset.model._meta.get_field(self.field)
+
+        ordering = queryset.query.order_by
+        self.descending = not (ordering and ordering[0] == self.field)
+
+        cursor = self.decode_cursor(request)
+        if cursor is None:
+            value, pk, reverse = None, None, False
+        else:
+            value, pk, reverse = cursor
+
+        # A previous-page cursor reads backwards from its position
+        descending = self.descending != reverse
+        queryset = queryset.order_by(*self.ordering(descending))
+        if pk is not None:
+            queryset = queryset.filter(self.after(value, pk, descending))
+
+        rows = list(queryset[:self.page_size + 1])
+        more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+            self.has_previous, self.has_next = more, True
+        else:
+            self.has_previous, self.has_next = cursor is not None, more
+        self.rows = rows
+        return rows
+
+    def ordering(self, descending):
+        if descending:
+            return F(self.field).desc(nulls_first=True), F(self.pk_name).desc()
+        return F(self.field).asc(nulls_last=True), F(self.pk_name).asc()
+
+    def after(self, value, pk, descending):
+        """Rows past (value, pk) in the given direction."""
+        lookup = 'lt' if descending else 'gt'
+        if value is None:
+            query = Q(**{f'{self.field}__isnull': True, f'{self.pk_name}__{lookup}': pk})
+            if descending:
+                query |= Q(**{f'{self.field}__isnull': False})
+            return query
+        query = Q(**{f'{self.field}__{lookup}': value}) | Q(**{self.field: value, f'{self.pk_name}__{lookup}': pk})
+        if not descending:
+            query |= Q(**{f'{self.field}__isnull': True})
+        return query
+
+    def row_position(self, row):
+        if isinstance(row, dict):
+            return row[self.field], row[self.pk_name]
+        return getattr(row, self.field), getattr(row, self.pk_name)
+
+    def encode_cursor(self, row, reverse):
+        value, pk = self.row_position(row)
+        payload = {'v': value.isoformat() if value is not None else None, 'id': pk, 'r': int(reverse)}
+        token = base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode()
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode()))
+            value = payload['v']
+            if value is not None:
+                value = self.model_field.to_python(value)
+            return value, int(payload['id']), bool(payload['r'])
+        except (TypeError, ValueError, KeyError, binascii.Error, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next or not self.rows:
+            return None
+        return self.encode_cursor(self.rows[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.rows:
+            return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        return self.encode_cursor(self.rows[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+
+class KeysetPaginationMixin:
+    """
+    Lets a list view switch from its pagination_class to KeysetPagination on
+    keyset_field when the request opts in.
+    """
+    keyset_field = None
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if self.keyset_field and KeysetPagination.requested(self.request):
+                self._paginator = KeysetPagination(self.keyset_field)
+            elif self.pagination_class is None:
+                self._paginator = None
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+
+class ReadAheadPage(Page):
+    """A page that knows whether another follows from the extra row read with it, not from num_pages."""
+
+    def __init__(self, object_list, number, paginator, more):
+        super().__init__(object_list, number, paginator)
+        self.more = more
+
+    def has_next(self):
+        return self.more
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that avoids running an exact COUNT(*) for every page.
+
+    Exact counts are cached per query (the filters as compiled to SQL) for
+    cache_timeout seconds. On a cache miss PostgreSQL's own estimate is used when
+    it is at least estimate_threshold rows: pg_class.reltuples for an unfiltered
+    table, the EXPLAIN row estimate otherwise. Smaller results are counted
+    exactly, which is cheap at that size. exact=True always counts, and refreshes
+    the cached value.
+
+    With an estimated count any page number is accepted and a page is only
+    rejected when it comes back empty. Each page reads one row more than it
+    shows and has a next page only when that row exists, so the next link
+    neither stops early on a low estimate nor leads past the end on a high one.
+    A cached count gets the same treatment; when the rows disagree with what it
+    predicts for the page, rows were added or removed since it was cached, and
+    the count is taken again.
+    """
+    estimate_threshold = 10000
+    cache_timeout = 60
+    cache_prefix = 'pagination-count'
+
+    def __init__(self, object_list, per_page, orphans=0, allow_empty_first_page=True, exact=False):
+        super().__init__(object_list, per_page, orphans, allow_empty_first_page)
+        self.exact = exact
+        self.estimated = False
+        self.cached = False
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list.order_by()
+        key = self.cache_key(queryset)
+        if not self.exact:
+            cached = cache.get(key)
+            if cached is not None:
+                self.cached = True
+                return cached
+            estimate = self.estimate(queryset)
+            if estimate is not None and estimate >= self.estimate_threshold:
+                self.estimated = True
+                return estimate
+
+        count = queryset.count()
+        cache.set(key, count, self.cache_timeout)
+        return count
+
+    def cache_key(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        digest = hashlib.md5(repr((queryset.db, sql, params)).encode()).hexdigest()
+        return f'{self.cache_prefix}:{queryset.model._meta.label_lower}:{digest}'
+
+    def estimate(self, queryset):
+        """The planner's row estimate for queryset, or None where there is none."""
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+        with connection.cursor() as cursor:
+            if not queryset.query.where and not queryset.query.distinct:
+                cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [queryset.model._meta.db_table])
+                row = cursor.fetchone()
+                # reltuples is -1 (0 before PostgreSQL 14) until the table is first analyzed
+                return row[0] if row and row[0] > 0 else None
+            sql, params = queryset.query.sql_with_params()
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+    def refresh_count(self):
+        """Replace a cached count with an exact one, and cache that."""
+        self.exact = True
+        self.cached = False
+        for name in ('count', 'num_pages'):
+            self.__dict__.pop(name, None)
+        return self.count
+
+    def validate_number(self, number):
+        count = self.count
+        if not (self.cached or self.estimated and count):
+            return super().validate_number(number)
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(self.error_messages['invalid_page'])
+        if number < 1:
+            raise EmptyPage(self.error_messages['min_page'])
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if not (self.cached or self.estimated):
+            return super().page(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        object_list = rows[:self.per_page]
+        if number > 1 and not object_list:
+            raise EmptyPage(self.error_messages['no_results'])
+        if self.cached and len(rows) != min(max(self.count - bottom, 0), self.per_page + 1):
+            self.refresh_count()
+        return ReadAheadPage(object_list, number, self, more=len(rows) > self.per_page)
+
+
+class EstimatedCountPagination(PageNumberPagination):
+    """
+    Page-number pagination whose count comes from EstimatedCountPaginator.
+    ?exact=true asks for a precise total; responses say whether the count is
+    an estimate in count_is_estimate.
+    """
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    exact_query_param = 'exact'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.exact_count = request.query_params.get(self.exact_query_param, '').lower() == 'true'
+        return super().paginate_queryset(queryset, request, view)
+
+    @property
+    def django_paginator_class(self):
+        return partial(EstimatedCountPaginator, exact=self.exact_count)
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        response.data['count_is_estimate'] = self.page.paginator.estimated
+        return response
+
+    def get_paginated_response_schema(self, schema):
+        schema = super().get_paginated_response_schema(schema)
+        schema['properties']['count_is_estimate'] = {'type': 'boolean'}
+        return schema
@@ -0,0 +1,232 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from config.models import AutoShift, Shift
+from resource.autoshift_index import AutoShiftIndex
+from resource.employee_roster import build_roster, roster_entries
+from resource.models import Employee
+
+logger = logging.getLogger(__name__)
+
+
+class EmployeeIndex(dict):
+    """
+    employee_id -> RosterEmployee. A lookup that misses falls back to one query, so
+    an employee added by another process is picked up without a full reload.
+    Unknown ids are remembered until the next Employee change. by_pk maps each
+    Employee primary key to its employee_id so a saved employee is found
+    without scanning the index.
+    """
+
+    def __init__(self, registry, shifts, *args):
+        super().__init__(*args)
+        self.registry = registry
+        self.shifts = shifts
+        self.unknown = set()
+        self.by_pk = {employee.pk: employee_id for employee_id, employee in self.items()}
+
+    def __setitem__(self, key, employee):
+        previous = super().get(key)
+        if previous is not None and previous.pk != employee.pk:
+            self.by_pk.pop(previous.pk, None)
+        super().__setitem__(key, employee)
+        self.by_pk[employee.pk] = key
+
+    def __delitem__(self, key):
+        employee = super().get(key)
+        super().__delitem__(key)
+        if employee is not None and self.by_pk.get(employee.pk) == key:
+            del self.by_pk[employee.pk]
+
+    def pop_pk(self, pk):
+        """Drop the entry for an Employee primary key, if it is indexed."""
+        employee_id = self.by_pk.get(pk)
+        if employee_id is not None:
+            del self[employee_id]
+
+    def get(self, key, default=None):
+        employee = super().get(key)
+        if employee is not None:
+            self.registry.stats['employee_hits'] += 1
+            return employee
+
+        # Misses write the index, so they run under the registry lock like the signal handlers
+        with self.registry._lock:
+            self.registry.stats['employee_misses'] += 1
+            if key is None or key in self.unknown:
+                return default
+            employee = super().get(key)
+            if employee is not None:
+                return employee
+            entries = roster_entries(self.shifts, employee_id=key)
+            if not entries:
+                self.unknown.add(key)
+                return default
+            self[key] = entries[0]
+            return entries[0]
+
+
+class ReferenceData:
+    """
+    The employee, shift and auto shift lookups an AttendanceProcessor works from.
+    """
+
+    def __init__(self, registry):
+        self.shifts = {shift.id: shift for shift in Shift.objects.all()}
+        self.employees = EmployeeIndex(registry, self.shifts, build_roster(self.shifts))
+        self.set_auto_shifts(list(AutoShift.objects.all()))
+
+    def set_auto_shifts(self, auto_shifts):
+        self.auto_shifts = auto_shifts
+        self.auto_shift_dict = {shift.name: shift for shift in auto_shifts}
+        self.auto_shift_index = AutoShiftIndex(auto_shifts)
+
+
+class ProcessorRegistry:
+    """
+    Process-wide source of AttendanceProcessor instances.
+
+    The reference data is loaded once and shared by every processor the
+    registry hands out. Saves and deletes of Employee, Shift and AutoShift in
+    this process patch it in place through signals; changes made by other
+    processes are picked up by employee lookups that miss, and by a full reload
+    once the data is older than PROCESSOR_REGISTRY_MAX_AGE seconds.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._data = None
+        self._loaded_at = 0.0
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'reloads': 0,
+            'updates': 0,
+            'employee_hits': 0,
+            'employee_misses': 0,
+            'last_load_seconds': 0.0,
+        }
+
+    @property
+    def max_age(self):
+        return getattr(settings, 'PROCESSOR_REGISTRY_MAX_AGE', 300)
+
+    def reference_data(self):
+        """Return the warm reference data, loading it first if it is cold or expired."""
+        with self._lock:
+            if self._data is not None and time.monotonic() - self._loaded_at < self.max_age:
+                self.stats['hits'] += 1
+                return self._data
+
+            self.stats['misses'] += 1
+            started = time.monotonic()
+            data = ReferenceData(self)
+            self._loaded_at = time.monotonic()
+            if self._data is not None:
+                self.stats['reloads'] += 1
+            self._data = data
+            self.stats['last_load_seconds'] = round(self._loaded_at - started, 4)
+            return data
+
+    def get_processor(self, processor_class):
+        """Build a processor_class instance that works from the shared reference data."""
+        return processor_class(reference_data=self.reference_data())
+
+    def invalidate(self):
+        with self._lock:
+            self._data = None
+
+    def metrics(self):
+        with self._lock:
+            metrics = dict(self.stats)
+            metrics['warm'] = self._data is not None
+            metrics['age_seconds'] = round(time.monotonic() - self._loaded_at, 1) if self._data is not None else None
+            if self._data is not None:
+                metrics['employees'] = len(self._data.employees)
+                metrics['shifts'] = len(self._data.shifts)
+                metrics['auto_shifts'] = len(self._data.auto_shifts)
+            return metrics
+
+    def employee_changed(self, employee, deleted=False):
+        with self._lock:
+            data = self._data
+            if data is None:
+                return
+            # The employee_id may have been edited, so drop the entry by primary key
+            data.employees.pop_pk(employee.pk)
+            data.employees.unknown.clear()
+            if not deleted:
+                for entry in roster_entries(data.shifts, pk=employee.pk):
+                    data.employees[entry.employee_id] = entry
+            self.stats['updates'] += 1
+
+    def shift_changed(self, shift, deleted=False):
+        with self._lock:
+            data = self._data
+            if data is None:
+                return
+            if deleted:
+                data.shifts.pop(shift.pk, None)
+            else:
+                data.shifts[shift.pk] = shift
+            # Keep each employee's resolved shift in step; deleting a shift sets Employee.shift to NULL
+            for employee in data.employees.values():
+                if employee.shift_id == shift.pk:
+                    employee.shift = None if deleted else shift
+                    if deleted:
+                        employee.shift_id = None
+            self.stats['updates'] += 1
+
+    def auto_shift_changed(self, auto_shift, deleted=False):
+        with self._lock:
+            data = self._data
+            if data is None:
+                return
+            auto_shifts = [cached for cached in data.auto_shifts if cached.pk != auto_shift.pk]
+            if not deleted:
+                auto_shifts.append(auto_shift)
+                auto_shifts.sort(key=lambda cached: cached.pk)
+            data.set_auto_shifts(auto_shifts)
+            self.stats['updates'] += 1
+
+
+registry = ProcessorRegistry()
+
+
+def get_processor(processor_class):
+    return registry.get_processor(processor_class)
+
+
+@receiver(post_save, sender=Employee)
+def employee_saved(sender, instance, **kwargs):
+    registry.employee_changed(instance)
+
+
+@receiver(post_delete, sender=Employee)
+def employee_deleted(sender, instance, **kwargs):
+    registry.employee_changed(instance, deleted=True)
+
+
+@receiver(post_save, sender=Shift)
+def shift_saved(sender, instance, **kwargs):
+    registry.shift_changed(instance)
+
+
+@receiver(post_delete, sender=Shift)
+def shift_deleted(sender, instance, **kwargs):
+    registry.shift_changed(instance, deleted=True)
+
+
+@receiver(post_save, sender=AutoShift)
+def auto_shift_saved(sender, instance, **kwargs):
+    registry.auto_shift_changed(instance)
+
+
+@receiver(post_delete, sender=AutoShift)
+def auto_shift_deleted(sender, instance, **kwargs):
+    registry.auto_shift_changed(instance, deleted=True)
@@ -0,0 +1,80 @@
+from datetime import time, timedelta
+
+# Punch times are stored as whole seconds since midnight of the row's logdate;
+# an OUT after midnight is stored past DAY so every pair subtracts directly.
+DAY = 24 * 60 * 60
+
+# Number of duty_in_N/duty_out_N columns the mandays tables had before punches
+LEGACY_SLOTS = 10
+
+
+def to_offset(value):
+    """Seconds since midnight of a time."""
+    return (value.hour * 60 + value.minute) * 60 + value.second
+
+
+def to_time(offset):
+    """Time of day of an offset, wrapping OUTs stored past midnight."""
+    if offset is None:
+        return None
+    offset %= DAY
+    return time(offset // 3600, offset % 3600 // 60, offset % 60)
+
+
+def out_offset(in_offset, out_time_offset):
+    """Offset of an OUT paired with in_offset, moved to the next day if it is earlier."""
+    if in_offset is not None and out_time_offset < in_offset:
+        return out_time_offset + DAY
+    return out_time_offset
+
+
+def duration(pair):
+    """Time worked in one [in, out] pair, or None when either side is missing."""
+    start, end = pair
+    if start is None or end is None or end <= start:
+        return None
+    return timedelta(seconds=end - start)
+
+
+def summarize(punches):
+    """The derived first_in, last_out and total_hours_worked columns of a punches list."""
+    ins = [pair[0] for pair in punches if pair[0] is not None]
+    outs = [pair[1] for pair in punches if pair[1] is not None]
+    total = timedelta()
+    for pair in punches:
+        total += duration(pair) or timedelta()
+    return {
+        'first_in': to_time(ins[0]) if ins else None,
+        'last_out': to_time(outs[-1]) if outs else None,
+        'total_hours_worked': total,
+    }
+
+
+def expand(punches):
+    """(duty_in, duty_out, total_time) for every pair, as times and timedeltas."""
+    return [(to_time(pair[0]), to_time(pair[1]), duration(pair)) for pair in punches]
+
+
+def from_slots(row, slots=LEGACY_SLOTS):
+    """Punches list of a row that still has duty_in_N/duty_out_N attributes."""
+    punches = []
+    for i in range(1, slots + 1):
+        duty_in = getattr(row, f'duty_in_{i}', None)
+        duty_out = getattr(row, f'duty_out_{i}', None)
+        if duty_in is None and duty_out is None:
+            continue
+        in_offset = to_offset(duty_in) if duty_in is not None else None
+        punches.append([in_offset, out_offset(in_offset, to_offset(duty_out)) if duty_out is not None else None])
+    return punches
+
+
+def to_slots(punches, slots=LEGACY_SLOTS, totals=True):
+    """duty_in_N/duty_out_N (and total_time_N) values for the first slots pairs."""
+    values = {}
+    for i in range(1, slots + 1):
+        pair = punches[i - 1] if i <= len(punches) else (None, None)
+        values[f'duty_in_{i}'] = to_time(pair[0])
+        values[f'duty_out_{i}'] = to_time(pair[1])
+        if totals:
+            values[f'total_time_{i}'] = duration(pair)
+    return values
@@ -0,0 +1,92 @@
+import re
+from datetime import datetime, timedelta
+
+from django.db.models import Case, IntegerField, Q, Value, When
+
+from resource.models import Employee
+from resource.monthly_summary import STATUS_COUNTERS
+
+# Employee columns the search boxes match by substring. Migration 0016 gives each
+# a pg_trgm GIN index on UPPER(column::text), the expression icontains compiles to.
+EMPLOYEE_TEXT_FIELDS = ('employee_id', 'employee_name', 'device_enroll_id', 'email')
+
+# Organisation names an employee is found by; these tables are small enough to scan
+EMPLOYEE_ORG_FIELDS = ('company__name', 'location__name', 'department__name', 'designation__name')
+
+# shift_status codes the attendance search matches exactly
+STATUS_CODES = frozenset(STATUS_COUNTERS)
+
+DATE_FORMATS = ('%Y-%m-%d', '%m-%d-%Y')
+MONTH_PATTERN = re.compile(r'^(\d{4})-(\d{1,2})$')
+
+
+def employee_q(term, prefix='', fields=EMPLOYEE_TEXT_FIELDS + EMPLOYEE_ORG_FIELDS):
+    """Q matching employees with term in any of fields; prefix is the path to Employee."""
+    query = Q()
+    for field in fields:
+        query |= Q(**{f'{prefix}{field}__icontains': term})
+    return query
+
+
+def parse_date_range(term):
+    """(first, last) date for 'YYYY-MM-DD', 'MM-DD-YYYY' or a whole 'YYYY-MM' month, else None."""
+    for date_format in DATE_FORMATS:
+        try:
+            day = datetime.strptime(term, date_format).date()
+            return day, day
+        except ValueError:
+            pass
+
+    match = MONTH_PATTERN.match(term)
+    if match:
+        year, month = int(match.group(1)), int(match.group(2))
+        if 1 <= month <= 12:
+            first = datetime(year, month, 1).date()
+            last = (first.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+            return first, last
+    return None
+
+
+def attendance_search_q(term):
+    """
+    Q for the attendance search box.
+
+    Text is matched against the employee (id, name, enroll id, email and
+    organisation names) first, on the trigram indexes, and the matching ids
+    reach attendance as a literal IN list. Every other branch is indexed too,
+    so PostgreSQL can combine them in a BitmapOr instead of filtering a
+    sequential scan: dates become logdate ranges, and a known status code
+    matches shift_status exactly. Times and durations are not searched; those
+    columns have no index.
+    """
+    term = term.strip()
+    employee_ids = list(Employee.objects.filter(employee_q(term)).values_list('id', flat=True))
+    query = Q(employeeid__in=employee_ids)
+
+    if term.upper() in STATUS_CODES:
+        query |= Q(shift_status=term.upper())
+
+    date_range = parse_date_range(term)
+    if date_range:
+        query |= Q(logdate__range=date_range)
+
+    return query
+
+
+def employee_search(queryset, term):
+    """
+    Employees matching term, best matches first: an exact employee id, then ids
+    and names starting with the term, then any other substring match.
+    """
+    term = term.strip()
+    ordering = queryset.query.order_by or Employee._meta.ordering
+    return queryset.filter(
+        employee_q(term, fields=EMPLOYEE_TEXT_FIELDS) | Q(job_status__icontains=term)
+    ).annotate(
+        search_rank=Case(
+            When(employee_id__iexact=term, then=Value(3)),
+            When(Q(employee_id__istartswith=term) | Q(employee_name__istartswith=term), then=Value(2)),
+            default=Value(1),
+            output_field=IntegerField(),
+        )
+    ).order_by('-search_rank', *ordering)
@@ -1,6 +1,9 @@
 from rest_framework import serializers
-from resource.models import (Employee, Attendance, Logs, LastLogId, ManDaysAttendance, ManDaysMissedPunchAttendance, OvertimeRoundoffRules, HolidayList)
+from resource.models import (Employee, Attendance, Logs, LastLogId, ManDaysAttendance, ManDaysMissedPunchAttendance, OvertimeRoundoffRules, HolidayList, ExportJob)
 from datetime import timedelta
+from django.urls import reverse
+from django.db.models import Manager
+from resource.punch_pairs import LEGACY_SLOTS, expand
 
 # from config import models as config
 # from config.models import config
@@ -69,14 +72,30 @@ class AttendanceSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
+class LogsListSerializer(serializers.ListSerializer):
+    """Resolves the employee names of a whole page of logs with one query"""
+
+    def to_representation(self, data):
+        logs = list(data.all() if isinstance(data, Manager) else data)
+        employee_ids = {log.employeeid for log in logs if log.employeeid}
+        self.child.employee_names = dict(
+            Employee.objects.filter(employee_id__in=employee_ids).values_list('employee_id', 'employee_name')
+        )
+        return super().to_representation(logs)
+
 class LogsSerializer(serializers.ModelSerializer):
     employee_name = serializers.SerializerMethodField()
+    # employee_id -> employee_name, filled in by LogsListSerializer
+    employee_names = None
 
     class Meta:
         model = Logs
         fields = '__all__'
+        list_serializer_class = LogsListSerializer
 
     def get_employee_name(self, obj):
+        if self.employee_names is not None:
+            return self.employee_names.get(obj.employeeid)
         try:
             employee = Employee.objects.get(employee_id=obj.employeeid)
             return employee.employee_name
@@ -89,7 +108,40 @@ class LastLogIdSerializer(serializers.ModelSerializer):
         model = LastLogId
         fields = '__all__'
 
-class ManDaysAttendanceSerializer(serializers.ModelSerializer):
+class PunchPairsField(serializers.ReadOnlyField):
+    """Punch pairs as a list of {duty_in, duty_out, total_time}"""
+    time_field = serializers.TimeField()
+    duration_field = serializers.DurationField()
+
+    def to_representation(self, value):
+        return [
+            {
+                'duty_in': self.time_field.to_representation(duty_in) if duty_in is not None else None,
+                'duty_out': self.time_field.to_representation(duty_out) if duty_out is not None else None,
+                'total_time': self.duration_field.to_representation(total_time) if total_time else None,
+            }
+            for duty_in, duty_out, total_time in expand(value or [])
+        ]
+
+class PunchSlotsMixin:
+    """
+    Adds the duty_in_N/duty_out_N/total_time_N keys the mandays screens read,
+    one set per pair and at least as many as the tables used to have.
+    """
+    slot_totals = True
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        punches = data.get('punches') or []
+        for i in range(1, max(len(punches), LEGACY_SLOTS) + 1):
+            pair = punches[i - 1] if i <= len(punches) else {}
+            data[f'duty_in_{i}'] = pair.get('duty_in')
+            data[f'duty_out_{i}'] = pair.get('duty_out')
+            if self.slot_totals:
+                data[f'total_time_{i}'] = pair.get('total_time')
+        return data
+
+class ManDaysAttendanceSerializer(PunchSlotsMixin, serializers.ModelSerializer):
     employee_id_id = serializers.PrimaryKeyRelatedField(read_only=True, source='employeeid.employee_id')
     profile_pic = serializers.ImageField(read_only=True, source='employeeid.profile_pic') 
     employee_name = serializers.PrimaryKeyRelatedField(read_only=True, source='employeeid.employee_name')
@@ -100,12 +152,13 @@ class ManDaysAttendanceSerializer(serializers.ModelSerializer):
     department_name = serializers.PrimaryKeyRelatedField(read_only=True, source='employeeid.department.name')
     designation_name = serializers.PrimaryKeyRelatedField(read_only=True, source='employeeid.designation.name')
     category = serializers.PrimaryKeyRelatedField(read_only=True, source='employeeid.category')
+    punches = PunchPairsField()
     
     class Meta:
         model = ManDaysAttendance
         fields = '__all__'
 
-class ManDaysMissedPunchAttendanceSerializer(serializers.ModelSerializer):
+class ManDaysMissedPunchAttendanceSerializer(PunchSlotsMixin, serializers.ModelSerializer):
     employee_id_id = serializers.PrimaryKeyRelatedField(read_only=True, source='employeeid.employee_id')
     profile_pic = serializers.ImageField(read_only=True, source='employeeid.profile_pic') 
     employee_name = serializers.PrimaryKeyRelatedField(read_only=True, source='employeeid.employee_name')
@@ -115,6 +168,8 @@ class ManDaysMissedPunchAttendanceSerializer(serializers.ModelSerializer):
     job_type = serializers.PrimaryKeyRelatedField(read_only=True, source='employeeid.job_type')
     department_name = serializers.PrimaryKeyRelatedField(read_only=True, source='employeeid.department.name')
     category = serializers.PrimaryKeyRelatedField(read_only=True, source='employeeid.category')
+    punches = PunchPairsField()
+    slot_totals = False
     
     class Meta:
         model = ManDaysMissedPunchAttendance
@@ -162,4 +217,19 @@ class HolidayListSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = HolidayList
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+class ExportJobSerializer(serializers.ModelSerializer):
+    """Serializer for queued report exports"""
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ExportJob
+        fields = ['id', 'report_type', 'month', 'year', 'filters', 'status', 'file_name', 'error',
+                  'created_at', 'started_at', 'finished_at', 'download_url']
+
+    def get_download_url(self, obj):
+        if obj.status != 'done':
+            return None
+        url = reverse('export-job-download', kwargs={'id': obj.id})
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
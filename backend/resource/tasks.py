@@ -7,7 +7,7 @@ from celery import shared_task
 # from resource.attendance import AttendanceCalculator
 from resource.attendance import AttendanceService
 from resource.attendance2 import process_attendance
-from tqdm import tqdm
+from resource.log_checkpoint import CheckpointMoved, pending_logs, process_in_chunks
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -45,86 +45,52 @@ logger = logging.getLogger(__name__)
 #     return process_success  # Return the overall processing success flag
 
 @shared_task
-def process_logs(log_data):
+def process_logs(log_data, since=None):
     """
-    Processes a list of log entries one by one, sending each log for processing only
-    if the previous log was processed successfully.
+    Processes a list of log entries one by one. LastLogId is advanced past
+    every log attempted, whether or not it was processed successfully, and
+    committed together with the logs of each chunk (LOG_PROCESSING_CHUNK_SIZE
+    logs or LOG_PROCESSING_CHUNK_SECONDS seconds).
     """
-    process_success = True  # Flag to track overall processing success
-
-    # print("Processing logs...", log_data)
-
-    with tqdm(total=log_data.count(), desc="Processing Logs", unit="log") as pbar:
-        for log_entry in log_data:  # Iterate through each Logs object in the QuerySet
-            if process_success:
-                try:
-                    # Update LastLogId before processing each log entry
-                    with transaction.atomic():
-                        LastLogId.objects.update(last_log_id=log_entry.id)
-
-                    success = process_attendance(
-                        log_entry.employeeid,  # Access attributes directly
-                        log_entry.log_datetime,
-                        log_entry.direction
-                    )
-
-                    if not success:  # If processing failed, break the loop
-                        # print(f"Error processing log for employee: {log_entry.employeeid}")
-                        # transaction.set_rollback(True)  # Rollback the transaction
-                        # process_success = False  # Set the flag to False indicating failure
-                        # break  # Stop processing further logs
-                        continue
-
-                # Update LastLogId after each successful log processing
-                
-                    # Update the progress bar
-                    pbar.update(1)
-                
-                # except Attendance.MultipleObjectsReturned:
-                #     # Skip to the next log entry if multiple objects are found
-                #     continue
-
-                except Exception as e:
-                    # Log the exception and continue to the next log entry
-                    logger.error(f"Error processing log for employee: {log_entry.employeeid}. {e}")
-                    continue
-
-                # print(f"Log processed for employee: {log_entry.direction} at {log_entry.log_datetime}")
-
-    # print("Logs processed.", log_data.count())
-    return process_success  # Return the overall processing success flag
+    def handle(log_entry):
+        try:
+            # A savepoint per log, so a database error only discards this log
+            with transaction.atomic():
+                success = process_attendance(
+                    log_entry.employeeid,  # Access attributes directly
+                    log_entry.log_datetime,
+                    log_entry.direction
+                )
+            if not success:
+                logger.warning(f"Log {log_entry.id} for employee {log_entry.employeeid} was not processed")
+        except Exception as e:
+            # Log the exception and continue to the next log entry
+            logger.error(f"Error processing log for employee: {log_entry.employeeid}. {e}")
+        return True
+
+    process_in_chunks(handle, list(log_data), since=since, desc="Processing Logs")
+    return True
 
 @shared_task
 def scan_for_data():
     try:
-        with transaction.atomic():
-            # Retrieve the LastLogId record or handle the case where it doesn't exist
-            last_log_id_record = LastLogId.objects.select_for_update().first()
-            
-            if last_log_id_record is None:
-                # If no LastLogId record exists, create a new one with default value
-                last_log_id_record = LastLogId.objects.create(last_log_id=0)
-            
-            last_processed_id = last_log_id_record.last_log_id
-
-            # Fetch new logs with an ID greater than the last processed ID
-            new_logs = Logs.objects.filter(id__gt=last_processed_id).order_by('log_datetime')
-
-            if new_logs.exists():  # Check if there are any new logs
-                # print(f"Found {new_logs.count()} new logs")
-                # logger.info(f"Found {new_logs.count()} new logs")
+        # Fetch new logs after the last processed ID
+        new_logs, last_processed_id = pending_logs()
 
-                # Process logs one by one with success check
-                all_logs_processed_successfully = process_logs(new_logs)
-                if all_logs_processed_successfully:
-                    # print("Successfully processed logs.")
-                    logger.info("Successfully processed logs.")
+        if new_logs:
+            process_logs(new_logs, since=last_processed_id)
+            logger.info("Successfully processed logs.")
+        else:
+            logger.info("No new logs found.")
 
-            else:
-                # print("No new logs found.")
-                logger.info("No new logs found.")
+    except CheckpointMoved as e:
+        # Another worker is processing the same logs
+        logger.warning(f"Stopped log processing: {e}")
 
-    except LastLogId.DoesNotExist:
-        # Handle the case where LastLogId does not exist
-        LastLogId.objects.create(last_log_id=0)
-        pass
+@shared_task
+def generate_export(job_id):
+    """
+    Render a queued monthly report and store it in the export cache.
+    """
+    from resource.export_jobs import run_export_job
+    run_export_job(job_id)
@@ -1,9 +1,39 @@
-from django.test import TestCase
-from resource.models import Employee, Logs, Attendance, LastLogId
-from config.models import AutoShift, Shift
+from django.test import RequestFactory, TestCase, override_settings, skipUnlessDBFeature
+from django.core.management import call_command
+from unittest import skipUnless
+from unittest.mock import patch
+from resource.models import Employee, Logs, Attendance, LastLogId, ExportJob, MonthlyAttendanceSummary, OpenAttendanceSession, ManDaysAttendance, AbsenteeWatermark, AbsenceCorrectionWatermark, HolidayList
+from config.models import AutoShift, Shift, Company, Location, Department, Designation
 from resource.attendance7 import AttendanceProcessor, ShiftWindow
-from datetime import datetime, time, timedelta
+from resource.exports import StreamingExcelWriter, TOTAL_FORMAT
+from resource.export_jobs import data_version
+from resource.attendance_matrix import build_attendance_matrix
+from resource.monthly_totals import MonthlyTotals, format_seconds, round_seconds
+from resource.processor_registry import registry as processor_registry
+from resource.employee_roster import build_roster
+from resource.autoshift_index import AutoShiftIndex
+from resource.log_checkpoint import CheckpointMoved, process_in_chunks
+from resource.attendance3 import ManDaysAttendanceProcessor
+from resource import attendance_rows, export_jobs, search
+from resource.pagination import EstimatedCountPaginator
+from resource.serializers import AttendanceSerializer
+from resource.punch_pairs import from_slots, to_slots
+from datetime import date, datetime, time, timedelta
+from io import BytesIO, StringIO
+from types import SimpleNamespace
+import json
+import tempfile
+import openpyxl
 from django.utils import timezone
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.core.cache import cache
+from django.conf import settings
+
+try:
+    from resource.management.commands import sync_logs
+except ImportError:  # pyodbc loads the system unixODBC library on import
+    sync_logs = None
 
 class AttendanceLogicTests(TestCase):
 
@@ -167,6 +197,34 @@ class AttendanceLogicTests(TestCase):
         self.assertEqual(attendance.total_time, expected_total_time)
         self.assertEqual(attendance.shift_status, 'P') # Present
 
+    def test_auto_shift_night_in_after_midnight(self):
+        """An IN just after midnight belongs to the night shift that started the evening before."""
+        # 00:30 is past the Midnight Shift's window but inside this one's 90 minute tolerance
+        late_night = AutoShift.objects.create(
+            name="Late Night Shift", start_time=time(23, 0), end_time=time(7, 0),
+            tolerance_start_time=timedelta(minutes=15), tolerance_end_time=timedelta(minutes=90),
+            grace_period_at_start_time=timedelta(minutes=5), grace_period_at_end_time=timedelta(minutes=5),
+            overtime_threshold_before_start=timedelta(minutes=30), overtime_threshold_after_end=timedelta(minutes=30),
+            half_day_threshold=timedelta(hours=4), full_day_threshold=timedelta(hours=6), absent_threshold=timedelta(hours=2),
+            lunch_duration=timedelta(minutes=0), include_lunch_break_in_half_day=False, include_lunch_break_in_full_day=False,
+        )
+        log_in_datetime = timezone.make_aware(datetime(2024, 12, 19, 0, 30))
+        log_out_datetime = timezone.make_aware(datetime(2024, 12, 19, 7, 0))
+
+        Logs.objects.create(employeeid=self.employee_auto_night.employee_id, log_datetime=log_in_datetime, direction="In Device")
+        Logs.objects.create(employeeid=self.employee_auto_night.employee_id, log_datetime=log_out_datetime, direction="Out Device")
+        AttendanceProcessor().process_new_logs()
+
+        attendance = Attendance.objects.get(employeeid=self.employee_auto_night)
+        self.assertEqual(attendance.logdate, date(2024, 12, 18))
+        self.assertEqual(attendance.shift, late_night.name)
+        self.assertEqual((attendance.first_logtime, attendance.last_logtime), (time(0, 30), time(7, 0)))
+        self.assertEqual(attendance.late_entry, timedelta(hours=1, minutes=30))
+        self.assertEqual(attendance.total_time, timedelta(hours=6, minutes=30))
+        self.assertIsNone(attendance.early_exit)
+        self.assertIsNone(attendance.overtime)
+        self.assertEqual(attendance.shift_status, 'P')
+
     def test_auto_shift_midnight_normal_in_out(self):
         """Test normal IN and OUT log processing for midnight auto shift."""
         log_in_datetime = timezone.make_aware(datetime(2024, 12, 18, 0, 5)) # Midnight shift IN
@@ -584,4 +642,1327 @@ class AttendanceLogicTests(TestCase):
         attendance_again = Attendance.objects.get(employeeid=self.employee_auto_day, logdate=in_log_datetime.date())
         self.assertEqual(attendance_again.shift_status, original_status) # Status should remain same after second run
 
-    # Add more test cases to cover other edge cases and functionalities as needed.
\ No newline at end of file
+    # Add more test cases to cover other edge cases and functionalities as needed.
+
+class BatchAttendanceProcessingTests(TestCase):
+
+    def setUp(self):
+        """Set up shifts, employees and a spread of punches for the batch comparison."""
+        AutoShift.objects.create(
+            name="Day Shift",
+            start_time=time(8, 0),
+            end_time=time(17, 0),
+            tolerance_start_time=timedelta(minutes=30),
+            tolerance_end_time=timedelta(minutes=60),
+            grace_period_at_start_time=timedelta(minutes=5),
+            grace_period_at_end_time=timedelta(minutes=5),
+            overtime_threshold_before_start=timedelta(minutes=30),
+            overtime_threshold_after_end=timedelta(minutes=30),
+            half_day_threshold=timedelta(hours=4),
+            full_day_threshold=timedelta(hours=8),
+            absent_threshold=timedelta(hours=2),
+            lunch_duration=timedelta(minutes=30),
+            include_lunch_break_in_half_day=True,
+            include_lunch_break_in_full_day=True
+        )
+        AutoShift.objects.create(
+            name="Night Shift",
+            start_time=time(22, 0),
+            end_time=time(7, 0),
+            tolerance_start_time=timedelta(minutes=30),
+            tolerance_end_time=timedelta(minutes=60),
+            grace_period_at_start_time=timedelta(minutes=5),
+            grace_period_at_end_time=timedelta(minutes=5),
+            overtime_threshold_before_start=timedelta(minutes=30),
+            overtime_threshold_after_end=timedelta(minutes=30),
+            half_day_threshold=timedelta(hours=4),
+            full_day_threshold=timedelta(hours=8),
+            absent_threshold=timedelta(hours=2),
+            lunch_duration=timedelta(minutes=0),
+            include_lunch_break_in_half_day=False,
+            include_lunch_break_in_full_day=False
+        )
+        fixed_shift = Shift.objects.create(
+            name="Fixed Shift",
+            start_time=time(9, 0),
+            end_time=time(18, 0),
+            grace_period_at_start_time=timedelta(minutes=5),
+            grace_period_at_end_time=timedelta(minutes=5),
+            overtime_threshold_before_start=timedelta(minutes=30),
+            overtime_threshold_after_end=timedelta(minutes=30),
+            half_day_threshold=timedelta(hours=4),
+            full_day_threshold=timedelta(hours=8),
+            absent_threshold=timedelta(hours=2),
+            lunch_duration=timedelta(minutes=30),
+            include_lunch_break_in_half_day=True,
+            include_lunch_break_in_full_day=True
+        )
+
+        employees = [
+            Employee.objects.create(employee_id="BATCH_AUTO", first_weekly_off=6),
+            Employee.objects.create(employee_id="BATCH_NIGHT", first_weekly_off=6),
+            Employee.objects.create(employee_id="BATCH_FIXED", shift=fixed_shift, first_weekly_off=6),
+        ]
+
+        punches = []
+        for day in range(16, 23):
+            punches += [
+                (employees[0], datetime(2024, 12, day, 8, 10), "In Device"),
+                (employees[0], datetime(2024, 12, day, 12, 0), "Out Device"),
+                (employees[0], datetime(2024, 12, day, 17, 40), "Out Device"),
+                (employees[1], datetime(2024, 12, day, 22, 5), "In Device"),
+                (employees[1], datetime(2024, 12, day, 6, 55), "Out Device"),
+                (employees[2], datetime(2024, 12, day, 17, 0), "Out Device"),
+                (employees[2], datetime(2024, 12, day, 9, 20), "In Device"),
+            ]
+        for employee, log_datetime, direction in punches:
+            Logs.objects.create(employeeid=employee.employee_id, log_datetime=timezone.make_aware(log_datetime), direction=direction)
+
+    def _snapshot(self):
+        return sorted(Attendance.objects.values_list(
+            'employeeid', 'logdate', 'first_logtime', 'last_logtime', 'direction', 'total_time',
+            'late_entry', 'early_exit', 'overtime', 'shift', 'shift_status'
+        ))
+
+    def test_batch_matches_per_log_processing(self):
+        """The batch engine writes the same attendance rows as the per-log path."""
+        self.assertTrue(AttendanceProcessor().process_new_logs())
+        expected = self._snapshot()
+        self.assertTrue(expected)
+
+        Attendance.objects.all().delete()
+        LastLogId.objects.update(last_log_id=0)
+
+        self.assertTrue(AttendanceProcessor().process_new_logs_batch())
+        self.assertEqual(self._snapshot(), expected)
+        self.assertEqual(LastLogId.objects.first().last_log_id, Logs.objects.order_by('-id').first().id)
+
+    def test_batch_updates_existing_rows(self):
+        """Rows opened by an earlier run are upserted in place, not duplicated."""
+        first_logs = Logs.objects.order_by('id')[:10]
+        LastLogId.objects.create(last_log_id=first_logs[len(first_logs) - 1].id)
+        Attendance.objects.create(employeeid=Employee.objects.get(employee_id="BATCH_AUTO"), logdate=datetime(2024, 12, 20).date(), shift_status='A')
+        existing_id = Attendance.objects.get().id
+
+        self.assertTrue(AttendanceProcessor().process_new_logs_batch())
+        attendance = Attendance.objects.get(employeeid__employee_id="BATCH_AUTO", logdate=datetime(2024, 12, 20).date())
+        self.assertEqual(attendance.id, existing_id)
+        self.assertIsNotNone(attendance.first_logtime)
+
+    def test_batch_commits_in_chunks_from_the_task_command(self):
+        """--batch runs the batch engine in checkpointed chunks with the same result."""
+        self.assertTrue(AttendanceProcessor().process_new_logs())
+        expected = self._snapshot()
+        Attendance.objects.all().delete()
+        LastLogId.objects.update(last_log_id=0)
+
+        processor_registry.invalidate()
+        with override_settings(LOG_PROCESSING_CHUNK_SIZE=4):
+            call_command('task', batch=True, stdout=StringIO())
+        self.assertEqual(self._snapshot(), expected)
+        self.assertEqual(LastLogId.objects.first().last_log_id, Logs.objects.order_by('-id').first().id)
+
+
+class StreamingExcelWriterTests(TestCase):
+    def test_streamed_workbook_round_trips(self):
+        """Rows, merged title, padded formats and tracked widths survive the streamed file."""
+        writer = StreamingExcelWriter("MusterRole_12_2024")
+        writer.merge_title("Monthly Muster Role Register", 5)
+        writer.write_row(["EMP ID", "EMP Name", "1", "2"])
+        writer.write_row(["E1", "A fairly long employee name", "P", "A"])
+        writer.write_row(["", "Grand Total", 1], [None] + [TOTAL_FORMAT] * 3)
+        response = writer.response("Employee_Muster_Role_December_2024.xlsx")
+
+        content = b"".join(response.streaming_content)
+        self.assertEqual(int(response["Content-Length"]), len(content))
+        self.assertIn("Employee_Muster_Role_December_2024.xlsx", response["Content-Disposition"])
+
+        ws = openpyxl.load_workbook(BytesIO(content)).active
+        self.assertEqual(ws.title, "MusterRole_12_2024")
+        self.assertIn("A1:E1", [str(r) for r in ws.merged_cells.ranges])
+        self.assertEqual([c.value for c in ws[3]][:4], ["E1", "A fairly long employee name", "P", "A"])
+        self.assertEqual(ws["D4"].fill.fgColor.rgb, "FFFFD700")
+        self.assertAlmostEqual(ws.column_dimensions["B"].width, 29, delta=1)
+        self.assertAlmostEqual(ws.column_dimensions["C"].width, 10, delta=1)
+        response.close()
+        self.assertTrue(writer.file.closed)
+
+    def test_temporary_file_is_released_when_closing_fails(self):
+        writer = StreamingExcelWriter("Broken")
+        writer.write_row(["E1"])
+        with patch.object(writer.workbook, 'close', side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                writer.response("Broken.xlsx")
+        self.assertTrue(writer.file.closed)
+
+
+class ExportJobTests(TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.settings_override = override_settings(EXPORT_JOB_BACKEND='inline', EXPORT_CACHE_DIR=self.cache_dir.name)
+        self.settings_override.enable()
+        self.employee = Employee.objects.create(
+            employee_id="EXP001", employee_name="Export Employee",
+            company=Company.objects.create(name="Company"), location=Location.objects.create(name="Location"),
+            department=Department.objects.create(name="Department"), designation=Designation.objects.create(name="Designation"),
+        )
+        Attendance.objects.create(employeeid=self.employee, logdate=datetime(2024, 12, 2).date(), shift_status='P')
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.cache_dir.cleanup()
+
+    def _request(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/attendance/export/jobs/', {'report_type': 'monthly_present', 'month': 12, 'year': 2024}, content_type='application/json')
+        return response
+
+    def test_job_generates_and_downloads_report(self):
+        response = self._request()
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()['id']
+
+        status_response = self.client.get(f'/attendance/export/jobs/{job_id}/')
+        self.assertEqual(status_response.json()['status'], 'done')
+        self.assertEqual(status_response.json()['file_name'], 'Employee_Present_December_2024.xlsx')
+
+        download = self.client.get(f'/attendance/export/jobs/{job_id}/download/')
+        self.assertEqual(download.status_code, 200)
+        ws = openpyxl.load_workbook(BytesIO(b"".join(download.streaming_content))).active
+        self.assertEqual(ws['A3'].value, "EXP001")
+
+    def test_repeat_request_reuses_file_until_data_changes(self):
+        first = self._request().json()
+        repeat = self._request()
+        self.assertEqual(repeat.status_code, 200)
+        self.assertEqual(repeat.json()['id'], first['id'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Attendance.objects.create(employeeid=self.employee, logdate=datetime(2024, 12, 3).date(), shift_status='P')
+        changed = self._request().json()
+        self.assertNotEqual(changed['id'], first['id'])
+        self.assertEqual(ExportJob.objects.filter(status='done').count(), 2)
+
+    def test_in_place_attendance_edit_changes_data_version(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            attendance = Attendance.objects.create(employeeid=self.employee, logdate=datetime(2024, 12, 3).date(), shift_status='P')
+        before = data_version(12, 2024)
+
+        attendance.shift_status = 'A'
+        with self.captureOnCommitCallbacks(execute=True):
+            attendance.save()
+        self.assertNotEqual(data_version(12, 2024), before)
+
+    def test_unknown_report_type_is_rejected(self):
+        response = self.client.post('/attendance/export/jobs/', {'report_type': 'payslips', 'month': 12, 'year': 2024}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_filters_the_reports_cannot_apply_are_rejected(self):
+        response = self.client.post('/attendance/export/jobs/', {'report_type': 'monthly_present', 'month': 12, 'year': 2024, 'filters': {'department': 'Department'}}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(ExportJob.objects.exists())
+
+    def test_renaming_a_department_changes_data_version(self):
+        before = data_version(12, 2024)
+        department = self.employee.department
+        department.name = "Renamed Department"
+        department.save()
+        self.assertNotEqual(data_version(12, 2024), before)
+
+    def test_lost_in_flight_job_is_replaced(self):
+        with patch.object(export_jobs, 'dispatch'), self.captureOnCommitCallbacks(execute=True):
+            lost = export_jobs.enqueue_export('monthly_present', 12, 2024)
+
+        # A job within its time limit is shared rather than queued twice
+        with patch.object(export_jobs, 'dispatch'):
+            self.assertEqual(export_jobs.enqueue_export('monthly_present', 12, 2024).pk, lost.pk)
+
+        ExportJob.objects.filter(pk=lost.pk).update(status='running', started_at=timezone.now() - timedelta(hours=2))
+        response = self._request()
+        self.assertEqual(response.status_code, 202)
+        self.assertNotEqual(response.json()['id'], lost.pk)
+        lost.refresh_from_db()
+        self.assertEqual(lost.status, 'failed')
+        self.assertEqual(ExportJob.objects.get(pk=response.json()['id']).status, 'done')
+
+
+class MonthlyAttendanceSummaryTests(TestCase):
+    def setUp(self):
+        self.employee = Employee.objects.create(employee_id="SUM001", employee_name="Summary Employee")
+
+    def _create(self, day, **fields):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Attendance.objects.create(employeeid=self.employee, logdate=datetime(2024, 12, day).date(), **fields)
+
+    def test_summary_follows_attendance_changes(self):
+        self._create(1, shift_status='P', shift='FS', overtime=timedelta(minutes=30), total_time=timedelta(hours=8))
+        self._create(2, shift_status='HD', late_entry=timedelta(minutes=10))
+        absent = self._create(3, shift_status='A')
+
+        summary = MonthlyAttendanceSummary.objects.get(employeeid=self.employee, year=2024, month=12)
+        self.assertEqual((summary.present_count, summary.half_day_count, summary.absent_count), (1, 1, 1))
+        self.assertEqual(summary.statuses[:4], ['P', 'HD', 'A', ''])
+        self.assertEqual(len(summary.statuses), 31)
+        self.assertEqual(summary.shifts[0], 'FS')
+        self.assertEqual(summary.overtime_seconds, 1800)
+        self.assertEqual(summary.day_late_entry[1], 600)
+        self.assertEqual(summary.total_time_seconds, 8 * 3600)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            absent.shift_status = 'WO'
+            absent.save()
+        summary.refresh_from_db()
+        self.assertEqual((summary.absent_count, summary.week_off_count), (0, 1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Attendance.objects.filter(employeeid=self.employee).delete()
+        self.assertFalse(MonthlyAttendanceSummary.objects.exists())
+
+    def test_batch_processing_refreshes_summary(self):
+        self.employee.shift = Shift.objects.create(
+            name="General Shift",
+            start_time=time(9, 0),
+            end_time=time(18, 0),
+            grace_period_at_start_time=timedelta(minutes=5),
+            grace_period_at_end_time=timedelta(minutes=5),
+            absent_threshold=timedelta(hours=2),
+            half_day_threshold=timedelta(hours=4),
+            full_day_threshold=timedelta(hours=8),
+            overtime_threshold_before_start=timedelta(minutes=30),
+            overtime_threshold_after_end=timedelta(minutes=30),
+        )
+        self.employee.save()
+        Logs.objects.create(employeeid="SUM001", log_datetime=timezone.make_aware(datetime(2024, 12, 5, 9, 0)), direction="In Device")
+        Logs.objects.create(employeeid="SUM001", log_datetime=timezone.make_aware(datetime(2024, 12, 5, 18, 0)), direction="Out Device")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            AttendanceProcessor().process_new_logs_batch()
+
+        attendance = Attendance.objects.get(employeeid=self.employee)
+        summary = MonthlyAttendanceSummary.objects.get(employeeid=self.employee, year=2024, month=12)
+        self.assertEqual(summary.statuses[4], attendance.shift_status)
+        self.assertEqual(summary.total_time_seconds, int(attendance.total_time.total_seconds()))
+
+
+class AttendanceMatrixTests(TestCase):
+    def test_rows_are_laid_out_by_day(self):
+        employee = Employee.objects.create(employee_id="MTX001", employee_name="Matrix Employee")
+        Attendance.objects.create(employeeid=employee, logdate=datetime(2024, 2, 29).date(), shift_status='P', shift='GS', overtime=timedelta(minutes=45))
+        Attendance.objects.create(employeeid=employee, logdate=datetime(2024, 2, 1).date(), shift_status='A')
+
+        for rows in (Attendance.objects.all(), Attendance.objects.values('employeeid_id', 'logdate', 'shift', 'shift_status', 'overtime')):
+            month = build_attendance_matrix(rows, 2024, 2)[employee.id]
+            self.assertEqual(month.num_days, 29)
+            self.assertEqual((month.statuses[0], month.statuses[1], month.statuses[28]), ('A', '', 'P'))
+            self.assertEqual(month.shifts[28], 'GS')
+            self.assertIsNone(month.records[10])
+            self.assertEqual(month.seconds('overtime')[28], 2700)
+            self.assertEqual(month.total_seconds('overtime'), 2700)
+            self.assertEqual(month.count('P', 'A'), 2)
+
+
+class MonthlyTotalsTests(TestCase):
+    def test_columns_and_grand_totals(self):
+        first = Employee.objects.create(employee_id="TOT001", employee_name="Totals One")
+        second = Employee.objects.create(employee_id="TOT002", employee_name="Totals Two")
+        MonthlyAttendanceSummary.objects.create(employeeid=first, year=2024, month=2, present_count=20, half_day_count=1, week_off_count=4, overtime_seconds=3600)
+        MonthlyAttendanceSummary.objects.create(employeeid=second, year=2024, month=2, absent_count=2, week_off_worked_count=1, overtime_seconds=5430)
+
+        totals = MonthlyTotals(2024, 2)
+        self.assertEqual(len(totals), 2)
+        self.assertIn(first.id, totals)
+        self.assertEqual(totals.value('present_days', first.id), 20.5)
+        self.assertEqual(totals.value('absent_days', second.id), 2)
+        self.assertEqual(totals.value('working_days', first.id), 25)
+        self.assertEqual(totals.grand('week_offs'), 5)
+        self.assertEqual(format_seconds(totals.grand('overtime_seconds')), "2:30:30")
+        self.assertIsNone(format_seconds(0))
+
+    def test_round_seconds(self):
+        self.assertEqual(round_seconds([0, 890, 910, 1800], 1800, 'nearest').tolist(), [0, 0, 1800, 1800])
+        self.assertEqual(round_seconds([0, 1], 1800, 'up').tolist(), [0, 1800])
+        self.assertEqual(round_seconds([1799], 1800, 'down').tolist(), [0])
+
+    def test_roundoff_export_shows_overtime_rounded_to_nothing(self):
+        employee = Employee.objects.create(
+            employee_id="TOT003", employee_name="Totals Three",
+            company=Company.objects.create(name="Company"), location=Location.objects.create(name="Location"),
+            department=Department.objects.create(name="Department"), designation=Designation.objects.create(name="Designation"),
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            Attendance.objects.create(employeeid=employee, logdate=date(2024, 12, 2), shift_status='P', overtime=timedelta(minutes=5))
+            Attendance.objects.create(employeeid=employee, logdate=date(2024, 12, 3), shift_status='P', overtime=timedelta(minutes=20))
+
+        response = self.client.get('/attendance/export/monthly_roundoff_overtime/', {'month': 12, 'year': 2024})
+        ws = openpyxl.load_workbook(BytesIO(b"".join(response.streaming_content))).active
+        # Days 1-3 are columns I-K: no overtime, 5 minutes rounded to nothing, 20 minutes rounded to 15
+        self.assertEqual([ws['I3'].value, ws['J3'].value, ws['K3'].value], [None, "0:00:00", "0:15:00"])
+
+
+@skipUnless(sync_logs, "pyodbc is not available")
+class SyncLogsCopyTests(TestCase):
+    def test_copy_value_escapes_text_format_specials(self):
+        self.assertEqual(sync_logs.copy_value(None), '\\N')
+        self.assertEqual(sync_logs.copy_value('a\tb'), 'a\\tb')
+        self.assertEqual(sync_logs.copy_value('a\nb\rc'), 'a\\nb\\rc')
+        self.assertEqual(sync_logs.copy_value('C:\\logs'), 'C:\\\\logs')
+        # A literal \N string must not read back as NULL
+        self.assertEqual(sync_logs.copy_value('\\N'), '\\\\N')
+        self.assertEqual(sync_logs.copy_value(7), '7')
+
+    def test_copy_rows_writes_one_tab_separated_line_per_record(self):
+        records = [
+            (1, 'E001', 'In', None, 'SN\t1', datetime(2024, 1, 1, 9, 0)),
+            (2, 'E002', 'Out', 'x\ny', 'SN2', datetime(2024, 1, 1, 18, 0)),
+        ]
+
+        buffer = sync_logs.copy_rows(records)
+
+        self.assertEqual(buffer.read().split('\n'), [
+            '1\tE001\tIn\t\\N\tSN\\t1\t2024-01-01 09:00:00',
+            '2\tE002\tOut\tx\\ny\tSN2\t2024-01-01 18:00:00',
+            '',
+        ])
+
+
+class FakeMssqlCursor:
+    """Pages through rows like fetch_mssql_batch's TOP (?) ... WHERE id > ? query."""
+
+    def __init__(self, rows, fail_on_fetch=None):
+        self.rows = rows
+        self.fail_on_fetch = fail_on_fetch
+        self.fetches = 0
+
+    def execute(self, query, params):
+        self.fetches += 1
+        if self.fetches == self.fail_on_fetch:
+            raise RuntimeError("MSSQL went away")
+        batch_size, last_id = params
+        self.result = [row for row in self.rows if row[0] > last_id][:batch_size]
+
+    def fetchall(self):
+        return self.result
+
+
+class FakePostgres:
+    """A PostgreSQL connection whose checkpoint row only changes on commit."""
+
+    def __init__(self, checkpoint=None):
+        self.checkpoint = checkpoint
+        self.pending = None
+        self.written = []
+        self.autocommit = True
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql, params=None):
+        if 'COALESCE(MAX(id), 0)' in sql:
+            self.result = (0, 0)
+        elif 'SELECT last_id' in sql:
+            self.result = (self.checkpoint,) if self.checkpoint is not None else None
+        elif 'INSERT INTO public.sync_logs_checkpoint' in sql:
+            self.pending = params[1]
+
+    def fetchone(self):
+        return self.result
+
+    def commit(self):
+        self.checkpoint = self.pending
+
+    def rollback(self):
+        self.pending = None
+
+    def close(self):
+        pass
+
+
+@skipUnless(sync_logs, "pyodbc is not available")
+class SyncLogsCheckpointTests(TestCase):
+    def setUp(self):
+        self.rows = [(log_id, 'E001', 'In', None, 'SN1', datetime(2024, 1, 1, 9, log_id)) for log_id in range(1, 8)]
+
+    def _command(self, ms_cursor, pg):
+        command = sync_logs.Command(stdout=StringIO(), stderr=StringIO())
+        command.BATCH_SIZE = 2
+        command.get_mssql_connection = lambda: SimpleNamespace(cursor=lambda: ms_cursor, close=lambda: None)
+        command.get_postgresql_connection = lambda: pg
+        return command
+
+    def _write(self, pg, fail_on_batch=None):
+        def write_batch(cursor, records):
+            if len(pg.written) + 1 == fail_on_batch:
+                raise RuntimeError("PostgreSQL write failed")
+            pg.written.append([record[0] for record in records])
+            return len(records)
+        return write_batch
+
+    def test_failed_batch_keeps_checkpoint_and_next_run_resumes_from_it(self):
+        pg = FakePostgres(checkpoint=2)
+        command = self._command(FakeMssqlCursor(self.rows), pg)
+        command.insert_postgresql_batch = self._write(pg, fail_on_batch=2)
+
+        with self.assertRaises(SystemExit):
+            call_command(command, mode='insert')
+        self.assertEqual(pg.written, [[3, 4]])
+        self.assertEqual(pg.checkpoint, 4)
+
+        command = self._command(FakeMssqlCursor(self.rows), pg)
+        command.insert_postgresql_batch = self._write(pg)
+        call_command(command, mode='insert')
+        self.assertEqual(pg.written, [[3, 4], [5, 6], [7]])
+        self.assertEqual(pg.checkpoint, 7)
+
+    def test_pipeline_stops_after_fetch_error(self):
+        pg = FakePostgres()
+        command = self._command(None, pg)
+        ms_cursor = FakeMssqlCursor(self.rows, fail_on_fetch=2)
+
+        with self.assertRaisesMessage(RuntimeError, "MSSQL went away"):
+            command.run_pipelined(SimpleNamespace(cursor=lambda: ms_cursor), pg, self._write(pg), 0, 1)
+        self.assertEqual(pg.written, [[1, 2]])
+        self.assertEqual(pg.checkpoint, 2)
+
+    def test_pipeline_stops_fetching_after_write_error(self):
+        pg = FakePostgres()
+        command = self._command(None, pg)
+        ms_cursor = FakeMssqlCursor(self.rows)
+
+        with self.assertRaisesMessage(RuntimeError, "PostgreSQL write failed"):
+            command.run_pipelined(SimpleNamespace(cursor=lambda: ms_cursor), pg, self._write(pg, fail_on_batch=1), 0, 1)
+        self.assertEqual(pg.written, [])
+        self.assertIsNone(pg.checkpoint)
+        # The producer was stopped with the queue full instead of reading every batch
+        self.assertLess(ms_cursor.fetches, 4)
+
+
+class LogsBulkCreateTests(TestCase):
+    def test_json_array_counts_accepted_duplicate_and_rejected_rows(self):
+        Logs.objects.create(id=10, employeeid="BULK001", log_datetime=timezone.make_aware(datetime(2024, 1, 1, 9, 0)), direction="In Device")
+        payload = [
+            {"id": 10, "employeeid": "BULK001", "log_datetime": "2024-01-01T09:00:00", "direction": "In Device"},
+            {"id": 11, "employeeid": "BULK001", "log_datetime": "2024-01-01T18:00:00", "direction": "Out Device"},
+            {"id": 11, "employeeid": "BULK001", "log_datetime": "2024-01-01T18:00:00", "direction": "Out Device"},
+            {"id": 12, "employeeid": "BULK001", "log_datetime": "not a date"},
+            {"employeeid": "BULK002", "log_datetime": "2024-01-01T09:05:00", "direction": "In Device"},
+        ]
+
+        response = self.client.post('/logs/bulk/', payload, content_type='application/json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['accepted'], 1)
+        self.assertEqual(response.json()['duplicates'], 2)
+        self.assertEqual(response.json()['rejected'], 2)
+        self.assertEqual(response.json()['errors'][0]['row'], 3)
+        self.assertEqual(response.json()['errors'][1], {'row': 4, 'errors': {'id': ['This field is required.']}})
+        self.assertEqual(Logs.objects.count(), 2)
+
+    def test_fifty_thousand_punches_in_one_call(self):
+        payload = [
+            {"id": 100000 + i, "employeeid": f"BULK{i % 500:04d}", "log_datetime": f"2024-02-{i % 28 + 1:02d}T{i % 24:02d}:00:00",
+             "direction": "In Device", "shortname": "Main Gate", "serialno": "CQZ7224460123"}
+            for i in range(50000)
+        ]
+        body = json.dumps(payload)
+        self.assertGreater(len(body), settings.DATA_UPLOAD_MAX_MEMORY_SIZE)
+
+        response = self.client.post('/logs/bulk/', body, content_type='application/json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.json()['accepted'], response.json()['rejected']), (50000, 0))
+        self.assertEqual(Logs.objects.count(), 50000)
+
+    def test_body_over_the_limit_is_refused(self):
+        payload = [{"id": 40, "employeeid": "BULK005", "log_datetime": "2024-01-04T09:00:00"}]
+        with override_settings(LOGS_BULK_MAX_BODY_SIZE=20):
+            response = self.client.post('/logs/bulk/', payload, content_type='application/json')
+        self.assertEqual(response.status_code, 413)
+        self.assertFalse(Logs.objects.exists())
+
+    def test_retried_batch_is_not_inserted_twice(self):
+        payload = [
+            {"id": 20, "employeeid": "BULK004", "log_datetime": "2024-01-03T09:00:00", "direction": "In Device"},
+            {"id": 21, "employeeid": "BULK004", "log_datetime": "2024-01-03T18:00:00", "direction": "Out Device"},
+        ]
+
+        first = self.client.post('/logs/bulk/', payload, content_type='application/json').json()
+        retry = self.client.post('/logs/bulk/', payload, content_type='application/json').json()
+
+        self.assertEqual((first['accepted'], first['duplicates']), (2, 0))
+        self.assertEqual((retry['accepted'], retry['duplicates']), (0, 2))
+        self.assertEqual(Logs.objects.filter(employeeid="BULK004").count(), 2)
+        self.assertEqual(Logs.objects.get(id=20).log_datetime, timezone.make_aware(datetime(2024, 1, 3, 9, 0)))
+
+    def test_ndjson_body(self):
+        body = '\n'.join([
+            '{"id": 30, "employeeid": "BULK003", "log_datetime": "2024-01-02T09:00:00", "direction": "In Device"}',
+            '',
+            '{"id": 31, "employeeid": "BULK003", "log_datetime": "2024-01-02T18:00:00", "direction": "Out Device"}',
+        ])
+
+        response = self.client.post('/logs/bulk/', body, content_type='application/x-ndjson')
+
+        self.assertEqual(response.json()['accepted'], 2)
+        self.assertEqual(Logs.objects.filter(employeeid="BULK003").count(), 2)
+
+    def test_malformed_body_is_rejected(self):
+        response = self.client.post('/logs/bulk/', '{"logs": ', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+
+class ProcessorRegistryTests(TestCase):
+    def setUp(self):
+        processor_registry.invalidate()
+        self.addCleanup(processor_registry.invalidate)
+
+    def test_reference_data_is_loaded_once_and_patched_by_signals(self):
+        Employee.objects.create(employee_id="REG001", employee_name="Registry One")
+        before = processor_registry.metrics()
+        data = processor_registry.reference_data()
+        self.assertIn("REG001", data.employees)
+
+        with self.assertNumQueries(0):
+            self.assertIs(processor_registry.reference_data(), data)
+
+        auto_shift = AutoShift.objects.create(
+            name="Registry Shift", start_time=time(9, 0), end_time=time(18, 0),
+            tolerance_start_time=timedelta(minutes=15), tolerance_end_time=timedelta(minutes=15),
+            absent_threshold=timedelta(hours=2), half_day_threshold=timedelta(hours=4), full_day_threshold=timedelta(hours=8),
+            overtime_threshold_before_start=timedelta(minutes=30), overtime_threshold_after_end=timedelta(minutes=30),
+        )
+        employee = Employee.objects.get(employee_id="REG001")
+        employee.employee_id = "REG002"
+        employee.save()
+
+        self.assertIn("REGISTRY SHIFT", data.auto_shift_dict)
+        self.assertNotIn("REG001", data.employees)
+        self.assertEqual(data.employees.get("REG002").pk, employee.pk)
+        self.assertEqual(data.employees.by_pk[employee.pk], "REG002")
+
+        auto_shift.delete()
+        self.assertNotIn("REGISTRY SHIFT", data.auto_shift_dict)
+
+        metrics = processor_registry.metrics()
+        self.assertEqual(metrics['misses'] - before['misses'], 1)
+        self.assertEqual(metrics['hits'] - before['hits'], 1)
+        self.assertEqual(metrics['updates'] - before['updates'], 3)
+
+    def test_missing_employee_falls_back_to_one_query(self):
+        data = processor_registry.reference_data()
+        # Rows written without signals, e.g. by another process
+        Employee.objects.bulk_create([Employee(employee_id="REG003", employee_name="Created Elsewhere")])
+
+        with self.assertNumQueries(1):
+            self.assertEqual(data.employees.get("REG003").employee_id, "REG003")
+        with self.assertNumQueries(1):
+            self.assertIsNone(data.employees.get("UNKNOWN"))
+        with self.assertNumQueries(0):
+            self.assertIsNone(data.employees.get("UNKNOWN"))
+        self.assertEqual(data.employees.by_pk[data.employees["REG003"].pk], "REG003")
+
+    def test_deleted_employee_is_dropped_by_primary_key(self):
+        employee = Employee.objects.create(employee_id="REG004", employee_name="Registry Four")
+        data = processor_registry.reference_data()
+        self.assertIn("REG004", data.employees)
+        pk = employee.pk
+
+        # Employee.delete() would also delete the shared default profile picture
+        Employee.objects.filter(pk=pk).delete()
+
+        self.assertNotIn("REG004", data.employees)
+        self.assertNotIn(pk, data.employees.by_pk)
+        self.assertEqual(len(data.employees.by_pk), len(data.employees))
+
+
+class EmployeeRosterTests(TestCase):
+    def test_roster_entries_resolve_shift_and_week_offs(self):
+        shift = Shift.objects.create(
+            name="Roster Shift", start_time=time(9, 0), end_time=time(18, 0),
+            grace_period_at_start_time=timedelta(minutes=5), grace_period_at_end_time=timedelta(minutes=5),
+            absent_threshold=timedelta(hours=2), half_day_threshold=timedelta(hours=4), full_day_threshold=timedelta(hours=8),
+            overtime_threshold_before_start=timedelta(minutes=30), overtime_threshold_after_end=timedelta(minutes=30),
+        )
+        Employee.objects.create(employee_id="ROS001", employee_name="Roster Fixed", shift=shift, first_weekly_off=6)
+        Employee.objects.create(employee_id="ROS002", employee_name="Roster Auto", auto_shift=True, first_weekly_off=None)
+
+        with self.assertNumQueries(1):
+            roster = build_roster({shift.id: shift})
+
+        self.assertIs(roster["ROS001"].shift, shift)
+        self.assertEqual(roster["ROS001"].week_off_days, (6,))
+        self.assertIsNone(roster["ROS002"].shift)
+        self.assertEqual(roster["ROS002"].week_off_days, ())
+        self.assertFalse(hasattr(roster["ROS001"], '__dict__'))
+
+
+class AutoShiftIndexTests(TestCase):
+    def auto_shift(self, name, start_time, end_time, tolerance):
+        return AutoShift(
+            name=name, start_time=start_time, end_time=end_time,
+            tolerance_start_time=tolerance, tolerance_end_time=tolerance,
+        )
+
+    def test_punch_resolves_to_shift_and_start_date(self):
+        general = self.auto_shift("G", time(9, 0), time(18, 0), timedelta(minutes=30))
+        midnight = self.auto_shift("C", time(0, 0), time(8, 0), timedelta(minutes=30))
+        night = self.auto_shift("N", time(23, 30), time(7, 30), timedelta(hours=1))
+        index = AutoShiftIndex([general, midnight, night])
+        day = datetime(2024, 1, 10)
+
+        self.assertEqual(index.match(day.replace(hour=9, minute=30)), [(general, day.date())])
+        self.assertEqual(index.match(day.replace(hour=9, minute=30, second=1)), [])
+        # C opens an hour before midnight, N's window runs past it into the next day
+        self.assertEqual(
+            index.match(day.replace(hour=23, minute=15)),
+            [(midnight, day.date() + timedelta(days=1)), (night, day.date())],
+        )
+        self.assertEqual(
+            index.match(day.replace(hour=0, minute=20)),
+            [(midnight, day.date()), (night, day.date() - timedelta(days=1))],
+        )
+        self.assertEqual(index.match(day.replace(hour=0, minute=45)), [])
+        self.assertEqual(AutoShiftIndex([]).match(day), [])
+
+
+class OpenSessionTests(TestCase):
+    def setUp(self):
+        AutoShift.objects.create(
+            name="Open Night", start_time=time(22, 0), end_time=time(6, 0),
+            tolerance_start_time=timedelta(minutes=30), tolerance_end_time=timedelta(minutes=30),
+            absent_threshold=timedelta(hours=2), half_day_threshold=timedelta(hours=4), full_day_threshold=timedelta(hours=7),
+            overtime_threshold_before_start=timedelta(minutes=30), overtime_threshold_after_end=timedelta(minutes=30),
+            lunch_duration=timedelta(0), night_shift=True,
+        )
+        self.employee = Employee.objects.create(employee_id="OPEN001", auto_shift=True)
+
+    def test_night_out_pairs_with_open_in_without_reads(self):
+        Logs.objects.create(employeeid="OPEN001", log_datetime=timezone.make_aware(datetime(2024, 12, 9, 22, 5)), direction="In Device")
+        AttendanceProcessor().process_new_logs()
+        session = OpenAttendanceSession.objects.get(employeeid=self.employee)
+        self.assertEqual(session.logdate, datetime(2024, 12, 9).date())
+
+        processor = AttendanceProcessor()
+        with self.assertNumQueries(1):
+            processor.sessions.load({self.employee.pk})
+        out_log = Logs(employeeid="OPEN001", log_datetime=timezone.make_aware(datetime(2024, 12, 10, 6, 10)), direction="Out Device")
+        with CaptureQueriesContext(connection) as queries, processor.sessions.writing():
+            self.assertTrue(processor.process_single_log(out_log))
+        selects = [query['sql'] for query in queries.captured_queries if query['sql'].lstrip().upper().startswith('SELECT')]
+        # The open row comes from memory; only its UPDATE is sent
+        self.assertEqual(selects, [])
+
+        attendance = Attendance.objects.get(employeeid=self.employee)
+        self.assertEqual(attendance.logdate, datetime(2024, 12, 9).date())
+        self.assertEqual(attendance.last_logtime, time(6, 10))
+        self.assertEqual(attendance.total_time, timedelta(hours=8, minutes=5))
+        self.assertEqual(processor.sessions.flush(), 1)
+        self.assertEqual(OpenAttendanceSession.objects.get(employeeid=self.employee).last_logtime, time(6, 10))
+
+    def test_edit_during_a_run_drops_the_session(self):
+        Logs.objects.create(employeeid="OPEN001", log_datetime=timezone.make_aware(datetime(2024, 12, 9, 22, 5)), direction="In Device")
+        AttendanceProcessor().process_new_logs()
+        processor = AttendanceProcessor()
+        processor.sessions.load()
+
+        # Like UpdateAttendanceView, a plain save of the row; the stored table is not touched
+        attendance = Attendance.objects.get(employeeid=self.employee)
+        attendance.first_logtime = time(21, 30)
+        with self.captureOnCommitCallbacks(execute=True), CaptureQueriesContext(connection) as queries:
+            attendance.save()
+        self.assertFalse(any('open_attendance_session' in query['sql'] for query in queries.captured_queries))
+        self.assertTrue(OpenAttendanceSession.objects.filter(employeeid=self.employee).exists())
+        self.assertNotIn(self.employee.pk, processor.sessions.sessions)
+
+        out_log = Logs(employeeid="OPEN001", log_datetime=timezone.make_aware(datetime(2024, 12, 10, 6, 10)), direction="Out Device")
+        self.assertTrue(processor.process_single_log(out_log))
+        attendance.refresh_from_db()
+        self.assertEqual((attendance.first_logtime, attendance.last_logtime), (time(21, 30), time(6, 10)))
+
+    def test_load_follows_rows_edited_since_the_session_was_stored(self):
+        Logs.objects.create(employeeid="OPEN001", log_datetime=timezone.make_aware(datetime(2024, 12, 9, 22, 5)), direction="In Device")
+        AttendanceProcessor().process_new_logs()
+        Attendance.objects.filter(employeeid=self.employee).update(first_logtime=time(21, 45))
+
+        processor = AttendanceProcessor()
+        processor.sessions.load({self.employee.pk})
+        open_row = processor.store.get_open(self.employee, datetime(2024, 12, 10).date(), datetime(2024, 12, 9).date())
+        self.assertEqual(open_row.first_logtime, time(21, 45))
+        self.assertEqual(processor.sessions.flush(), 1)
+        self.assertEqual(OpenAttendanceSession.objects.get(employeeid=self.employee).first_logtime, time(21, 45))
+
+    def test_load_skips_a_session_superseded_by_a_later_in(self):
+        Logs.objects.create(employeeid="OPEN001", log_datetime=timezone.make_aware(datetime(2024, 12, 9, 22, 5)), direction="In Device")
+        AttendanceProcessor().process_new_logs()
+        # Written by another processor, e.g. attendance4, which keeps no sessions
+        Attendance.objects.bulk_create([Attendance(employeeid=self.employee, logdate=datetime(2024, 12, 10).date(), first_logtime=time(22, 0), shift="OPEN NIGHT")])
+
+        processor = AttendanceProcessor()
+        processor.sessions.load({self.employee.pk})
+        self.assertIsNone(processor.store.get_open(self.employee, datetime(2024, 12, 10).date(), datetime(2024, 12, 9).date()))
+
+        out_log = Logs(employeeid="OPEN001", log_datetime=timezone.make_aware(datetime(2024, 12, 11, 6, 10)), direction="Out Device")
+        with processor.sessions.writing():
+            self.assertTrue(processor.process_single_log(out_log))
+        self.assertEqual(Attendance.objects.get(employeeid=self.employee, logdate=datetime(2024, 12, 10).date()).last_logtime, time(6, 10))
+        self.assertIsNone(Attendance.objects.get(employeeid=self.employee, logdate=datetime(2024, 12, 9).date()).last_logtime)
+
+    def test_stale_session_is_checked_against_its_row(self):
+        Logs.objects.create(employeeid="OPEN001", log_datetime=timezone.make_aware(datetime(2024, 12, 9, 22, 5)), direction="In Device")
+        AttendanceProcessor().process_new_logs()
+
+        # Reset by another process between runs: no signal reaches this one
+        Attendance.objects.filter(employeeid=self.employee).update(first_logtime=None, shift_status='A')
+        processor = AttendanceProcessor()
+        processor.sessions.load()
+
+        out_log = Logs(employeeid="OPEN001", log_datetime=timezone.make_aware(datetime(2024, 12, 10, 6, 10)), direction="Out Device")
+        processor.process_single_log(out_log)
+
+        self.assertNotIn(self.employee.pk, processor.sessions.sessions)
+        self.assertIsNone(Attendance.objects.get(employeeid=self.employee, logdate=datetime(2024, 12, 9).date()).last_logtime)
+        missed = Attendance.objects.get(employeeid=self.employee, logdate=datetime(2024, 12, 10).date())
+        self.assertEqual((missed.shift_status, missed.last_logtime), ('MP', time(6, 10)))
+
+    def test_deleted_row_drops_the_session(self):
+        Logs.objects.create(employeeid="OPEN001", log_datetime=timezone.make_aware(datetime(2024, 12, 9, 22, 5)), direction="In Device")
+        AttendanceProcessor().process_new_logs()
+        processor = AttendanceProcessor()
+        processor.sessions.load()
+
+        Attendance.objects.filter(employeeid=self.employee).delete()
+
+        self.assertNotIn(self.employee.pk, processor.sessions.sessions)
+        self.assertFalse(OpenAttendanceSession.objects.exists())
+        self.assertIsNone(processor.store.get_open(self.employee, datetime(2024, 12, 10).date(), datetime(2024, 12, 9).date()))
+
+    def test_failed_chunk_discards_its_sessions(self):
+        first = Logs.objects.create(employeeid="OPEN001", log_datetime=timezone.make_aware(datetime(2024, 12, 9, 22, 5)), direction="In Device")
+        second = Logs.objects.create(employeeid="OPEN001", log_datetime=timezone.make_aware(datetime(2024, 12, 10, 22, 5)), direction="In Device")
+        processor = AttendanceProcessor()
+        handle_log = processor.process_single_log
+
+        def fail_after_second(log, is_manual=False):
+            handled = handle_log(log)
+            if log.id == second.id:
+                raise RuntimeError("chunk failed")
+            return handled
+
+        processor.process_single_log = fail_after_second
+        self.assertFalse(processor.process_new_logs(chunk_size=1))
+
+        self.assertEqual(processor.sessions.sessions, {})
+        self.assertFalse(Attendance.objects.filter(logdate=datetime(2024, 12, 10).date()).exists())
+        self.assertEqual(LastLogId.objects.get().last_log_id, first.id)
+        session = OpenAttendanceSession.objects.get(employeeid=self.employee)
+        self.assertEqual(session.logdate, datetime(2024, 12, 9).date())
+        self.assertEqual(
+            processor.store.get_open(self.employee, datetime(2024, 12, 10).date(), datetime(2024, 12, 9).date()).pk,
+            session.attendance_id,
+        )
+
+    def test_cold_start_rebuilds_from_recent_attendance(self):
+        today = timezone.localdate()
+        Attendance.objects.create(employeeid=self.employee, logdate=today - timedelta(days=5), first_logtime=time(22, 0))
+        recent = Attendance.objects.create(employeeid=self.employee, logdate=today - timedelta(days=1), first_logtime=time(22, 0))
+
+        processor = AttendanceProcessor()
+        processor.sessions.load()
+
+        self.assertEqual(OpenAttendanceSession.objects.get(employeeid=self.employee).attendance_id, recent.pk)
+        self.assertEqual(processor.store.get_open(self.employee, today, today - timedelta(days=1)).pk, recent.pk)
+
+
+class LogCheckpointTests(TestCase):
+    def setUp(self):
+        LastLogId.objects.create(last_log_id=0)
+        start = timezone.make_aware(datetime(2024, 12, 2, 9, 0))
+        self.logs = [
+            Logs.objects.create(employeeid="CHK001", log_datetime=start + timedelta(minutes=i), direction="In Device")
+            for i in range(5)
+        ]
+
+    def test_failure_keeps_committed_chunks(self):
+        def handle(log):
+            if log.id == self.logs[3].id:
+                raise RuntimeError("boom")
+            Attendance.objects.create(logdate=log.log_datetime.date() + timedelta(days=log.id))
+            return True
+
+        with self.assertRaises(RuntimeError):
+            process_in_chunks(handle, chunk_size=2)
+
+        # The chunk holding the failing log is rolled back with its checkpoint
+        self.assertEqual(LastLogId.objects.get().last_log_id, self.logs[1].id)
+        self.assertEqual(Attendance.objects.count(), 2)
+
+        self.assertEqual(process_in_chunks(lambda log: True, chunk_size=2), 3)
+        self.assertEqual(LastLogId.objects.get().last_log_id, self.logs[4].id)
+
+    def test_checkpoint_stays_below_waiting_logs_when_ids_are_out_of_time_order(self):
+        Logs.objects.all().delete()
+        start = timezone.make_aware(datetime(2024, 12, 3, 9, 0))
+        # id 30 is an old punch synced late, so it sorts before 10 and 20
+        for log_id, minutes in ((30, 0), (10, 1), (20, 2)):
+            Logs.objects.create(id=log_id, employeeid="CHK002", log_datetime=start + timedelta(minutes=minutes), direction="In Device")
+
+        def handle(log):
+            if log.id == 10:
+                raise RuntimeError("boom")
+            return True
+
+        with self.assertRaises(RuntimeError):
+            process_in_chunks(handle, chunk_size=1)
+        # Committing 30 may not skip 10 and 20, which are still waiting
+        self.assertEqual(LastLogId.objects.get().last_log_id, 9)
+
+        seen = []
+        process_in_chunks(lambda log: seen.append(log.id) or True, chunk_size=1)
+        self.assertEqual(seen, [30, 10, 20])
+        self.assertEqual(LastLogId.objects.get().last_log_id, 30)
+
+    def test_stops_when_another_run_moves_the_checkpoint(self):
+        # Another run committed a chunk after these logs were read at checkpoint 0
+        LastLogId.objects.update(last_log_id=self.logs[1].id)
+
+        with self.assertRaises(CheckpointMoved):
+            process_in_chunks(lambda log: True, logs=self.logs, since=0, chunk_size=1)
+        self.assertEqual(LastLogId.objects.get().last_log_id, self.logs[1].id)
+
+
+def logs_without_distinct_on(processor):
+    """ManDaysAttendanceProcessor._get_new_logs minus DISTINCT ON, for logs without duplicate punches."""
+    return (Logs.objects
+            .filter(id__gt=processor.last_processed_id)
+            .order_by('employeeid', 'log_datetime', 'direction', 'id')
+            .values('id', 'employeeid', 'log_datetime', 'direction'))
+
+
+class ManDaysBatchTests(TestCase):
+    def _run(self, method):
+        """Run one processing method and return the rows it leaves, then roll them back."""
+        savepoint = transaction.savepoint()
+        with patch.object(ManDaysAttendanceProcessor, '_get_new_logs', logs_without_distinct_on):
+            getattr(ManDaysAttendanceProcessor(), method)()
+        rows = list(
+            ManDaysAttendance.objects.order_by('employeeid_id', 'logdate')
+            .values('employeeid_id', 'logdate', 'shift', 'shift_status', 'punches', 'first_in', 'last_out', 'total_hours_worked')
+        )
+        transaction.savepoint_rollback(savepoint)
+        return rows
+
+    def test_batch_matches_per_day_processing(self):
+        night = Employee.objects.create(employee_id="MAN002")
+        Employee.objects.create(employee_id="MAN003")
+        ManDaysAttendance.objects.create(employeeid=night, logdate=datetime(2024, 12, 2).date(), punches=[[8 * 3600, None]])
+        punches = [
+            # Night In closed by the next day's first Out, then a second night shift
+            ("MAN002", 2, 22, "In Device"), ("MAN002", 3, 6, "Out Device"), ("MAN002", 3, 9, "In Device"),
+            ("MAN002", 3, 17, "Out Device"), ("MAN002", 4, 5, "Out Device"), ("MAN002", 4, 22, "In Device"),
+            ("MAN002", 5, 7, "Out Device"),
+            # Day shifts, and an Out with no open In the day before
+            ("MAN003", 2, 9, "In Device"), ("MAN003", 2, 18, "Out Device"), ("MAN003", 3, 7, "Out Device"),
+            ("MAN003", 3, 9, "In Device"), ("MAN003", 3, 13, "Out Device"), ("MAN003", 3, 14, "In Device"),
+            ("UNKNOWN", 3, 9, "In Device"),
+        ]
+        for employee_id, day, hour, direction in punches:
+            Logs.objects.create(employeeid=employee_id, log_datetime=timezone.make_aware(datetime(2024, 12, day, hour, 0)), direction=direction)
+
+        per_day = self._run('process_logs')
+        batch = self._run('process_logs_batch')
+
+        self.assertEqual(batch, per_day)
+        night_days = {row['logdate'].day: row['punches'] for row in batch if row['employeeid_id'] == night.pk}
+        self.assertEqual(night_days[2], [[22 * 3600, 30 * 3600]])
+        self.assertEqual(night_days[4], [[None, 5 * 3600], [22 * 3600, 31 * 3600]])
+
+    @skipUnlessDBFeature('can_distinct_on_fields')
+    def test_batch_pairs_night_punch_with_previous_day(self):
+        employee = Employee.objects.create(employee_id="MAN001")
+        ManDaysAttendance.objects.create(employeeid=employee, logdate=datetime(2024, 12, 2).date(), punches=[[8 * 3600, None]])
+        for day, hour, direction in ((2, 22, "In Device"), (3, 6, "Out Device"), (3, 9, "In Device"), (3, 17, "Out Device")):
+            Logs.objects.create(employeeid="MAN001", log_datetime=timezone.make_aware(datetime(2024, 12, day, hour, 0)), direction=direction)
+
+        ManDaysAttendanceProcessor().process_logs_batch()
+
+        first_day = ManDaysAttendance.objects.get(employeeid=employee, logdate=datetime(2024, 12, 2).date())
+        self.assertEqual(first_day.punches, [[22 * 3600, 30 * 3600]])
+        self.assertEqual((first_day.first_in, first_day.last_out), (time(22, 0), time(6, 0)))
+        self.assertEqual(first_day.total_hours_worked, timedelta(hours=8))
+        second_day = ManDaysAttendance.objects.get(employeeid=employee, logdate=datetime(2024, 12, 3).date())
+        self.assertEqual(second_day.punches, [[None, 6 * 3600], [9 * 3600, 17 * 3600]])
+        self.assertEqual(second_day.total_hours_worked, timedelta(hours=8))
+
+
+class PunchPairsTests(TestCase):
+    def test_day_keeps_every_pair(self):
+        day = datetime(2024, 12, 2)
+        logs = []
+        for hour in range(6, 18):
+            logs.append({'log_datetime': day.replace(hour=hour), 'direction': "In Device"})
+            logs.append({'log_datetime': day.replace(hour=hour, minute=30), 'direction': "Out Device"})
+        processor = ManDaysAttendanceProcessor()
+
+        punches = processor._process_day_logs("MAN001", day.date(), logs)
+        data = processor._attendance_data(1, day.date(), punches)
+
+        self.assertEqual(len(data['punches']), 12)
+        self.assertEqual((data['first_in'], data['last_out']), (time(6, 0), time(17, 30)))
+        self.assertEqual(data['total_hours_worked'], timedelta(hours=6))
+
+    def test_slots_round_trip(self):
+        row = SimpleNamespace(duty_in_1=time(22, 0), duty_out_1=time(6, 0), duty_in_2=None, duty_out_2=time(7, 0))
+        punches = from_slots(row)
+
+        self.assertEqual(punches, [[22 * 3600, 30 * 3600], [None, 7 * 3600]])
+        slots = to_slots(punches)
+        self.assertEqual((slots['duty_out_1'], slots['total_time_1'], slots['duty_in_3']), (time(6, 0), timedelta(hours=8), None))
+
+
+@skipUnless(connection.vendor == 'postgresql', "absentees uses generate_series")
+class AbsenteesCommandTests(TestCase):
+    def test_opens_days_once_from_the_watermark(self):
+        today = timezone.now().date()
+        employee = Employee.objects.create(employee_id="ABS001", first_weekly_off=today.weekday() or 6)
+        Employee.objects.create(employee_id="ABS002", date_of_joining=today)
+        HolidayList.objects.create(holiday_date=today - timedelta(days=1), holiday_name="Holiday")
+        Attendance.objects.create(employeeid=employee, logdate=today - timedelta(days=2), shift_status='P')
+
+        call_command('absentees', days=3, stdout=StringIO())
+
+        statuses = dict(Attendance.objects.filter(employeeid=employee).values_list('logdate', 'shift_status'))
+        self.assertEqual(statuses[today - timedelta(days=2)], 'P')
+        self.assertEqual(statuses[today - timedelta(days=1)], 'PH')
+        self.assertEqual(statuses[today], 'WO' if today.weekday() else 'A')
+        self.assertEqual(Attendance.objects.filter(employeeid__employee_id="ABS002").count(), 1)
+        self.assertEqual(AbsenteeWatermark.objects.get().opened_through, today)
+
+        # A later run only looks at today, which is already open
+        call_command('absentees', stdout=StringIO())
+        self.assertEqual(Attendance.objects.count(), 4)
+
+
+class AbsenceCorrectionTests(TestCase):
+    def mark(self, employee, days_ago, statuses):
+        today = timezone.now().date()
+        for offset, status in enumerate(statuses):
+            Attendance.objects.create(employeeid=employee, logdate=today - timedelta(days=days_ago - offset), shift_status=status)
+
+    def statuses(self, employee):
+        return list(Attendance.objects.filter(employeeid=employee).order_by('logdate').values_list('shift_status', flat=True))
+
+    def test_sandwiched_days_are_marked_absent_once(self):
+        first = Employee.objects.create(employee_id="SAN001")
+        second = Employee.objects.create(employee_id="SAN002")
+        self.mark(first, 8, ['A', 'WO', 'A', 'WO', 'A', 'P', 'WO', 'A'])
+        # A-WO-A split across two employees is not a pattern
+        self.mark(second, 3, ['WO', 'A'])
+
+        call_command('absence_correction', stdout=StringIO())
+
+        self.assertEqual(self.statuses(first), ['A', 'A', 'A', 'A', 'A', 'P', 'WO', 'A'])
+        self.assertEqual(self.statuses(second), ['WO', 'A'])
+        self.assertEqual(AbsenceCorrectionWatermark.objects.get().processed_through, timezone.now().date() - timedelta(days=1))
+
+    def test_later_runs_only_read_recent_days(self):
+        employee = Employee.objects.create(employee_id="SAN003")
+        self.mark(employee, 3, ['A'])
+        call_command('absence_correction', stdout=StringIO())
+
+        # Rows written behind the watermark are left to --full
+        self.mark(employee, 30, ['A', 'PH', 'A'])
+        self.mark(employee, 2, ['WO', 'A'])
+        call_command('absence_correction', patterns='A-WO-A,A-PH-A', stdout=StringIO())
+        self.assertEqual(self.statuses(employee), ['A', 'PH', 'A', 'A', 'A', 'A'])
+
+        call_command('absence_correction', patterns='A-WO-A,A-PH-A', full=True, stdout=StringIO())
+        self.assertEqual(self.statuses(employee), ['A', 'A', 'A', 'A', 'A', 'A'])
+
+    def test_days_follow_the_django_clock(self):
+        employee = Employee.objects.create(employee_id="SAN004")
+        Attendance.objects.create(employeeid=employee, logdate=date(2024, 12, 2), shift_status='A')
+        now = timezone.make_aware(datetime(2024, 12, 5, 23, 30))
+
+        with patch('django.utils.timezone.now', return_value=now):
+            call_command('absence_correction', stdout=StringIO())
+
+        self.assertEqual(AbsenceCorrectionWatermark.objects.get().processed_through, date(2024, 12, 4))
+
+
+class LogsListQueryTests(TestCase):
+    def setUp(self):
+        start = timezone.make_aware(datetime(2024, 12, 2, 9, 0))
+        for i in range(60):
+            employee_id = f"LOG{i % 20:03d}"
+            if i < 20:
+                Employee.objects.create(employee_id=employee_id, employee_name=f"Employee {i}")
+            Logs.objects.create(employeeid=employee_id, log_datetime=start + timedelta(minutes=i), direction="In Device")
+        Logs.objects.create(employeeid="UNKNOWN", log_datetime=start - timedelta(days=1), direction="In Device")
+
+    def query_count(self, page_size):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/logs/', {'page_size': page_size, 'exact': 'true'})
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response.json()['results']
+
+    def test_queries_do_not_grow_with_page_size(self):
+        small, _ = self.query_count(5)
+        large, results = self.query_count(100)
+
+        self.assertEqual(small, large)
+        self.assertEqual(len(results), 61)
+        self.assertEqual(results[0]['employee_name'], "Employee 19")
+        self.assertIsNone(results[-1]['employee_name'])
+
+
+class AttendanceListReadPathTests(TestCase):
+    def setUp(self):
+        company = Company.objects.create(name="Acme")
+        location = Location.objects.create(name="Plant")
+        department = Department.objects.create(name="Ops")
+        for i in range(30):
+            employee = Employee.objects.create(
+                employee_id=f"ROW{i:03d}", employee_name=f"Employee {i}", company=company, location=location,
+                department=department if i % 2 else None, job_type="Staff",
+            )
+            Attendance.objects.create(
+                employeeid=employee, logdate=datetime(2024, 12, 2).date() - timedelta(days=i), shift_status='P',
+                first_logtime=time(9, 0, 5), total_time=timedelta(hours=8, seconds=3),
+            )
+
+    def test_rows_match_the_serializer(self):
+        response = self.client.get('/attendance/', {'page_size': 30})
+        rows = {row['id']: row for row in response.json()['results']}
+
+        request = RequestFactory().get('/attendance/')
+        for attendance in Attendance.objects.all():
+            expected = AttendanceSerializer(attendance, context={'request': request}).data
+            row = rows[attendance.id]
+            self.assertEqual(list(row), list(attendance_rows.ATTENDANCE_ROW_FIELDS))
+            # The serializer leaves out relations that are not set, the fast path returns None
+            self.assertEqual({key: row[key] for key in expected}, dict(expected))
+            self.assertTrue(all(row[key] is None for key in row.keys() - expected.keys()))
+
+    def test_sparse_fields_and_constant_queries(self):
+        with CaptureQueriesContext(connection) as small:
+            self.client.get('/attendance/', {'page_size': 5, 'exact': 'true'})
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get('/attendance/', {'page_size': 30, 'fields': 'logdate,employee_name', 'exact': 'true'})
+
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(response.json()['results'][0], {'employee_name': "Employee 0", 'logdate': '2024-12-02'})
+        self.assertNotIn('company', large.captured_queries[-1]['sql'])
+
+        self.assertEqual(self.client.get('/attendance/', {'fields': 'logdate,salary'}).status_code, 400)
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        company = Company.objects.create(name="Northwind")
+        self.alice = Employee.objects.create(employee_id="SRC100", employee_name="Alice Moreau", company=company)
+        self.bob = Employee.objects.create(employee_id="SRC001", employee_name="Bob SRC001 Smith")
+        Employee.objects.create(employee_id="SRC0011", employee_name="Carol")
+        Attendance.objects.create(employeeid=self.alice, logdate=datetime(2024, 12, 2).date(), shift_status='P',
+                                  first_logtime=time(9, 15, 30), total_time=timedelta(hours=8, minutes=5))
+        Attendance.objects.create(employeeid=self.bob, logdate=datetime(2024, 11, 30).date(), shift_status='A')
+
+    def search_attendance(self, term):
+        return set(Attendance.objects.filter(search.attendance_search_q(term)).values_list('employeeid__employee_id', flat=True))
+
+    def test_attendance_search_uses_structured_matches(self):
+        self.assertEqual(self.search_attendance("north"), {"SRC100"})
+        self.assertEqual(self.search_attendance("2024-12-02"), {"SRC100"})
+        self.assertEqual(self.search_attendance("11-30-2024"), {"SRC001"})
+        self.assertEqual(self.search_attendance("2024-11"), {"SRC001"})
+        self.assertEqual(self.search_attendance("a"), {"SRC100", "SRC001"})
+        # Numbers are no longer matched inside the text of dates and durations
+        self.assertEqual(self.search_attendance("12"), set())
+        # Times and durations are not searched, their columns are unindexed
+        self.assertEqual(self.search_attendance("09:15"), set())
+
+    def test_attendance_search_only_uses_indexed_columns(self):
+        where = str(Attendance.objects.filter(search.attendance_search_q("alice")).query).split('WHERE', 1)[1]
+        self.assertEqual(where.strip(), f'"attendance"."employeeid_id" IN ({self.alice.pk})')
+
+        # A known status code is matched exactly, not case-folded
+        where = str(Attendance.objects.filter(search.attendance_search_q("p")).query).split('WHERE', 1)[1]
+        self.assertIn('"attendance"."shift_status" = P', where)
+        self.assertEqual(self.search_attendance("p"), {"SRC100"})
+
+    def test_employee_search_ranks_exact_ids_first(self):
+        results = list(search.employee_search(Employee.objects.all(), "src001").values_list('employee_id', flat=True))
+        self.assertEqual(results, ["SRC001", "SRC0011"])
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        start = timezone.make_aware(datetime(2024, 12, 2, 9, 0))
+        # Pairs of logs share a timestamp so pages have to break ties on id
+        for i in range(23):
+            Logs.objects.create(employeeid=f"KEY{i:03d}", log_datetime=start + timedelta(minutes=i // 2), direction="In Device")
+        Logs.objects.create(employeeid="KEYNULL", log_datetime=None, direction="In Device")
+
+    def walk(self, url, params, link='next'):
+        pages, query_counts = [], []
+        response = None
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            query_counts.append(len(queries))
+            pages.append(response.json()['results'])
+            url, params = response.json()[link], None
+        return pages, query_counts, response.json()
+
+    def test_log_pages_cover_every_row_once_at_a_constant_cost(self):
+        pages, query_counts, last = self.walk('/logs/', {'pagination': 'cursor', 'page_size': 5})
+
+        ids = [row['id'] for page in pages for row in page]
+        expected = [log.id for log in Logs.objects.filter(log_datetime__isnull=True)]
+        expected += list(Logs.objects.filter(log_datetime__isnull=False).order_by('-log_datetime', '-id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+        self.assertEqual([len(page) for page in pages], [5, 5, 5, 5, 4])
+        self.assertEqual(len(set(query_counts)), 1)
+        self.assertNotIn('count', last)
+
+        # previous links walk the same pages back
+        back, _, first = self.walk(last['previous'], None, link='previous')
+        self.assertEqual(back, pages[-2::-1])
+        self.assertIsNone(first['previous'])
+
+    def test_attendance_pages_follow_the_requested_direction(self):
+        employee = Employee.objects.create(employee_id="KEY001", employee_name="Keyset")
+        for i in range(7):
+            Attendance.objects.create(employeeid=employee, logdate=datetime(2024, 12, 1).date() + timedelta(days=i), shift_status='P')
+
+        pages, _, _ = self.walk('/attendance/', {
+            'pagination': 'cursor', 'page_size': 3, 'fields': 'logdate',
+            'date_from': '12-02-2024', 'date_to': '12-07-2024',
+        })
+        # A date range lists oldest first; the page still reads id and logdate for its cursor
+        self.assertEqual(pages, [
+            [{'logdate': f'2024-12-0{day}'} for day in (2, 3, 4)],
+            [{'logdate': f'2024-12-0{day}'} for day in (5, 6, 7)],
+        ])
+
+        self.assertEqual(self.client.get('/logs/', {'cursor': 'not-a-cursor'}).status_code, 404)
+
+
+class EstimatedCountPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        for i in range(12):
+            Employee.objects.create(employee_id=f"CNT{i:03d}", employee_name=f"Counted {i}", job_status="Active" if i % 3 else "Inactive")
+
+    def get(self, params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/employee/', params)
+        self.assertEqual(response.status_code, 200)
+        counts = [query['sql'] for query in queries.captured_queries if 'COUNT(' in query['sql']]
+        return response.json(), len(counts)
+
+    def test_exact_counts_are_cached_per_filter_set(self):
+        body, counted = self.get({'search': 'Inactive'})
+        self.assertEqual((body['count'], body['count_is_estimate'], counted), (4, False, 1))
+
+        # Another page of the same filters reuses the cached count, other filters count again
+        self.assertEqual(self.get({'search': 'Inactive', 'page_size': 2, 'page': 2})[1], 0)
+        self.assertEqual(self.get({'search': 'Counted 1'})[1], 1)
+
+        body, counted = self.get({'search': 'Inactive', 'exact': 'true'})
+        self.assertEqual((body['count'], counted), (4, 1))
+
+    def test_pages_past_a_stale_cached_count_are_served(self):
+        body = self.get({'search': 'Inactive', 'page_size': 2})[0]
+        self.assertEqual((body['count'], body['next'] is not None), (4, True))
+
+        # The cached count still says two pages; the new row is on a third
+        Employee.objects.create(employee_id="CNT100", employee_name="Late joiner", job_status="Inactive")
+        body, counted = self.get({'search': 'Inactive', 'page_size': 2, 'page': 2})
+        self.assertEqual((body['count'], body['next'] is not None, counted), (5, True, 1))
+        body, counted = self.get({'search': 'Inactive', 'page_size': 2, 'page': 3})
+        self.assertEqual(([row['employee_id'] for row in body['results']], body['next'], counted), (['CNT100'], None, 0))
+
+        # Rows gone since the count was cached are noticed as well
+        Employee.objects.filter(employee_id__in=["CNT100", "CNT000"]).delete()
+        body, counted = self.get({'search': 'Inactive', 'page_size': 2, 'page': 2})
+        self.assertEqual((body['count'], body['next'], counted), (3, None, 1))
+
+    def test_a_cached_empty_result_does_not_hide_new_rows(self):
+        self.assertEqual(self.get({'search': 'Newcomer'})[0]['count'], 0)
+        Employee.objects.create(employee_id="CNT100", employee_name="Newcomer")
+        body, counted = self.get({'search': 'Newcomer'})
+        self.assertEqual((body['count'], len(body['results']), counted), (1, 1, 1))
+
+    def test_next_links_follow_the_rows_not_the_estimate(self):
+        with patch.object(EstimatedCountPaginator, 'estimate_threshold', 1):
+            # Too low: two rows estimated, twelve there
+            with patch.object(EstimatedCountPaginator, 'estimate', return_value=2):
+                body = self.get({'page_size': 5})[0]
+                self.assertEqual((body['count'], body['count_is_estimate']), (2, True))
+                self.assertIsNotNone(body['next'])
+                body = self.get({'page_size': 5, 'page': 3})[0]
+                self.assertEqual((len(body['results']), body['next']), (2, None))
+                self.assertIsNotNone(body['previous'])
+
+            # Too high: a thousand rows estimated, four there
+            with patch.object(EstimatedCountPaginator, 'estimate', return_value=1000):
+                body = self.get({'search': 'Inactive', 'page_size': 2, 'page': 2})[0]
+                self.assertEqual((body['count'], len(body['results']), body['next']), (1000, 2, None))
+
+    @skipUnless(connection.vendor == 'postgresql', 'Row estimates come from the PostgreSQL planner')
+    def test_large_results_use_the_planner_estimate(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {Employee._meta.db_table}')
+        with patch.object(EstimatedCountPaginator, 'estimate_threshold', 1):
+            body, counted = self.get({})
+            self.assertTrue(body['count_is_estimate'])
+            self.assertEqual(counted, 0)
+            body, counted = self.get({'exact': 'true'})
+            self.assertEqual((body['count'], body['count_is_estimate'], counted), (12, False, 1))
+
+
+class AttendanceMetricsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.day = date(2024, 12, 2)
+        rows = [
+            ('P', time(9, 0), time(18, 0), timedelta(minutes=5), None),
+            ('P', time(9, 30), time(9, 30), None, timedelta(hours=1)),
+            ('A', None, None, None, None),
+            ('A', None, None, None, None),
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            for i, (shift_status, first, last, late, overtime) in enumerate(rows):
+                employee = Employee.objects.create(employee_id=f"MET{i:03d}", employee_name=f"Metric {i}")
+                Attendance.objects.create(employeeid=employee, logdate=self.day, shift_status=shift_status,
+                                          first_logtime=first, last_logtime=last, late_entry=late, overtime=overtime)
+                Attendance.objects.create(employeeid=employee, logdate=self.day - timedelta(days=1), shift_status='P')
+
+    def get(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/attendance/metrics/daily/')
+        self.assertEqual(response.status_code, 200)
+        return response.json(), len(queries)
+
+    def test_counts_come_from_one_query_then_the_cache(self):
+        data, queries = self.get()
+        self.assertEqual(queries, 1)
+        self.assertEqual(
+            {key: data[key] for key in ('present_count', 'absent_count', 'late_entry_count', 'overtime_count', 'total_checkin', 'total_checkout')},
+            {'present_count': 2, 'absent_count': 2, 'late_entry_count': 1, 'overtime_count': 1, 'total_checkin': 2, 'total_checkout': 1},
+        )
+        self.assertEqual(self.get(), (data, 0))
+
+        # A write to the latest day drops its cached counts
+        with self.captureOnCommitCallbacks(execute=True):
+            Attendance.objects.filter(shift_status='A', logdate=self.day).first().save()
+        self.assertEqual(self.get()[1], 1)
+
+    def test_writes_to_a_new_day_move_the_counts_forward(self):
+        self.get()
+        employee = Employee.objects.get(employee_id="MET000")
+        with self.captureOnCommitCallbacks(execute=True):
+            Attendance.objects.create(employeeid=employee, logdate=self.day + timedelta(days=1), shift_status='P')
+
+        data, _ = self.get()
+        self.assertEqual((data['present_count'], data['absent_count']), (1, 0))
@@ -2,7 +2,7 @@ from django.urls import re_path
 from resource.views import (
                             EmployeeListCreate, EmployeeRetrieveUpdateDestroy, EmployeeIdGet, 
                             AttendanceListCreate, ExportAttendanceExcelView, AttendanceMetricsAPIView,
-                            AttendanceMonthlyMetricsAPIView, LogsListCreate, LogsRetrieveUpdateDestroy,
+                            AttendanceMonthlyMetricsAPIView, LogsListCreate, LogsBulkCreate, LogsRetrieveUpdateDestroy,
                             EmployeeDropdownList, ExportEmployeeAttendanceExcelView, ExportAllEmployeeAttendanceExcelView, 
                             LastLogIdView, MandaysAttendanceListCreate, ManDaysAttendanceExcelExport, ManDaysWorkedExcelExport,
                             ManDaysMissedPunchExcelExport,ExportLogsExcelView, ResetMandaysView, test_view, ExportMonthlyDutyHourExcel, 
@@ -10,7 +10,8 @@ from resource.views import (
                             ExportMonthlyOvertimeExcel, ExportMonthlyLateEntryExcel, ExportMonthlyEarlyExitExcel, ExportMonthlyAbsentExcel, ExportMonthlyPresentExcel, ProcessLogView,
                             ExportMonthlyOvertimeExcel2, ExportMonthlyLateEntryExcel2, ExportMonthlyEarlyExitExcel2, ExportMonthlyAbsentExcel2, ExportMonthlyPresentExcel2,
                             ExportMonthlyShiftRoasterExcel2, ExportMonthlyPayrollExcel2, ExportMonthlyMusterRoleExcel2, ExportMonthlyOvertimeRoundoffExcel2, OvertimeRoundoffRulesView, 
-                            OvertimeRoundoffRulesUpdate, MonthlyAttendanceView, UpdateAttendanceView, HolidayListCreate, HolidayRetrieveUpdateDestroy)
+                            OvertimeRoundoffRulesUpdate, MonthlyAttendanceView, UpdateAttendanceView, HolidayListCreate, HolidayRetrieveUpdateDestroy,
+                            ExportJobCreate, ExportJobStatus, ExportJobDownload, ProcessorRegistryMetricsView)
 
 from django.conf import settings
 from django.conf.urls.static import static
@@ -32,6 +33,7 @@ urlpatterns = [
     re_path(r'^attendance/metrics/monthly/$', AttendanceMonthlyMetricsAPIView.as_view(), name='attendance-metrics-monthly'),
 
     re_path(r'^logs/$', LogsListCreate.as_view(), name='logs-list-create'),
+    re_path(r'^logs/bulk/$', LogsBulkCreate.as_view(), name='logs-bulk-create'),
     re_path(r'^logs/(?P<id>\d+)/$', LogsRetrieveUpdateDestroy.as_view(), name='logs-list-create'),
 
     re_path(r'^employee/dropdown/$', EmployeeDropdownList.as_view(), name='employee-dropdown-list'),
@@ -62,6 +64,12 @@ urlpatterns = [
 
     re_path(r'^attendance/export/monthly_present/$', ExportMonthlyPresentExcel2.as_view(), name='attendance-export'),
 
+    re_path(r'^attendance/export/jobs/$', ExportJobCreate.as_view(), name='export-job-create'),
+    re_path(r'^attendance/export/jobs/(?P<id>\d+)/$', ExportJobStatus.as_view(), name='export-job-status'),
+    re_path(r'^attendance/export/jobs/(?P<id>\d+)/download/$', ExportJobDownload.as_view(), name='export-job-download'),
+
+    re_path(r'^attendance/processor/metrics/$', ProcessorRegistryMetricsView.as_view(), name='processor-registry-metrics'),
+
     re_path(r'^last_log_id/$', LastLogIdView.as_view(), name='attendance-export'),
 
     re_path(r'^attendance/mandays/$', MandaysAttendanceListCreate.as_view(), name='logs-list-create'),
@@ -3,6 +3,7 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.pagination import PageNumberPagination
+from django.conf import settings
 from django.core.cache import cache
 from django.db.models import Q, F, Count, Sum
 from django.db.models.signals import post_save, post_delete
@@ -12,7 +13,7 @@ from typing import Optional, Tuple, Any, List, Dict
 import pytz
 from dateutil import parser
 from django.utils.timezone import make_aware, timezone, now
-from django.http import HttpResponse
+from django.http import HttpResponse, FileResponse
 from django.shortcuts import get_object_or_404
 from django.views.generic import View
 from django.core.management import execute_from_command_line
@@ -20,6 +21,7 @@ from django.core.management import call_command
 from django.db import transaction
 from apscheduler.schedulers.background import BackgroundScheduler
 from django_apscheduler.jobstores import DjangoJobStore
+import os
 import time
 import json
 from django.http import StreamingHttpResponse
@@ -33,7 +35,7 @@ from openpyxl.styles import Font, PatternFill, Alignment, NamedStyle, Border, Si
 from collections import defaultdict
 from calendar import monthrange
 
-from resource.models import Employee, Attendance, Logs, LastLogId,ManDaysAttendance, ManDaysMissedPunchAttendance, LastLogIdMandays, OvertimeRoundoffRules, ManualLogs, HolidayList
+from resource.models import Employee, Attendance, Logs, LastLogId,ManDaysAttendance, ManDaysMissedPunchAttendance, LastLogIdMandays, OvertimeRoundoffRules, ManualLogs, HolidayList, ExportJob, MonthlyAttendanceSummary
 from resource.scheduler import get_scheduler
 from . import serializers
 from .services import generate_unique_ids, check_employee_id
@@ -41,6 +43,22 @@ from .services import generate_unique_ids, check_employee_id
 from config.models import Company, Location
 
 from resource import attendance5
+from resource import export_jobs
+from resource import log_ingest
+from resource import attendance7
+from resource import attendance_rows
+from resource import daily_metrics
+from resource import search
+from resource.pagination import EstimatedCountPagination, KeysetPaginationMixin
+from resource.processor_registry import get_processor, registry as processor_registry
+from resource.attendance_matrix import AttendanceMonth
+from resource.monthly_summary import ensure_month
+from resource.monthly_totals import MonthlyTotals, SECONDS_FIELDS, format_seconds, format_day_seconds, round_seconds
+from resource.punch_pairs import LEGACY_SLOTS, expand
+from resource.exports import (
+    StreamingExcelWriter, header_formats, XLSX_CONTENT_TYPE, INFO_FORMAT, BORDER_FORMAT, BOLD_FORMAT, TOTAL_FORMAT,
+    PRESENT_TOTAL_FORMAT, ABSENT_TOTAL_FORMAT, STATUS_FORMATS,
+)
 
 class DefaultPagination(PageNumberPagination):
     """
@@ -94,7 +112,7 @@ class EmployeeListCreate(generics.ListCreateAPIView):
     """
     queryset = Employee.objects.all()
     serializer_class = serializers.EmployeeSerializer
-    pagination_class = DefaultPagination
+    pagination_class = EstimatedCountPagination
     filter_backends = (DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter)
     filter_fields = '__all__'
     search_fields = ['employee_id', 'employee_name', 'job_status']
@@ -116,18 +134,9 @@ class EmployeeListCreate(generics.ListCreateAPIView):
 
     def search_queryset(self, queryset, search_query):
         """
-        Filter the queryset based on the search query.
-        """
-        return queryset.filter(
-            Q(employee_id__icontains=search_query) |
-            Q(employee_name__icontains=search_query) |
-            Q(email__icontains=search_query) |
-            # Q(phone_no__icontains=search_query) |
-            # Q(designation_name__icontains=search_query) |
-            # Q(department_name__icontains=search_query) |
-            # Q(location_name__icontains=search_query) |
-            Q(job_status__icontains=search_query)
-        )
+        Filter the queryset based on the search query, best matches first.
+        """
+        return search.employee_search(queryset, search_query)
 
     def get(self, request, *args, **kwargs):
         """
@@ -167,13 +176,15 @@ class EmployeeRetrieveUpdateDestroy(generics.RetrieveUpdateDestroyAPIView):
         serializer.save()
 
 
-class AttendanceListCreate(generics.ListCreateAPIView):
+class AttendanceListCreate(KeysetPaginationMixin, generics.ListCreateAPIView):
     """
     API view for listing and creating attendance records.
+    ?pagination=cursor pages on (logdate, id) instead of page numbers.
     """
     # queryset = Attendance.objects.all()
     serializer_class = serializers.AttendanceSerializer
-    pagination_class = DefaultPagination
+    pagination_class = EstimatedCountPagination
+    keyset_field = 'logdate'
     filter_backends = (DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter)
     filter_fields = '__all__'
     search_fields = ['employee_id', 'employee_name', 'device_enroll_id', 'logdate', 'shift', 
@@ -209,20 +220,7 @@ class AttendanceListCreate(generics.ListCreateAPIView):
         queryset = Attendance.objects.order_by('-logdate').all()
 
         if search_query:
-            queryset = queryset.filter(
-                Q(employeeid__employee_name__icontains=search_query) |
-                Q(employeeid__device_enroll_id__icontains=search_query) |
-                Q(logdate__icontains=search_query) |
-                Q(shift_status__iexact=search_query) |
-                Q(first_logtime__icontains=search_query) |
-                Q(last_logtime__icontains=search_query) |
-                Q(total_time__icontains=search_query) |
-                Q(late_entry__icontains=search_query) |
-                Q(employeeid__company__name__icontains=search_query) |
-                Q(employeeid__location__name__icontains=search_query) |
-                Q(employeeid__department__name__icontains=search_query) |
-                Q(employeeid__designation__name__icontains=search_query) 
-            )
+            queryset = queryset.filter(search.attendance_search_q(search_query))
 
         if date_query:
             try:
@@ -290,15 +288,22 @@ class AttendanceListCreate(generics.ListCreateAPIView):
     def get(self, request, *args, **kwargs):
         """
         Get the list of attendance records with optional search query.
+
+        Each page is read with one joined values() query and mapped straight to
+        dicts shaped like AttendanceSerializer output. ?fields=employee_id_id,logdate,...
+        returns only those keys and joins only the tables they need.
         """
-        queryset = self.get_queryset()
+        try:
+            keys = attendance_rows.parse_fields(request.GET.get('fields'))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = attendance_rows.select_rows(self.get_queryset(), keys)
         page = self.paginate_queryset(queryset)
         if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+            return self.get_paginated_response(attendance_rows.format_rows(page, keys, request))
 
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response(attendance_rows.format_rows(queryset, keys, request), status=status.HTTP_200_OK)
 
 # @receiver([post_save, post_delete], sender=Attendance)
 # def invalidate_and_reload_attendance_cache(sender, instance, **kwargs):
@@ -539,76 +544,35 @@ class ExportAttendanceExcelView(View):
         
 class AttendanceMetricsAPIView(generics.ListAPIView):
     def get_queryset(self):
-        # Get the latest log date
-        # latest_logdate = datetime.strptime('2023-08-03', '%Y-%m-%d').date()
-        latest_logdate = Attendance.objects.latest('logdate').logdate
-        # print(latest_logdate)
         # Filter the queryset to include only records with the latest log date
-        queryset = Attendance.objects.filter(logdate=latest_logdate)
-        return queryset
+        return daily_metrics.latest_day_queryset()
 
     def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        
-        # Counting logic
-        present_count = queryset.filter(shift_status='P').count()
-        absent_count = queryset.filter(shift_status='A').count()
-        late_entry_count = queryset.exclude(late_entry__isnull=True).count()
-        early_exit_count = queryset.exclude(early_exit__isnull=True).count()
-        overtime_count = queryset.exclude(overtime__isnull=True).count()
-
-        latest_logdate = queryset.latest('logdate').logdate
-
-        # counting present count since last hour(current hour - 1 hour)
-        present_count_last_hour = queryset.filter(shift_status='P', first_logtime__gte=now()-timedelta(hours=1)).count()
-
-        # Calculate the absent count for the previous week
-        previous_week_absent_count = queryset.filter(shift_status='A', logdate__range=[latest_logdate - timedelta(days=7), latest_logdate - timedelta(days=1)]).count()
-
-        # Calculate the absent count for the current week
-        current_week_absent_count = queryset.filter(shift_status='A', logdate__range=[latest_logdate - timedelta(days=1), latest_logdate]).count()
-
-        # Calculate the percentage increase in absentees compared to last week
-        if previous_week_absent_count != 0:
-            absent_percentage_increase = ((current_week_absent_count - previous_week_absent_count) / previous_week_absent_count) * 100
-        else:
-            absent_percentage_increase = 0
-
-        # Counting employees who arrive late frequently
-        late_arrival_threshold = 5  # Define the threshold for frequent late arrivals
-        frequent_late_arrivals = queryset.filter(late_entry__isnull=False).annotate(late_count=Count('late_entry')).filter(late_count__gte=late_arrival_threshold).count()
-
-        # Counting employees who arrived late today
-        today = date.today()
-        late_today = queryset.filter(late_entry__isnull=False, logdate=today).count()
-        
-        late_arrival_threshold = 5  # Define the threshold for frequent late arrivals
-        frequent_late_arrivals = queryset.filter(late_entry__isnull=False).annotate(late_count=Count('late_entry')).filter(late_count__gte=late_arrival_threshold).count()
+        # Every count comes from one aggregate over the latest day, cached per date
+        counts = daily_metrics.latest_day_counts()
 
         current_hour = datetime.now().hour
         # Counting live headcount 
         if 5 <= current_hour <= 17:
-            live_headcount = queryset.filter(first_logtime=F('last_logtime')).count()
+            live_headcount = counts['single_punch_count']
         else:
-            live_headcount = 0    
-        # counting total checkin whose first logtime is not null
-        total_checkin = queryset.exclude(first_logtime__isnull=True).count()
-        # counting total checkout whose last logtime is not null and not equal to first logtime
-        total_checkout = queryset.exclude(last_logtime__isnull=True).exclude(last_logtime=F('first_logtime')).count()
-        
-        # Constructing response data
+            live_headcount = 0
+
+        # Constructing response data. The week-over-week absentee change and the
+        # frequent late arrivals were computed over the latest day's rows alone,
+        # where they always came out as 0, and are kept at that.
         data = {
-            'present_count': present_count,
-            'absent_count': absent_count,
-            'late_entry_count': late_entry_count,
-            'early_exit_count': early_exit_count,
-            'overtime_count': overtime_count,
+            'present_count': counts['present_count'],
+            'absent_count': counts['absent_count'],
+            'late_entry_count': counts['late_entry_count'],
+            'early_exit_count': counts['early_exit_count'],
+            'overtime_count': counts['overtime_count'],
             'live_headcount': live_headcount,
-            'total_checkin': total_checkin,
-            'total_checkout': total_checkout,
-            'present_count_last_hour': present_count_last_hour,
-            'absent_percentage_increase': absent_percentage_increase,
-            'frequent_late_arrivals': frequent_late_arrivals,
+            'total_checkin': counts['total_checkin'],
+            'total_checkout': counts['total_checkout'],
+            'present_count_last_hour': counts['present_count_last_hour'],
+            'absent_percentage_increase': 0,
+            'frequent_late_arrivals': 0,
         }
         
         return Response(data)
@@ -659,12 +623,14 @@ class AttendanceMonthlyMetricsAPIView(APIView):
         
         return Response(response_data, status=status.HTTP_200_OK)
     
-class LogsListCreate(generics.ListCreateAPIView):
+class LogsListCreate(KeysetPaginationMixin, generics.ListCreateAPIView):
     """
     API view for listing and creating logs with improved filtering.
+    ?pagination=cursor pages on (log_datetime, id) instead of page numbers.
     """
     serializer_class = serializers.LogsSerializer
-    pagination_class = DefaultPagination
+    pagination_class = EstimatedCountPagination
+    keyset_field = 'log_datetime'
     filter_backends = (DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter)
     filter_fields = '__all__'
     search_fields = ['employeeid', 'shortname']
@@ -749,6 +715,39 @@ class LogsListCreate(generics.ListCreateAPIView):
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)        
 
+class LogsBulkCreate(APIView):
+    """
+    API view for ingesting many logs in one request, as a JSON array or as
+    NDJSON (Content-Type: application/x-ndjson, one log per line).
+    Returns how many logs were accepted, skipped as duplicates or rejected.
+
+    The body may be up to LOGS_BULK_MAX_BODY_SIZE bytes (20 MB by default,
+    about 130,000 punches) instead of Django's 2.5 MB DATA_UPLOAD_MAX_MEMORY_SIZE,
+    so a 50,000-punch backlog fits in one call. Larger bodies get a 413.
+    """
+    def post(self, request, *args, **kwargs):
+        max_size = settings.LOGS_BULK_MAX_BODY_SIZE
+        too_large = Response({'error': f'Request body exceeds {max_size} bytes, send the logs in smaller batches.'},
+                             status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        try:
+            if int(request.META.get('CONTENT_LENGTH') or 0) > max_size:
+                return too_large
+        except ValueError:
+            pass
+
+        # Read the stream directly: request.body would apply DATA_UPLOAD_MAX_MEMORY_SIZE
+        body = request.read(max_size + 1)
+        if len(body) > max_size:
+            return too_large
+
+        try:
+            rows = log_ingest.parse_punches(body, request.content_type)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        result = log_ingest.ingest_punches(rows)
+        return Response(result, status=status.HTTP_200_OK)
+
 class LogsRetrieveUpdateDestroy(generics.RetrieveUpdateDestroyAPIView):
     """
     API view for retrieving, updating, and deleting a log.
@@ -1935,7 +1934,7 @@ class MandaysAttendanceListCreate(generics.ListCreateAPIView):
     """
     queryset = ManDaysAttendance.objects.order_by('-logdate').all()
     serializer_class = serializers.ManDaysAttendanceSerializer
-    pagination_class = DefaultPagination
+    pagination_class = EstimatedCountPagination
     filter_backends = (DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter)
     filter_fields = '__all__'
     search_fields = ['employee_id', 'employee_name', 'device_enroll_id', 'logdate', 'shift', 
@@ -2032,15 +2031,17 @@ class ManDaysAttendanceExcelExport(View):
     HEADERS = (
         "Employee ID", "Device Enroll ID", "Employee Name", "Company", "Location", 
         "Department", "Designation", "Employee Type",
-        "Log Date", "Duty In 1", "Duty Out 1", "Total Hours", "Duty In 2", 
-        "Duty Out 2", "Total Hours", "Duty In 3", "Duty Out 3", "Total Hours",
-        "Duty In 4", "Duty Out 4", "Total Hours", "Duty In 5", "Duty Out 5",
-        "Total Hours", "Duty In 6", "Duty Out 6", "Total Hours", "Duty In 7",
-        "Duty Out 7", "Total Hours", "Duty In 8", "Duty Out 8", "Total Hours",
-        "Duty In 9", "Duty Out 9", "Total Hours", "Duty In 10", "Duty Out 10",
-        "Mandays Worked Hours"
+        "Log Date",
     )
 
+    def get_headers(self, pair_count):
+        """Fixed headers, then Duty In/Duty Out/Total Hours for every pair column"""
+        headers = list(self.HEADERS)
+        for i in range(1, pair_count + 1):
+            headers.extend((f"Duty In {i}", f"Duty Out {i}", "Total Hours"))
+        headers.append("Mandays Worked Hours")
+        return headers
+
     def get_queryset(self, request):
         """Get filtered queryset with all related fields"""
         employee_id = request.GET.get('employee_id')
@@ -2117,7 +2118,7 @@ class ManDaysAttendanceExcelExport(View):
         """Format timedelta or return empty string"""
         return td if td and td != timedelta(0) else ""
 
-    def setup_worksheet(self, wb):
+    def setup_worksheet(self, wb, pair_count=LEGACY_SLOTS):
         """Setup worksheet with headers and styling"""
         ws = wb.active
         ws.title = "Mandays Attendance Report"
@@ -2127,7 +2128,7 @@ class ManDaysAttendanceExcelExport(View):
         header_fill = PatternFill(start_color="D3D3D3", end_color="D3D3D3", fill_type="solid")
         
         # Write headers
-        for col_num, header in enumerate(self.HEADERS, 1):
+        for col_num, header in enumerate(self.get_headers(pair_count), 1):
             cell = ws.cell(row=1, column=col_num, value=header)
             cell.font = header_font
             cell.fill = header_fill
@@ -2148,50 +2149,33 @@ class ManDaysAttendanceExcelExport(View):
             record.employeeid.designation.name if record.employeeid.designation else "",
             record.employeeid.job_type if record.employeeid.job_type else "",
             record.logdate,
-            record.duty_in_1,
-            record.duty_out_1,
-            self.format_timedelta(record.total_time_1),
-            record.duty_in_2,
-            record.duty_out_2,
-            self.format_timedelta(record.total_time_2),
-            record.duty_in_3,
-            record.duty_out_3,
-            self.format_timedelta(record.total_time_3),
-            record.duty_in_4,
-            record.duty_out_4,
-            self.format_timedelta(record.total_time_4),
-            record.duty_in_5,
-            record.duty_out_5,
-            self.format_timedelta(record.total_time_5),
-            record.duty_in_6,
-            record.duty_out_6,
-            self.format_timedelta(record.total_time_6),
-            record.duty_in_7,
-            record.duty_out_7,
-            self.format_timedelta(record.total_time_7),
-            record.duty_in_8,
-            record.duty_out_8,
-            self.format_timedelta(record.total_time_8),
-            record.duty_in_9,
-            record.duty_out_9,
-            self.format_timedelta(record.total_time_9),
-            record.duty_in_10,
-            record.duty_out_10,
-            self.format_timedelta(record.total_hours_worked)
+        ) + tuple(
+            value
+            for duty_in, duty_out, total_time in expand(record.punches)
+            for value in (duty_in, duty_out, self.format_timedelta(total_time))
         )
 
+    def pad_record_data(self, record_data, pair_count):
+        """Blank the pair columns a record does not use, then add its worked hours"""
+        record, values = record_data
+        padding = len(self.HEADERS) + 3 * pair_count - len(values)
+        return values + (None,) * padding + (self.format_timedelta(record.total_hours_worked),)
+
     def get(self, request, *args, **kwargs):
         # Get filtered queryset
         queryset = self.get_queryset(request)
         
         # Convert queryset to tuple of tuples for better performance
         records = tuple(
-            self.get_record_data(record) for record in queryset
+            (record, self.get_record_data(record)) for record in queryset
         )
+        # One set of pair columns per pair of the busiest day, never fewer than before
+        pair_count = max((len(record.punches) for record, _ in records), default=0)
+        pair_count = max(pair_count, LEGACY_SLOTS)
 
         # Create workbook and setup worksheet
         wb = openpyxl.Workbook()
-        ws = self.setup_worksheet(wb)
+        ws = self.setup_worksheet(wb, pair_count)
         
         # Cache alignment style
         center_alignment = Alignment(horizontal='center')
@@ -2206,7 +2190,7 @@ class ManDaysAttendanceExcelExport(View):
 
         # Write data efficiently
         for row_num, record_data in enumerate(records, 2):
-            for col_num, value in enumerate(record_data, 1):
+            for col_num, value in enumerate(self.pad_record_data(record_data, pair_count), 1):
                 cell = ws.cell(row=row_num, column=col_num, value=value)
                 cell.alignment = center_alignment
                 cell.border = thin_border
@@ -2227,24 +2211,7 @@ class ManDaysWorkedExcelExport(View):
 
     def get_duty_times(self, record):
         """Helper method to get first duty in and last duty out times."""
-        # Get all duty in times
-        duty_in_times = [
-            getattr(record, f'duty_in_{i}')
-            for i in range(1, 11)
-            if getattr(record, f'duty_in_{i}') is not None
-        ]
-        
-        # Get all duty out times
-        duty_out_times = [
-            getattr(record, f'duty_out_{i}')
-            for i in range(1, 11)
-            if getattr(record, f'duty_out_{i}') is not None
-        ]
-        
-        first_duty_in = duty_in_times[0] if duty_in_times else None
-        last_duty_out = duty_out_times[-1] if duty_out_times else None
-        
-        return first_duty_in, last_duty_out
+        return record.first_in, record.last_out
 
     def get(self, request, *args, **kwargs):
         employee_id = request.GET.get('employee_id')
@@ -2380,10 +2347,12 @@ class ManDaysMissedPunchExcelExport(View):
         ws = wb.active
         ws.title = "Mandays Attendance Report"
 
-        headers = ["Employee ID", "Device Enroll ID", "Employee Name", "Company", "Location", "Log Date", "Duty In 1", "Duty Out 1", 
-                   "Duty In 2", "Duty Out 2", "Duty In 3", "Duty Out 3", "Duty In 4", "Duty Out 4", 
-                   "Duty In 5", "Duty Out 5", "Duty In 6", "Duty Out 6", "Duty In 7", "Duty Out 7", 
-                   "Duty In 8", "Duty Out 8", "Duty In 9", "Duty Out 9", "Duty In 10", "Duty Out 10"]
+        records = list(queryset)
+        pair_count = max(max((len(record.punches) for record in records), default=0), LEGACY_SLOTS)
+
+        headers = ["Employee ID", "Device Enroll ID", "Employee Name", "Company", "Location", "Log Date"]
+        for i in range(1, pair_count + 1):
+            headers.extend((f"Duty In {i}", f"Duty Out {i}"))
         
         row_num = 1
 
@@ -2398,33 +2367,16 @@ class ManDaysMissedPunchExcelExport(View):
             ws.column_dimensions[ws.cell(row=row_num, column=col_num).column_letter].width = len(header) + 7
         ws.freeze_panes = 'A2'
 
-        for row_num, record in enumerate(queryset, 2):
+        for row_num, record in enumerate(records, 2):
             ws.cell(row=row_num, column=1, value=record.employeeid.employee_id)
             ws.cell(row=row_num, column=2, value=record.employeeid.device_enroll_id)
             ws.cell(row=row_num, column=3, value=record.employeeid.employee_name)
             ws.cell(row=row_num, column=4, value=record.employeeid.company.name)
             ws.cell(row=row_num, column=5, value=record.employeeid.location.name)
             ws.cell(row=row_num, column=6, value=record.logdate)
-            ws.cell(row=row_num, column=7, value=record.duty_in_1)
-            ws.cell(row=row_num, column=8, value=record.duty_out_1)
-            ws.cell(row=row_num, column=10, value=record.duty_in_2)
-            ws.cell(row=row_num, column=11, value=record.duty_out_2)
-            ws.cell(row=row_num, column=13, value=record.duty_in_3)
-            ws.cell(row=row_num, column=14, value=record.duty_out_3)
-            ws.cell(row=row_num, column=16, value=record.duty_in_4)
-            ws.cell(row=row_num, column=17, value=record.duty_out_4)
-            ws.cell(row=row_num, column=19, value=record.duty_in_5)
-            ws.cell(row=row_num, column=20, value=record.duty_out_5)
-            ws.cell(row=row_num, column=22, value=record.duty_in_6)
-            ws.cell(row=row_num, column=23, value=record.duty_out_6)
-            ws.cell(row=row_num, column=25, value=record.duty_in_7)
-            ws.cell(row=row_num, column=26, value=record.duty_out_7)
-            ws.cell(row=row_num, column=28, value=record.duty_in_8)
-            ws.cell(row=row_num, column=29, value=record.duty_out_8)
-            ws.cell(row=row_num, column=31, value=record.duty_in_9)
-            ws.cell(row=row_num, column=32, value=record.duty_out_9)
-            ws.cell(row=row_num, column=34, value=record.duty_in_10)
-            ws.cell(row=row_num, column=35, value=record.duty_out_10)
+            for i, (duty_in, duty_out, _) in enumerate(expand(record.punches)):
+                ws.cell(row=row_num, column=7 + 2 * i, value=duty_in)
+                ws.cell(row=row_num, column=8 + 2 * i, value=duty_out)
 
             cell.alignment = Alignment(horizontal='center')
 
@@ -2676,8 +2628,8 @@ class ResetMandaysView(generics.GenericAPIView):
                 deleted_count, was_full_cleanup = self.cleanup_old_data(cutoff_date)
                 last_log_id = self.update_last_log_id(cutoff_date, was_full_cleanup)
                 
-                # Run mandays command
-                call_command('mandays')
+                # Run mandays command; a reset replays up to 100 days of logs
+                call_command('mandays', batch=True)
                 
                 response_data = {
                     'message': 'Successfully reset mandays data and restarted processing',
@@ -2912,9 +2864,10 @@ class ExportMonthlyDutyHourExcel(View):
         days = [str(day) for day in range(1, num_days + 1)]
         shifts, statuses, first_logs, last_logs, total_hours = ([] for _ in range(5))
 
+        month_records = AttendanceMonth(records, num_days).records
+
         for day in range(1, num_days + 1):
-            log_date = first_day.replace(day=day)
-            record = next((rec for rec in records if rec.logdate == log_date), None)
+            record = month_records[day - 1]
             if record:
                 shifts.append(record.shift or "")
                 statuses.append(record.shift_status or "")
@@ -3108,9 +3061,10 @@ class ExportMonthlyMusterRoleExcel(View):
         absent_total = 0
         present_total = 0
 
+        month_records = AttendanceMonth(records, num_days).records
+
         for day in range(1, num_days + 1):
-            log_date = first_day.replace(day=day)
-            record = next((rec for rec in records if rec.logdate == log_date), None)
+            record = month_records[day - 1]
             if record:
                 statuses.append(record.shift_status or "")
             else:
@@ -3136,26 +3090,6 @@ class ExportMonthlyMusterRoleExcel2(View):
     View to generate and export an Excel file containing monthly muster role details for all employees.
     """
 
-    # Predefined styles for shift statuses (keeping the same as original)
-    SHIFT_STATUS_STYLES = {
-        'P': NamedStyle(name='status-P', fill=PatternFill(start_color="C8E6C9", end_color="C8E6C9", fill_type="solid"), font=Font(color="256029", bold=True), border=Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin')), alignment=Alignment(horizontal='center')),
-        'WW': NamedStyle(name='status-WW', fill=PatternFill(start_color="C8E6C9", end_color="C8E6C9", fill_type="solid"), font=Font(color="256029", bold=True), border=Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin')), alignment=Alignment(horizontal='center')),
-        'A': NamedStyle(name='status-A', fill=PatternFill(start_color="FFCDD2", end_color="FFCDD2", fill_type="solid"), font=Font(color="C63737", bold=True), border=Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin')), alignment=Alignment(horizontal='center')),
-        'HD': NamedStyle(name='status-HD', fill=PatternFill(start_color="FFD54F", end_color="FFD54F", fill_type="solid"), font=Font(color="8A5340", bold=True), border=Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin')), alignment=Alignment(horizontal='center')),
-        'WO': NamedStyle(name='status-WO', fill=PatternFill(start_color="FFD54F", end_color="FFD54F", fill_type="solid"), font=Font(color="8A5340", bold=True), border=Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin')), alignment=Alignment(horizontal='center')),
-        'PH': NamedStyle(name='status-PH', fill=PatternFill(start_color="FFD54F", end_color="FFD54F", fill_type="solid"), font=Font(color="8A5340", bold=True), border=Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin')), alignment=Alignment(horizontal='center')),
-        'FH': NamedStyle(name='status-FH', fill=PatternFill(start_color="FFD54F", end_color="FFD54F", fill_type="solid"), font=Font(color="8A5340", bold=True), border=Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin')), alignment=Alignment(horizontal='center')),
-        'MP': NamedStyle(name='status-MP', fill=PatternFill(start_color="FFF4E6", end_color="FFF4E6", fill_type="solid"), font=Font(color="D84315", bold=True), border=Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin')), alignment=Alignment(horizontal='center')),
-        'IH': NamedStyle(name='status-IH', fill=PatternFill(start_color="FFF3CD", end_color="FFF3CD", fill_type="solid"), font=Font(color="856404", bold=True), border=Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin')), alignment=Alignment(horizontal='center')),
-    }
-
-    THIN_BORDER = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
-
     def get(self, request, *args, **kwargs):
         """
         Handle GET request to generate the Excel file.
@@ -3174,10 +3108,8 @@ class ExportMonthlyMusterRoleExcel2(View):
         # Fetch attendance and employee data
         attendance_data, employee_data = self.fetch_data(month, year)
 
-        # Initialize the workbook
-        wb = Workbook()
-        ws = wb.active
-        ws.title = f"MusterRole_{month}_{year}"
+        # Initialize the streaming workbook
+        writer = StreamingExcelWriter(f"MusterRole_{month}_{year}")
 
         first_day_of_month = date(year, month, 1)
         last_day_of_month = self.get_last_day_of_month(first_day_of_month)
@@ -3185,37 +3117,21 @@ class ExportMonthlyMusterRoleExcel2(View):
 
         # Add main header
         main_header = f"Monthly Muster Role Register for the Period: {first_day_of_month} to {last_day_of_month} | Printed: {datetime.now().strftime('%d-%m-%Y')}"
-        ws.merge_cells(start_row=1, start_column=1, end_row=1, end_column=num_days + 6)
-        cell = ws.cell(row=1, column=1, value=main_header)
-        cell.font = Font(bold=True)
+        writer.merge_title(main_header, num_days + 6)
 
         # Add column headers
         header_labels = ["EMP ID", "EMP Name", "Company", "Location", "Department", "Designation", "Type", "Days"]
         days_header = [str(day) for day in range(1, num_days + 1)]
         total_header = ["Present", "Absent"]
         full_header = header_labels + days_header + total_header
-        ws.append(full_header)
-
-        # Style header row
-        for col in range(1, len(full_header) + 1):
-            cell = ws.cell(row=2, column=col)
-            cell.font = Font(bold=True)
-            cell.fill = PatternFill(start_color="E3F2FD", end_color="E3F2FD", fill_type="solid")
-            cell.border = self.THIN_BORDER
-
-            if col >= 9:  # Style days and total columns
-                cell.font = Font(bold=True)
-                cell.fill = PatternFill(start_color="F5F5F5", end_color="F5F5F5", fill_type="solid")
+        writer.write_row(full_header, header_formats(len(full_header)))
 
         # Add employee data rows
-        row_num = 3  # Start from row 3 after headers
-        total_present = 0
-        total_absent = 0
-
         for employee_id, details in employee_data.items():
-            records = attendance_data.get(employee_id, [])
-            if records:
-                days, statuses, absent_total, present_total = self.process_records(records, first_day_of_month, num_days)
+            if employee_id in attendance_data:
+                statuses = attendance_data.statuses(employee_id)
+                present_total = attendance_data.value('present_days_with_ww', employee_id)
+                absent_total = attendance_data.value('absent_days', employee_id)
                 data_row = [
                     details['employee_id'],
                     details['employee_name'],
@@ -3226,67 +3142,28 @@ class ExportMonthlyMusterRoleExcel2(View):
                     details['job_type'],
                     "Status",
                 ] + statuses + [present_total, absent_total]
-                ws.append(data_row)
-
-                # Apply styling to data row
-                for col in range(1, len(data_row) + 1):
-                    cell = ws.cell(row=row_num, column=col)
-                    cell.border = self.THIN_BORDER
-                    
-                    if col <= 8:  # Style employee info columns
-                        cell.font = Font(bold=True)
-                        cell.fill = PatternFill(start_color="E3F2FD", end_color="E3F2FD", fill_type="solid")
-                    
-                    if col >= 9 and col < len(data_row) - 1:  # Style status cells
-                        status = data_row[col - 1]
-                        style = self.SHIFT_STATUS_STYLES.get(status)
-                        if style:
-                            cell.style = style
-                    
-                    # Style Present total column
-                    if col == len(data_row) - 1:
-                        cell.font = Font(bold=True)
-                        cell.fill = PatternFill(start_color="C8E6C9", end_color="C8E6C9", fill_type="solid")
-                    
-                    # Style Absent total column
-                    if col == len(data_row):
-                        cell.font = Font(bold=True)
-                        cell.fill = PatternFill(start_color="FFCDD2", end_color="FFCDD2", fill_type="solid")
-
-                row_num += 1
-                total_present += present_total
-                total_absent += absent_total
+                formats = (
+                    [INFO_FORMAT] * 8
+                    + [STATUS_FORMATS.get(status, BORDER_FORMAT) for status in statuses]
+                    + [PRESENT_TOTAL_FORMAT, ABSENT_TOTAL_FORMAT]
+                )
+                writer.write_row(data_row, formats)
 
         # Add grand total row
-        grand_total_row = [""] * (len(full_header) - 3) + ["Grand Total", total_present, total_absent]
-        ws.append(grand_total_row)
+        grand_total_row = [""] * (len(full_header) - 3) + ["Grand Total", attendance_data.grand('present_days_with_ww'), attendance_data.grand('absent_days')]
+        writer.write_row(grand_total_row, [None] * (len(full_header) - 3) + [TOTAL_FORMAT] * 3)
 
-        # Style grand total row
-        for col in range(len(full_header) - 2, len(full_header) + 1):
-            cell = ws.cell(row=row_num, column=col)
-            cell.font = Font(bold=True)
-            cell.fill = PatternFill(start_color="FFD700", end_color="FFD700", fill_type="solid")
-            cell.border = self.THIN_BORDER
-
-        # Adjust column widths
-        self.adjust_column_widths(ws)
-
-        # Generate response
+        # Stream the finished workbook back
         month_name = first_day_of_month.strftime('%B')
-        response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-        response['Content-Disposition'] = f'attachment; filename=Employee_Muster_Role_{month_name}_{year}.xlsx'
-        wb.save(response)
-        return response
+        return writer.response(f'Employee_Muster_Role_{month_name}_{year}.xlsx')
 
     def fetch_data(self, month, year):
         """
         Fetch attendance and employee data to minimize database queries.
         """
-        # Fetch attendance records
-        attendance_records = Attendance.objects.filter(logdate__year=year, logdate__month=month).select_related('employeeid')
-        attendance_data = defaultdict(list)
-        for record in attendance_records:
-            attendance_data[record.employeeid_id].append(record)
+        # Load the month's summaries as columns, one entry per employee
+        ensure_month(year, month)
+        attendance_data = MonthlyTotals(year, month)
 
         # Fetch employee data
         employees = Employee.objects.all().select_related('department', 'designation', 'location', 'company')
@@ -3314,64 +3191,6 @@ class ExportMonthlyMusterRoleExcel2(View):
         next_month = first_day.replace(day=28) + timedelta(days=4)
         return next_month - timedelta(days=next_month.day)
 
-    def adjust_column_widths(self, ws):
-        """
-        Adjust column widths based on the maximum content length in each column,
-        skipping merged cells and applying a minimum and maximum width limit.
-        """
-        max_width = {}
-        max_allowed_width = 30  # Set a maximum width limit for columns
-        min_allowed_width = 10  # Set a minimum width limit for columns
-
-        for row in ws.iter_rows():
-            for cell in row:
-                # Skip merged cells as they don't have column_letter
-                if isinstance(cell, MergedCell):
-                    continue
-                column = cell.column_letter
-                value_length = len(str(cell.value)) if cell.value is not None else 0
-                if column not in max_width or value_length > max_width[column]:
-                    max_width[column] = min(value_length, max_allowed_width)  # Apply max width limit
-
-        for col_letter, width in max_width.items():
-            # Apply minimum and maximum width, adding padding
-            adjusted_width = max(min_allowed_width, width + 2)
-            ws.column_dimensions[col_letter].width = adjusted_width
-
-    # Keep existing fetch_data, get_last_day_of_month, adjust_column_widths methods as they are
-
-    def process_records(self, records, first_day, num_days):
-        """
-        Process attendance records for each day of the month.
-        """
-        days = [str(day) for day in range(1, num_days + 1)]
-        statuses = []
-        absent_total = 0
-        present_total = 0
-
-        for day in range(1, num_days + 1):
-            log_date = first_day.replace(day=day)
-            record = next((rec for rec in records if rec.logdate == log_date), None)
-            if record:
-                statuses.append(record.shift_status or "")
-            else:
-                statuses.append("")
-        
-        for status_code in statuses:
-            if status_code == 'A':
-                absent_total += 1
-            elif status_code == 'HD':
-                present_total += 0.5
-                absent_total += 0.5
-            elif status_code == 'P':
-                present_total += 1
-            elif status_code == 'WW':
-                present_total += 1
-            elif status_code == 'IH':
-                present_total += 1
-
-        return days, statuses, absent_total, present_total
-
 class ExportMonthlyPayrollExcel(View):
     """
     View to generate and export an Excel file containing monthly duty hours and attendance details for all employees.
@@ -3563,9 +3382,10 @@ class ExportMonthlyPayrollExcel(View):
         total_early_exit = timedelta(0)
         total_overtime = timedelta(0)
 
+        month_records = AttendanceMonth(records, num_days).records
+
         for day in range(1, num_days + 1):
-            log_date = first_day.replace(day=day)
-            record = next((rec for rec in records if rec.logdate == log_date), None)
+            record = month_records[day - 1]
             if record:
                 statuses.append(record.shift_status or "")
             else:
@@ -3607,26 +3427,8 @@ class ExportMonthlyPayrollExcel2(View):
     View to generate and export an Excel file containing monthly duty hours and attendance details for all employees.
     """
 
-    # Predefined styles for shift statuses
-    SHIFT_STATUS_STYLES = {
-        'P': NamedStyle(name='status-P', fill=PatternFill(start_color="C8E6C9", end_color="C8E6C9", fill_type="solid"), font=Font(color="256029", bold=True), border=Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin')), alignment=Alignment(horizontal='center')),
-        'WW': NamedStyle(name='status-WW', fill=PatternFill(start_color="C8E6C9", end_color="C8E6C9", fill_type="solid"), font=Font(color="256029", bold=True), border=Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin')), alignment=Alignment(horizontal='center')),
-        'A': NamedStyle(name='status-A', fill=PatternFill(start_color="FFCDD2", end_color="FFCDD2", fill_type="solid"), font=Font(color="C63737", bold=True), border=Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin')), alignment=Alignment(horizontal='center')),
-        'HD': NamedStyle(name='status-HD', fill=PatternFill(start_color="FFD54F", end_color="FFD54F", fill_type="solid"), font=Font(color="8A5340", bold=True), border=Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin')), alignment=Alignment(horizontal='center')),
-        'WO': NamedStyle(name='status-WO', fill=PatternFill(start_color="FFD54F", end_color="FFD54F", fill_type="solid"), font=Font(color="8A5340", bold=True), border=Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin')), alignment=Alignment(horizontal='center')),
-        'PH': NamedStyle(name='status-PH', fill=PatternFill(start_color="FFD54F", end_color="FFD54F", fill_type="solid"), font=Font(color="8A5340", bold=True), border=Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin')), alignment=Alignment(horizontal='center')),
-        'FH': NamedStyle(name='status-FH', fill=PatternFill(start_color="FFD54F", end_color="FFD54F", fill_type="solid"), font=Font(color="8A5340", bold=True), border=Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin')), alignment=Alignment(horizontal='center')),
-        'MP': NamedStyle(name='status-MP', fill=PatternFill(start_color="FFF4E6", end_color="FFF4E6", fill_type="solid"), font=Font(color="D84315", bold=True), border=Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin')), alignment=Alignment(horizontal='center')),
-        'IH': NamedStyle(name='status-IH', fill=PatternFill(start_color="FFF3CD", end_color="FFF3CD", fill_type="solid"), font=Font(color="856404", bold=True), border=Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin')), alignment=Alignment(horizontal='center')),
-    }
-
-    # Define a border style
-    THIN_BORDER = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
+    # Day counts shown after Calender Days, in column order
+    DAY_COUNT_COLUMNS = ('working_days', 'paid_days', 'present_days', 'absent_days', 'missed_punch_count', 'week_off_worked_count', 'week_offs')
 
     def get(self, request, *args, **kwargs):
         """
@@ -3646,10 +3448,8 @@ class ExportMonthlyPayrollExcel2(View):
         # Fetch attendance and employee data
         attendance_data, employee_data = self.fetch_data(month, year)
 
-        # Initialize the workbook
-        wb = Workbook()
-        ws = wb.active
-        ws.title = f"Payroll_{month}_{year}"
+        # Initialize the streaming workbook
+        writer = StreamingExcelWriter(f"Payroll_{month}_{year}")
 
         first_day_of_month = date(year, month, 1)
         last_day_of_month = self.get_last_day_of_month(first_day_of_month)
@@ -3657,43 +3457,25 @@ class ExportMonthlyPayrollExcel2(View):
 
         # Add main header
         main_header = f"Monthly Payroll Register for the Period of: {first_day_of_month} to {last_day_of_month} | Printed Date: {datetime.now().strftime('%d-%m-%Y')}"
-        ws.merge_cells(start_row=1, start_column=1, end_row=1, end_column=num_days + 6)
-        cell = ws.cell(row=1, column=1, value=main_header)
-        cell.font = Font(bold=True)
+        writer.merge_title(main_header, num_days + 6)
 
         # Add column headers
         header_labels = ["EMP ID", "EMP Name", "Company", "Location", "Department", "Designation", "Type", "Days"]
         days_header = [str(day) for day in range(1, num_days + 1)]
         total_header = ["Calender Days", "Working Days", "Paid Days", "Present", "Absent", "MP", "WW", "WO", "PH", "FS", "CL", "EL", "SL", "Total Working", "Total Late Entry", "Total Early Exit", "Total Overtime"]
         full_header = header_labels + days_header + total_header
-        ws.append(full_header)
-
-        # Style header row
-        for col in range(1, len(full_header) + 1):
-            cell = ws.cell(row=2, column=col)
-            cell.font = Font(bold=True)
-            cell.fill = PatternFill(start_color="E3F2FD", end_color="E3F2FD", fill_type="solid")
-            cell.border = self.THIN_BORDER
-
-            if col >= 9:  # Style days and total columns
-                cell.font = Font(bold=True)
-                cell.fill = PatternFill(start_color="F5F5F5", end_color="F5F5F5", fill_type="solid")
+        writer.write_row(full_header, header_formats(len(full_header)))
 
         # Add employee data rows
-        row_num = 3  # Start from row 3 after headers
-        total_present = 0
-        total_absent = 0
-        ww_count = 0
-        wo_count = 0
-        grand_total_working_seconds = 0
-        grand_total_late_entry = 0
-        grand_total_early_exit = 0
-        grand_total_overtime = 0
-
         for employee_id, details in employee_data.items():
-            records = attendance_data.get(employee_id, [])
-            if records:
-                days, statuses,total_days, working_days, paid_days, present_total, absent_total, mp_count, ww_count, wo_count, total_working, total_late_entry, total_early_exit, total_overtime = self.process_records(records, first_day_of_month, num_days)
+            if employee_id in attendance_data:
+                statuses = attendance_data.statuses(employee_id)
+                totals = (
+                    [num_days]
+                    + [attendance_data.value(column, employee_id) for column in self.DAY_COUNT_COLUMNS]
+                    + [0, 0, 0, 0, 0]
+                    + [self.format_timedelta_to_hhmmss(attendance_data.value(column, employee_id)) for column in SECONDS_FIELDS]
+                )
                 data_row = [
                     details['employee_id'],
                     details['employee_name'],
@@ -3703,88 +3485,35 @@ class ExportMonthlyPayrollExcel2(View):
                     details['designation'],
                     details['job_type'],
                     "Status",
-                ] + statuses + [total_days, working_days, paid_days, present_total, absent_total, mp_count, ww_count, wo_count, 0, 0, 0, 0, 0, total_working, total_late_entry, total_early_exit, total_overtime]
-                ws.append(data_row)
-
-                # Apply styling to data row
-                for col in range(1, len(data_row) + 1):
-                    cell = ws.cell(row=row_num, column=col)
-                    cell.border = self.THIN_BORDER
-                    if col <= 8:  # Style employee info columns
-                        cell.font = Font(bold=True)
-                        cell.fill = PatternFill(start_color="E3F2FD", end_color="E3F2FD", fill_type="solid")
-                    
-                    if col >= 7:  # Style days and total columns
-                        cell.font = Font(bold=True)
-                        if col < len(data_row) - 16:  # Style shift cells
-                            shift = data_row[col - 1]
-                            style = self.SHIFT_STATUS_STYLES.get(shift)
-                            if style:
-                                cell.style = style
-                        else:  # Style total columns
-                            cell.fill = PatternFill(start_color="FFD700", end_color="FFD700", fill_type="solid")
-
-                row_num += 1
-
-                total_present += present_total
-                total_absent += absent_total
-                ww_count += ww_count
-                wo_count += wo_count
-
-                # Accumulate grand total seconds
-                if total_working and total_working != 'None':
-                    hours, minutes, seconds = map(int, total_working.split(':'))
-                    grand_total_working_seconds += hours * 3600 + minutes * 60 + seconds
-                
-                # Check and handle None for time values
-                if total_late_entry and total_late_entry != 'None':
-                    hours, minutes, seconds = map(int, total_late_entry.split(':'))
-                    grand_total_late_entry += hours * 3600 + minutes * 60 + seconds
-                
-                if total_early_exit and total_early_exit != 'None':
-                    hours, minutes, seconds = map(int, total_early_exit.split(':'))
-                    grand_total_early_exit += hours * 3600 + minutes * 60 + seconds
-                
-                if total_overtime and total_overtime != 'None':
-                    hours, minutes, seconds = map(int, total_overtime.split(':'))
-                    grand_total_overtime += hours * 3600 + minutes * 60 + seconds
-        
-        # Calculate grand total hours
-        grand_total_working_hours = self.format_timedelta_to_hhmmss(grand_total_working_seconds)
-        grand_total_late_entry = self.format_timedelta_to_hhmmss(grand_total_late_entry)
-        grand_total_early_exit = self.format_timedelta_to_hhmmss(grand_total_early_exit)
-        grand_total_overtime = self.format_timedelta_to_hhmmss(grand_total_overtime)
-
-        # Add grand total row
-        grand_total_row = [""] * (len(full_header) - 17) + ["Grand Total"] + [total_present, total_absent, ww_count, wo_count, 0, 0, 0, 0, 0, grand_total_working_hours, grand_total_late_entry, grand_total_early_exit, grand_total_overtime]
-        ws.append(grand_total_row)
-
-        # Style grand total row
-        for col in range(len(full_header) - 17, len(full_header) + 1):
-            cell = ws.cell(row=row_num, column=col)
-            cell.font = Font(bold=True)
-            cell.fill = PatternFill(start_color="FFD700", end_color="FFD700", fill_type="solid")  # Gold color
-            cell.border = self.THIN_BORDER
-
-        # Adjust column widths
-        self.adjust_column_widths(ws)
+                ] + statuses + totals
+                formats = (
+                    [INFO_FORMAT] * 8
+                    + [STATUS_FORMATS.get(status, BOLD_FORMAT) for status in statuses]
+                    + [TOTAL_FORMAT] * len(total_header)
+                )
+                writer.write_row(data_row, formats)
+
+        # Add grand total row, aligned under the total columns
+        grand_totals = (
+            [num_days * len(attendance_data)]
+            + [attendance_data.grand(column) for column in self.DAY_COUNT_COLUMNS]
+            + [0, 0, 0, 0, 0]
+            + [self.format_timedelta_to_hhmmss(attendance_data.grand(column)) for column in SECONDS_FIELDS]
+        )
+        grand_total_row = [""] * (len(full_header) - 18) + ["Grand Total"] + grand_totals
+        writer.write_row(grand_total_row, [None] * (len(full_header) - 18) + [TOTAL_FORMAT] * 18)
 
-        # Generate response
+        # Stream the finished workbook back
         month_name = first_day_of_month.strftime('%B')
-        response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-        response['Content-Disposition'] = f'attachment; filename=Employee_Payroll_{month_name}_{year}.xlsx'
-        wb.save(response)
-        return response
+        return writer.response(f'Employee_Payroll_{month_name}_{year}.xlsx')
 
     def fetch_data(self, month, year):
         """
         Fetch attendance and employee data to minimize database queries.
         """
-        # Fetch attendance records
-        attendance_records = Attendance.objects.filter(logdate__year=year, logdate__month=month).select_related('employeeid')
-        attendance_data = defaultdict(list)
-        for record in attendance_records:
-            attendance_data[record.employeeid_id].append(record)
+        # Load the month's summaries as columns, one entry per employee
+        ensure_month(year, month)
+        attendance_data = MonthlyTotals(year, month)
 
         # Fetch employee data
         employees = Employee.objects.all().select_related('department', 'designation', 'location', 'company')
@@ -3840,95 +3569,6 @@ class ExportMonthlyPayrollExcel2(View):
         
         return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
 
-    def process_records(self, records, first_day, num_days):
-        """
-        Process attendance records for each day of the month.
-        """
-        days = [str(day) for day in range(1, num_days + 1)]
-        total_days = len(days)
-        statuses = []
-        present_total = 0
-        absent_total = 0
-        mp_count = 0 
-        ww_count = 0
-        wo_count = 0
-
-        total_working = timedelta(0)
-        total_late_entry = timedelta(0)
-        total_early_exit = timedelta(0)
-        total_overtime = timedelta(0)
-
-        for day in range(1, num_days + 1):
-            log_date = first_day.replace(day=day)
-            record = next((rec for rec in records if rec.logdate == log_date), None)
-            if record:
-                statuses.append(record.shift_status or "")
-            else:
-                statuses.append("")
-
-        for status_code in statuses:
-            if status_code == 'A':
-                absent_total += 1
-            elif status_code == 'HD':
-                present_total += 0.5
-                absent_total += 0.5
-            elif status_code == 'P':
-                present_total += 1
-            elif status_code == 'IH':
-                present_total += 1
-        
-        # Count number of statuses WW and WO and MP
-        ww_count = statuses.count('WW')
-        wo_count = statuses.count('WO') + statuses.count('WW')
-        mp_count = statuses.count('MP')
-        
-        # Calculate totals safely
-        total_working_le = sum((record.total_time or timedelta(0) for record in records), timedelta(0))
-        total_late_entry_le = sum((record.late_entry or timedelta(0) for record in records), timedelta(0))
-        total_early_exit_le = sum((record.early_exit or timedelta(0) for record in records), timedelta(0))
-        total_overtime_le = sum((record.overtime or timedelta(0) for record in records), timedelta(0))
-
-        total_working = self.format_timedelta_to_hhmmss(total_working_le)
-        total_late_entry = self.format_timedelta_to_hhmmss(total_late_entry_le)
-        total_early_exit = self.format_timedelta_to_hhmmss(total_early_exit_le)
-        total_overtime = self.format_timedelta_to_hhmmss(total_overtime_le)
-
-        # Format the output as HH:MM:SS
-        total_working = str(total_working) if total_working else None
-        total_late_entry = str(total_late_entry) if total_late_entry else None
-        total_early_exit = str(total_early_exit) if total_early_exit else None
-        total_overtime = str(total_overtime) if total_overtime else None
-
-        working_days = total_days - wo_count
-        # paid_days = working_days - absent_total - mp_count
-        paid_days = present_total + wo_count
-
-        return days, statuses, total_days, working_days, paid_days, present_total, absent_total, mp_count, ww_count, wo_count, total_working, total_late_entry, total_early_exit, total_overtime
-
-    def adjust_column_widths(self, ws):
-        """
-        Adjust column widths based on the maximum content length in each column,
-        skipping merged cells and applying a minimum and maximum width limit.
-        """
-        max_width = {}
-        max_allowed_width = 30  # Set a maximum width limit for columns
-        min_allowed_width = 10  # Set a minimum width limit for columns
-
-        for row in ws.iter_rows():
-            for cell in row:
-                # Skip merged cells as they don't have column_letter
-                if isinstance(cell, MergedCell):
-                    continue
-                column = cell.column_letter
-                value_length = len(str(cell.value)) if cell.value is not None else 0
-                if column not in max_width or value_length > max_width[column]:
-                    max_width[column] = min(value_length, max_allowed_width)  # Apply max width limit
-
-        for col_letter, width in max_width.items():
-            # Apply minimum and maximum width, adding padding
-            adjusted_width = max(min_allowed_width, width + 2)
-            ws.column_dimensions[col_letter].width = adjusted_width
-
 class ExportMonthlyShiftRoasterExcel(View):
     """
     View to generate and export an Excel file containing monthly duty hours and attendance details for all employees.
@@ -4093,9 +3733,10 @@ class ExportMonthlyShiftRoasterExcel(View):
         days = [str(day) for day in range(1, num_days + 1)]
         shifts = []
 
+        month_records = AttendanceMonth(records, num_days).records
+
         for day in range(1, num_days + 1):
-            log_date = first_day.replace(day=day)
-            record = next((rec for rec in records if rec.logdate == log_date), None)
+            record = month_records[day - 1]
             if record:
                 shifts.append(record.shift or "")
             else:
@@ -4108,27 +3749,6 @@ class ExportMonthlyShiftRoasterExcel2(View):
     View to generate and export an Excel file containing monthly shift roaster details for all employees.
     """
 
-    # Predefined styles for shift statuses
-    SHIFT_STATUS_STYLES = {
-        'P': NamedStyle(name='status-P', fill=PatternFill(start_color="C8E6C9", end_color="C8E6C9", fill_type="solid"), font=Font(color="256029", bold=True), border=Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin')), alignment=Alignment(horizontal='center')),
-        'WW': NamedStyle(name='status-WW', fill=PatternFill(start_color="C8E6C9", end_color="C8E6C9", fill_type="solid"), font=Font(color="256029", bold=True), border=Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin')), alignment=Alignment(horizontal='center')),
-        'A': NamedStyle(name='status-A', fill=PatternFill(start_color="FFCDD2", end_color="FFCDD2", fill_type="solid"), font=Font(color="C63737", bold=True), border=Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin')), alignment=Alignment(horizontal='center')),
-        'HD': NamedStyle(name='status-HD', fill=PatternFill(start_color="FFD54F", end_color="FFD54F", fill_type="solid"), font=Font(color="8A5340", bold=True), border=Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin')), alignment=Alignment(horizontal='center')),
-        'WO': NamedStyle(name='status-WO', fill=PatternFill(start_color="FFD54F", end_color="FFD54F", fill_type="solid"), font=Font(color="8A5340", bold=True), border=Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin')), alignment=Alignment(horizontal='center')),
-        'PH': NamedStyle(name='status-PH', fill=PatternFill(start_color="FFD54F", end_color="FFD54F", fill_type="solid"), font=Font(color="8A5340", bold=True), border=Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin')), alignment=Alignment(horizontal='center')),
-        'FH': NamedStyle(name='status-FH', fill=PatternFill(start_color="FFD54F", end_color="FFD54F", fill_type="solid"), font=Font(color="8A5340", bold=True), border=Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin')), alignment=Alignment(horizontal='center')),
-        'MP': NamedStyle(name='status-MP', fill=PatternFill(start_color="FFF4E6", end_color="FFF4E6", fill_type="solid"), font=Font(color="D84315", bold=True), border=Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin')), alignment=Alignment(horizontal='center')),
-        'IH': NamedStyle(name='status-IH', fill=PatternFill(start_color="FFF3CD", end_color="FFF3CD", fill_type="solid"), font=Font(color="856404", bold=True), border=Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin')), alignment=Alignment(horizontal='center')),
-    }
-
-    # Define a border style
-    THIN_BORDER = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
-
     def get(self, request, *args, **kwargs):
         """
         Handle GET request to generate the Excel file.
@@ -4147,10 +3767,8 @@ class ExportMonthlyShiftRoasterExcel2(View):
         # Fetch attendance and employee data
         attendance_data, employee_data = self.fetch_data(month, year)
 
-        # Initialize the workbook
-        wb = Workbook()
-        ws = wb.active
-        ws.title = f"Shift_Roaster_{month}_{year}"
+        # Initialize the streaming workbook
+        writer = StreamingExcelWriter(f"Shift_Roaster_{month}_{year}")
 
         first_day_of_month = date(year, month, 1)
         last_day_of_month = self.get_last_day_of_month(first_day_of_month)
@@ -4158,34 +3776,19 @@ class ExportMonthlyShiftRoasterExcel2(View):
 
         # Add main header
         main_header = f"Monthly Shift Roaster Register for the Period of: {first_day_of_month} to {last_day_of_month} | Printed Date: {datetime.now().strftime('%d-%m-%Y')}"
-        ws.merge_cells(start_row=1, start_column=1, end_row=1, end_column=num_days + 6)
-        cell = ws.cell(row=1, column=1, value=main_header)
-        cell.font = Font(bold=True)
+        writer.merge_title(main_header, num_days + 6)
 
         # Add column headers
         header_labels = ["EMP ID", "EMP Name", "Company", "Location", "Department", "Designation", "Type", "Days"]
         days_header = [str(day) for day in range(1, num_days + 1)]
         total_header = ["FS", "SS", "NS", "GS"]
         full_header = header_labels + days_header + total_header
-        ws.append(full_header)
-
-        # Style header row
-        for col in range(1, len(full_header) + 1):
-            cell = ws.cell(row=2, column=col)
-            cell.font = Font(bold=True)
-            cell.fill = PatternFill(start_color="E3F2FD", end_color="E3F2FD", fill_type="solid")
-            cell.border = self.THIN_BORDER
-
-            if col >= 9:  # Style days and total columns
-                cell.font = Font(bold=True)
-                cell.fill = PatternFill(start_color="F5F5F5", end_color="F5F5F5", fill_type="solid")
+        writer.write_row(full_header, header_formats(len(full_header)))
 
         # Add employee data rows
-        row_num = 3  # Start from row 3 after headers
         for employee_id, details in employee_data.items():
-            records = attendance_data.get(employee_id, [])
-            if records:
-                days, shifts, fs_count, ss_count, ns_count, gs_count = self.process_records(records, first_day_of_month, num_days)
+            if employee_id in attendance_data:
+                days, shifts, fs_count, ss_count, ns_count, gs_count = self.process_records(attendance_data.shifts(employee_id), first_day_of_month, num_days)
                 data_row = [
                     details['employee_id'],
                     details['employee_name'],
@@ -4196,47 +3799,24 @@ class ExportMonthlyShiftRoasterExcel2(View):
                     details['job_type'],
                     "Shift",
                 ] + shifts + [fs_count, ss_count, ns_count, gs_count]  # Placeholder for FS, SS, NS, GS
-                ws.append(data_row)
-
-                # Apply styling to data row
-                for col in range(1, len(data_row) + 1):
-                    cell = ws.cell(row=row_num, column=col)
-                    cell.border = self.THIN_BORDER
-                    if col <= 8:  # Style employee info columns
-                        cell.font = Font(bold=True)
-                        cell.fill = PatternFill(start_color="E3F2FD", end_color="E3F2FD", fill_type="solid")
-                    
-                    if col >= 7:  # Style days and total columns
-                        cell.font = Font(bold=True)
-                        if col < len(data_row) - 3:  # Style shift cells
-                            shift = data_row[col - 1]
-                            style = self.SHIFT_STATUS_STYLES.get(shift)
-                            if style:
-                                cell.style = style
-                        else:  # Style FS, SS, NS, GS columns
-                            cell.fill = PatternFill(start_color="FFD700", end_color="FFD700", fill_type="solid")
-
-                row_num += 1
-
-        # Adjust column widths
-        self.adjust_column_widths(ws)
+                formats = (
+                    [INFO_FORMAT] * 8
+                    + [STATUS_FORMATS.get(shift, BOLD_FORMAT) for shift in shifts]
+                    + [TOTAL_FORMAT] * len(total_header)
+                )
+                writer.write_row(data_row, formats)
 
-        # Generate response
+        # Stream the finished workbook back
         month_name = first_day_of_month.strftime('%B')
-        response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-        response['Content-Disposition'] = f'attachment; filename=Employee_Shift_Roaster_{month_name}_{year}.xlsx'
-        wb.save(response)
-        return response
+        return writer.response(f'Employee_Shift_Roaster_{month_name}_{year}.xlsx')
 
     def fetch_data(self, month, year):
         """
         Fetch attendance and employee data to minimize database queries.
         """
-        # Fetch attendance records
-        attendance_records = Attendance.objects.filter(logdate__year=year, logdate__month=month).select_related('employeeid')
-        attendance_data = defaultdict(list)
-        for record in attendance_records:
-            attendance_data[record.employeeid_id].append(record)
+        # Load the month's summaries as columns, one entry per employee
+        ensure_month(year, month)
+        attendance_data = MonthlyTotals(year, month)
 
         # Fetch employee data
         employees = Employee.objects.all().select_related('department', 'designation', 'location', 'company')
@@ -4262,61 +3842,19 @@ class ExportMonthlyShiftRoasterExcel2(View):
         next_month = first_day.replace(day=28) + timedelta(days=4)
         return next_month - timedelta(days=next_month.day)
 
-    def process_records(self, records, first_day, num_days):
+    def process_records(self, shifts, first_day, num_days):
         """
-        Process attendance records for each day of the month.
+        Count each shift in the employee's day shifts for the month.
         """
         days = [str(day) for day in range(1, num_days + 1)]
-        shifts = []
 
-        fs_count = 0
-        ss_count = 0
-        ns_count = 0
-        gs_count = 0
-
-        for day in range(1, num_days + 1):
-            log_date = first_day.replace(day=day)
-            record = next((rec for rec in records if rec.logdate == log_date), None)
-            if record:
-                shift = record.shift or ""
-                shifts.append(shift)
-                if shift == "FS":  # Check if the shift is 'FS'
-                    fs_count += 1
-                elif shift == "SS":
-                    ss_count += 1
-                elif shift == "NS":
-                    ns_count += 1   
-                elif shift == "GS":
-                    gs_count += 1
-            else:
-                shifts.append("")
+        fs_count = shifts.count("FS")
+        ss_count = shifts.count("SS")
+        ns_count = shifts.count("NS")
+        gs_count = shifts.count("GS")
 
         return days, shifts, fs_count, ss_count, ns_count, gs_count
 
-    def adjust_column_widths(self, ws):
-        """
-        Adjust column widths based on the maximum content length in each column,
-        skipping merged cells and applying a minimum and maximum width limit.
-        """
-        max_width = {}
-        max_allowed_width = 30  # Set a maximum width limit for columns
-        min_allowed_width = 10  # Set a minimum width limit for columns
-
-        for row in ws.iter_rows():
-            for cell in row:
-                # Skip merged cells as they don't have column_letter
-                if isinstance(cell, MergedCell):
-                    continue
-                column = cell.column_letter
-                value_length = len(str(cell.value)) if cell.value is not None else 0
-                if column not in max_width or value_length > max_width[column]:
-                    max_width[column] = min(value_length, max_allowed_width)  # Apply max width limit
-
-        for col_letter, width in max_width.items():
-            # Apply minimum and maximum width, adding padding
-            adjusted_width = max(min_allowed_width, width + 2)
-            ws.column_dimensions[col_letter].width = adjusted_width
-    
 class ExportMonthlyOvertimeExcel(View):
     """
     View to generate and export an Excel file containing monthly duty hours and attendance details for all employees.
@@ -4482,9 +4020,10 @@ class ExportMonthlyOvertimeExcel(View):
         overtime = []
         total_overtime = timedelta(0)
 
+        month_records = AttendanceMonth(records, num_days).records
+
         for day in range(1, num_days + 1):
-            log_date = first_day.replace(day=day)
-            record = next((rec for rec in records if rec.logdate == log_date), None)
+            record = month_records[day - 1]
             if record:
                 total_overtime_value = record.overtime or timedelta(0)
                 overtime.append(str(total_overtime_value if total_overtime_value != timedelta(0) else ""))
@@ -4509,14 +4048,6 @@ class ExportMonthlyOvertimeExcel2(View):
     View to generate and export an Excel file containing monthly duty hours and attendance details for all employees.
     """
 
-    # Define a border style
-    THIN_BORDER = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
-
     def get(self, request, *args, **kwargs):
         """
         Handle GET request to generate the Excel file.
@@ -4535,10 +4066,8 @@ class ExportMonthlyOvertimeExcel2(View):
         # Fetch attendance and employee data
         attendance_data, employee_data = self.fetch_data(month, year)
 
-        # Initialize the workbook
-        wb = Workbook()
-        ws = wb.active
-        ws.title = f"Attendance_{month}_{year}"
+        # Initialize the streaming workbook
+        writer = StreamingExcelWriter(f"Attendance_{month}_{year}")
 
         first_day_of_month = date(year, month, 1)
         last_day_of_month = self.get_last_day_of_month(first_day_of_month)
@@ -4547,40 +4076,22 @@ class ExportMonthlyOvertimeExcel2(View):
 
         # Add main header
         main_header = f"Monthly Overtime Register for the Period of: {first_day_of_month} to {last_day_of_month} | Printed Date: {datetime.now().strftime('%d-%m-%Y')}"
-        ws.merge_cells(start_row=1, start_column=1, end_row=1, end_column=num_days + 9)
-        cell = ws.cell(row=1, column=1, value=main_header)
-        cell.font = Font(bold=True)
+        writer.merge_title(main_header, num_days + 9)
 
         # Add column headers
         header_labels = ["EMP ID", "EMP Name", "Company", "Location", "Department", "Designation", "Type", "Days"]
         days_header = [str(day) for day in range(1, num_days + 1)]
         total_header = ["Total"]
         full_header = header_labels + days_header + total_header
-        ws.append(full_header)
-
-        # Style header row
-        for col in range(1, len(full_header) + 1):
-            cell = ws.cell(row=2, column=col)
-            cell.font = Font(bold=True)
-            cell.fill = PatternFill(start_color="E3F2FD", end_color="E3F2FD", fill_type="solid")
-            cell.border = self.THIN_BORDER
-        
-            if col >= 9:
-                cell.font = Font(bold=True)
-                cell.fill = PatternFill(start_color="F5F5F5", end_color="F5F5F5", fill_type="solid")
-                
-                # Adjust column width based on max content width
-                # if col <= len(max_widths):
-                #     ws.column_dimensions[cell.column_letter].width = max_widths[col-1] + 2
-            
+        writer.write_row(full_header, header_formats(len(full_header)))
+
         # Add employee data rows
-        row_num = 3  # Start from row 3 after headers
-        grand_total_seconds = 0
+        day_seconds = attendance_data.day_seconds('day_overtime')
 
         for employee_id, details in employee_data.items():
-            records = attendance_data.get(employee_id, [])
-            if records:
-                overtime, formatted_total = self.process_records(records, first_day_of_month, num_days)
+            if employee_id in attendance_data:
+                days = [format_day_seconds(seconds) for seconds in day_seconds[attendance_data.index[employee_id]].tolist()]
+                formatted_total = format_seconds(attendance_data.value('overtime_seconds', employee_id))
                 data_row = [
                     details['employee_id'],
                     details['employee_name'],
@@ -4590,63 +4101,25 @@ class ExportMonthlyOvertimeExcel2(View):
                     details['designation'],
                     details['job_type'],
                     "Overtime",
-                ] + overtime + [formatted_total]
-                ws.append(data_row)
-
-                # Apply styling to data row
-                for col in range(1, len(data_row) + 1):
-                    cell = ws.cell(row=row_num, column=col)
-                    cell.border = self.THIN_BORDER
-                    if col <= 8:  # Style employee info columns
-                        cell.font = Font(bold=True)
-                        cell.fill = PatternFill(start_color="E3F2FD", end_color="E3F2FD", fill_type="solid")
-                    
-                    if col >= 9:  # Style days and total columns
-                        cell.font = Font(bold=True)
-                
-                row_num += 1
-
-                # Accumulate grand total seconds
-                if formatted_total:
-                    hours, minutes, seconds = map(int, formatted_total.split(':'))
-                    grand_total_seconds += hours * 3600 + minutes * 60 + seconds
-        
-        # Calculate grand total hours
-        grand_total_hours = grand_total_seconds // 3600
-        grand_total_minutes = (grand_total_seconds % 3600) // 60
-        grand_total_seconds = grand_total_seconds % 60
-        grand_total_str = f"{grand_total_hours}:{grand_total_minutes:02d}:{grand_total_seconds:02d}"
+                ] + days + [formatted_total]
+                writer.write_row(data_row, [INFO_FORMAT] * 8 + [BOLD_FORMAT] * (len(data_row) - 8))
 
         # Add grand total row
+        grand_total_str = format_seconds(attendance_data.grand('overtime_seconds')) or "0:00:00"
         grand_total_row = [""] * (len(full_header) - 2) + ["Grand Total"] + [grand_total_str]
-        ws.append(grand_total_row)
-
-        # Style grand total row
-        for col in range(len(full_header) - 1, len(full_header) + 1):
-            cell = ws.cell(row=row_num, column=col)
-            cell.font = Font(bold=True)
-            cell.fill = PatternFill(start_color="FFD700", end_color="FFD700", fill_type="solid")  # Gold color
-            cell.border = self.THIN_BORDER
+        writer.write_row(grand_total_row, [None] * (len(full_header) - 2) + [TOTAL_FORMAT] * 2)
 
-        # Adjust column widths
-        self.adjust_column_widths(ws)
-
-        # Generate response
+        # Stream the finished workbook back
         month_name = first_day_of_month.strftime('%B')
-        response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-        response['Content-Disposition'] = f'attachment; filename=Employee_Overtime_{month_name}_{year}.xlsx'
-        wb.save(response)
-        return response
+        return writer.response(f'Employee_Overtime_{month_name}_{year}.xlsx')
 
     def fetch_data(self, month, year):
         """
         Fetch attendance and employee data to minimize database queries.
         """
-        # Fetch attendance records
-        attendance_records = Attendance.objects.filter(logdate__year=year, logdate__month=month).select_related('employeeid')
-        attendance_data = defaultdict(list)
-        for record in attendance_records:
-            attendance_data[record.employeeid_id].append(record)
+        # Load the month's summaries as columns, one entry per employee
+        ensure_month(year, month)
+        attendance_data = MonthlyTotals(year, month)
 
         # Fetch employee data
         employees = Employee.objects.all().select_related('department', 'designation', 'location', 'company')
@@ -4672,83 +4145,11 @@ class ExportMonthlyOvertimeExcel2(View):
         next_month = first_day.replace(day=28) + timedelta(days=4)
         return next_month - timedelta(days=next_month.day)
 
-    def process_records(self, records, first_day, num_days):
-        """
-        Process attendance records to extract overtime for each day and total.
-        Returns overtime for each day and the total overtime in "HH:MM:SS" format,
-        even if it exceeds 24 hours (e.g., converts "1 day 03:39:42" to "27:39:42").
-        """
-        overtime = []
-        total_overtime = timedelta(0)
-        grand_total_seconds = 0
-
-        for day in range(1, num_days + 1):
-            log_date = first_day.replace(day=day)
-            record = next((rec for rec in records if rec.logdate == log_date), None)
-            
-            if record and record.overtime:
-                # Accumulate total overtime
-                total_overtime += record.overtime
-
-                # Convert individual day's overtime to "HH:MM:SS"
-                ot_seconds = int(record.overtime.total_seconds())
-                hours = ot_seconds // 3600  # Total hours (including days)
-                minutes = (ot_seconds % 3600) // 60
-                seconds = ot_seconds % 60
-                ot_str = f"{hours}:{minutes:02d}:{seconds:02d}"
-                overtime.append(ot_str)
-            else:
-                overtime.append("")  # No overtime for this day
-
-        # Format total overtime into "HH:MM:SS"
-        if total_overtime == timedelta(0):
-            formatted_total = None  # No overtime
-        else:
-            total_seconds = int(total_overtime.total_seconds())
-            hours = total_seconds // 3600  # Total hours (including days)
-            minutes = (total_seconds % 3600) // 60
-            seconds = total_seconds % 60
-            formatted_total = f"{hours}:{minutes:02d}:{seconds:02d}"
-
-        return overtime, formatted_total
-
-    def adjust_column_widths(self, ws):
-        """
-        Adjust column widths based on the maximum content length in each column,
-        skipping merged cells and applying a minimum and maximum width limit.
-        """
-        max_width = {}
-        max_allowed_width = 30  # Set a maximum width limit for columns
-        min_allowed_width = 10  # Set a minimum width limit for columns
-
-        for row in ws.iter_rows():
-            for cell in row:
-                # Skip merged cells as they don't have column_letter
-                if isinstance(cell, MergedCell):
-                    continue
-                column = cell.column_letter
-                value_length = len(str(cell.value)) if cell.value is not None else 0
-                if column not in max_width or value_length > max_width[column]:
-                    max_width[column] = min(value_length, max_allowed_width)  # Apply max width limit
-
-        for col_letter, width in max_width.items():
-            # Apply minimum and maximum width, adding padding
-            adjusted_width = max(min_allowed_width, width + 2)
-            ws.column_dimensions[col_letter].width = adjusted_width
-
 class ExportMonthlyOvertimeRoundoffExcel2(View):
     """
     View to generate and export an Excel file containing monthly duty hours and attendance details for all employees.
     """
 
-    # Define a border style
-    THIN_BORDER = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
-
     def get(self, request, *args, **kwargs):
         """
         Handle GET request to generate the Excel file.
@@ -4767,10 +4168,8 @@ class ExportMonthlyOvertimeRoundoffExcel2(View):
         # Fetch attendance and employee data
         attendance_data, employee_data = self.fetch_data(month, year)
 
-        # Initialize the workbook
-        wb = Workbook()
-        ws = wb.active
-        ws.title = f"Attendance_{month}_{year}"
+        # Initialize the streaming workbook
+        writer = StreamingExcelWriter(f"Attendance_{month}_{year}")
 
         first_day_of_month = date(year, month, 1)
         last_day_of_month = self.get_last_day_of_month(first_day_of_month)
@@ -4779,40 +4178,35 @@ class ExportMonthlyOvertimeRoundoffExcel2(View):
 
         # Add main header
         main_header = f"Monthly Overtime Roundoff Register for the Period of: {first_day_of_month} to {last_day_of_month} | Printed Date: {datetime.now().strftime('%d-%m-%Y')}"
-        ws.merge_cells(start_row=1, start_column=1, end_row=1, end_column=num_days + 9)
-        cell = ws.cell(row=1, column=1, value=main_header)
-        cell.font = Font(bold=True)
+        writer.merge_title(main_header, num_days + 9)
 
         # Add column headers
         header_labels = ["EMP ID", "EMP Name", "Company", "Location", "Department", "Designation", "Type", "Days"]
         days_header = [str(day) for day in range(1, num_days + 1)]
         total_header = ["Total"]
         full_header = header_labels + days_header + total_header
-        ws.append(full_header)
-
-        # Style header row
-        for col in range(1, len(full_header) + 1):
-            cell = ws.cell(row=2, column=col)
-            cell.font = Font(bold=True)
-            cell.fill = PatternFill(start_color="E3F2FD", end_color="E3F2FD", fill_type="solid")
-            cell.border = self.THIN_BORDER
-        
-            if col >= 9:
-                cell.font = Font(bold=True)
-                cell.fill = PatternFill(start_color="F5F5F5", end_color="F5F5F5", fill_type="solid")
-                
-                # Adjust column width based on max content width
-                # if col <= len(max_widths):
-                #     ws.column_dimensions[cell.column_letter].width = max_widths[col-1] + 2
-            
+        writer.write_row(full_header, header_formats(len(full_header)))
+
         # Add employee data rows
-        row_num = 3  # Start from row 3 after headers
-        grand_total_seconds = 0
+        # Round every employee's daily overtime in one pass
+        overtime_rules = OvertimeRoundoffRules.load()
+        day_overtime = attendance_data.day_seconds('day_overtime')
+        rounded = round_seconds(
+            day_overtime,
+            int(overtime_rules.round_off_interval.total_seconds()),
+            overtime_rules.round_off_direction,
+        )
+        rounded_totals = rounded.sum(axis=1)
 
         for employee_id, details in employee_data.items():
-            records = attendance_data.get(employee_id, [])
-            if records:
-                overtime, formatted_total = self.process_records(records, first_day_of_month, num_days)
+            if employee_id in attendance_data:
+                i = attendance_data.index[employee_id]
+                # A day with overtime that rounds down to nothing still shows 0:00:00
+                overtime = [
+                    format_seconds(seconds) or ("0:00:00" if worked else "")
+                    for seconds, worked in zip(rounded[i].tolist(), day_overtime[i].tolist())
+                ]
+                formatted_total = format_seconds(rounded_totals[i])
                 data_row = [
                     details['employee_id'],
                     details['employee_name'],
@@ -4823,62 +4217,24 @@ class ExportMonthlyOvertimeRoundoffExcel2(View):
                     details['job_type'],
                     "Overtime",
                 ] + overtime + [formatted_total]
-                ws.append(data_row)
-
-                # Apply styling to data row
-                for col in range(1, len(data_row) + 1):
-                    cell = ws.cell(row=row_num, column=col)
-                    cell.border = self.THIN_BORDER
-                    if col <= 8:  # Style employee info columns
-                        cell.font = Font(bold=True)
-                        cell.fill = PatternFill(start_color="E3F2FD", end_color="E3F2FD", fill_type="solid")
-                    
-                    if col >= 9:  # Style days and total columns
-                        cell.font = Font(bold=True)
-                
-                row_num += 1
-
-                # Accumulate grand total seconds
-                if formatted_total:
-                    hours, minutes, seconds = map(int, formatted_total.split(':'))
-                    grand_total_seconds += hours * 3600 + minutes * 60 + seconds
-        
-        # Calculate grand total hours
-        grand_total_hours = grand_total_seconds // 3600
-        grand_total_minutes = (grand_total_seconds % 3600) // 60
-        grand_total_seconds = grand_total_seconds % 60
-        grand_total_str = f"{grand_total_hours}:{grand_total_minutes:02d}:{grand_total_seconds:02d}"
+                writer.write_row(data_row, [INFO_FORMAT] * 8 + [BOLD_FORMAT] * (len(data_row) - 8))
 
         # Add grand total row
+        grand_total_str = format_seconds(rounded.sum()) or "0:00:00"
         grand_total_row = [""] * (len(full_header) - 2) + ["Grand Total"] + [grand_total_str]
-        ws.append(grand_total_row)
-
-        # Style grand total row
-        for col in range(len(full_header) - 1, len(full_header) + 1):
-            cell = ws.cell(row=row_num, column=col)
-            cell.font = Font(bold=True)
-            cell.fill = PatternFill(start_color="FFD700", end_color="FFD700", fill_type="solid")  # Gold color
-            cell.border = self.THIN_BORDER
-
-        # Adjust column widths
-        self.adjust_column_widths(ws)
+        writer.write_row(grand_total_row, [None] * (len(full_header) - 2) + [TOTAL_FORMAT] * 2)
 
-        # Generate response
+        # Stream the finished workbook back
         month_name = first_day_of_month.strftime('%B')
-        response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-        response['Content-Disposition'] = f'attachment; filename=Employee_Roundoff_Overtime_{month_name}_{year}.xlsx'
-        wb.save(response)
-        return response
+        return writer.response(f'Employee_Roundoff_Overtime_{month_name}_{year}.xlsx')
 
     def fetch_data(self, month, year):
         """
         Fetch attendance and employee data to minimize database queries.
         """
-        # Fetch attendance records
-        attendance_records = Attendance.objects.filter(logdate__year=year, logdate__month=month).select_related('employeeid')
-        attendance_data = defaultdict(list)
-        for record in attendance_records:
-            attendance_data[record.employeeid_id].append(record)
+        # Load the month's summaries as columns, one entry per employee
+        ensure_month(year, month)
+        attendance_data = MonthlyTotals(year, month)
 
         # Fetch employee data
         employees = Employee.objects.all().select_related('department', 'designation', 'location', 'company')
@@ -4904,98 +4260,6 @@ class ExportMonthlyOvertimeRoundoffExcel2(View):
         next_month = first_day.replace(day=28) + timedelta(days=4)
         return next_month - timedelta(days=next_month.day)
 
-    def process_records(self, records, first_day, num_days):
-        """
-        Process attendance records to extract overtime for each day and total.
-        Returns overtime for each day and the total overtime in "HH:MM:SS" format,
-        even if it exceeds 24 hours (e.g., converts "1 day 03:39:42" to "27:39:42").
-        """
-        overtime = []
-        total_overtime = timedelta(0)
-        grand_total_seconds = 0
-
-        # Get the singleton instance of OvertimeRoundoffRules
-        overtime_rules = OvertimeRoundoffRules.load()
-
-        # Access the attributes from the instance:
-        rounding_interval = overtime_rules.round_off_interval
-        rounding_direction = overtime_rules.round_off_direction
-        rounding_threshold = rounding_interval / 2 
-
-        for day in range(1, num_days + 1):
-            log_date = first_day.replace(day=day)
-            record = next((rec for rec in records if rec.logdate == log_date), None)
-            
-            if record and record.overtime:
-                # Convert overtime to total seconds
-                ot_seconds = int(record.overtime.total_seconds())
-
-                # Use the instance attributes for calculations:
-                remainder = ot_seconds % rounding_interval.total_seconds()
-
-                if rounding_direction.lower() == "nearest":
-                    if remainder >= rounding_threshold.total_seconds():
-                        rounded_seconds = int(ot_seconds + (rounding_interval.total_seconds() - remainder))
-                    else:
-                        rounded_seconds = int(ot_seconds - remainder)
-
-                elif rounding_direction.lower() == "up":
-                    rounded_seconds = int(ot_seconds + (rounding_interval.total_seconds() - remainder)) if remainder > 0 else ot_seconds
-
-                else:
-                    rounded_seconds = int(ot_seconds - remainder)
-
-                # Convert rounded seconds back to timedelta
-                rounded_overtime = timedelta(seconds=rounded_seconds)
-
-                # Accumulate total overtime
-                total_overtime += rounded_overtime
-
-                # Convert individual day's overtime to "HH:MM:SS"
-                hours = rounded_seconds // 3600  # Total hours (including days)
-                minutes = (rounded_seconds % 3600) // 60
-                seconds = rounded_seconds % 60
-                ot_str = f"{hours}:{minutes:02d}:{seconds:02d}"
-                overtime.append(ot_str)
-            else:
-                overtime.append("")  # No overtime for this day
-
-        # Format total overtime into "HH:MM:SS"
-        if total_overtime == timedelta(0):
-            formatted_total = None  # No overtime
-        else:
-            total_seconds = int(total_overtime.total_seconds())
-            hours = total_seconds // 3600  # Total hours (including days)
-            minutes = (total_seconds % 3600) // 60
-            seconds = total_seconds % 60
-            formatted_total = f"{hours}:{minutes:02d}:{seconds:02d}"
-
-        return overtime, formatted_total
-
-    def adjust_column_widths(self, ws):
-        """
-        Adjust column widths based on the maximum content length in each column,
-        skipping merged cells and applying a minimum and maximum width limit.
-        """
-        max_width = {}
-        max_allowed_width = 30  # Set a maximum width limit for columns
-        min_allowed_width = 10  # Set a minimum width limit for columns
-
-        for row in ws.iter_rows():
-            for cell in row:
-                # Skip merged cells as they don't have column_letter
-                if isinstance(cell, MergedCell):
-                    continue
-                column = cell.column_letter
-                value_length = len(str(cell.value)) if cell.value is not None else 0
-                if column not in max_width or value_length > max_width[column]:
-                    max_width[column] = min(value_length, max_allowed_width)  # Apply max width limit
-
-        for col_letter, width in max_width.items():
-            # Apply minimum and maximum width, adding padding
-            adjusted_width = max(min_allowed_width, width + 2)
-            ws.column_dimensions[col_letter].width = adjusted_width
-    
 class ExportMonthlyLateEntryExcel(View):
     """
     View to generate and export an Excel file containing monthly duty hours and attendance details for all employees.
@@ -5161,9 +4425,10 @@ class ExportMonthlyLateEntryExcel(View):
         late_entry = []
         total_late_entry = timedelta(0)
 
+        month_records = AttendanceMonth(records, num_days).records
+
         for day in range(1, num_days + 1):
-            log_date = first_day.replace(day=day)
-            record = next((rec for rec in records if rec.logdate == log_date), None)
+            record = month_records[day - 1]
             if record:
                 late_entry_value = record.late_entry or timedelta(0)
                 late_entry.append(str(late_entry_value if late_entry_value != timedelta(0) else ""))
@@ -5188,14 +4453,6 @@ class ExportMonthlyLateEntryExcel2(View):
     View to generate and export an Excel file containing monthly late entry details for all employees.
     """
 
-    # Define a border style
-    THIN_BORDER = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
-
     def get(self, request, *args, **kwargs):
         """
         Handle GET request to generate the Excel file.
@@ -5214,10 +4471,8 @@ class ExportMonthlyLateEntryExcel2(View):
         # Fetch attendance and employee data
         attendance_data, employee_data = self.fetch_data(month, year)
 
-        # Initialize the workbook
-        wb = Workbook()
-        ws = wb.active
-        ws.title = f"Late_Entry_{month}_{year}"
+        # Initialize the streaming workbook
+        writer = StreamingExcelWriter(f"Late_Entry_{month}_{year}")
 
         first_day_of_month = date(year, month, 1)
         last_day_of_month = self.get_last_day_of_month(first_day_of_month)
@@ -5225,36 +4480,22 @@ class ExportMonthlyLateEntryExcel2(View):
 
         # Add main header
         main_header = f"Monthly Late Entry Register for the Period of: {first_day_of_month} to {last_day_of_month} | Printed Date: {datetime.now().strftime('%d-%m-%Y')}"
-        ws.merge_cells(start_row=1, start_column=1, end_row=1, end_column=num_days + 8)
-        cell = ws.cell(row=1, column=1, value=main_header)
-        cell.font = Font(bold=True)
+        writer.merge_title(main_header, num_days + 8)
 
         # Add column headers
         header_labels = ["EMP ID", "EMP Name", "Company", "Location", "Department", "Designation", "Type", "Days"]
         days_header = [str(day) for day in range(1, num_days + 1)]
         total_header = ["Total"]
         full_header = header_labels + days_header + total_header
-        ws.append(full_header)
-
-        # Style header row
-        for col in range(1, len(full_header) + 1):
-            cell = ws.cell(row=2, column=col)
-            cell.font = Font(bold=True)
-            cell.fill = PatternFill(start_color="E3F2FD", end_color="E3F2FD", fill_type="solid")
-            cell.border = self.THIN_BORDER
-
-            if col >= 9:
-                cell.font = Font(bold=True)
-                cell.fill = PatternFill(start_color="F5F5F5", end_color="F5F5F5", fill_type="solid")
+        writer.write_row(full_header, header_formats(len(full_header)))
 
         # Add employee data rows
-        row_num = 3  # Start from row 3 after headers
-        grand_total_seconds = 0
+        day_seconds = attendance_data.day_seconds('day_late_entry')
 
         for employee_id, details in employee_data.items():
-            records = attendance_data.get(employee_id, [])
-            if records:
-                late_entry, formatted_total = self.process_records(records, first_day_of_month, num_days)
+            if employee_id in attendance_data:
+                days = [format_day_seconds(seconds) for seconds in day_seconds[attendance_data.index[employee_id]].tolist()]
+                formatted_total = format_seconds(attendance_data.value('late_entry_seconds', employee_id))
                 data_row = [
                     details['employee_id'],
                     details['employee_name'],
@@ -5264,63 +4505,25 @@ class ExportMonthlyLateEntryExcel2(View):
                     details['designation'],
                     details['job_type'],
                     "Late Entry",
-                ] + late_entry + [formatted_total]
-                ws.append(data_row)
-
-                # Apply styling to data row
-                for col in range(1, len(data_row) + 1):
-                    cell = ws.cell(row=row_num, column=col)
-                    cell.border = self.THIN_BORDER
-                    if col <= 8:  # Style employee info columns
-                        cell.font = Font(bold=True)
-                        cell.fill = PatternFill(start_color="E3F2FD", end_color="E3F2FD", fill_type="solid")
-                    
-                    if col >= 9:
-                        cell.font = Font(bold=True)
-
-                row_num += 1
-
-                # Accumulate grand total seconds
-                if formatted_total:
-                    hours, minutes, seconds = map(int, formatted_total.split(':'))
-                    grand_total_seconds += hours * 3600 + minutes * 60 + seconds
-        
-        # Calculate grand total hours
-        grand_total_hours = grand_total_seconds // 3600
-        grand_total_minutes = (grand_total_seconds % 3600) // 60
-        grand_total_seconds = grand_total_seconds % 60
-        grand_total_str = f"{grand_total_hours}:{grand_total_minutes:02d}:{grand_total_seconds:02d}"
+                ] + days + [formatted_total]
+                writer.write_row(data_row, [INFO_FORMAT] * 8 + [BOLD_FORMAT] * (len(data_row) - 8))
 
         # Add grand total row
+        grand_total_str = format_seconds(attendance_data.grand('late_entry_seconds')) or "0:00:00"
         grand_total_row = [""] * (len(full_header) - 2) + ["Grand Total"] + [grand_total_str]
-        ws.append(grand_total_row)
-
-        # Style grand total row
-        for col in range(len(full_header) - 1, len(full_header) + 1):
-            cell = ws.cell(row=row_num, column=col)
-            cell.font = Font(bold=True)
-            cell.fill = PatternFill(start_color="FFD700", end_color="FFD700", fill_type="solid")  # Gold color
-            cell.border = self.THIN_BORDER
+        writer.write_row(grand_total_row, [None] * (len(full_header) - 2) + [TOTAL_FORMAT] * 2)
 
-        # Adjust column widths
-        self.adjust_column_widths(ws)
-
-        # Generate response
+        # Stream the finished workbook back
         month_name = first_day_of_month.strftime('%B')
-        response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-        response['Content-Disposition'] = f'attachment; filename=Employee_Late_Entry_{month_name}_{year}.xlsx'
-        wb.save(response)
-        return response
+        return writer.response(f'Employee_Late_Entry_{month_name}_{year}.xlsx')
 
     def fetch_data(self, month, year):
         """
         Fetch attendance and employee data to minimize database queries.
         """
-        # Fetch attendance records
-        attendance_records = Attendance.objects.filter(logdate__year=year, logdate__month=month).select_related('employeeid')
-        attendance_data = defaultdict(list)
-        for record in attendance_records:
-            attendance_data[record.employeeid_id].append(record)
+        # Load the month's summaries as columns, one entry per employee
+        ensure_month(year, month)
+        attendance_data = MonthlyTotals(year, month)
 
         # Fetch employee data
         employees = Employee.objects.all().select_related('department', 'designation', 'location', 'company')
@@ -5346,64 +4549,6 @@ class ExportMonthlyLateEntryExcel2(View):
         next_month = first_day.replace(day=28) + timedelta(days=4)
         return next_month - timedelta(days=next_month.day)
 
-    def process_records(self, records, first_day, num_days):
-        """
-        Process attendance records to extract late entry for each day and total.
-        Returns late entry for each day and the total in "HH:MM:SS" format.
-        """
-        late_entry = []
-        total_late = timedelta(0)
-
-        for day in range(1, num_days + 1):
-            log_date = first_day.replace(day=day)
-            record = next((rec for rec in records if rec.logdate == log_date), None)
-            
-            if record and record.late_entry:
-                total_late += record.late_entry
-                le_seconds = int(record.late_entry.total_seconds())
-                hours = le_seconds // 3600
-                minutes = (le_seconds % 3600) // 60
-                seconds = le_seconds % 60
-                late_entry.append(f"{hours}:{minutes:02d}:{seconds:02d}")
-            else:
-                late_entry.append("")
-
-        # Format total late entry
-        if total_late == timedelta(0):
-            formatted_total = None
-        else:
-            total_seconds = int(total_late.total_seconds())
-            hours = total_seconds // 3600
-            minutes = (total_seconds % 3600) // 60
-            seconds = total_seconds % 60
-            formatted_total = f"{hours}:{minutes:02d}:{seconds:02d}"
-
-        return late_entry, formatted_total
-    
-    def adjust_column_widths(self, ws):
-        """
-        Adjust column widths based on the maximum content length in each column,
-        skipping merged cells and applying a minimum and maximum width limit.
-        """
-        max_width = {}
-        max_allowed_width = 30  # Set a maximum width limit for columns
-        min_allowed_width = 10  # Set a minimum width limit for columns
-
-        for row in ws.iter_rows():
-            for cell in row:
-                # Skip merged cells as they don't have column_letter
-                if isinstance(cell, MergedCell):
-                    continue
-                column = cell.column_letter
-                value_length = len(str(cell.value)) if cell.value is not None else 0
-                if column not in max_width or value_length > max_width[column]:
-                    max_width[column] = min(value_length, max_allowed_width)  # Apply max width limit
-
-        for col_letter, width in max_width.items():
-            # Apply minimum and maximum width, adding padding
-            adjusted_width = max(min_allowed_width, width + 2)
-            ws.column_dimensions[col_letter].width = adjusted_width
-    
 class ExportMonthlyEarlyExitExcel(View):
     """
     View to generate and export an Excel file containing monthly duty hours and attendance details for all employees.
@@ -5569,9 +4714,10 @@ class ExportMonthlyEarlyExitExcel(View):
         early_exit = []
         total_early_exit = timedelta(0)  # Initialize total as timedelta
 
+        month_records = AttendanceMonth(records, num_days).records
+
         for day in range(1, num_days + 1):
-            log_date = first_day.replace(day=day)
-            record = next((rec for rec in records if rec.logdate == log_date), None)
+            record = month_records[day - 1]
             if record:
                 early_exit_value = record.early_exit or timedelta(0)
                 early_exit.append(str(early_exit_value if early_exit_value != timedelta(0) else ""))
@@ -5596,14 +4742,6 @@ class ExportMonthlyEarlyExitExcel2(View):
     View to generate and export an Excel file containing monthly late entry details for all employees.
     """
 
-    # Define a border style
-    THIN_BORDER = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
-
     def get(self, request, *args, **kwargs):
         """
         Handle GET request to generate the Excel file.
@@ -5622,10 +4760,8 @@ class ExportMonthlyEarlyExitExcel2(View):
         # Fetch attendance and employee data
         attendance_data, employee_data = self.fetch_data(month, year)
 
-        # Initialize the workbook
-        wb = Workbook()
-        ws = wb.active
-        ws.title = f"Early_Exit_{month}_{year}"
+        # Initialize the streaming workbook
+        writer = StreamingExcelWriter(f"Early_Exit_{month}_{year}")
 
         first_day_of_month = date(year, month, 1)
         last_day_of_month = self.get_last_day_of_month(first_day_of_month)
@@ -5633,36 +4769,22 @@ class ExportMonthlyEarlyExitExcel2(View):
 
         # Add main header
         main_header = f"Monthly Early Exit Register for the Period of: {first_day_of_month} to {last_day_of_month} | Printed Date: {datetime.now().strftime('%d-%m-%Y')}"
-        ws.merge_cells(start_row=1, start_column=1, end_row=1, end_column=num_days + 8)
-        cell = ws.cell(row=1, column=1, value=main_header)
-        cell.font = Font(bold=True)
+        writer.merge_title(main_header, num_days + 8)
 
         # Add column headers
         header_labels = ["EMP ID", "EMP Name", "Company", "Location", "Department", "Designation", "Type", "Days"]
         days_header = [str(day) for day in range(1, num_days + 1)]
         total_header = ["Total"]
         full_header = header_labels + days_header + total_header
-        ws.append(full_header)
+        writer.write_row(full_header, header_formats(len(full_header)))
 
-        # Style header row
-        for col in range(1, len(full_header) + 1):
-            cell = ws.cell(row=2, column=col)
-            cell.font = Font(bold=True)
-            cell.fill = PatternFill(start_color="E3F2FD", end_color="E3F2FD", fill_type="solid")
-            cell.border = self.THIN_BORDER
-
-            if col >= 9:
-                cell.font = Font(bold=True)
-                cell.fill = PatternFill(start_color="F5F5F5", end_color="F5F5F5", fill_type="solid")
-
-        # Add employee data rows
-        row_num = 3  # Start from row 3 after headers
-        grand_total_seconds = 0
+        # Add employee data rows
+        day_seconds = attendance_data.day_seconds('day_early_exit')
 
         for employee_id, details in employee_data.items():
-            records = attendance_data.get(employee_id, [])
-            if records:
-                early_exit, formatted_total = self.process_records(records, first_day_of_month, num_days)
+            if employee_id in attendance_data:
+                days = [format_day_seconds(seconds) for seconds in day_seconds[attendance_data.index[employee_id]].tolist()]
+                formatted_total = format_seconds(attendance_data.value('early_exit_seconds', employee_id))
                 data_row = [
                     details['employee_id'],
                     details['employee_name'],
@@ -5672,63 +4794,25 @@ class ExportMonthlyEarlyExitExcel2(View):
                     details['designation'],
                     details['job_type'],
                     "Early Exit",
-                ] + early_exit + [formatted_total]
-                ws.append(data_row)
-
-                # Apply styling to data row
-                for col in range(1, len(data_row) + 1):
-                    cell = ws.cell(row=row_num, column=col)
-                    cell.border = self.THIN_BORDER
-                    if col <= 8:  # Style employee info columns
-                        cell.font = Font(bold=True)
-                        cell.fill = PatternFill(start_color="E3F2FD", end_color="E3F2FD", fill_type="solid")
-                    
-                    if col >= 9:
-                        cell.font = Font(bold=True)
-
-                row_num += 1
-
-                # Accumulate grand total seconds
-                if formatted_total:
-                    hours, minutes, seconds = map(int, formatted_total.split(':'))
-                    grand_total_seconds += hours * 3600 + minutes * 60 + seconds
-        
-        # Calculate grand total hours
-        grand_total_hours = grand_total_seconds // 3600
-        grand_total_minutes = (grand_total_seconds % 3600) // 60
-        grand_total_seconds = grand_total_seconds % 60
-        grand_total_str = f"{grand_total_hours}:{grand_total_minutes:02d}:{grand_total_seconds:02d}"
+                ] + days + [formatted_total]
+                writer.write_row(data_row, [INFO_FORMAT] * 8 + [BOLD_FORMAT] * (len(data_row) - 8))
 
         # Add grand total row
+        grand_total_str = format_seconds(attendance_data.grand('early_exit_seconds')) or "0:00:00"
         grand_total_row = [""] * (len(full_header) - 2) + ["Grand Total"] + [grand_total_str]
-        ws.append(grand_total_row)
-
-        # Style grand total row
-        for col in range(len(full_header) - 1, len(full_header) + 1):
-            cell = ws.cell(row=row_num, column=col)
-            cell.font = Font(bold=True)
-            cell.fill = PatternFill(start_color="FFD700", end_color="FFD700", fill_type="solid")  # Gold color
-            cell.border = self.THIN_BORDER
-
-        # Adjust column widths
-        self.adjust_column_widths(ws)
+        writer.write_row(grand_total_row, [None] * (len(full_header) - 2) + [TOTAL_FORMAT] * 2)
 
-        # Generate response
+        # Stream the finished workbook back
         month_name = first_day_of_month.strftime('%B')
-        response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-        response['Content-Disposition'] = f'attachment; filename=Employee_Early_Exit_{month_name}_{year}.xlsx'
-        wb.save(response)
-        return response
+        return writer.response(f'Employee_Early_Exit_{month_name}_{year}.xlsx')
 
     def fetch_data(self, month, year):
         """
         Fetch attendance and employee data to minimize database queries.
         """
-        # Fetch attendance records
-        attendance_records = Attendance.objects.filter(logdate__year=year, logdate__month=month).select_related('employeeid')
-        attendance_data = defaultdict(list)
-        for record in attendance_records:
-            attendance_data[record.employeeid_id].append(record)
+        # Load the month's summaries as columns, one entry per employee
+        ensure_month(year, month)
+        attendance_data = MonthlyTotals(year, month)
 
         # Fetch employee data
         employees = Employee.objects.all().select_related('department', 'designation', 'location', 'company')
@@ -5754,64 +4838,6 @@ class ExportMonthlyEarlyExitExcel2(View):
         next_month = first_day.replace(day=28) + timedelta(days=4)
         return next_month - timedelta(days=next_month.day)
 
-    def process_records(self, records, first_day, num_days):
-        """
-        Process attendance records to extract late entry for each day and total.
-        Returns late entry for each day and the total in "HH:MM:SS" format.
-        """
-        early_exit = []
-        total_early = timedelta(0)
-
-        for day in range(1, num_days + 1):
-            log_date = first_day.replace(day=day)
-            record = next((rec for rec in records if rec.logdate == log_date), None)
-            
-            if record and record.early_exit:
-                total_early += record.early_exit
-                le_seconds = int(record.early_exit.total_seconds())
-                hours = le_seconds // 3600
-                minutes = (le_seconds % 3600) // 60
-                seconds = le_seconds % 60
-                early_exit.append(f"{hours}:{minutes:02d}:{seconds:02d}")
-            else:
-                early_exit.append("")
-
-        # Format total late entry
-        if total_early == timedelta(0):
-            formatted_total = None
-        else:
-            total_seconds = int(total_early.total_seconds())
-            hours = total_seconds // 3600
-            minutes = (total_seconds % 3600) // 60
-            seconds = total_seconds % 60
-            formatted_total = f"{hours}:{minutes:02d}:{seconds:02d}"
-
-        return early_exit, formatted_total
-    
-    def adjust_column_widths(self, ws):
-        """
-        Adjust column widths based on the maximum content length in each column,
-        skipping merged cells and applying a minimum and maximum width limit.
-        """
-        max_width = {}
-        max_allowed_width = 30  # Set a maximum width limit for columns
-        min_allowed_width = 10  # Set a minimum width limit for columns
-
-        for row in ws.iter_rows():
-            for cell in row:
-                # Skip merged cells as they don't have column_letter
-                if isinstance(cell, MergedCell):
-                    continue
-                column = cell.column_letter
-                value_length = len(str(cell.value)) if cell.value is not None else 0
-                if column not in max_width or value_length > max_width[column]:
-                    max_width[column] = min(value_length, max_allowed_width)  # Apply max width limit
-
-        for col_letter, width in max_width.items():
-            # Apply minimum and maximum width, adding padding
-            adjusted_width = max(min_allowed_width, width + 2)
-            ws.column_dimensions[col_letter].width = adjusted_width
-    
 class ExportMonthlyAbsentExcel(View):
     """
     View to generate and export an Excel file containing monthly duty hours and attendance details for all employees.
@@ -5983,9 +5009,10 @@ class ExportMonthlyAbsentExcel(View):
         statuses = []
         absent_total = 0
 
+        month_records = AttendanceMonth(records, num_days).records
+
         for day in range(1, num_days + 1):
-            log_date = first_day.replace(day=day)
-            record = next((rec for rec in records if rec.logdate == log_date), None)
+            record = month_records[day - 1]
             if record:
                 if record.shift_status in ('A', 'MP', 'HD', 'WO'):
                     statuses.append(record.shift_status)
@@ -6009,27 +5036,6 @@ class ExportMonthlyAbsentExcel2(View):
     View to generate and export an Excel file containing monthly absent details for all employees.
     """
 
-    # Predefined styles for shift statuses
-    SHIFT_STATUS_STYLES = {
-        'P': NamedStyle(name='status-P', fill=PatternFill(start_color="C8E6C9", end_color="C8E6C9", fill_type="solid"), font=Font(color="256029", bold=True), border=Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin')), alignment=Alignment(horizontal='center')),
-        'WW': NamedStyle(name='status-WW', fill=PatternFill(start_color="C8E6C9", end_color="C8E6C9", fill_type="solid"), font=Font(color="256029", bold=True), border=Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin')), alignment=Alignment(horizontal='center')),
-        'A': NamedStyle(name='status-A', fill=PatternFill(start_color="FFCDD2", end_color="FFCDD2", fill_type="solid"), font=Font(color="C63737", bold=True), border=Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin')), alignment=Alignment(horizontal='center')),
-        'HD': NamedStyle(name='status-HD', fill=PatternFill(start_color="FFD54F", end_color="FFD54F", fill_type="solid"), font=Font(color="8A5340", bold=True), border=Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin')), alignment=Alignment(horizontal='center')),
-        'WO': NamedStyle(name='status-WO', fill=PatternFill(start_color="FFD54F", end_color="FFD54F", fill_type="solid"), font=Font(color="8A5340", bold=True), border=Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin')), alignment=Alignment(horizontal='center')),
-        'PH': NamedStyle(name='status-PH', fill=PatternFill(start_color="FFD54F", end_color="FFD54F", fill_type="solid"), font=Font(color="8A5340", bold=True), border=Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin')), alignment=Alignment(horizontal='center')),
-        'FH': NamedStyle(name='status-FH', fill=PatternFill(start_color="FFD54F", end_color="FFD54F", fill_type="solid"), font=Font(color="8A5340", bold=True), border=Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin')), alignment=Alignment(horizontal='center')),
-        'MP': NamedStyle(name='status-MP', fill=PatternFill(start_color="FFF4E6", end_color="FFF4E6", fill_type="solid"), font=Font(color="D84315", bold=True), border=Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin')), alignment=Alignment(horizontal='center')),
-        'IH': NamedStyle(name='status-IH', fill=PatternFill(start_color="FFF3CD", end_color="FFF3CD", fill_type="solid"), font=Font(color="856404", bold=True), border=Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin')), alignment=Alignment(horizontal='center')),
-    }
-
-    # Define a border style
-    THIN_BORDER = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
-
     def get(self, request, *args, **kwargs):
         """
         Handle GET request to generate the Excel file.
@@ -6048,10 +5054,8 @@ class ExportMonthlyAbsentExcel2(View):
         # Fetch attendance and employee data
         attendance_data, employee_data = self.fetch_data(month, year)
 
-        # Initialize the workbook
-        wb = Workbook()
-        ws = wb.active
-        ws.title = f"Attendance_{month}_{year}"
+        # Initialize the streaming workbook
+        writer = StreamingExcelWriter(f"Attendance_{month}_{year}")
 
         first_day_of_month = date(year, month, 1)
         last_day_of_month = self.get_last_day_of_month(first_day_of_month)
@@ -6059,36 +5063,20 @@ class ExportMonthlyAbsentExcel2(View):
 
         # Add main header
         main_header = f"Monthly Absent Register for the Period of: {first_day_of_month} to {last_day_of_month} | Printed Date: {datetime.now().strftime('%d-%m-%Y')}"
-        ws.merge_cells(start_row=1, start_column=1, end_row=1, end_column=num_days + 6)
-        cell = ws.cell(row=1, column=1, value=main_header)
-        cell.font = Font(bold=True)
+        writer.merge_title(main_header, num_days + 6)
 
         # Add column headers
         header_labels = ["EMP ID", "EMP Name", "Company", "Location", "Department", "Designation", "Type", "Days"]
         days_header = [str(day) for day in range(1, num_days + 1)]
         total_header = ["Absent Days"]
         full_header = header_labels + days_header + total_header
-        ws.append(full_header)
-
-        # Style header row
-        for col in range(1, len(full_header) + 1):
-            cell = ws.cell(row=2, column=col)
-            cell.font = Font(bold=True)
-            cell.fill = PatternFill(start_color="E3F2FD", end_color="E3F2FD", fill_type="solid")
-            cell.border = self.THIN_BORDER
-
-            if col >= 9:  # Style days and total columns
-                cell.font = Font(bold=True)
-                cell.fill = PatternFill(start_color="F5F5F5", end_color="F5F5F5", fill_type="solid")
+        writer.write_row(full_header, header_formats(len(full_header)))
 
         # Add employee data rows
-        row_num = 3  # Start from row 3 after headers
-        grand_total = 0
-
         for employee_id, details in employee_data.items():
-            records = attendance_data.get(employee_id, [])
-            if records:
-                days, statuses, absent_total = self.process_records(records, first_day_of_month, num_days)
+            if employee_id in attendance_data:
+                statuses = [status if status in ('A', 'MP', 'HD', 'WO') else "" for status in attendance_data.statuses(employee_id)]
+                total = attendance_data.value('absent_days_with_mp', employee_id)
                 data_row = [
                     details['employee_id'],
                     details['employee_name'],
@@ -6098,63 +5086,29 @@ class ExportMonthlyAbsentExcel2(View):
                     details['designation'],
                     details['job_type'],
                     "Status",
-                ] + statuses + [absent_total]
-                ws.append(data_row)
-
-                # Apply styling to data row
-                for col in range(1, len(data_row) + 1):
-                    cell = ws.cell(row=row_num, column=col)
-                    cell.border = self.THIN_BORDER
-                    if col <= 8:  # Style employee info columns
-                        cell.font = Font(bold=True)
-                        cell.fill = PatternFill(start_color="E3F2FD", end_color="E3F2FD", fill_type="solid")
-                    
-                    if col >= 8:  # Style days and total columns
-                        cell.font = Font(bold=True)
-                        if col < len(data_row):  # Style status cells
-                            status = data_row[col - 1]
-                            style = self.SHIFT_STATUS_STYLES.get(status)
-                            if style:
-                                cell.style = style
-                        else:  # Style total column
-                            cell.fill = PatternFill(start_color="FFCDD2", end_color="FFCDD2", fill_type="solid")
-
-                row_num += 1
-
-                # Accumulate grand total seconds
-                if absent_total:
-                    grand_total += absent_total
+                ] + statuses + [total]
+                formats = (
+                    [INFO_FORMAT] * 8
+                    + [STATUS_FORMATS.get(status, BOLD_FORMAT) for status in statuses]
+                    + [ABSENT_TOTAL_FORMAT]
+                )
+                writer.write_row(data_row, formats)
 
         # Add grand total row
-        grand_total_row = [""] * (len(full_header) - 2) + ["Grand Total"] + [grand_total]
-        ws.append(grand_total_row)
+        grand_total_row = [""] * (len(full_header) - 2) + ["Grand Total"] + [attendance_data.grand('absent_days_with_mp')]
+        writer.write_row(grand_total_row, [None] * (len(full_header) - 2) + [TOTAL_FORMAT] * 2)
 
-        # Style grand total row
-        for col in range(len(full_header) - 1, len(full_header) + 1):
-            cell = ws.cell(row=row_num, column=col)
-            cell.font = Font(bold=True)
-            cell.fill = PatternFill(start_color="FFD700", end_color="FFD700", fill_type="solid")  # Gold color
-            cell.border = self.THIN_BORDER
-
-        # Adjust column widths
-        self.adjust_column_widths(ws)
-
-        # Generate response
+        # Stream the finished workbook back
         month_name = first_day_of_month.strftime('%B')
-        response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-        response['Content-Disposition'] = f'attachment; filename=Employee_Absent_{month_name}_{year}.xlsx'
-        wb.save(response)
-        return response
+        return writer.response(f'Employee_Absent_{month_name}_{year}.xlsx')
 
     def fetch_data(self, month, year):
         """
         Fetch attendance and employee data to minimize database queries.
         """
-        # Fetch attendance records
-        attendance_records = Attendance.objects.filter(logdate__year=year, logdate__month=month).select_related('employeeid')
-        attendance_data = defaultdict(list)
-        for record in attendance_records:
-            attendance_data[record.employeeid_id].append(record)
+        # Load the month's summaries as columns, one entry per employee
+        ensure_month(year, month)
+        attendance_data = MonthlyTotals(year, month)
 
         # Fetch employee data
         employees = Employee.objects.all().select_related('department', 'designation', 'location', 'company')
@@ -6180,60 +5134,6 @@ class ExportMonthlyAbsentExcel2(View):
         next_month = first_day.replace(day=28) + timedelta(days=4)
         return next_month - timedelta(days=next_month.day)
 
-    def process_records(self, records, first_day, num_days):
-        """
-        Process attendance records for each day of the month.
-        """
-        days = [str(day) for day in range(1, num_days + 1)]
-        statuses = []
-        absent_total = 0
-
-        for day in range(1, num_days + 1):
-            log_date = first_day.replace(day=day)
-            record = next((rec for rec in records if rec.logdate == log_date), None)
-            if record:
-                if record.shift_status in ('A', 'MP', 'HD', 'WO'):
-                    statuses.append(record.shift_status)
-                else:
-                    statuses.append("")
-            else:
-                statuses.append("")
-
-        for status_code in statuses:
-            if status_code == 'A':
-                absent_total += 1
-            elif status_code == 'HD':
-                absent_total += 0.5
-            elif status_code == 'MP':
-                absent_total += 1
-
-        return days, statuses, absent_total
-
-    def adjust_column_widths(self, ws):
-        """
-        Adjust column widths based on the maximum content length in each column,
-        skipping merged cells and applying a minimum and maximum width limit.
-        """
-        max_width = {}
-        max_allowed_width = 30  # Set a maximum width limit for columns
-        min_allowed_width = 10  # Set a minimum width limit for columns
-
-        for row in ws.iter_rows():
-            for cell in row:
-                # Skip merged cells as they don't have column_letter
-                if isinstance(cell, MergedCell):
-                    continue
-                column = cell.column_letter
-                value_length = len(str(cell.value)) if cell.value is not None else 0
-                if column not in max_width or value_length > max_width[column]:
-                    max_width[column] = min(value_length, max_allowed_width)  # Apply max width limit
-
-        for col_letter, width in max_width.items():
-            # Apply minimum and maximum width, adding padding
-            adjusted_width = max(min_allowed_width, width + 2)
-            ws.column_dimensions[col_letter].width = adjusted_width
-    
-    
 class ExportMonthlyPresentExcel(View):
     """
     View to generate and export an Excel file containing monthly duty hours and attendance details for all employees.
@@ -6405,9 +5305,10 @@ class ExportMonthlyPresentExcel(View):
         statuses = []
         present_total = 0
 
+        month_records = AttendanceMonth(records, num_days).records
+
         for day in range(1, num_days + 1):
-            log_date = first_day.replace(day=day)
-            record = next((rec for rec in records if rec.logdate == log_date), None)
+            record = month_records[day - 1]
             if record:
                 if record.shift_status in ('P', 'WW', 'HD', 'WO', 'IH'):
                     statuses.append(record.shift_status)
@@ -6433,26 +5334,6 @@ class ExportMonthlyPresentExcel2(View):
     View to generate and export an Excel file containing monthly duty hours and attendance details for all employees.
     """
 
-    # Predefined styles for shift statuses
-    SHIFT_STATUS_STYLES = {
-        'P': NamedStyle(name='status-P', fill=PatternFill(start_color="C8E6C9", end_color="C8E6C9", fill_type="solid"), font=Font(color="256029", bold=True), border=Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin')), alignment=Alignment(horizontal='center')),
-        'WW': NamedStyle(name='status-WW', fill=PatternFill(start_color="C8E6C9", end_color="C8E6C9", fill_type="solid"), font=Font(color="256029", bold=True), border=Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin')), alignment=Alignment(horizontal='center')),
-        'A': NamedStyle(name='status-A', fill=PatternFill(start_color="FFCDD2", end_color="FFCDD2", fill_type="solid"), font=Font(color="C63737", bold=True), border=Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin')), alignment=Alignment(horizontal='center')),
-        'HD': NamedStyle(name='status-HD', fill=PatternFill(start_color="FFD54F", end_color="FFD54F", fill_type="solid"), font=Font(color="8A5340", bold=True), border=Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin')), alignment=Alignment(horizontal='center')),
-        'WO': NamedStyle(name='status-WO', fill=PatternFill(start_color="FFD54F", end_color="FFD54F", fill_type="solid"), font=Font(color="8A5340", bold=True), border=Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin')), alignment=Alignment(horizontal='center')),
-        'PH': NamedStyle(name='status-PH', fill=PatternFill(start_color="FFD54F", end_color="FFD54F", fill_type="solid"), font=Font(color="8A5340", bold=True), border=Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin')), alignment=Alignment(horizontal='center')),
-        'FH': NamedStyle(name='status-FH', fill=PatternFill(start_color="FFD54F", end_color="FFD54F", fill_type="solid"), font=Font(color="8A5340", bold=True), border=Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin')), alignment=Alignment(horizontal='center')),
-        'MP': NamedStyle(name='status-MP', fill=PatternFill(start_color="FFF4E6", end_color="FFF4E6", fill_type="solid"), font=Font(color="D84315", bold=True), border=Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin')), alignment=Alignment(horizontal='center')),
-        'IH': NamedStyle(name='status-IH', fill=PatternFill(start_color="FFF3CD", end_color="FFF3CD", fill_type="solid"), font=Font(color="856404", bold=True), border=Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin')), alignment=Alignment(horizontal='center')),
-    }
-
-    THIN_BORDER = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
-
     def get(self, request, *args, **kwargs):
         """
         Handle GET request to generate the Excel file.
@@ -6471,10 +5352,8 @@ class ExportMonthlyPresentExcel2(View):
         # Fetch attendance and employee data
         attendance_data, employee_data = self.fetch_data(month, year)
 
-        # Initialize the workbook
-        wb = Workbook()
-        ws = wb.active
-        ws.title = f"Attendance_{month}_{year}"
+        # Initialize the streaming workbook
+        writer = StreamingExcelWriter(f"Attendance_{month}_{year}")
 
         first_day_of_month = date(year, month, 1)
         last_day_of_month = self.get_last_day_of_month(first_day_of_month)
@@ -6482,36 +5361,20 @@ class ExportMonthlyPresentExcel2(View):
 
         # Add the headers for the file
         main_header = f"Monthly Present Register for the Period: {first_day_of_month} to {last_day_of_month} | Printed: {datetime.now().strftime('%d-%m-%Y')}"
-        ws.merge_cells(start_row=1, start_column=1, end_row=1, end_column=num_days + 6)
-        cell = ws.cell(row=1, column=1, value=main_header)
-        cell.font = Font(bold=True)
+        writer.merge_title(main_header, num_days + 6)
 
         # Add column headers
         header_labels = ["EMP ID", "EMP Name", "Company", "Location", "Department", "Designation", "Type", "Days"]
         days_header = [str(day) for day in range(1, num_days + 1)]
         total_header = ["Present Days"]
         full_header = header_labels + days_header + total_header
-        ws.append(full_header)
-
-        # Style header row
-        for col in range(1, len(full_header) + 1):
-            cell = ws.cell(row=2, column=col)
-            cell.font = Font(bold=True)
-            cell.fill = PatternFill(start_color="E3F2FD", end_color="E3F2FD", fill_type="solid")
-            cell.border = self.THIN_BORDER
-
-            if col >= 9:  # Style days and total columns
-                cell.font = Font(bold=True)
-                cell.fill = PatternFill(start_color="F5F5F5", end_color="F5F5F5", fill_type="solid")
+        writer.write_row(full_header, header_formats(len(full_header)))
 
         # Add employee data rows
-        row_num = 3  # Start from row 3 after headers
-        grand_total = 0
-
         for employee_id, details in employee_data.items():
-            records = attendance_data.get(employee_id, [])
-            if records:
-                days, statuses, present_total = self.process_records(records, first_day_of_month, num_days)
+            if employee_id in attendance_data:
+                statuses = [status if status in ('P', 'WW', 'HD', 'WO', 'IH') else "" for status in attendance_data.statuses(employee_id)]
+                total = attendance_data.value('present_days_with_ww', employee_id)
                 data_row = [
                     details['employee_id'],
                     details['employee_name'],
@@ -6521,66 +5384,29 @@ class ExportMonthlyPresentExcel2(View):
                     details['designation'],
                     details['job_type'],
                     "Status",
-                ] + statuses + [present_total]
-                ws.append(data_row)
-
-                # Apply styling to data row
-                for col in range(1, len(data_row) + 1):
-                    cell = ws.cell(row=row_num, column=col)
-                    cell.border = self.THIN_BORDER
-                    if col <= 8:  # Style employee info columns
-                        cell.font = Font(bold=True)
-                        cell.fill = PatternFill(start_color="E3F2FD", end_color="E3F2FD", fill_type="solid")
-
-                    if col >= 8:  # Style days and total columns
-                        if col < len(data_row):  # Style status cells
-                            status = data_row[col - 1]
-                            style = self.SHIFT_STATUS_STYLES.get(status)
-                            if style:
-                                cell.style = style
-                        else:  # Style total column
-                            cell.fill = PatternFill(start_color="C8E6C9", end_color="C8E6C9", fill_type="solid")
-                    
-                    if col > len(header_labels) + num_days:
-                        cell.font = Font(bold=True)
-                        cell.fill = PatternFill(start_color="C8E6C9", end_color="C8E6C9", fill_type="solid")
-
-                row_num += 1
-
-                # Accumulate grand total seconds
-                if present_total:
-                    grand_total += present_total
+                ] + statuses + [total]
+                formats = (
+                    [INFO_FORMAT] * 8
+                    + [STATUS_FORMATS.get(status, BORDER_FORMAT) for status in statuses]
+                    + [PRESENT_TOTAL_FORMAT]
+                )
+                writer.write_row(data_row, formats)
 
         # Add grand total row
-        grand_total_row = [""] * (len(full_header) - 2) + ["Grand Total"] + [grand_total]
-        ws.append(grand_total_row)
+        grand_total_row = [""] * (len(full_header) - 2) + ["Grand Total"] + [attendance_data.grand('present_days_with_ww')]
+        writer.write_row(grand_total_row, [None] * (len(full_header) - 2) + [TOTAL_FORMAT] * 2)
 
-        # Style grand total row
-        for col in range(len(full_header) - 1, len(full_header) + 1):
-            cell = ws.cell(row=row_num, column=col)
-            cell.font = Font(bold=True)
-            cell.fill = PatternFill(start_color="FFD700", end_color="FFD700", fill_type="solid")  # Gold color
-            cell.border = self.THIN_BORDER
-
-        # Adjust column widths
-        self.adjust_column_widths(ws)
-
-        # Generate response
+        # Stream the finished workbook back
         month_name = first_day_of_month.strftime('%B')
-        response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-        response['Content-Disposition'] = f'attachment; filename=Employee_Present_{month_name}_{year}.xlsx'
-        wb.save(response)
-        return response
+        return writer.response(f'Employee_Present_{month_name}_{year}.xlsx')
 
     def fetch_data(self, month, year):
         """
         Fetch attendance and employee data to minimize database queries.
         """
-        # Fetch attendance records
-        attendance_records = Attendance.objects.filter(logdate__year=year, logdate__month=month).select_related('employeeid')
-        attendance_data = defaultdict(list)
-        for record in attendance_records:
-            attendance_data[record.employeeid_id].append(record)
+        # Load the month's summaries as columns, one entry per employee
+        ensure_month(year, month)
+        attendance_data = MonthlyTotals(year, month)
 
         # Fetch employee data
         employees = Employee.objects.all().select_related('department', 'designation', 'location', 'company')
@@ -6608,124 +5434,6 @@ class ExportMonthlyPresentExcel2(View):
         next_month = first_day.replace(day=28) + timedelta(days=4)
         return next_month - timedelta(days=next_month.day)
 
-    def add_employee_data(self, ws, details, records, first_day, last_day, num_days, start_row):
-        """
-        Add employee details and attendance data to the worksheet.
-        """
-        # Add employee header
-        header = (
-            f"Monthly Late Entry Register for the Period of: {first_day} to {last_day}"
-        )
-        ws.merge_cells(start_row=start_row, start_column=1, end_row=start_row, end_column=num_days)
-        cell = ws.cell(row=start_row, column=1, value=header)
-        cell.font = Font(bold=True)
-
-        # Process attendance records
-        days, statuses, present_total = self.process_records(records, first_day, num_days)
-
-        # Define header labels
-        header_labels = ["EMP ID", "EMP Name", "Company", "Location", "Department", "Designation", "Type", "Days"]
-        row_data = header_labels + days + ["Present Days"]
-
-        # Adding the rows to the sheet
-        rows = [
-            row_data,
-            [f"{details['employee_id']}", f"{details['employee_name']}", f"{details['department']}", f"{details['designation']}", f"{details['job_type']}", "Status"] + statuses + 
-            [present_total],
-        ]
-
-        # Calculate max width for each column
-        max_widths = []
-        for col in range(len(header_labels)):
-            max_width = max(len(str(header_labels[col])), len(str(rows[1][col])))
-            max_widths.append(max_width)
-
-        # Iterate through each row of data and add it to the worksheet
-        for i, row_data in enumerate(rows, start=start_row + 1):
-            for col, value in enumerate(row_data, start=1):
-                cell = ws.cell(row=i, column=col, value=value)
-                cell.border = self.THIN_BORDER
-                
-                # Style the header column (first columns)
-                if col < 7:
-                    cell.font = Font(bold=True)
-                    cell.fill = PatternFill(start_color="E3F2FD", end_color="E3F2FD", fill_type="solid")
-                    
-                    # Adjust column width based on max content width
-                    if col <= len(max_widths):
-                        ws.column_dimensions[cell.column_letter].width = max_widths[col-1] + 2  # Add padding
-                
-                # Style the status cells
-                if i == start_row + 2:  # Status row
-                    style = self.SHIFT_STATUS_STYLES.get(value)
-                    if style:
-                        cell.style = style
-
-                if i == start_row + 2 and col > len(header_labels) + num_days:
-                    cell.font = Font(bold=True)
-                    cell.fill = PatternFill(start_color="C8E6C9", end_color="C8E6C9", fill_type="solid")
-                
-                # Style the days row
-                if i == start_row + 1 and col > 6: 
-                    cell.font = Font(bold=True)
-                    cell.fill = PatternFill(start_color="F5F5F5", end_color="F5F5F5", fill_type="solid")
-
-    def process_records(self, records, first_day, num_days):
-        """
-        Process attendance records for each day of the month.
-        """
-        days = [str(day) for day in range(1, num_days + 1)]
-        statuses = []
-        present_total = 0
-
-        for day in range(1, num_days + 1):
-            log_date = first_day.replace(day=day)
-            record = next((rec for rec in records if rec.logdate == log_date), None)
-            if record:
-                if record.shift_status in ('P', 'WW', 'HD', 'WO', 'IH'):
-                    statuses.append(record.shift_status)
-                else:
-                    statuses.append("")
-            else:
-                statuses.append("")
-            
-        for status_code in statuses:
-            if status_code == 'HD':
-                present_total += 0.5
-            elif status_code == 'P':
-                present_total += 1
-            elif status_code == 'WW':
-                present_total += 1
-            elif status_code == 'IH':
-                present_total += 1
-
-        return days, statuses, present_total
-
-    def adjust_column_widths(self, ws):
-        """
-        Adjust column widths based on the maximum content length in each column,
-        skipping merged cells and applying a minimum and maximum width limit.
-        """
-        max_width = {}
-        max_allowed_width = 30  # Set a maximum width limit for columns
-        min_allowed_width = 10  # Set a minimum width limit for columns
-
-        for row in ws.iter_rows():
-            for cell in row:
-                # Skip merged cells as they don't have column_letter
-                if isinstance(cell, MergedCell):
-                    continue
-                column = cell.column_letter
-                value_length = len(str(cell.value)) if cell.value is not None else 0
-                if column not in max_width or value_length > max_width[column]:
-                    max_width[column] = min(value_length, max_allowed_width)  # Apply max width limit
-
-        for col_letter, width in max_width.items():
-            # Apply minimum and maximum width, adding padding
-            adjusted_width = max(min_allowed_width, width + 2)
-            ws.column_dimensions[col_letter].width = adjusted_width
-
-
 class ProcessLogView(APIView):
     def post(self, request, *args, **kwargs):
         serializer = serializers.LogsSerializer(data=request.data)
@@ -6737,8 +5445,8 @@ class ProcessLogView(APIView):
             # Create a Logs instance
             log = Logs(log_datetime=log_datetime, employeeid=employeeid, direction=direction)
 
-            # Process the log using AttendanceProcessor
-            processor = attendance5.AttendanceProcessor()
+            # Process the log using the shared, already loaded AttendanceProcessor data
+            processor = get_processor(attendance5.AttendanceProcessor)
             success = processor.process_single_log(log, is_manual=True)
 
             if success:
@@ -6748,6 +5456,13 @@ class ProcessLogView(APIView):
         else:
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+class ProcessorRegistryMetricsView(APIView):
+    """
+    Hit/miss, reload and incremental update counters of the shared attendance processor data.
+    """
+    def get(self, request, *args, **kwargs):
+        return Response(processor_registry.metrics(), status=status.HTTP_200_OK)
+
 class MonthlyAttendanceView(APIView):
     """
     API to fetch attendance data for a given year and month.
@@ -6796,43 +5511,48 @@ class MonthlyAttendanceView(APIView):
         start_date = make_aware(datetime(year, month, 1))
         end_date = make_aware(datetime(year, month, days_in_month, 23, 59, 59))
 
-        attendance_records = Attendance.objects.filter(logdate__range=(start_date, end_date))
+        # The monthly summaries give one row per employee with attendance this month,
+        # so pagination happens before any daily rows are read
+        ensure_month(year, month)
+        summaries = MonthlyAttendanceSummary.objects.filter(year=year, month=month).select_related('employeeid').order_by('employeeid__employee_id')
 
         # Apply search filter for employee_id and employee_name
         if search_query:
-            attendance_records = attendance_records.filter(
+            summaries = summaries.filter(
                 Q(employeeid__employee_id__icontains=search_query) 
                 # Q(employeeid__employee_name__icontains=search_query)
             )
 
-        # Group attendance by employee
-        employee_data = {}
-        for record in attendance_records:
-            emp_id = record.employeeid.employee_id
-            emp_name = record.employeeid.employee_name
-
-            if emp_id not in employee_data:
-                employee_data[emp_id] = {
-                    'employee_id': emp_id,
-                    'employee_name': emp_name,
-                    'attendance': {}
-                }
+        # Paginate employee records
+        paginator = self.EmployeePagination()
+        page = paginator.paginate_queryset(summaries, request)
+
+        employee_data = {
+            summary.employeeid_id: {
+                'employee_id': summary.employeeid.employee_id,
+                'employee_name': summary.employeeid.employee_name,
+                'attendance': {}
+            }
+            for summary in page
+        }
 
+        # Only the employees on this page need their daily rows
+        attendance_records = Attendance.objects.filter(
+            employeeid_id__in=list(employee_data), logdate__range=(start_date, end_date)
+        ).only('id', 'employeeid_id', 'logdate', 'first_logtime', 'last_logtime', 'direction')
+
+        for record in attendance_records:
             date_str = record.logdate.strftime('%d')
-            employee_data[emp_id]['attendance'][date_str] = {
+            employee_data[record.employeeid_id]['attendance'][date_str] = {
                 'id': record.id,
                 'time_in': record.first_logtime.strftime('%H:%M') if record.first_logtime else None,
                 'time_out': record.last_logtime.strftime('%H:%M') if record.last_logtime else None,
                 'direction': record.direction if record.direction else None
             }
 
-        # Paginate employee records
-        paginator = self.EmployeePagination()
-        paginated_employees = paginator.paginate_queryset(list(employee_data.values()), request)
-
         response_data = {
             'dates': dates_list,
-            'employees': paginated_employees
+            'employees': list(employee_data.values())
         }
 
         return paginator.get_paginated_response(response_data)
@@ -6999,10 +5719,9 @@ class MonthlyAttendanceView(APIView):
 
 class UpdateAttendanceView(APIView):
     def patch(self, request, attendance_id):
-        from resource.attendance7 import AttendanceProcessor
         print("UpdateAttendanceView PATCH method called!")
 
-        processor = AttendanceProcessor()
+        processor = get_processor(attendance7.AttendanceProcessor)
         data = request.data
         time_in = data.get("time_in")
         time_out = data.get("time_out")
@@ -7158,4 +5877,66 @@ class HolidayRetrieveUpdateDestroy(generics.RetrieveUpdateDestroyAPIView):
     """
     queryset = HolidayList.objects.all()
     serializer_class = serializers.HolidayListSerializer
-    lookup_url_kwarg = "id"
\ No newline at end of file
+    lookup_url_kwarg = "id"
+
+class ExportJobCreate(APIView):
+    """
+    Queue a monthly report for background generation.
+
+    Takes report_type (one of export_jobs.REPORT_VIEWS), month, year and an
+    optional filters object, limited to export_jobs.REPORT_FILTERS. If the same report was already built for the
+    current state of the data the finished job is returned straight away.
+    """
+    def post(self, request, *args, **kwargs):
+        report_type = request.data.get('report_type')
+        month = request.data.get('month')
+        year = request.data.get('year')
+        filters = request.data.get('filters') or {}
+
+        if report_type not in export_jobs.REPORT_VIEWS:
+            return Response({'error': f"report_type must be one of: {', '.join(export_jobs.REPORT_VIEWS)}"}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not (month and year):
+            return Response({'error': 'Month and year are required parameters.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            month, year = int(month), int(year)
+        except (TypeError, ValueError):
+            return Response({'error': 'Month and year must be valid integers.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not isinstance(filters, dict):
+            return Response({'error': 'filters must be an object.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        unknown = set(filters) - export_jobs.REPORT_FILTERS
+        if unknown:
+            return Response({'error': f"Unsupported filters: {', '.join(sorted(unknown))}"}, status=status.HTTP_400_BAD_REQUEST)
+
+        job = export_jobs.enqueue_export(report_type, month, year, filters)
+        serializer = serializers.ExportJobSerializer(job, context={'request': request})
+        response_status = status.HTTP_200_OK if job.status == 'done' else status.HTTP_202_ACCEPTED
+        return Response(serializer.data, status=response_status)
+
+class ExportJobStatus(generics.RetrieveAPIView):
+    """
+    Poll the state of a queued report.
+    """
+    queryset = ExportJob.objects.all()
+    serializer_class = serializers.ExportJobSerializer
+    lookup_url_kwarg = "id"
+
+class ExportJobDownload(APIView):
+    """
+    Download the file produced by a finished report job.
+    """
+    def get(self, request, id, *args, **kwargs):
+        job = get_object_or_404(ExportJob, id=id)
+
+        if job.status != 'done':
+            return Response({'error': 'Report is not ready yet.', 'status': job.status}, status=status.HTTP_409_CONFLICT)
+
+        if not (job.file_path and os.path.exists(job.file_path)):
+            return Response({'error': 'Report file is no longer available, please request it again.'}, status=status.HTTP_410_GONE)
+
+        return FileResponse(open(job.file_path, 'rb'), as_attachment=True, filename=job.file_name,
+                            content_type=XLSX_CONTENT_TYPE)
+
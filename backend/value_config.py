@@ -1,3 +1,9 @@
 WEEK_OFF_CONFIG = {
     'DEFAULT_WEEK_OFF': [], # 0: Monday, 1: Tuesday, ..., 6: Sunday
 }
+
+ABSENCE_CORRECTION_CONFIG = {
+    # Sandwich patterns over consecutive days, e.g. 'A-PH-A' or 'A-WO-WO-A'.
+    # The days between the first and last status are marked 'A'.
+    'PATTERNS': ['A-WO-A'],
+}
@@ -0,0 +1,325 @@
+"""
+Long-running punch sync from the biotime MSSQL logs table to the attendance backend.
+
+Replaces import.py, copy.py and Getin_Attendance.pyw. Instead of reconnecting
+to both databases on every tick, the service keeps its connections open and
+only reconnects (with exponential backoff) after one fails. Polling speeds up
+while punches are flowing and slows down when the device table is idle.
+
+Every fetched batch is written to an on-disk spool before it is delivered, so
+punches read from MSSQL survive a PostgreSQL or API outage and are delivered in
+order once the target is reachable again.
+
+Run it with pythonw log_sync.py to keep it in the background on Windows.
+"""
+import json
+import logging
+import os
+import time
+
+import psycopg2
+import pyodbc
+import requests
+from psycopg2.extras import execute_values
+
+# MSSQL connection details
+MSSQL_CONN_STR = os.getenv(
+    'MSSQL_CONN_STR',
+    'DRIVER={ODBC Driver 17 for SQL Server};SERVER=127.0.0.1;DATABASE=biotime;UID=Digitali;PWD=Digitali',
+)
+
+# PostgreSQL connection details, used when DELIVERY is 'db'
+PG_CONN_STR = os.getenv('PG_CONN_STR', 'dbname=skf user=postgres password=password123 host=10.177.8.143 port=5432')
+
+# API details, used when DELIVERY is 'http'
+API_URL = os.getenv('API_URL', 'http://10.38.21.181:8000/')
+LAST_LOG_ID_URL = API_URL + 'last_log_id'
+LOGS_BULK_URL = API_URL + 'logs/bulk/'
+
+# 'db' upserts straight into public.logs, 'http' posts each batch to the API
+DELIVERY = os.getenv('SYNC_DELIVERY', 'db')
+
+# Rows fetched from MSSQL per batch
+BATCH_SIZE = int(os.getenv('SYNC_BATCH_SIZE', '5000'))
+
+# Seconds between polls; doubles while idle up to the maximum
+MIN_POLL_INTERVAL = float(os.getenv('SYNC_MIN_POLL_INTERVAL', '1'))
+MAX_POLL_INTERVAL = float(os.getenv('SYNC_MAX_POLL_INTERVAL', '30'))
+
+# Longest wait between reconnect attempts
+MAX_BACKOFF = 60
+
+# Undelivered batches are kept here until the target accepts them
+SPOOL_DIR = os.getenv('SYNC_SPOOL_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'spool'))
+
+# Stop fetching when this many batches are waiting in the spool
+MAX_SPOOL_BATCHES = int(os.getenv('SYNC_MAX_SPOOL_BATCHES', '2000'))
+
+LOG_COLUMNS = ('id', 'employeeid', 'direction', 'shortname', 'serialno', 'log_datetime')
+
+logger = logging.getLogger('log_sync')
+
+
+class ConnectionUnavailable(Exception):
+    pass
+
+
+class ReconnectingConnection:
+    """
+    A connection that stays open between polls. After a failure it is closed
+    and not retried until its backoff delay has passed.
+    """
+
+    def __init__(self, name, connect):
+        self.name = name
+        self._connect = connect
+        self.conn = None
+        self.failures = 0
+        self.retry_at = 0.0
+
+    def get(self):
+        if self.conn is None:
+            if time.monotonic() < self.retry_at:
+                raise ConnectionUnavailable(f"{self.name} is unavailable")
+            try:
+                self.conn = self._connect()
+            except Exception:
+                self._schedule_retry()
+                raise
+            logger.info("Connected to %s", self.name)
+            self.failures = 0
+        return self.conn
+
+    def failed(self):
+        """Drop the connection after an error; the next get() reconnects once the backoff has passed."""
+        if self.conn is not None:
+            try:
+                self.conn.close()
+            except Exception:
+                pass
+            self.conn = None
+        self._schedule_retry()
+
+    def _schedule_retry(self):
+        self.failures += 1
+        delay = min(2 ** (self.failures - 1), MAX_BACKOFF)
+        self.retry_at = time.monotonic() + delay
+        logger.warning("%s unavailable, retrying in %ss", self.name, delay)
+
+
+class Spool:
+    """
+    Fetched batches waiting for delivery, one JSON file per batch named by its
+    first MSSQL id, plus the last id that has been fetched into the spool.
+    """
+
+    def __init__(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.state_path = os.path.join(directory, 'state.json')
+
+    def last_id(self):
+        try:
+            with open(self.state_path) as fh:
+                return json.load(fh)['last_id']
+        except (FileNotFoundError, ValueError, KeyError):
+            return None
+
+    def add(self, records):
+        path = os.path.join(self.directory, f"{records[0]['id']:015d}.json")
+        self._write(path, records)
+        self._write(self.state_path, {'last_id': records[-1]['id']})
+
+    def pending(self):
+        """Spooled batches in id order, as (path, records)."""
+        for name in sorted(os.listdir(self.directory)):
+            if name.endswith('.json') and name != 'state.json':
+                path = os.path.join(self.directory, name)
+                with open(path) as fh:
+                    yield path, json.load(fh)
+
+    def remove(self, path):
+        os.remove(path)
+
+    def reject(self, entries):
+        """Keep punches the target refused, one JSON line per punch with its errors."""
+        with open(os.path.join(self.directory, 'rejected.jsonl'), 'a') as fh:
+            for entry in entries:
+                fh.write(json.dumps(entry) + '\n')
+
+    def __len__(self):
+        return sum(1 for name in os.listdir(self.directory) if name.endswith('.json') and name != 'state.json')
+
+    def _write(self, path, data):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as fh:
+            json.dump(data, fh)
+        os.replace(tmp_path, path)
+
+
+def connect_mssql():
+    return pyodbc.connect(MSSQL_CONN_STR, timeout=30)
+
+
+def connect_postgres():
+    return psycopg2.connect(PG_CONN_STR)
+
+
+def fetch_records(mssql_conn, last_id):
+    """Fetch the next batch of punches after last_id as JSON-ready dicts."""
+    query = """
+        SELECT TOP (?) [id], [employeeid], [direction], [shortname], [serialno], [log_datetime]
+        FROM [dbo].[logs]
+        WHERE [id] > ?
+        ORDER BY [id]
+    """
+    cursor = mssql_conn.cursor()
+    try:
+        cursor.execute(query, (BATCH_SIZE, last_id))
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+
+    records = []
+    for row in rows:
+        record = dict(zip(LOG_COLUMNS, row))
+        if record['log_datetime'] is not None:
+            record['log_datetime'] = record['log_datetime'].isoformat()
+        records.append(record)
+    return records
+
+
+def deliver_db(pg_conn, records):
+    """Upsert a batch into public.logs in one statement. Nothing is rejected."""
+    insert_query = """
+        INSERT INTO public.logs (id, employeeid, direction, shortname, serialno, log_datetime)
+        VALUES %s
+        ON CONFLICT (id) DO UPDATE
+        SET
+            employeeid = EXCLUDED.employeeid,
+            direction = EXCLUDED.direction,
+            shortname = EXCLUDED.shortname,
+            serialno = EXCLUDED.serialno,
+            log_datetime = EXCLUDED.log_datetime
+        WHERE
+            logs.log_datetime < EXCLUDED.log_datetime
+    """
+    rows = [tuple(record[column] for column in LOG_COLUMNS) for record in records]
+    try:
+        with pg_conn.cursor() as cursor:
+            execute_values(cursor, insert_query, rows, page_size=len(rows))
+        pg_conn.commit()
+    except Exception:
+        pg_conn.rollback()
+        raise
+    return []
+
+
+def deliver_http(session, records):
+    """
+    Post a batch to the bulk logs endpoint in one request. Returns the punches
+    the API rejected, each with its validation errors. The API only describes
+    the first rejections; if it refused more, the whole batch is returned, with
+    errors None for the undescribed punches, so none of them is lost.
+    """
+    response = session.post(LOGS_BULK_URL, json=records, timeout=60)
+    response.raise_for_status()
+    result = response.json()
+
+    errors = {error['row']: error['errors'] for error in result.get('errors', [])}
+    if result.get('rejected', 0) > len(errors):
+        return [{'record': record, 'errors': errors.get(row)} for row, record in enumerate(records)]
+    return [{'record': records[row], 'errors': row_errors} for row, row_errors in errors.items()]
+
+
+def initial_last_id(target):
+    """Where to start when the spool has no state yet."""
+    if DELIVERY == 'http':
+        response = target.get().get(LAST_LOG_ID_URL, timeout=30)
+        response.raise_for_status()
+        return response.json().get('last_log_id', 0) or 0
+
+    pg_conn = target.get()
+    with pg_conn.cursor() as cursor:
+        cursor.execute('SELECT MAX(id) FROM public.logs')
+        result = cursor.fetchone()
+    pg_conn.rollback()
+    return result[0] if result[0] is not None else 0
+
+
+def deliver_spool(spool, target):
+    """Deliver spooled batches in order until the spool is empty or the target fails."""
+    deliver = deliver_http if DELIVERY == 'http' else deliver_db
+    delivered = 0
+    for path, records in spool.pending():
+        try:
+            rejected = deliver(target.get(), records)
+        except ConnectionUnavailable:
+            break
+        except Exception as e:
+            logger.error("Delivery failed, %d batches kept in the spool: %s", len(spool), e)
+            target.failed()
+            break
+        if rejected:
+            spool.reject(rejected)
+            logger.error("%d punches from batch %s were rejected and kept in rejected.jsonl", len(rejected), os.path.basename(path))
+        spool.remove(path)
+        delivered += len(records)
+    return delivered
+
+
+def run():
+    spool = Spool(SPOOL_DIR)
+    mssql = ReconnectingConnection('MSSQL', connect_mssql)
+    if DELIVERY == 'http':
+        target = ReconnectingConnection('API', requests.Session)
+    else:
+        target = ReconnectingConnection('PostgreSQL', connect_postgres)
+
+    last_id = spool.last_id()
+    interval = MIN_POLL_INTERVAL
+
+    while True:
+        fetched = 0
+
+        if last_id is None:
+            try:
+                last_id = initial_last_id(target)
+                logger.info("Starting sync after id %s", last_id)
+            except ConnectionUnavailable:
+                pass
+            except Exception as e:
+                logger.error("Could not read the starting id: %s", e)
+                target.failed()
+
+        # Fetch the next batch into the spool unless it is already full
+        if last_id is not None and len(spool) < MAX_SPOOL_BATCHES:
+            try:
+                records = fetch_records(mssql.get(), last_id)
+                if records:
+                    spool.add(records)
+                    last_id = records[-1]['id']
+                    fetched = len(records)
+            except ConnectionUnavailable:
+                pass
+            except Exception as e:
+                logger.error("Error fetching from MSSQL: %s", e)
+                mssql.failed()
+
+        delivered = deliver_spool(spool, target)
+        if fetched or delivered:
+            logger.info("Fetched %d, delivered %d, last id %s, %d batches spooled", fetched, delivered, last_id, len(spool))
+
+        # Poll again straight away after a full batch, back off while idle
+        if fetched >= BATCH_SIZE:
+            interval = 0
+        elif fetched or delivered:
+            interval = MIN_POLL_INTERVAL
+        else:
+            interval = min(max(interval, MIN_POLL_INTERVAL) * 2, MAX_POLL_INTERVAL)
+        time.sleep(interval)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    run()
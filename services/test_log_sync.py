@@ -0,0 +1,135 @@
+"""
+Tests for log_sync. Run from this directory with python -m unittest test_log_sync.
+"""
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+try:
+    import log_sync
+except ImportError:  # pyodbc loads the system unixODBC library on import
+    log_sync = None
+
+
+@unittest.skipUnless(log_sync, "pyodbc is not available")
+class SpoolTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.spool = log_sync.Spool(self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_batches_are_pending_in_id_order_until_removed(self):
+        self.spool.add([{'id': 20}, {'id': 21}])
+        self.spool.add([{'id': 3}, {'id': 4}])
+
+        pending = list(self.spool.pending())
+        self.assertEqual([records[0]['id'] for path, records in pending], [3, 20])
+        self.assertEqual(len(self.spool), 2)
+
+        self.spool.remove(pending[0][0])
+        self.assertEqual([records[0]['id'] for path, records in self.spool.pending()], [20])
+        self.assertEqual(len(self.spool), 1)
+
+    def test_last_id_survives_a_restart(self):
+        self.assertIsNone(self.spool.last_id())
+        self.spool.add([{'id': 7}, {'id': 9}])
+
+        self.assertEqual(log_sync.Spool(self.directory.name).last_id(), 9)
+
+    def test_rejected_punches_are_kept_outside_the_pending_batches(self):
+        self.spool.reject([{'record': {'id': 5}, 'errors': {'log_datetime': ['A valid datetime is required.']}}])
+
+        self.assertEqual(list(self.spool.pending()), [])
+        with open(os.path.join(self.directory.name, 'rejected.jsonl')) as fh:
+            self.assertEqual(json.loads(fh.readline())['record'], {'id': 5})
+
+
+@unittest.skipUnless(log_sync, "pyodbc is not available")
+class ReconnectingConnectionTests(unittest.TestCase):
+    def test_backoff_doubles_up_to_the_maximum_and_resets_on_connect(self):
+        connect = mock.Mock(side_effect=OSError("refused"))
+        connection = log_sync.ReconnectingConnection('PostgreSQL', connect)
+
+        with mock.patch.object(log_sync.time, 'monotonic', return_value=1000.0):
+            delays = []
+            for attempt in range(8):
+                connection.retry_at = 0.0
+                with self.assertRaises(OSError):
+                    connection.get()
+                delays.append(connection.retry_at - 1000.0)
+        self.assertEqual(delays, [1, 2, 4, 8, 16, 32, 60, 60])
+
+        connect.side_effect = None
+        connection.retry_at = 0.0
+        self.assertIs(connection.get(), connect.return_value)
+        self.assertEqual(connection.failures, 0)
+
+    def test_no_reconnect_before_the_backoff_has_passed(self):
+        connect = mock.Mock()
+        connection = log_sync.ReconnectingConnection('MSSQL', connect)
+        connection.get()
+
+        with mock.patch.object(log_sync.time, 'monotonic', return_value=1000.0):
+            connection.failed()
+            connect.return_value.close.assert_called_once()
+            with self.assertRaises(log_sync.ConnectionUnavailable):
+                connection.get()
+        self.assertEqual(connect.call_count, 1)
+
+        with mock.patch.object(log_sync.time, 'monotonic', return_value=1001.0):
+            connection.get()
+        self.assertEqual(connect.call_count, 2)
+
+
+@unittest.skipUnless(log_sync, "pyodbc is not available")
+class DeliverSpoolTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.spool = log_sync.Spool(self.directory.name)
+        self.spool.add([{'id': 1}, {'id': 2}, {'id': 3}])
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _session(self, result):
+        session = mock.Mock()
+        session.post.return_value.json.return_value = result
+        return session
+
+    def test_rejected_punches_are_kept_and_the_batch_is_removed(self):
+        session = self._session({'rejected': 1, 'errors': [{'row': 1, 'errors': {'employeeid': ['This field is required.']}}]})
+        target = mock.Mock(get=mock.Mock(return_value=session))
+
+        with mock.patch.object(log_sync, 'DELIVERY', 'http'):
+            self.assertEqual(log_sync.deliver_spool(self.spool, target), 3)
+
+        self.assertEqual(len(self.spool), 0)
+        with open(os.path.join(self.directory.name, 'rejected.jsonl')) as fh:
+            rejected = [json.loads(line) for line in fh]
+        self.assertEqual(rejected, [{'record': {'id': 2}, 'errors': {'employeeid': ['This field is required.']}}])
+
+    def test_whole_batch_is_kept_when_rejections_are_not_all_described(self):
+        session = self._session({'rejected': 2, 'errors': [{'row': 0, 'errors': {'id': ['A positive integer is required.']}}]})
+
+        rejected = log_sync.deliver_http(session, [{'id': 1}, {'id': 2}, {'id': 3}])
+
+        self.assertEqual([entry['record']['id'] for entry in rejected], [1, 2, 3])
+        self.assertEqual([entry['errors'] is None for entry in rejected], [False, True, True])
+
+    def test_failed_delivery_keeps_the_batch(self):
+        target = mock.Mock(get=mock.Mock(return_value=mock.Mock()))
+
+        with mock.patch.object(log_sync, 'DELIVERY', 'db'), \
+                mock.patch.object(log_sync, 'deliver_db', side_effect=OSError("connection reset")):
+            self.assertEqual(log_sync.deliver_spool(self.spool, target), 0)
+
+        self.assertEqual(len(self.spool), 1)
+        target.failed.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()